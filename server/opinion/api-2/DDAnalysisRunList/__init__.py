@@ -13,11 +13,36 @@ import azure.functions as func
 from shared.utils import auth_get_email
 from shared.models import DDAnalysisRun, DueDiligence, Document, Folder
 from shared.session import transactional_session
+from shared.serialization import Projection
 from sqlalchemy import desc
 
 
 DEV_MODE = os.environ.get("DEV_MODE", "").lower() == "true"
 
+# selected_document_ids is replaced by selected_documents in the response
+RUN_LIST_FIELDS = Projection(
+    DDAnalysisRun,
+    run_id=DDAnalysisRun.id,
+    dd_id=DDAnalysisRun.dd_id,
+    run_number=DDAnalysisRun.run_number,
+    name=DDAnalysisRun.name,
+    status=DDAnalysisRun.status,
+    selected_document_ids=DDAnalysisRun.selected_document_ids,
+    total_documents=DDAnalysisRun.total_documents,
+    documents_processed=DDAnalysisRun.documents_processed,
+    findings_total=DDAnalysisRun.findings_total,
+    findings_critical=DDAnalysisRun.findings_critical,
+    findings_high=DDAnalysisRun.findings_high,
+    findings_medium=DDAnalysisRun.findings_medium,
+    findings_low=DDAnalysisRun.findings_low,
+    estimated_cost_usd=DDAnalysisRun.estimated_cost_usd,
+    created_at=DDAnalysisRun.created_at,
+    started_at=DDAnalysisRun.started_at,
+    completed_at=DDAnalysisRun.completed_at,
+    last_error=DDAnalysisRun.last_error,
+    synthesis_data=DDAnalysisRun.synthesis_data,
+)
+
 
 def main(req: func.HttpRequest) -> func.HttpResponse:
 
@@ -52,7 +77,7 @@ def main(req: func.HttpRequest) -> func.HttpResponse:
 
         with transactional_session() as session:
             # Verify DD exists
-            dd = session.query(DueDiligence).filter(DueDiligence.id == dd_uuid).first()
+            dd = session.query(DueDiligence.id).filter(DueDiligence.id == dd_uuid).first()
             if not dd:
                 return func.HttpResponse(
                     json.dumps({"error": "Due diligence not found"}),
@@ -61,50 +86,29 @@ def main(req: func.HttpRequest) -> func.HttpResponse:
                 )
 
             # Get all runs for this DD, ordered by created_at desc
-            runs = session.query(DDAnalysisRun).filter(
+            runs = RUN_LIST_FIELDS.query(session).filter(
                 DDAnalysisRun.dd_id == dd_uuid
             ).order_by(desc(DDAnalysisRun.created_at)).all()
 
-            # Get all documents for this DD to map IDs to names
-            folders = session.query(Folder).filter(Folder.dd_id == dd_uuid).all()
-            folder_ids = [f.id for f in folders]
-
-            documents = session.query(Document).filter(
-                Document.folder_id.in_(folder_ids)
-            ).all() if folder_ids else []
+            # Map this DD's document IDs to names
+            documents = session.query(Document.id, Document.original_file_name).join(
+                Folder, Document.folder_id == Folder.id
+            ).filter(Folder.dd_id == dd_uuid).all()
 
-            doc_lookup = {str(d.id): d.original_file_name for d in documents}
+            doc_lookup = {str(doc_id): name for doc_id, name in documents}
 
             # Build response
             runs_data = []
-            for run in runs:
+            for row in runs:
+                run = RUN_LIST_FIELDS.to_dict(row)
                 # Get document names for this run
                 doc_names = []
-                for doc_id in (run.selected_document_ids or []):
+                for doc_id in (run.pop("selected_document_ids") or []):
                     doc_name = doc_lookup.get(doc_id, "Unknown Document")
                     doc_names.append({"id": doc_id, "name": doc_name})
 
-                runs_data.append({
-                    "run_id": str(run.id),
-                    "dd_id": str(run.dd_id),
-                    "run_number": run.run_number,
-                    "name": run.name,
-                    "status": run.status,
-                    "selected_documents": doc_names,
-                    "total_documents": run.total_documents,
-                    "documents_processed": run.documents_processed,
-                    "findings_total": run.findings_total,
-                    "findings_critical": run.findings_critical,
-                    "findings_high": run.findings_high,
-                    "findings_medium": run.findings_medium,
-                    "findings_low": run.findings_low,
-                    "estimated_cost_usd": run.estimated_cost_usd,
-                    "created_at": run.created_at.isoformat() if run.created_at else None,
-                    "started_at": run.started_at.isoformat() if run.started_at else None,
-                    "completed_at": run.completed_at.isoformat() if run.completed_at else None,
-                    "last_error": run.last_error,
-                    "synthesis_data": run.synthesis_data if hasattr(run, 'synthesis_data') else None
-                })
+                run["selected_documents"] = doc_names
+                runs_data.append(run)
 
             return func.HttpResponse(
                 json.dumps({"runs": runs_data}),
@@ -6,6 +6,7 @@ import textwrap
 import azure.functions as func
 from shared.utils import auth_get_email
 from shared.session import transactional_session
+from shared.rate_limit import get_llm_rate_limiter, retry_after_seconds
 from shared.models import (
     Folder, DueDiligence, DueDiligenceMember, Perspective, Document,
     DDQuestion, DDQuestionReferencedDoc, PerspectiveRisk, PerspectiveRiskFinding,
@@ -348,17 +349,34 @@ def direct_claude_chat(question, dd_id, briefing, lens, session, findings_contex
             Please provide a helpful response. If the question requires specific document content, explain that the DD analysis needs to be run first to extract findings.
         """)
 
+    max_tokens = 1024
+    limiter = get_llm_rate_limiter("claude")
+    estimated_tokens = len(prompt) // 4 + max_tokens
+    acquired = False
+    actual_tokens = 0
     try:
+        acquired = limiter.acquire(estimated_tokens) if limiter else False
+        if limiter and not acquired:
+            raise TimeoutError("Timed out waiting for Claude rate limiter")
         client = anthropic.Anthropic(api_key=os.environ.get("ANTHROPIC_API_KEY"))
         message = client.messages.create(
             model="claude-sonnet-4-20250514",
-            max_tokens=1024,
+            max_tokens=max_tokens,
             messages=[{"role": "user", "content": prompt}]
         )
+        actual_tokens = message.usage.input_tokens + message.usage.output_tokens
+        if limiter:
+            limiter.report_success()
         answer = message.content[0].text
     except Exception as e:
+        if limiter and isinstance(e, anthropic.RateLimitError):
+            headers = getattr(getattr(e, "response", None), "headers", None)
+            limiter.report_rate_limit_error(retry_after=retry_after_seconds(headers, None))
         logging.error(f"Claude API error: {str(e)}")
         answer = f"I apologize, but I encountered an error processing your question. Please try again later. (Error: {str(e)})"
+    finally:
+        if acquired:
+            limiter.release(actual_tokens, estimated_tokens)
 
     return {
         "answer": answer,
@@ -104,49 +104,99 @@ def get_claude_client():
     return ClaudeClient()
 
 
-def extract_text_from_document(doc_id: str, file_type: str) -> str:
-    """Extract text content from a document for classification."""
-    # Import the existing text extraction utility
-    from DDProcessAllDev import extract_text_from_file_with_extension
-
-    if DEV_MODE and LOCAL_STORAGE_PATH:
-        file_path = os.path.join(LOCAL_STORAGE_PATH, "docs", doc_id)
-    else:
-        # For non-dev mode, we'd need to download from blob storage
-        # For now, this is DEV_MODE focused
-        file_path = os.path.join("/tmp/dd_storage", "docs", doc_id)
+def extract_texts_from_documents(documents: list) -> dict:
+    """
+    Extract text content from documents for classification.
 
-    try:
-        text = extract_text_from_file_with_extension(file_path, file_type)
+    Uses the shared extraction cache (process pool for cache misses), which
+    later stages and runs reuse. Returns dict of doc_id -> text, truncated
+    for the classification prompt.
+    """
+    from shared.text_extraction import get_document_texts
 
-        # Truncate to approximately 2000 tokens (~8000 characters)
-        max_chars = 8000
-        if len(text) > max_chars:
-            text = text[:max_chars] + "\n\n[... truncated for classification ...]"
+    # For non-dev mode, we'd need to download from blob storage
+    # For now, this is DEV_MODE focused
+    storage_path = LOCAL_STORAGE_PATH if DEV_MODE and LOCAL_STORAGE_PATH else "/tmp/dd_storage"
 
-        return text
+    try:
+        texts = get_document_texts(documents, storage_path)
     except Exception as e:
-        logging.warning(f"Failed to extract text from {doc_id}: {e}")
-        return ""
+        logging.warning(f"Failed to extract text for classification: {e}")
+        return {}
+
+    # Truncate to approximately 2000 tokens (~8000 characters)
+    max_chars = 8000
+    return {
+        doc_id: text[:max_chars] + "\n\n[... truncated for classification ...]" if len(text) > max_chars else text
+        for doc_id, text in texts.items()
+    }
 
 
-def classify_document(client, doc_text: str, filename: str) -> dict:
-    """
-    Classify a document using Claude Haiku.
-
-    Returns dict with: category, subcategory, document_type, confidence, key_parties, reasoning
-    """
+def build_classification_prompt(doc_text: str, filename: str) -> str:
+    """Build the classification prompt, falling back to filename-only when there is no text."""
     # Even if text extraction failed, try to classify based on filename
     # Many legal documents have descriptive filenames that indicate their type
     if not doc_text.strip():
         logging.info(f"[DDClassifyDocuments] No text extracted for {filename}, attempting filename-based classification")
         doc_text = f"[No text content available - classify based on filename only]\n\nFilename: {filename}"
 
-    prompt = CLASSIFICATION_PROMPT.format(
+    return CLASSIFICATION_PROMPT.format(
         document_text=doc_text,
         filename=filename
     )
 
+
+def parse_classification_response(response: dict, filename: str) -> dict:
+    """Validate a classification response into the stored classification fields."""
+    if "error" in response:
+        logging.warning(f"Classification parse error for {filename}: {response.get('error')}")
+        # Try to extract what we can from the raw response
+        return {
+            "category": "99_Needs_Review",
+            "subcategory": "Classification Error",
+            "document_type": "Unknown",
+            "confidence": 0,
+            "key_parties": [],
+            "reasoning": f"Classification parse error: {response.get('error')}"
+        }
+
+    # Validate category
+    category = response.get("category", "99_Needs_Review")
+    if category not in FOLDER_CATEGORIES:
+        category = "99_Needs_Review"
+
+    # Ensure confidence is a number
+    confidence = response.get("confidence", 50)
+    if not isinstance(confidence, (int, float)):
+        try:
+            confidence = int(confidence)
+        except:
+            confidence = 50
+    confidence = max(0, min(100, confidence))  # Clamp to 0-100
+
+    # Ensure key_parties is a list
+    key_parties = response.get("key_parties", [])
+    if not isinstance(key_parties, list):
+        key_parties = [key_parties] if key_parties else []
+
+    return {
+        "category": category,
+        "subcategory": response.get("subcategory", ""),
+        "document_type": response.get("document_type", "Unknown"),
+        "confidence": confidence,
+        "key_parties": key_parties,
+        "reasoning": response.get("reasoning", "")
+    }
+
+
+def classify_document(client, doc_text: str, filename: str) -> dict:
+    """
+    Classify a document using Claude Haiku.
+
+    Returns dict with: category, subcategory, document_type, confidence, key_parties, reasoning
+    """
+    prompt = build_classification_prompt(doc_text, filename)
+
     try:
         response = client.complete(
             prompt=prompt,
@@ -154,48 +204,11 @@ def classify_document(client, doc_text: str, filename: str) -> dict:
             model="haiku",  # Use Haiku for fast, cheap classification
             max_tokens=1024,
             temperature=0.1,
-            json_mode=True
+            json_mode=True,
+            pass_name="classification"
         )
 
-        if "error" in response:
-            logging.warning(f"Classification parse error for {filename}: {response.get('error')}")
-            # Try to extract what we can from the raw response
-            return {
-                "category": "99_Needs_Review",
-                "subcategory": "Classification Error",
-                "document_type": "Unknown",
-                "confidence": 0,
-                "key_parties": [],
-                "reasoning": f"Classification parse error: {response.get('error')}"
-            }
-
-        # Validate category
-        category = response.get("category", "99_Needs_Review")
-        if category not in FOLDER_CATEGORIES:
-            category = "99_Needs_Review"
-
-        # Ensure confidence is a number
-        confidence = response.get("confidence", 50)
-        if not isinstance(confidence, (int, float)):
-            try:
-                confidence = int(confidence)
-            except:
-                confidence = 50
-        confidence = max(0, min(100, confidence))  # Clamp to 0-100
-
-        # Ensure key_parties is a list
-        key_parties = response.get("key_parties", [])
-        if not isinstance(key_parties, list):
-            key_parties = [key_parties] if key_parties else []
-
-        return {
-            "category": category,
-            "subcategory": response.get("subcategory", ""),
-            "document_type": response.get("document_type", "Unknown"),
-            "confidence": confidence,
-            "key_parties": key_parties,
-            "reasoning": response.get("reasoning", "")
-        }
+        return parse_classification_response(response, filename)
 
     except Exception as e:
         logging.error(f"Classification API error for {filename}: {e}")
@@ -209,6 +222,41 @@ def classify_document(client, doc_text: str, filename: str) -> dict:
         }
 
 
+def classify_documents_with_message_batches(client, docs: list, doc_texts: dict) -> dict:
+    """
+    Classify documents through the Anthropic Message Batches API.
+
+    Used for large data rooms when DD_CLASSIFY_USE_MESSAGE_BATCHES=true:
+    half the cost of live calls and no per-minute rate limits, but results
+    can take minutes to hours. Requests the batch could not answer are
+    retried live by BatchClaudeClient.
+
+    Returns dict of doc_id -> classification (same shape as classify_document).
+    """
+    from dd_enhanced.core.async_claude_client import CompletionRequest
+    from dd_enhanced.core.message_batches import BatchClaudeClient
+
+    requests = []
+    for doc in docs:
+        requests.append(CompletionRequest(
+            request_id=str(doc.id),
+            prompt=build_classification_prompt(doc_texts.get(str(doc.id), ""), doc.original_file_name),
+            system=CLASSIFICATION_SYSTEM_PROMPT,
+            model="haiku",
+            max_tokens=1024,
+            temperature=0.1,
+            json_mode=True,
+            pass_name="classification"
+        ))
+
+    filenames = {str(doc.id): doc.original_file_name for doc in docs}
+    results = BatchClaudeClient.from_client(client).run_many(requests)
+    return {
+        result.request_id: parse_classification_response(result.response, filenames[result.request_id])
+        for result in results
+    }
+
+
 def update_organisation_status(session, dd_id: str, classified_count: int,
                                total_documents: int, low_confidence_count: int,
                                failed_count: int, category_counts: dict,
@@ -376,11 +424,22 @@ def classify_documents_for_dd(dd_id: str, reset: bool = False) -> dict:
             status="classifying"
         )
 
+        # Extract all texts up front (cached per file version, process pool for misses)
+        doc_texts = extract_texts_from_documents(pending_docs)
+
+        # Large data rooms: classify everything up front as message batches
+        batch_classifications = {}
+        if os.environ.get("DD_CLASSIFY_USE_MESSAGE_BATCHES", "false").lower() == "true":
+            try:
+                logging.info(f"[DDClassifyDocuments] Submitting {total_documents} documents as message batches")
+                batch_classifications = classify_documents_with_message_batches(client, pending_docs, doc_texts)
+            except Exception as e:
+                logging.error(f"[DDClassifyDocuments] Message batch classification failed, classifying live: {e}")
+
         # Process each document
         for idx, doc in enumerate(pending_docs):
             doc_id = str(doc.id)
             filename = doc.original_file_name
-            file_type = doc.type or filename.split('.')[-1] if '.' in filename else 'pdf'
 
             logging.info(f"[DDClassifyDocuments] Classifying {idx + 1}/{total_documents}: {filename}")
 
@@ -389,16 +448,18 @@ def classify_documents_for_dd(dd_id: str, reset: bool = False) -> dict:
             session.commit()
 
             try:
-                # Extract text from document
-                doc_text = extract_text_from_document(doc_id, file_type)
+                classification = batch_classifications.get(doc_id)
+
+                if classification is None:
+                    doc_text = doc_texts.get(doc_id, "")
 
-                # Even if text extraction fails, we still try to classify based on filename
-                # The classify_document function handles empty text by using filename
-                if not doc_text.strip():
-                    logging.warning(f"[DDClassifyDocuments] No text extracted from {filename} - will classify by filename")
+                    # Even if text extraction fails, we still try to classify based on filename
+                    # The classify_document function handles empty text by using filename
+                    if not doc_text.strip():
+                        logging.warning(f"[DDClassifyDocuments] No text extracted from {filename} - will classify by filename")
 
-                # Classify document (handles both with-content and filename-only cases)
-                classification = classify_document(client, doc_text, filename)
+                    # Classify document (handles both with-content and filename-only cases)
+                    classification = classify_document(client, doc_text, filename)
 
                 # Update document with classification results
                 doc.ai_category = classification["category"]
@@ -37,27 +37,29 @@ def get_claude_client():
     return ClaudeClient()
 
 
-def extract_text_from_document(doc_id: str, file_type: str) -> str:
-    """Extract text content from a document for entity mapping."""
-    from DDProcessAllDev import extract_text_from_file_with_extension
-
-    if DEV_MODE and LOCAL_STORAGE_PATH:
-        file_path = os.path.join(LOCAL_STORAGE_PATH, "docs", doc_id)
-    else:
-        file_path = os.path.join("/tmp/dd_storage", "docs", doc_id)
+def extract_texts_from_documents(documents: list) -> dict:
+    """
+    Extract text content from documents for entity mapping.
 
-    try:
-        text = extract_text_from_file_with_extension(file_path, file_type)
+    Uses the shared extraction cache (process pool for cache misses).
+    Returns dict of doc_id -> text, truncated for the mapping prompt.
+    """
+    from shared.text_extraction import get_document_texts
 
-        # Truncate to approximately 12500 tokens (~50000 characters)
-        max_chars = 50000
-        if len(text) > max_chars:
-            text = text[:max_chars] + "\n\n[... truncated for entity mapping ...]"
+    storage_path = LOCAL_STORAGE_PATH if DEV_MODE and LOCAL_STORAGE_PATH else "/tmp/dd_storage"
 
-        return text
+    try:
+        texts = get_document_texts(documents, storage_path)
     except Exception as e:
-        logging.warning(f"Failed to extract text from {doc_id}: {e}")
-        return ""
+        logging.warning(f"Failed to extract text for entity mapping: {e}")
+        return {}
+
+    # Truncate to approximately 12500 tokens (~50000 characters)
+    max_chars = 50000
+    return {
+        doc_id: text[:max_chars] + "\n\n[... truncated for entity mapping ...]" if len(text) > max_chars else text
+        for doc_id, text in texts.items()
+    }
 
 
 def run_entity_mapping(dd_id: str, run_id: str = None, max_docs: int = None) -> dict:
@@ -219,6 +221,8 @@ def run_entity_mapping(dd_id: str, run_id: str = None, max_docs: int = None) ->
                 "shareholders": shareholders_list,
             }
 
+        doc_texts = extract_texts_from_documents(documents)
+
         # Process each document
         per_doc_results = []
         for idx, doc in enumerate(documents):
@@ -230,7 +234,7 @@ def run_entity_mapping(dd_id: str, run_id: str = None, max_docs: int = None) ->
 
             try:
                 # Extract text
-                doc_text = extract_text_from_document(doc_id, file_type)
+                doc_text = doc_texts.get(doc_id, "")
 
                 if not doc_text.strip():
                     logging.warning(f"[DDEntityMapping] No text for {filename}, skipping")
@@ -11,11 +11,49 @@ import azure.functions as func
 from shared.utils import auth_get_email
 from shared.models import DDEvalRubric
 from shared.session import transactional_session
-from sqlalchemy import desc
+from shared.serialization import Projection
+from sqlalchemy import desc, case, cast, Text, func as sql_func
 
 
 DEV_MODE = os.environ.get("DEV_MODE", "").lower() == "true"
 
+# rubric_data categories counted for the summary
+SUMMARY_CATEGORIES = (
+    "critical_red_flags",
+    "amber_flags",
+    "cross_document_connections",
+    "missing_documents",
+)
+
+
+# rubric_data values (as jsonb text) that get an empty summary, like a falsy dict did
+EMPTY_RUBRIC_DATA = ("{}", "[]", "null", '""', "0", "false")
+
+
+# rubric_data is JSONB in the database (migrations/create_dd_eval_tables.sql),
+# so the jsonb_* functions apply even though the model declares JSON
+def _category_count(category: str):
+    """Length of a rubric_data array, counted in SQL so rubric_data is never loaded."""
+    value = DDEvalRubric.rubric_data[category]
+    return case(
+        (sql_func.jsonb_typeof(value) == "array", sql_func.jsonb_array_length(value)),
+        else_=0
+    )
+
+
+RUBRIC_LIST_FIELDS = Projection(
+    DDEvalRubric,
+    id=DDEvalRubric.id,
+    name=DDEvalRubric.name,
+    description=DDEvalRubric.description,
+    total_points=DDEvalRubric.total_points,
+    dd_id=DDEvalRubric.dd_id,
+    created_at=DDEvalRubric.created_at,
+    created_by=DDEvalRubric.created_by,
+    has_rubric_data=cast(DDEvalRubric.rubric_data, Text).notin_(EMPTY_RUBRIC_DATA),
+    **{f"{category}_count": _category_count(category) for category in SUMMARY_CATEGORIES},
+)
+
 
 def main(req: func.HttpRequest) -> func.HttpResponse:
 
@@ -31,24 +69,20 @@ def main(req: func.HttpRequest) -> func.HttpResponse:
 
         with transactional_session() as session:
             # Get all rubrics ordered by created_at desc
-            rubrics = session.query(DDEvalRubric).order_by(
+            rubrics = RUBRIC_LIST_FIELDS.query(session).order_by(
                 desc(DDEvalRubric.created_at)
             ).all()
 
             # Build response
             rubrics_data = []
-            for rubric in rubrics:
-                rubrics_data.append({
-                    "id": str(rubric.id),
-                    "name": rubric.name,
-                    "description": rubric.description,
-                    "total_points": rubric.total_points,
-                    "dd_id": str(rubric.dd_id) if rubric.dd_id else None,
-                    "created_at": rubric.created_at.isoformat() if rubric.created_at else None,
-                    "created_by": rubric.created_by,
-                    # Include summary counts from rubric_data
-                    "summary": _get_rubric_summary(rubric.rubric_data)
-                })
+            for row in rubrics:
+                rubric = RUBRIC_LIST_FIELDS.to_dict(row)
+                # Include summary counts from rubric_data (empty when there is none)
+                counts = {
+                    f"{category}_count": rubric.pop(f"{category}_count") for category in SUMMARY_CATEGORIES
+                }
+                rubric["summary"] = counts if rubric.pop("has_rubric_data") else {}
+                rubrics_data.append(rubric)
 
             return func.HttpResponse(
                 json.dumps({"rubrics": rubrics_data}),
@@ -65,15 +99,3 @@ def main(req: func.HttpRequest) -> func.HttpResponse:
             mimetype="application/json"
         )
 
-
-def _get_rubric_summary(rubric_data: dict) -> dict:
-    """Extract summary counts from rubric data."""
-    if not rubric_data:
-        return {}
-
-    return {
-        "critical_red_flags_count": len(rubric_data.get("critical_red_flags", [])),
-        "amber_flags_count": len(rubric_data.get("amber_flags", [])),
-        "cross_document_connections_count": len(rubric_data.get("cross_document_connections", [])),
-        "missing_documents_count": len(rubric_data.get("missing_documents", []))
-    }
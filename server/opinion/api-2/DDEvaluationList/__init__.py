@@ -13,11 +13,40 @@ import azure.functions as func
 from shared.utils import auth_get_email
 from shared.models import DDEvaluation, DDEvalRubric, DDAnalysisRun, DueDiligence
 from shared.session import transactional_session
+from shared.serialization import Projection
 from sqlalchemy import desc
 
 
 DEV_MODE = os.environ.get("DEV_MODE", "").lower() == "true"
 
+# Rubric, run and DD names come from outer joins (see _evaluation_query)
+EVALUATION_LIST_FIELDS = Projection(
+    DDEvaluation,
+    id=DDEvaluation.id,
+    rubric_id=DDEvaluation.rubric_id,
+    rubric_name=DDEvalRubric.name,
+    run_id=DDEvaluation.run_id,
+    run_name=DDAnalysisRun.name,
+    dd_id=DDAnalysisRun.dd_id,
+    dd_name=DueDiligence.name,
+    status=DDEvaluation.status,
+    total_score=DDEvaluation.total_score,
+    percentage=DDEvaluation.percentage,
+    performance_band=DDEvaluation.performance_band,
+    evaluation_model=DDEvaluation.evaluation_model,
+    created_at=DDEvaluation.created_at,
+    completed_at=DDEvaluation.completed_at,
+)
+
+
+def _evaluation_query(session):
+    return (
+        EVALUATION_LIST_FIELDS.query(session)
+        .outerjoin(DDEvalRubric, DDEvalRubric.id == DDEvaluation.rubric_id)
+        .outerjoin(DDAnalysisRun, DDAnalysisRun.id == DDEvaluation.run_id)
+        .outerjoin(DueDiligence, DueDiligence.id == DDAnalysisRun.dd_id)
+    )
+
 
 def main(req: func.HttpRequest) -> func.HttpResponse:
 
@@ -39,7 +68,7 @@ def main(req: func.HttpRequest) -> func.HttpResponse:
 
         with transactional_session() as session:
             # Build query
-            query = session.query(DDEvaluation)
+            query = _evaluation_query(session)
 
             # Apply filters
             if rubric_id:
@@ -67,8 +96,8 @@ def main(req: func.HttpRequest) -> func.HttpResponse:
             if dd_id:
                 try:
                     dd_uuid = uuid_module.UUID(dd_id)
-                    # Filter by DD through the run relationship
-                    query = query.join(DDAnalysisRun).filter(
+                    # Filter by DD through the joined run
+                    query = query.filter(
                         DDAnalysisRun.dd_id == dd_uuid
                     )
                 except ValueError:
@@ -91,43 +120,7 @@ def main(req: func.HttpRequest) -> func.HttpResponse:
             # Order by created_at desc
             evaluations = query.order_by(desc(DDEvaluation.created_at)).all()
 
-            # Build response with related data
-            evaluations_data = []
-            for evaluation in evaluations:
-                # Get rubric name
-                rubric = session.query(DDEvalRubric).filter(
-                    DDEvalRubric.id == evaluation.rubric_id
-                ).first()
-
-                # Get run info
-                run = session.query(DDAnalysisRun).filter(
-                    DDAnalysisRun.id == evaluation.run_id
-                ).first()
-
-                dd_name = None
-                if run:
-                    dd = session.query(DueDiligence).filter(
-                        DueDiligence.id == run.dd_id
-                    ).first()
-                    if dd:
-                        dd_name = dd.name
-
-                evaluations_data.append({
-                    "id": str(evaluation.id),
-                    "rubric_id": str(evaluation.rubric_id),
-                    "rubric_name": rubric.name if rubric else None,
-                    "run_id": str(evaluation.run_id),
-                    "run_name": run.name if run else None,
-                    "dd_id": str(run.dd_id) if run else None,
-                    "dd_name": dd_name,
-                    "status": evaluation.status,
-                    "total_score": evaluation.total_score,
-                    "percentage": evaluation.percentage,
-                    "performance_band": evaluation.performance_band,
-                    "evaluation_model": evaluation.evaluation_model,
-                    "created_at": evaluation.created_at.isoformat() if evaluation.created_at else None,
-                    "completed_at": evaluation.completed_at.isoformat() if evaluation.completed_at else None
-                })
+            evaluations_data = [EVALUATION_LIST_FIELDS.to_dict(row) for row in evaluations]
 
             return func.HttpResponse(
                 json.dumps({"evaluations": evaluations_data}),
@@ -12,6 +12,8 @@ from docx.enum.style import WD_STYLE_TYPE
 from docx.oxml.ns import qn, nsdecls
 from docx.oxml import OxmlElement, parse_xml
 
+from dd_enhanced.core.finding_dedup import deduplicate_findings
+
 
 # Severity colors - matching UI status colors
 # UI uses: Critical (red), High (orange), Medium (yellow), Positive (green)
@@ -145,6 +147,21 @@ def get_finding_summary(finding: Dict, max_length: int = 80) -> str:
     return title
 
 
+def collapse_duplicates(findings: List[Dict]) -> List[Dict]:
+    """
+    Collapse findings that describe the same issue within a category, keeping
+    the most severe (earliest report reference on ties). The full list stays
+    in the Risk Analysis section.
+    """
+    return deduplicate_findings(
+        findings,
+        text=get_risk_title,
+        group=get_category,
+        rank=lambda f: SEVERITY_ORDER.index(get_status(f)) if get_status(f) in SEVERITY_ORDER else len(SEVERITY_ORDER),
+        document=lambda f: f.get('document_name'),
+    )
+
+
 def deduplicate_for_section(findings: List[Dict], section_type: str) -> List[Dict]:
     """
     Return findings appropriate for a given section, avoiding duplication.
@@ -155,24 +172,26 @@ def deduplicate_for_section(findings: List[Dict], section_type: str) -> List[Dic
     - 'conditions_precedent': Only CPs, summary only
     - 'risk_analysis': All findings, full details (main section)
     - 'action_items': Only actionable findings, reference only
+
+    Summary sections list each issue once (see collapse_duplicates).
     """
     if section_type == 'executive_summary':
         # Top critical findings only
         red_findings = [f for f in findings if get_status(f) == 'Red']
-        return red_findings[:5]
+        return collapse_duplicates(red_findings)[:5]
 
     elif section_type == 'deal_blockers':
-        return [f for f in findings if f.get('deal_impact') == 'deal_blocker']
+        return collapse_duplicates([f for f in findings if f.get('deal_impact') == 'deal_blocker'])
 
     elif section_type == 'conditions_precedent':
-        return [f for f in findings if f.get('deal_impact') == 'condition_precedent']
+        return collapse_duplicates([f for f in findings if f.get('deal_impact') == 'condition_precedent'])
 
     elif section_type == 'action_items':
-        return [
+        return collapse_duplicates([
             f for f in findings
             if f.get('requires_action') or get_status(f) == 'Red' or
             f.get('deal_impact') in ('deal_blocker', 'condition_precedent')
-        ][:15]
+        ])[:15]
 
     else:  # 'risk_analysis' - return all
         return findings
@@ -5,7 +5,9 @@ import azure.functions as func
 from shared.utils import send_custom_event_to_eventgrid, sleep_random_time
 from shared.uploader import extract_text_with_new_client, get_blob_metadata, set_blob_metadata
 from shared.uploader import read_from_blob_storage, handle_file_with_next_chunk_to_process
-from shared.rag import create_chunks_and_embeddings_from_pages, create_chunks_and_embeddings_from_text, get_llm_summary, split_text_by_page
+from shared.rag import create_chunks_and_embeddings_from_pages, create_chunks_and_embeddings_from_text, get_llm_summary, stream_chunks_and_embeddings
+from shared.chunking import iter_page_chunks, CHUNKING_VERSION
+from shared.text_extraction import bytes_hash
 from shared.ddsearch import save_to_dd_search_index, search_similar_dd_documents, format_search_results_for_prompt
 from shared.models import Folder, Document
 from shared.models import DueDiligence, DueDiligenceMember, Document, PerspectiveRiskFinding, Folder, Perspective, PerspectiveRisk
@@ -14,6 +16,7 @@ from sqlalchemy.orm import joinedload
 from shared.session import transactional_session
 from shared.rag import generate_document_description, generate_all_folder_descriptions, call_llm_with
 from shared.email_helper import send_processing_complete_email
+from shared.embedding_clusters import cluster_embeddings
 from typing import List, Dict, Tuple
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import numpy as np
@@ -426,39 +429,14 @@ def identify_duplicate_clusters_with_embeddings(
 ) -> List[List[int]]:
     """
     Group findings using pre-computed embeddings.
-    Much faster than computing embeddings on-demand.
+    Findings of the same type with cosine similarity >= threshold end up in
+    the same cluster (transitively); see shared.embedding_clusters.
     """
-    
-    clusters = []
-    processed = set()
-    
-    for i in range(len(findings_data)):
-        if i in processed:
-            continue
-        
-        cluster = [i]
-        processed.add(i)
-        emb1 = np.array(embeddings[i])
-        
-        for j in range(i + 1, len(findings_data)):
-            if j in processed:
-                continue
-            
-            # Must be same type
-            if findings_data[i]["type"] != findings_data[j]["type"]:
-                continue
-            
-            # Calculate cosine similarity directly
-            emb2 = np.array(embeddings[j])
-            similarity = np.dot(emb1, emb2) / (np.linalg.norm(emb1) * np.linalg.norm(emb2))
-            
-            if similarity >= similarity_threshold:
-                cluster.append(j)
-                processed.add(j)
-        
-        clusters.append(cluster)
-    
-    return clusters
+    return cluster_embeddings(
+        embeddings,
+        similarity_threshold,
+        groups=[f.get("type") for f in findings_data]
+    )
 
 
 def llm_merge_duplicate_findings(findings_group: List[Dict], question_detail: str) -> Dict:
@@ -581,6 +559,56 @@ def llm_merge_duplicate_findings(findings_group: List[Dict], question_detail: st
         }
 
 
+def _apply_merge_result(cluster_findings: List[Dict], pr_id, merge_result: Dict) -> List[Dict]:
+    """Findings to keep for a cluster given the LLM merge decision."""
+    if not merge_result.get("is_duplicate_group"):
+        return cluster_findings
+
+    merged = merge_result.get("merged_finding") or {}
+    
+    # ✅ FORCE perspective_risk_id (don't trust LLM to preserve it)
+    merged["perspective_risk_id"] = pr_id
+    
+    # Collect doc ids & pages from originals
+    doc_ids = []
+    for f in cluster_findings:
+        if f.get("document_ids"):
+            doc_ids.extend(f["document_ids"])
+        elif f.get("document_id"):
+            doc_ids.append(f["document_id"])
+    doc_ids = list({str(x) for x in doc_ids})  # unique as strings
+    
+    page_numbers = []
+    for f in cluster_findings:
+        page_numbers.extend(f.get("page_numbers", []))
+    page_numbers = list(dict.fromkeys(page_numbers))  # preserve order, unique
+    
+    # Hydrate merged fields if missing/empty
+    if not merged.get("document_ids"):
+        merged["document_ids"] = [uuid.UUID(x) for x in doc_ids]
+    if not merged.get("page_numbers"):
+        merged["page_numbers"] = page_numbers
+    if not merged.get("document_id"):
+        merged["document_id"] = merged["document_ids"][0] if merged["document_ids"] else cluster_findings[0].get("document_id")
+    if not merged.get("finding_type") and merged.get("type"):
+        merged["finding_type"] = merged["type"]
+    
+    # ✅ VALIDATE before adding
+    if not merged.get("perspective_risk_id"):
+        logging.error(f"❌ Merged finding still missing perspective_risk_id after hydration! Using originals.")
+        return cluster_findings
+    
+    if not merged.get("document_id"):
+        logging.error(f"❌ Merged finding missing document_id! Using originals.")
+        return cluster_findings
+    
+    return [merged]
+
+
+# Concurrent LLM merge calls per deduplication (the shared LLM rate limiter still applies)
+DEDUP_MERGE_WORKERS = int(os.environ.get("DD_DEDUP_MERGE_WORKERS", "8"))
+
+
 def deduplicate_findings_intelligent(findings_data: List[Dict], question_detail: str) -> List[Dict]:
     if len(findings_data) <= 1:
         return findings_data
@@ -593,11 +621,13 @@ def deduplicate_findings_intelligent(findings_data: List[Dict], question_detail:
             by_type[finding_type] = []
         by_type[finding_type].append((idx, finding))
     
-    deduplicated = []
+    # Ordered plan of output slots: findings kept as-is, or a cluster to merge
+    plan = []
+    merge_jobs = []
     
     for finding_type, typed_findings in by_type.items():
         if len(typed_findings) == 1:
-            deduplicated.append(typed_findings[0][1])
+            plan.append(("keep", [typed_findings[0][1]]))
             continue
         
         just_findings = [f[1] for f in typed_findings]
@@ -612,7 +642,7 @@ def deduplicate_findings_intelligent(findings_data: List[Dict], question_detail:
             embeddings = [item["embedding"] for item in embeddings_batch]
         except Exception as e:
             logging.error(f"Embedding batch failed: {e}")
-            deduplicated.extend(just_findings)
+            plan.append(("keep", just_findings))
             continue
         
         clusters = identify_duplicate_clusters_with_embeddings(
@@ -621,72 +651,44 @@ def deduplicate_findings_intelligent(findings_data: List[Dict], question_detail:
         
         logging.info(f"   Found {len(clusters)} clusters")
         
-        # Process each cluster
         for cluster_indices in clusters:
             if len(cluster_indices) == 1:
-                deduplicated.append(just_findings[cluster_indices[0]])
+                plan.append(("keep", [just_findings[cluster_indices[0]]]))
                 continue
             
             cluster_findings = [just_findings[i] for i in cluster_indices]
             
-            logging.info(f"   🤖 LLM analyzing cluster of {len(cluster_findings)} similar findings")
-            
             # ✅ CRITICAL: Get perspective_risk_id BEFORE LLM call
             # All findings in a cluster MUST have the same perspective_risk_id
             pr_id = next((f.get("perspective_risk_id") for f in cluster_findings if f.get("perspective_risk_id")), None)
             
             if pr_id is None:
                 logging.error(f"❌ Cluster has no valid perspective_risk_id! Skipping deduplication for this cluster.")
-                deduplicated.extend(cluster_findings)
+                plan.append(("keep", cluster_findings))
                 continue
             
-            # Use LLM to merge
-            merge_result = llm_merge_duplicate_findings(cluster_findings, question_detail)
-            
-            if merge_result.get("is_duplicate_group"):
-                merged = merge_result.get("merged_finding") or {}
-                
-                # ✅ FORCE perspective_risk_id (don't trust LLM to preserve it)
-                merged["perspective_risk_id"] = pr_id
-                
-                # Collect doc ids & pages from originals
-                doc_ids = []
-                for f in cluster_findings:
-                    if f.get("document_ids"):
-                        doc_ids.extend(f["document_ids"])
-                    elif f.get("document_id"):
-                        doc_ids.append(f["document_id"])
-                doc_ids = list({str(x) for x in doc_ids})  # unique as strings
-                
-                page_numbers = []
-                for f in cluster_findings:
-                    page_numbers.extend(f.get("page_numbers", []))
-                page_numbers = list(dict.fromkeys(page_numbers))  # preserve order, unique
-                
-                # Hydrate merged fields if missing/empty
-                if not merged.get("document_ids"):
-                    merged["document_ids"] = [uuid.UUID(x) for x in doc_ids]
-                if not merged.get("page_numbers"):
-                    merged["page_numbers"] = page_numbers
-                if not merged.get("document_id"):
-                    merged["document_id"] = merged["document_ids"][0] if merged["document_ids"] else cluster_findings[0].get("document_id")
-                if not merged.get("finding_type") and merged.get("type"):
-                    merged["finding_type"] = merged["type"]
-                
-                # ✅ VALIDATE before adding
-                if not merged.get("perspective_risk_id"):
-                    logging.error(f"❌ Merged finding still missing perspective_risk_id after hydration! Using originals.")
-                    deduplicated.extend(cluster_findings)
-                    continue
-                
-                if not merged.get("document_id"):
-                    logging.error(f"❌ Merged finding missing document_id! Using originals.")
-                    deduplicated.extend(cluster_findings)
-                    continue
-                
-                deduplicated.append(merged)
-            else:
-                deduplicated.extend(cluster_findings)
+            plan.append(("merge", len(merge_jobs)))
+            merge_jobs.append((cluster_findings, pr_id))
+    
+    # Clusters are independent - run the LLM merges concurrently
+    merge_results = [None] * len(merge_jobs)
+    if merge_jobs:
+        logging.info(f"   🤖 LLM analyzing {len(merge_jobs)} clusters of similar findings")
+        with ThreadPoolExecutor(max_workers=max(1, min(DEDUP_MERGE_WORKERS, len(merge_jobs)))) as executor:
+            futures = {
+                executor.submit(llm_merge_duplicate_findings, cluster_findings, question_detail): job_index
+                for job_index, (cluster_findings, _) in enumerate(merge_jobs)
+            }
+            for future in as_completed(futures):
+                merge_results[futures[future]] = future.result()
+    
+    deduplicated = []
+    for kind, value in plan:
+        if kind == "keep":
+            deduplicated.extend(value)
+        else:
+            cluster_findings, pr_id = merge_jobs[value]
+            deduplicated.extend(_apply_merge_result(cluster_findings, pr_id, merge_results[value]))
     
     logging.info(f"✅ Deduplication complete: {len(findings_data)} → {len(deduplicated)} findings")
     
@@ -1449,6 +1451,7 @@ def process_document_batch_parallel(session, dd_id: str, email: str, max_concurr
                                 # Store page-marked text for source referencing in findings
                                 if result.get("text_with_pages"):
                                     db_doc.extracted_text_with_pages = result["text_with_pages"]
+                                    db_doc.extracted_text_hash = result["text_hash"]
                                     db_doc.total_pages = result.get("total_pages", 0)
 
                                 update_session.commit()
@@ -1536,19 +1539,18 @@ def process_single_document_complete(doc_id: str, dd_id: str, email: str,
                     break
             initial_content = " ".join(content_chunks)[:1000]
         
-        # Chunk and embed (sequential per doc, but that's fast)
-        pages_chunked = split_text_by_page(pages, chunk_size=800, chunk_overlap=80)
-        chunks_and_embeddings = create_chunks_and_embeddings_from_pages(pages_chunked)
-        
-        # Index
-        save_to_dd_search_index(
-            dd_id,
-            doc_id,
-            folder_path,
-            folder_hierarchy,
-            chunks_and_embeddings,
-            filename
-        )
+        # Chunk, embed and index window by window (bounded memory for large OCR'd docs)
+        chunk_count = 0
+        for chunks_and_embeddings in stream_chunks_and_embeddings(iter_page_chunks(pages)):
+            chunk_count += len(chunks_and_embeddings)
+            save_to_dd_search_index(
+                dd_id,
+                doc_id,
+                folder_path,
+                folder_hierarchy,
+                chunks_and_embeddings,
+                filename
+            )
 
         # Generate text with page markers for source referencing
         text_with_pages, total_pages = format_pages_with_markers(pages)
@@ -1560,11 +1562,12 @@ def process_single_document_complete(doc_id: str, dd_id: str, email: str,
             "status": "success",
             "pages": len(pages),
             "total_pages": total_pages,
-            "chunks": len(chunks_and_embeddings),
+            "chunks": chunk_count,
             "ocr_time": ocr_time,
             "total_time": total_time,
             "initial_content": initial_content,
-            "text_with_pages": text_with_pages  # For storing in document model
+            "text_with_pages": text_with_pages,  # For storing in document model
+            "text_hash": bytes_hash(file_contents)  # Marks the stored text current (see shared.text_extraction)
         }
         
     except Exception as e:
@@ -1737,6 +1740,13 @@ def main(req: func.HttpRequest) -> func.HttpResponse:
 
                 
                 next_chunk_to_process = int(metadata["next_chunk_to_process"])
+                if next_chunk_to_process and metadata.get("chunking_version") != CHUNKING_VERSION:
+                    # Progress was recorded against different chunk boundaries; re-chunk from the start
+                    logging.info(
+                        f"chunking version changed ({metadata.get('chunking_version')} -> {CHUNKING_VERSION}) "
+                        f"for {metadata['original_file_name']}; restarting from chunk 0"
+                    )
+                    next_chunk_to_process = 0
 
                 logging.info(f"check: folder.path {db_doc.folder.path}")
                 logging.info(f"check: folder.hierarchy {db_doc.folder.hierarchy}")
@@ -1826,6 +1836,7 @@ def main(req: func.HttpRequest) -> func.HttpResponse:
                     logging.info(f"more work to do, updated doc in dd {metadata['original_file_name']}")
 
                     metadata["next_chunk_to_process"] = str(chunk_stop)
+                    metadata["chunking_version"] = CHUNKING_VERSION
                     
                     if db_doc.processing_status != "In progress":
                         db_doc.processing_status = "In progress"
@@ -4,30 +4,45 @@ DD Findings Stream Endpoint
 Server-Sent Events (SSE) endpoint for streaming live findings
 during DD processing. Falls back to long-polling for Azure Functions
 which doesn't support true SSE.
+
+Clients take a snapshot without a cursor, then long-poll with the
+returned cursor. Polls read the append-only dd_finding_event log
+(shared/finding_events.py) rather than re-running the findings join.
 """
 import azure.functions as func
 import json
+import os
 from datetime import datetime
 from shared.session import transactional_session
+from shared.finding_events import finding_delta, get_findings_feed, latest_cursor, read_finding_events
 from sqlalchemy import text
 
+# Upper bound on how long a poll may wait for new findings
+MAX_WAIT_SECONDS = float(os.environ.get("DD_FINDINGS_STREAM_MAX_WAIT", "25"))
+
 
 def main(req: func.HttpRequest) -> func.HttpResponse:
     """
     Get recent findings for a DD.
 
     Since Azure Functions doesn't support true SSE, this endpoint
-    returns the most recent findings since a given timestamp.
+    returns the most recent findings, or the findings stored after a cursor.
     The frontend can poll this endpoint to get new findings.
 
     Query params:
         dd_id: UUID of the due diligence
-        since: ISO timestamp to get findings after (optional)
+        cursor: Last cursor returned by this endpoint (optional). Without it
+            the latest findings are returned as a snapshot.
+        wait: With a cursor, seconds to wait for new findings before
+            returning an empty page (default 0, max DD_FINDINGS_STREAM_MAX_WAIT)
+        since: ISO timestamp (accepted for older clients, ignored)
         limit: Max number of findings to return (default 20)
+
+    Response: {findings, count, cursor, timestamp}; pass cursor to the next call.
     """
     try:
         dd_id = req.params.get("dd_id")
-        since = req.params.get("since")
+        cursor = req.params.get("cursor")
         limit = int(req.params.get("limit", "20"))
 
         if not dd_id:
@@ -37,120 +52,112 @@ def main(req: func.HttpRequest) -> func.HttpResponse:
                 mimetype="application/json"
             )
 
-        with transactional_session() as session:
-            # Query findings from perspective_risk_finding table
-            # Join through the perspective -> member -> dd chain
-            # Note: Only using columns that exist in the database schema
-            base_query = """
-                SELECT
-                    prf.id::text,
-                    prf.id::text as finding_id,
-                    prf.phrase as description,
-                    prf.status::text as severity,
-                    prf.finding_type::text,
-                    prf.confidence_score,
-                    prf.requires_action,
-                    prf.action_priority::text,
-                    prf.direct_answer,
-                    prf.evidence_quote,
-                    d.original_file_name as source_document,
-                    pr.category
-                FROM perspective_risk_finding prf
-                JOIN perspective_risk pr ON prf.perspective_risk_id = pr.id
-                JOIN perspective p ON pr.perspective_id = p.id
-                JOIN due_diligence_member ddm ON p.member_id = ddm.id
-                JOIN document d ON prf.document_id = d.id
-                WHERE ddm.dd_id = :dd_id
-            """
-
-            if since:
-                # Note: perspective_risk_finding doesn't have created_at, so we use id ordering
-                # For now, just return latest findings
-                findings_query = text(base_query + """
-                    ORDER BY prf.id DESC
-                    LIMIT :limit
-                """)
-                results = session.execute(
-                    findings_query,
-                    {"dd_id": dd_id, "limit": limit}
-                ).fetchall()
-            else:
-                findings_query = text(base_query + """
-                    ORDER BY prf.id DESC
-                    LIMIT :limit
-                """)
-                results = session.execute(
-                    findings_query,
-                    {"dd_id": dd_id, "limit": limit}
-                ).fetchall()
-
-            # Map status to severity
-            status_to_severity = {
-                "Red": "high",
-                "Amber": "medium",
-                "Green": "low",
-                "Info": "info",
-                "New": "medium",
-                "Deleted": "low"
-            }
-
-            # Map finding_type to deal impact
-            finding_type_to_impact = {
-                "negative": "noted",
-                "positive": "none",
-                "neutral": "none",
-                "gap": "condition_precedent",
-                "informational": "none"
-            }
-
-            # Map action_priority to severity
-            action_priority_to_severity = {
-                "critical": "high",
-                "high": "high",
-                "medium": "medium",
-                "low": "low",
-                "none": "low"
-            }
-
-            findings = []
-            for row in results:
-                # Use status for severity, fall back to action_priority
-                severity = status_to_severity.get(row.severity, "medium")
-                if row.action_priority:
-                    severity = action_priority_to_severity.get(row.action_priority, severity)
-
-                finding = {
-                    "id": row.id,
-                    "findingId": row.finding_id or row.id,
-                    "timestamp": datetime.utcnow().isoformat(),
-                    "sourceDocument": row.source_document or "Unknown",
-                    "category": row.category or "other",
-                    "severity": severity,
-                    "dealImpact": finding_type_to_impact.get(row.finding_type, "noted") if row.finding_type else "noted",
-                    "description": row.description or "",
-                    "pass": "analyze",  # Default to analyze pass
-                    "clauseReference": None,
-                    "requiresAction": row.requires_action or False,
-                    "confidenceScore": float(row.confidence_score) if row.confidence_score else 0.5,
-                    "directAnswer": row.direct_answer,
-                    "evidenceQuote": row.evidence_quote
-                }
-
-                findings.append(finding)
-
-            # Return as JSON array
-            return func.HttpResponse(
-                json.dumps({
-                    "findings": findings,
-                    "count": len(findings),
-                    "timestamp": datetime.utcnow().isoformat()
-                }),
-                mimetype="application/json"
-            )
+        if cursor is not None:
+            wait = min(max(float(req.params.get("wait", "0")), 0.0), MAX_WAIT_SECONDS)
+            return _poll_changes(dd_id, int(cursor), limit, wait)
+
+        return _snapshot(dd_id, limit)
 
+    except ValueError as e:
+        return func.HttpResponse(
+            json.dumps({"error": f"Invalid parameter: {e}"}),
+            status_code=400,
+            mimetype="application/json"
+        )
     except Exception as e:
         return func.HttpResponse(
             json.dumps({"error": str(e)}),
             status_code=500,
             mimetype="application/json"
         )
+
+
+def _poll_changes(dd_id: str, cursor: int, limit: int, wait: float) -> func.HttpResponse:
+    """Findings logged after cursor, waiting up to `wait` seconds for the first one."""
+    with transactional_session() as session:
+        events = read_finding_events(session, dd_id, cursor, limit)
+
+    if not events and wait > 0:
+        # No connection is held while waiting; re-read once on wake-up or timeout
+        get_findings_feed().wait(dd_id, cursor, wait)
+        with transactional_session() as session:
+            events = read_finding_events(session, dd_id, cursor, limit)
+
+    findings = [event["finding"] for event in events]
+    return func.HttpResponse(
+        json.dumps({
+            "findings": findings,
+            "count": len(findings),
+            "cursor": events[-1]["seq"] if events else cursor,
+            "hasMore": len(events) == limit,
+            "timestamp": datetime.utcnow().isoformat()
+        }),
+        mimetype="application/json"
+    )
+
+
+def _snapshot(dd_id: str, limit: int) -> func.HttpResponse:
+    """Latest findings across all runs, with the cursor to poll from."""
+    with transactional_session() as session:
+        # Read the cursor first: findings logged during the snapshot come
+        # through the next poll (clients de-duplicate by id)
+        cursor = latest_cursor(session, dd_id)
+
+        # Query findings from perspective_risk_finding table
+        # Join through the perspective -> member -> dd chain
+        # Note: Only using columns that exist in the database schema
+        # perspective_risk_finding doesn't have created_at, so we use id ordering
+        findings_query = text("""
+            SELECT
+                prf.id::text,
+                prf.phrase as description,
+                prf.status::text as severity,
+                prf.finding_type::text,
+                prf.confidence_score,
+                prf.requires_action,
+                prf.action_priority::text,
+                prf.direct_answer,
+                prf.evidence_quote,
+                d.original_file_name as source_document,
+                pr.category
+            FROM perspective_risk_finding prf
+            JOIN perspective_risk pr ON prf.perspective_risk_id = pr.id
+            JOIN perspective p ON pr.perspective_id = p.id
+            JOIN due_diligence_member ddm ON p.member_id = ddm.id
+            JOIN document d ON prf.document_id = d.id
+            WHERE ddm.dd_id = :dd_id
+            ORDER BY prf.id DESC
+            LIMIT :limit
+        """)
+        results = session.execute(
+            findings_query,
+            {"dd_id": dd_id, "limit": limit}
+        ).fetchall()
+
+        findings = []
+        for row in results:
+            finding = finding_delta(
+                finding_id=row.id,
+                status=row.severity,
+                finding_type=row.finding_type,
+                action_priority=row.action_priority,
+                requires_action=row.requires_action,
+                confidence_score=row.confidence_score,
+                direct_answer=row.direct_answer,
+                evidence_quote=row.evidence_quote,
+                source_document=row.source_document,
+                category=row.category,
+            )
+            finding["description"] = row.description or ""
+            findings.append(finding)
+
+    # Return as JSON array
+    return func.HttpResponse(
+        json.dumps({
+            "findings": findings,
+            "count": len(findings),
+            "cursor": cursor,
+            "timestamp": datetime.utcnow().isoformat()
+        }),
+        mimetype="application/json"
+    )
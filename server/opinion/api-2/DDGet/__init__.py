@@ -6,9 +6,9 @@ import re
 import azure.functions as func
 from shared.utils import auth_get_email
 from shared.session import transactional_session
+from shared.db_instrumentation import instrumented
 from shared.models import Document, DueDiligence, Folder
-from sqlalchemy import exists, case, and_
-from sqlalchemy.orm import joinedload
+from sqlalchemy import exists, case, and_, func as sql_func
 
 DEV_MODE = os.environ.get("DEV_MODE", "").lower() == "true"
 
@@ -22,6 +22,7 @@ def extract_transaction_type(briefing: str) -> str | None:
         return match.group(1).strip()
     return None
 
+@instrumented()
 def main(req: func.HttpRequest) -> func.HttpResponse:
 
     # Skip function-key check in dev mode
@@ -36,6 +37,15 @@ def main(req: func.HttpRequest) -> func.HttpResponse:
             return err
         
         dd_id = req.params.get("dd_id")
+        # Optional per-folder document paging (folder_id narrows to one folder)
+        folder_id = req.params.get("folder_id")
+        try:
+            doc_limit = int(req.params["doc_limit"]) if req.params.get("doc_limit") else None
+            doc_offset = int(req.params.get("doc_offset") or "0")
+        except ValueError:
+            return func.HttpResponse("doc_limit and doc_offset must be integers", status_code=400)
+        if (doc_limit is not None and doc_limit < 1) or doc_offset < 0:
+            return func.HttpResponse("doc_limit must be positive and doc_offset non-negative", status_code=400)
         result = {}
 
         with transactional_session() as session:
@@ -52,17 +62,15 @@ def main(req: func.HttpRequest) -> func.HttpResponse:
                 ),
                 else_=False
             ).label("has_in_progress_docs")
-            due_diligence, has_in_progress_docs = (
+            row = (
                 session.query(DueDiligence, has_in_progress_docs)
                 .filter(DueDiligence.id == dd_id)
-                .options(
-                    joinedload(DueDiligence.folders).joinedload(Folder.documents)
-                )
                 .first()
             )
 
-            if not due_diligence:
+            if not row:
                 raise ValueError(f"DueDiligence {dd_id} not found")
+            due_diligence, has_in_progress_docs = row
 
             result = {
                 "dd_id": str(due_diligence.id),
@@ -74,59 +82,14 @@ def main(req: func.HttpRequest) -> func.HttpResponse:
                 "created_at": due_diligence.created_at.isoformat(),
                 "has_in_progress_docs": has_in_progress_docs,
                 "project_setup": due_diligence.project_setup,  # Full wizard data
-                "folders": []
-            }
-            
-            for folder in due_diligence.folders:
-                folder_data = {
-                    "folder_id": str(folder.id),
-                    "folder_name": folder.folder_name,
-                    "level": folder.path.count("/"),
-                    "hierarchy": folder.hierarchy,
-                    "description":folder.description,
-                    "documents": [
-                        {
-                            "document_id": str(doc.id),
-                            "original_file_name": doc.original_file_name,
-                            "type": doc.type,
-                            "uploaded_at": doc.uploaded_at.isoformat() if doc.uploaded_at else None,
-                            "processing_status": doc.processing_status,
-                            "size_in_bytes": doc.size_in_bytes,
-                            "is_original": doc.is_original,
-                            "description":doc.description,
-                            "readability_status": doc.readability_status or "pending",
-                            "readability_error": doc.readability_error,
-                            # AI Classification fields
-                            "ai_category": doc.ai_category,
-                            "ai_subcategory": doc.ai_subcategory,
-                            "ai_document_type": doc.ai_document_type,
-                            "ai_confidence": doc.ai_confidence,
-                            "classification_status": doc.classification_status,
-                            # Conversion fields (for DOCX/XLSX/PPTX to PDF)
-                            "converted_doc_id": str(doc.converted_doc_id) if doc.converted_doc_id else None,
-                            "conversion_status": doc.conversion_status,
-                            "converted_from_id": str(doc.converted_from_id) if doc.converted_from_id else None,
-                        }
-                        for doc in folder.documents
-                    ]
-                }
-
-                result["folders"].append(folder_data)
-            
-            result["folders"] = [
-                {**f_outer, "has_children": any(
-                    (f_outer["folder_id"] + "/" in f_inner["hierarchy"] or "/" + f_outer["folder_id"] in f_inner["hierarchy"])  and f_inner["folder_id"] != f_outer["folder_id"]
-                    for f_inner in result["folders"]
-                )}
-                for f_outer in result["folders"]
-            ]
-            
-            result["folders"] = [
-                folder for folder in result["folders"]
-                if not (
-                    len(folder["documents"]) == 1 and folder["documents"][0]["is_original"]
+                "folders": _build_folder_tree(
+                    _query_folders(session, dd_id),
+                    _query_tree_documents(session, dd_id, folder_id, doc_limit, doc_offset),
+                    folder_id,
+                    # A page can miss a folder entirely, so its rows cannot carry the totals
+                    _query_folder_counts(session, dd_id, folder_id) if doc_limit is not None else None
                 )
-            ]
+            }
 
         return func.HttpResponse(json.dumps(result), mimetype="application/json", status_code=200)
 
@@ -134,3 +97,153 @@ def main(req: func.HttpRequest) -> func.HttpResponse:
         logging.info(e)
         logging.error(str(e))
         return func.HttpResponse(f"Error: {str(e)}", status_code=500)
+
+
+# Columns the file tree needs - extracted text and JSON columns are never loaded
+TREE_DOCUMENT_COLUMNS = (
+    Document.id,
+    Document.folder_id,
+    Document.original_file_name,
+    Document.type,
+    Document.uploaded_at,
+    Document.processing_status,
+    Document.size_in_bytes,
+    Document.is_original,
+    Document.description,
+    Document.readability_status,
+    Document.readability_error,
+    Document.ai_category,
+    Document.ai_subcategory,
+    Document.ai_document_type,
+    Document.ai_confidence,
+    Document.classification_status,
+    Document.converted_doc_id,
+    Document.conversion_status,
+    Document.converted_from_id,
+)
+
+
+def _query_folders(session, dd_id):
+    return session.query(
+        Folder.id, Folder.folder_name, Folder.path, Folder.hierarchy, Folder.description
+    ).filter(Folder.dd_id == dd_id).all()
+
+
+def _query_tree_documents(session, dd_id, folder_id=None, limit=None, offset=0):
+    """
+    Tree-view document rows for a DD, with per-folder totals.
+
+    Each row carries folder_total and folder_originals (document and
+    original-document counts for its folder) so folders can be filtered
+    without a second query. limit/offset page within each folder; a page has
+    no rows for folders with offset or fewer documents, so paged callers read
+    the totals from _query_folder_counts.
+    """
+    position = sql_func.row_number().over(
+        partition_by=Document.folder_id,
+        order_by=(Document.original_file_name, Document.id)
+    ).label("position")
+    folder_total = sql_func.count().over(partition_by=Document.folder_id).label("folder_total")
+    folder_originals = sql_func.count(case((Document.is_original == True, 1))).over(  # noqa: E712
+        partition_by=Document.folder_id
+    ).label("folder_originals")
+
+    query = (
+        session.query(*TREE_DOCUMENT_COLUMNS, position, folder_total, folder_originals)
+        .join(Folder, Document.folder_id == Folder.id)
+        .filter(Folder.dd_id == dd_id)
+    )
+    if folder_id:
+        query = query.filter(Document.folder_id == folder_id)
+
+    ranked = query.subquery()
+    paged = session.query(ranked)
+    if limit is not None:
+        paged = paged.filter(ranked.c.position > offset, ranked.c.position <= offset + limit)
+    return paged.order_by(ranked.c.folder_id, ranked.c.position).all()
+
+
+def _query_folder_counts(session, dd_id, folder_id=None) -> dict:
+    """{folder_id: (document count, original-document count)} over every document of the DD."""
+    query = (
+        session.query(
+            Document.folder_id,
+            sql_func.count(),
+            sql_func.count(case((Document.is_original == True, 1))),  # noqa: E712
+        )
+        .join(Folder, Document.folder_id == Folder.id)
+        .filter(Folder.dd_id == dd_id)
+    )
+    if folder_id:
+        query = query.filter(Document.folder_id == folder_id)
+    return {row[0]: (row[1], row[2]) for row in query.group_by(Document.folder_id)}
+
+
+def _document_json(doc) -> dict:
+    return {
+        "document_id": str(doc.id),
+        "original_file_name": doc.original_file_name,
+        "type": doc.type,
+        "uploaded_at": doc.uploaded_at.isoformat() if doc.uploaded_at else None,
+        "processing_status": doc.processing_status,
+        "size_in_bytes": doc.size_in_bytes,
+        "is_original": doc.is_original,
+        "description":doc.description,
+        "readability_status": doc.readability_status or "pending",
+        "readability_error": doc.readability_error,
+        # AI Classification fields
+        "ai_category": doc.ai_category,
+        "ai_subcategory": doc.ai_subcategory,
+        "ai_document_type": doc.ai_document_type,
+        "ai_confidence": doc.ai_confidence,
+        "classification_status": doc.classification_status,
+        # Conversion fields (for DOCX/XLSX/PPTX to PDF)
+        "converted_doc_id": str(doc.converted_doc_id) if doc.converted_doc_id else None,
+        "conversion_status": doc.conversion_status,
+        "converted_from_id": str(doc.converted_from_id) if doc.converted_from_id else None,
+    }
+
+
+def _build_folder_tree(folders, documents, folder_id=None, counts=None) -> list:
+    """
+    Folder list with documents and has_children, in one pass over each input.
+
+    counts ({folder_id: (total, originals)}) is required when documents is a
+    page; otherwise it is taken from the rows' folder_total/folder_originals.
+
+    A folder has children when its id appears as an ancestor segment in
+    another folder's hierarchy ("<root id>/<child id>/..."). Folders holding
+    only their single original document (converted uploads) are hidden.
+    """
+    documents_by_folder = {}
+    row_counts = {}
+    for doc in documents:
+        documents_by_folder.setdefault(doc.folder_id, []).append(_document_json(doc))
+        row_counts[doc.folder_id] = (doc.folder_total, doc.folder_originals)
+    if counts is None:
+        counts = row_counts
+
+    ancestor_ids = set()
+    for folder in folders:
+        if "/" in (folder.hierarchy or ""):
+            own_id = str(folder.id)
+            ancestor_ids.update(part for part in folder.hierarchy.split("/") if part and part != own_id)
+
+    tree = []
+    for folder in folders:
+        if folder_id and str(folder.id) != folder_id:
+            continue
+        total, originals = counts.get(folder.id, (0, 0))
+        if total == 1 and originals == 1:
+            continue
+        tree.append({
+            "folder_id": str(folder.id),
+            "folder_name": folder.folder_name,
+            "level": folder.path.count("/"),
+            "hierarchy": folder.hierarchy,
+            "description":folder.description,
+            "documents": documents_by_folder.get(folder.id, []),
+            "document_count": total,
+            "has_children": str(folder.id) in ancestor_ids,
+        })
+    return tree
@@ -25,13 +25,18 @@ Returns:
 import logging
 import os
 import json
-import yaml
+import sys
 import azure.functions as func
 
 from shared.utils import auth_get_email
 from shared.session import transactional_session
 from shared.models import Document, Folder, DueDiligence
 
+# Add dd_enhanced to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'dd_enhanced'))
+
+from config.blueprint_registry import get_blueprint_registry
+
 DEV_MODE = os.environ.get("DEV_MODE", "").lower() == "true"
 
 # Path to blueprint YAML files
@@ -64,8 +69,8 @@ def load_blueprint(transaction_type: str) -> dict | None:
         return None
 
     try:
-        with open(blueprint_file, 'r', encoding='utf-8') as f:
-            return yaml.safe_load(f)
+        # Shared, read-only copy parsed once per process
+        return get_blueprint_registry().blueprint_file(transaction_type)
     except Exception as e:
         logging.error(f"Failed to load blueprint {blueprint_file}: {e}")
         return None
@@ -10,9 +10,34 @@ from shared.utils import auth_get_email
 from sqlalchemy import exists, case, and_, or_
 from shared.session import transactional_session
 from shared.models import DueDiligence, DueDiligenceMember, Folder, Document
+from shared.serialization import Projection
 
 DEV_MODE = os.environ.get("DEV_MODE", "").lower() == "true"
 
+has_in_progress_docs = case(
+    (
+        exists().where(
+            and_(
+                Folder.dd_id == DueDiligence.id,
+                Document.folder_id == Folder.id,
+                Document.processing_status == "In progress"
+            )
+        ),
+        True
+    ),
+    else_=False
+)
+
+# briefing is read for transaction_type and not returned
+DD_LIST_FIELDS = Projection(
+    DueDiligence,
+    id=DueDiligence.id,
+    name=DueDiligence.name,
+    created_at=DueDiligence.created_at,
+    briefing=DueDiligence.briefing,
+    has_in_progress_docs=has_in_progress_docs,
+)
+
 
 def extract_transaction_type(briefing: str) -> str | None:
     """Extract transaction type code from briefing text."""
@@ -42,24 +67,11 @@ def main(req: func.HttpRequest) -> func.HttpResponse:
         
         with transactional_session() as session:
 
-            results = []
-            has_in_progress_docs = case(
-                (
-                    exists().where(
-                        and_(
-                            Folder.dd_id == DueDiligence.id,
-                            Document.folder_id == Folder.id,
-                            Document.processing_status == "In progress"
-                        )
-                    ),
-                    True
-                ),
-                else_=False
-            ).label("has_in_progress_docs")
+            query = DD_LIST_FIELDS.query(session)
             match filter_type:
                 case "involves_me":
-                    results = (
-                        session.query(DueDiligence, has_in_progress_docs)
+                    query = (
+                        query
                         .outerjoin(DueDiligence.members)
                         .filter(
                             or_(
@@ -67,12 +79,10 @@ def main(req: func.HttpRequest) -> func.HttpResponse:
                                 DueDiligenceMember.member_email == email
                             )
                         )
-                        .order_by(DueDiligence.created_at.desc())
-                        .all()
                     )
                 case "doesnt_involve_me":
-                    results = (
-                        session.query(DueDiligence, has_in_progress_docs)
+                    query = (
+                        query
                         .outerjoin(DueDiligence.members)
                         .filter(
                             and_(
@@ -83,20 +93,16 @@ def main(req: func.HttpRequest) -> func.HttpResponse:
                                 )
                             )
                         )
-                        .order_by(DueDiligence.created_at.desc())
-                        .all()
                     )
                 case "im_a_member":
-                    results = (
-                        session.query(DueDiligence)
+                    query = (
+                        query
                         .outerjoin(DueDiligence.members)
                         .filter(DueDiligenceMember.member_email == email)
-                        .order_by(DueDiligence.created_at.desc())
-                        .all()
                     )
                 case "im_not_a_member":
-                    results = (
-                        session.query(DueDiligence, has_in_progress_docs)
+                    query = (
+                        query
                         .outerjoin(DueDiligence.members)
                         .filter(
                             or_(
@@ -104,28 +110,23 @@ def main(req: func.HttpRequest) -> func.HttpResponse:
                                 DueDiligenceMember.member_email.is_(None)
                             )
                         )
-                        .order_by(DueDiligence.created_at.desc())
-                        .all()
                     )
                 case "owned_by_me":
-                    results = (
-                        session.query(DueDiligence, has_in_progress_docs)
+                    query = (
+                        query
                         .outerjoin(DueDiligence.members)
                         .filter(DueDiligence.owned_by == email)
-                        .order_by(DueDiligence.created_at.desc())
-                        .all()
                     )
                 case _:
                     return "Unknown"
 
-            projected_results = [
-                {
-                    **{k: v for k, v in dd.to_dict().items() if k in ["id", "name", "created_at"]},
-                    "transaction_type": extract_transaction_type(dd.briefing),
-                    "has_in_progress_docs": has_progress
-                }
-                for dd, has_progress in results
-            ]
+            projected_results = []
+            for row in query.order_by(DueDiligence.created_at.desc()).all():
+                dd = DD_LIST_FIELDS.to_dict(row)
+                has_progress = dd.pop("has_in_progress_docs")
+                dd["transaction_type"] = extract_transaction_type(dd.pop("briefing"))
+                dd["has_in_progress_docs"] = has_progress
+                projected_results.append(dd)
 
 
         return func.HttpResponse(json.dumps({"due_diligences":projected_results}), mimetype="application/json", status_code=200)
@@ -11,6 +11,7 @@ from shared.models import Document, DueDiligence, DueDiligenceMember, Folder, Pe
 from shared.dev_adapters.claude_llm import call_llm_with
 from shared.dev_adapters.local_search import add_to_index
 from shared.dev_adapters.dev_config import get_dev_config
+from shared.text_extraction import extract_text_from_file_with_extension
 
 DEV_MODE = os.environ.get("DEV_MODE", "").lower() == "true"
 
@@ -68,71 +69,6 @@ def extract_text_from_file(file_path: str) -> str:
     return extract_text_from_file_with_extension(file_path, ext.lstrip('.'))
 
 
-def extract_text_from_file_with_extension(file_path: str, extension: str) -> str:
-    """Extract text content from a file, using the provided extension to determine file type.
-    This is needed because in dev mode files are stored without extensions."""
-    import os
-
-    if not os.path.exists(file_path):
-        logging.warning(f"File not found: {file_path}")
-        return ""
-
-    ext = extension.lower().lstrip('.')
-
-    try:
-        if ext == 'txt':
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                return f.read()
-
-        elif ext == 'pdf':
-            try:
-                import fitz  # PyMuPDF
-                doc = fitz.open(file_path)
-                text_parts = []
-                for page_num, page in enumerate(doc, start=1):
-                    page_text = page.get_text()
-                    if page_text.strip():
-                        text_parts.append(f"\n[PAGE {page_num}]\n{page_text}")
-                doc.close()
-                return "".join(text_parts)
-            except ImportError:
-                logging.warning("PyMuPDF not installed, trying pdfplumber")
-                try:
-                    import pdfplumber
-                    with pdfplumber.open(file_path) as pdf:
-                        text_parts = []
-                        for page_num, page in enumerate(pdf.pages, start=1):
-                            page_text = page.extract_text() or ""
-                            if page_text.strip():
-                                text_parts.append(f"\n[PAGE {page_num}]\n{page_text}")
-                        return "".join(text_parts)
-                except ImportError:
-                    logging.error("No PDF library available")
-                    return f"[PDF file - {os.path.basename(file_path)}]"
-
-        elif ext in ['docx', 'doc']:
-            try:
-                from docx import Document as DocxDocument
-                doc = DocxDocument(file_path)
-                return "\n".join([para.text for para in doc.paragraphs])
-            except ImportError:
-                logging.error("python-docx not installed")
-                return f"[Word document - {os.path.basename(file_path)}]"
-            except Exception as e:
-                logging.error(f"Error reading docx: {e}")
-                # Try reading as binary and extracting text
-                return ""
-
-        else:
-            # Try to read as text
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                return f.read()
-
-    except Exception as e:
-        logging.error(f"Error extracting text from {file_path}: {e}")
-        return ""
-
-
 def analyze_document_with_claude(filename: str, content: str, transaction_type: str) -> Dict:
     """Use Claude to analyze a document for risks"""
 
@@ -15,6 +15,7 @@ import azure.functions as func
 
 from shared.session import transactional_session
 from shared.models import DDProcessingCheckpoint, DDAnalysisRun, DDOrganisationStatus
+from shared.run_control import publish_run_command
 
 DEV_MODE = os.environ.get("DEV_MODE", "").lower() == "true"
 
@@ -131,6 +132,10 @@ def main(req: func.HttpRequest) -> func.HttpResponse:
 
             session.commit()
 
+            if cancelled_processing:
+                # Stop the processing thread now rather than at its next status check
+                publish_run_command(str(checkpoint.id), 'cancel')
+
             result_run_id = str(run.id) if run else None
             logging.info(f"[DDProcessCancel] Successfully cancelled - run: {result_run_id}, org: {cancelled_organisation}")
 
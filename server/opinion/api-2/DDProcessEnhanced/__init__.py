@@ -30,6 +30,8 @@ from shared.models import (
 )
 from shared.dev_adapters.dev_config import get_dev_config
 from shared.document_selector import get_processable_documents, get_original_document_id
+from shared.text_extraction import get_document_texts
+from shared.finding_events import delta_for_model, get_findings_feed, record_finding_events
 
 # Add dd_enhanced to path for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'dd_enhanced'))
@@ -55,6 +57,7 @@ from dd_enhanced.core.compression_engine import (
     compress_all_documents,
     get_compression_stats,
 )
+from dd_enhanced.core.message_batches import BatchClaudeClient, MessageBatchConfig
 from dd_enhanced.core.batch_manager import (
     create_batch_plan,
     get_batch_stats,
@@ -480,9 +483,13 @@ def _load_dd_data(dd_id: str, resume_from_checkpoint: bool) -> Dict[str, Any]:
             # Store document filenames for later lookup
             doc_filenames = {str(doc.id): doc.original_file_name for doc in documents}
 
+            # Cached per file version; cache misses are extracted in a process pool
+            dev_config = get_dev_config()
+            texts = get_document_texts(documents, dev_config.get("local_storage_path", "/tmp/dd_storage"))
+
             doc_dicts = []
             for doc in documents:
-                content = _extract_document_content(doc)
+                content = texts.get(str(doc.id), "")
                 if content:
                     folder = folder_lookup.get(str(doc.folder_id))
                     # Get original document ID for finding linkage
@@ -944,11 +951,18 @@ def _run_all_passes(
                         'current_stage': f'pass4_compression_{current}_of_{total}'
                     })
 
+            # Compression is latency-tolerant: submit it as message batches when enabled
+            batch_config = MessageBatchConfig.from_env()
+            compression_client = (
+                BatchClaudeClient.from_client(client, batch_config=batch_config)
+                if batch_config.enabled else client
+            )
+
             compressed_docs = compress_all_documents(
                 documents=doc_dicts,
                 prioritized_docs=prioritized_docs,
                 pass2_findings=pass2_findings,
-                claude_client=client,
+                claude_client=compression_client,
                 progress_callback=compression_progress
             )
             compression_stats = get_compression_stats(compressed_docs)
@@ -1262,6 +1276,7 @@ def _run_parallel_passes(
             include_tier3=include_tier3,
             entity_map=entity_map,
             validated_context=parallel_validated_context,
+            control_key=checkpoint_id,
         )
 
         # Check for errors
@@ -1350,7 +1365,7 @@ def _store_all_findings(
 
             # Store all findings
             all_findings = pass4_results.get("all_findings", [])
-            stored_count = _store_findings(
+            stored_findings = _store_findings(
                 session,
                 perspective.id,
                 all_findings,
@@ -1371,12 +1386,37 @@ def _store_all_findings(
             for doc in documents:
                 doc.processing_status = 'processed'
 
+            # Append to the findings change feed (a failure here must not lose the findings)
+            new_findings = stored_findings + cross_doc_stored
+            session.flush()
+            feed_cursor = 0
+            try:
+                categories = {
+                    risk.id: risk.category
+                    for risk in session.query(PerspectiveRisk).filter(PerspectiveRisk.perspective_id == perspective.id)
+                }
+                doc_names = {doc.id: doc.original_file_name for doc in documents}
+                with session.begin_nested():
+                    feed_cursor = record_finding_events(session, dd_id, None, [
+                        delta_for_model(
+                            db_finding,
+                            doc_names.get(db_finding.document_id) or db_finding.cross_doc_source,
+                            categories.get(db_finding.perspective_risk_id)
+                        )
+                        for db_finding in new_findings
+                    ])
+            except Exception as e:
+                logging.warning(f"[DDProcessEnhanced] Could not record finding events: {e}")
+
             # Commit all changes
             session.commit()
 
+            if feed_cursor:
+                get_findings_feed().notify(str(dd_id), feed_cursor)
+
             return {
-                "stored_count": stored_count,
-                "cross_doc_stored": cross_doc_stored
+                "stored_count": len(stored_findings),
+                "cross_doc_stored": len(cross_doc_stored)
             }
 
     except Exception as e:
@@ -1603,23 +1643,6 @@ def _map_transaction_type_to_code(transaction_type: str) -> str:
     return "ma_corporate"  # Default
 
 
-def _extract_document_content(doc: Document) -> str:
-    """Extract text content from a document."""
-    from DDProcessAllDev import extract_text_from_file_with_extension
-
-    dev_config = get_dev_config()
-    local_storage_path = dev_config.get("local_storage_path", "/tmp/dd_storage")
-    file_path = os.path.join(local_storage_path, "docs", str(doc.id))
-
-    extension = doc.type if doc.type else os.path.splitext(doc.original_file_name)[1].lstrip('.')
-
-    try:
-        return extract_text_from_file_with_extension(file_path, extension)
-    except Exception as e:
-        logging.warning(f"[DDProcessEnhanced] Could not extract content from {doc.original_file_name}: {e}")
-        return ""
-
-
 def _classify_document_type(filename: str, folder: Optional[Folder]) -> str:
     """Classify document type based on filename and folder."""
     filename_lower = filename.lower()
@@ -1742,9 +1765,9 @@ def _store_findings(
     findings: List[Dict],
     doc_lookup: Dict[str, Document],
     blueprint: Dict
-) -> int:
-    """Store findings in the database."""
-    stored_count = 0
+) -> List[PerspectiveRiskFinding]:
+    """Store findings in the database; returns the findings added, in order."""
+    stored = []
     risk_cache = {}  # Cache risk categories
 
     for finding in findings:
@@ -1821,12 +1844,12 @@ def _store_findings(
                 reasoning=reasoning_json
             )
             session.add(db_finding)
-            stored_count += 1
+            stored.append(db_finding)
 
         except Exception as e:
             logging.warning(f"[DDProcessEnhanced] Could not store finding: {e}")
 
-    return stored_count
+    return stored
 
 
 def _store_cross_doc_findings(
@@ -1834,9 +1857,9 @@ def _store_cross_doc_findings(
     perspective_id: str,
     findings: List[Dict],
     doc_lookup: Dict[str, Document]
-) -> int:
-    """Store cross-document findings with enhanced fields."""
-    stored_count = 0
+) -> List[PerspectiveRiskFinding]:
+    """Store cross-document findings with enhanced fields; returns the findings added, in order."""
+    stored = []
 
     # Get or create cross-document risk category
     risk = session.query(PerspectiveRisk).filter(
@@ -1896,12 +1919,12 @@ def _store_cross_doc_findings(
                 reasoning=reasoning_json
             )
             session.add(db_finding)
-            stored_count += 1
+            stored.append(db_finding)
 
         except Exception as e:
             logging.warning(f"[DDProcessEnhanced] Could not store cross-doc finding: {e}")
 
-    return stored_count
+    return stored
 
 
 def _get_category_description(blueprint: Dict, category: str) -> str:
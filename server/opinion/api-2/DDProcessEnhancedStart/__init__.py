@@ -10,17 +10,22 @@ The frontend polls DDProgressEnhanced to get real-time progress updates.
 
 DEV MODE: Uses threading for background processing (no EventGrid/Durable Functions dependency)
 """
+import copy
+import hashlib
 import logging
 import os
 import json
 import threading
 import uuid as uuid_module
 import datetime
-from typing import Dict, Any
+from typing import Dict, Any, List
 
 import azure.functions as func
 
 from shared.session import transactional_session
+from shared.db_instrumentation import instrumented
+from shared.run_control import get_run_control
+from shared.finding_events import delta_for_model, get_findings_feed, record_finding_events
 from sqlalchemy import text
 from shared.models import (
     Document, DueDiligence, DueDiligenceMember, Folder,
@@ -35,6 +40,18 @@ from dd_enhanced.core.checkpoint_questions import generate_checkpoint_c_content
 
 DEV_MODE = os.environ.get("DEV_MODE", "").lower() == "true"
 
+# Pass 1 runs documents concurrently (Haiku, independent per document); the
+# shared Claude rate limiter still caps the actual request rate
+PASS1_WORKERS = int(os.environ.get("DD_PASS1_WORKERS", "8"))
+
+# Minimum seconds between checkpoint progress writes / pause checks in Pass 1
+PROGRESS_WRITE_INTERVAL = float(os.environ.get("DD_PROGRESS_WRITE_INTERVAL", "5"))
+
+# Incremental runs: diff against the DD's previous completed run and carry
+# forward Pass 1/2 results for unchanged documents (and Pass 3 results for
+# clusters without changed documents)
+INCREMENTAL_RUNS = os.environ.get("DD_ENABLE_INCREMENTAL", "true").lower() == "true"
+
 # Global dict to track running processes (for dev mode)
 _running_processes: Dict[str, threading.Thread] = {}
 
@@ -52,6 +69,8 @@ def main(req: func.HttpRequest) -> func.HttpResponse:
     Body (optional JSON):
         include_tier3: bool - Include deep-dive questions (default: false)
         use_clustered_pass3: bool - Use optimized Pass 3 (default: true)
+        incremental: bool - Reuse results for documents unchanged since the
+            previous completed run (default: true; false forces a full run)
     """
     # Only allow in dev mode for now
     if not DEV_MODE:
@@ -91,6 +110,7 @@ def main(req: func.HttpRequest) -> func.HttpResponse:
 
         include_tier3 = options.get('include_tier3', False)
         use_clustered_pass3 = options.get('use_clustered_pass3', True)
+        incremental = options.get('incremental', True) and INCREMENTAL_RUNS
         model_tier = options.get('model_tier', 'balanced')  # cost_optimized, balanced, high_accuracy, maximum_accuracy
 
         # Validate model_tier
@@ -230,7 +250,8 @@ def main(req: func.HttpRequest) -> func.HttpResponse:
         # Spawn background thread (pass string versions for JSON/logging operations)
         thread = threading.Thread(
             target=_run_processing_in_background,
-            args=(dd_id_str, run_id, checkpoint_id, selected_doc_ids, include_tier3, use_clustered_pass3, model_tier),
+            args=(dd_id_str, run_id, checkpoint_id, selected_doc_ids, include_tier3, use_clustered_pass3, model_tier,
+                  incremental),
             daemon=True
         )
         thread.start()
@@ -251,7 +272,8 @@ def main(req: func.HttpRequest) -> func.HttpResponse:
                         "checkpoint_id": checkpoint_id,
                         "document_count": doc_count,
                         "include_tier3": include_tier3,
-                        "use_clustered_pass3": use_clustered_pass3
+                        "use_clustered_pass3": use_clustered_pass3,
+                        "incremental": incremental
                     }
                 )
                 audit_session.commit()
@@ -281,6 +303,7 @@ def main(req: func.HttpRequest) -> func.HttpResponse:
         )
 
 
+@instrumented()
 def _run_processing_in_background(
     dd_id: str,
     run_id: str,
@@ -288,17 +311,23 @@ def _run_processing_in_background(
     selected_doc_ids: list,
     include_tier3: bool,
     use_clustered_pass3: bool,
-    model_tier: str = "balanced"
+    model_tier: str = "balanced",
+    incremental: bool = True
 ):
     """
     Background worker that processes DD with granular checkpoint updates.
 
     This runs in a separate thread and updates the checkpoint after:
-    - Each document in Pass 1
+    - Pass 1 progress (concurrent, written every PROGRESS_WRITE_INTERVAL seconds)
     - Each document in Pass 2
     - Each cluster in Pass 3
     - Pass 4 completion
 
+    Incremental runs diff the documents against the DD's previous completed
+    run: only new or modified documents go through Pass 1 and Pass 2, and
+    only clusters containing them through clustered Pass 3. Stored results
+    are carried forward for everything else.
+
     Model Tiers:
     - cost_optimized: Haiku → Sonnet → Sonnet → Sonnet (~R350/200 docs)
     - balanced: Haiku → Sonnet → Opus → Sonnet (~R500/200 docs)
@@ -370,12 +399,24 @@ def _run_processing_in_background(
         client = ClaudeClient(model_tier=selected_tier)
         logging.info(f"[BackgroundProcessor] Using model tier: {selected_tier.value}")
 
+        # ===== Incremental run: diff against the previous completed run =====
+        context_key = _incremental_context_key(model_tier, include_tier3, transaction_context_str,
+                                               blueprint, reference_docs)
+        plan = _plan_incremental_run(dd_id, run_id, doc_dicts, context_key) if incremental else {}
+        carried = plan.get("carried", {})
+        if plan.get("previous_run_id"):
+            _update_checkpoint(checkpoint_id, {
+                'previous_run_id': uuid_module.UUID(plan["previous_run_id"]),
+                'documents_from_cache': len(carried)
+            })
+
         # ===== PASS 1: Extract (with per-document updates) =====
         print(f"[BackgroundProcessor] Pass 1: Extracting from {total_docs} documents", flush=True)
         logging.info(f"[BackgroundProcessor] Pass 1: Extracting from {total_docs} documents")
 
         pass1_results = _run_pass1_with_progress(
-            doc_dicts, client, checkpoint_id, total_docs, run_id
+            doc_dicts, client, checkpoint_id, total_docs, run_id,
+            cached_extractions={doc_id: r['pass1_result'] for doc_id, r in carried.items()}
         )
 
         # Check if we should exit (None = paused timeout, thread should exit cleanly)
@@ -412,7 +453,8 @@ def _run_processing_in_background(
         pass2_result = _run_pass2_with_progress(
             doc_dicts, reference_docs, blueprint, client, checkpoint_id,
             transaction_context_str, prioritized_questions, total_docs, run_id,
-            pass1_results  # Pass for saving on timeout
+            pass1_results,  # Pass for saving on timeout
+            cached_analyses=carried
         )
 
         # Check if we should exit (None = paused timeout)
@@ -497,7 +539,9 @@ def _run_processing_in_background(
             if use_clustered_pass3:
                 print(f"[BackgroundProcessor] Calling _run_pass3_clustered_with_progress...", flush=True)
                 pass3_results = _run_pass3_clustered_with_progress(
-                    doc_dicts, pass1_results, blueprint, client, checkpoint_id, run_id, pass2_findings
+                    doc_dicts, pass1_results, blueprint, client, checkpoint_id, run_id, pass2_findings,
+                    previous_clusters=plan.get("clusters"),
+                    carried_doc_ids=set(carried)
                 )
             else:
                 print(f"[BackgroundProcessor] Calling _run_pass3_simple...", flush=True)
@@ -573,6 +617,10 @@ def _run_processing_in_background(
         else:
             logging.info(f"[BackgroundProcessor] Stored {store_result.get('stored_count', 0)} findings")
 
+        # Save per-document and per-cluster results for the next incremental run
+        if INCREMENTAL_RUNS:
+            _save_incremental_state(run_id, doc_dicts, context_key, pass1_results, pass2_result, pass3_results)
+
         # Get final cost summary
         cost_summary = client.get_cost_summary()
 
@@ -659,6 +707,7 @@ def _run_processing_in_background(
         # Clean up thread reference
         if run_id in _running_processes:
             del _running_processes[run_id]
+        get_run_control().forget(checkpoint_id)
 
 
 def _update_checkpoint(checkpoint_id: str, updates: Dict[str, Any]):
@@ -718,25 +767,12 @@ def _check_should_stop(checkpoint_id: str) -> tuple[bool, str]:
     """
     Check if processing should stop (cancelled or paused).
     Returns (should_stop, reason).
+
+    Answered from the process-wide run control (shared.run_control), which
+    DDProcessPause / DDProcessCancel update by publishing commands; the
+    checkpoint row is only read on first use and periodic resync.
     """
-    try:
-        checkpoint_uuid = uuid_module.UUID(checkpoint_id) if isinstance(checkpoint_id, str) else checkpoint_id
-        with transactional_session() as session:
-            checkpoint = session.query(DDProcessingCheckpoint).filter(
-                DDProcessingCheckpoint.id == checkpoint_uuid
-            ).first()
-            if checkpoint:
-                if checkpoint.status == 'failed':
-                    # Check if it was cancelled
-                    if checkpoint.last_error and 'cancelled' in checkpoint.last_error.lower():
-                        return True, 'cancelled'
-                    return True, 'failed'
-                if checkpoint.status == 'paused':
-                    return True, 'paused'
-        return False, ''
-    except Exception as e:
-        logging.warning(f"[BackgroundProcessor] Error checking status: {e}")
-        return False, ''
+    return get_run_control().should_stop(checkpoint_id)
 
 
 def _wait_while_paused(checkpoint_id: str, run_id: str, max_wait_seconds: int = 3600) -> str:
@@ -749,28 +785,15 @@ def _wait_while_paused(checkpoint_id: str, run_id: str, max_wait_seconds: int =
         'timeout' - Waited too long, thread should exit (but status stays paused)
     """
     import time
-    wait_interval = 10  # Check every 10 seconds
-    total_waited = 0
-
-    while total_waited < max_wait_seconds:
-        should_stop, reason = _check_should_stop(checkpoint_id)
-        if not should_stop:
-            # No longer paused, continue processing
-            logging.info(f"[BackgroundProcessor] Run {run_id} resumed after {total_waited}s pause")
-            return 'resumed'
-        if reason in ('cancelled', 'failed'):
-            # Was cancelled while paused
-            return 'cancelled'
-        # Still paused, wait
-        time.sleep(wait_interval)
-        total_waited += wait_interval
-        # Log every 5 minutes
-        if total_waited % 300 == 0:
-            logging.info(f"[BackgroundProcessor] Run {run_id} paused, waiting... ({total_waited // 60} min)")
+    started = time.monotonic()
+    result = get_run_control().wait_while_paused(checkpoint_id, max_wait_seconds)
 
-    # Timed out - thread will exit but status stays 'paused' for later resume
-    logging.info(f"[BackgroundProcessor] Run {run_id} paused for 1 hour, saving state and exiting thread")
-    return 'timeout'
+    if result == 'resumed':
+        logging.info(f"[BackgroundProcessor] Run {run_id} resumed after {time.monotonic() - started:.0f}s pause")
+    elif result == 'timeout':
+        # Thread will exit but status stays 'paused' for later resume
+        logging.info(f"[BackgroundProcessor] Run {run_id} paused for 1 hour, saving state and exiting thread")
+    return result
 
 
 def _save_intermediate_results(checkpoint_id: str, results: Dict[str, Any]):
@@ -815,11 +838,88 @@ def _update_run_status(run_id: str, status: str, updates: Dict[str, Any] = None)
         logging.warning(f"[BackgroundProcessor] Failed to update run status: {e}")
 
 
+def _incremental_context_key(model_tier: str, include_tier3: bool, transaction_context_str: str,
+                             blueprint: Dict[str, Any], reference_docs: List[Dict[str, Any]]) -> str:
+    """Settings that affect every document's results; a change forces a full run."""
+    # Pass 2 analyses every document against the reference (constitutional/
+    # governance) documents, so adding, removing or editing one of them
+    # invalidates every document's stored results, not just its own.
+    reference_hashes = sorted(
+        (d["id"], hashlib.sha256(d.get("text", "").encode()).hexdigest())
+        for d in reference_docs
+    )
+    settings = json.dumps([model_tier, include_tier3, transaction_context_str, blueprint, reference_hashes],
+                          sort_keys=True, default=str)
+    return hashlib.sha256(settings.encode()).hexdigest()
+
+
+def _plan_incremental_run(dd_id: str, run_id: str, doc_dicts: list, context_key: str) -> Dict[str, Any]:
+    """
+    Diff this run's documents against the DD's previous completed run.
+
+    Returns previous_run_id, carried (doc_id -> stored Pass 1/2 results for
+    unchanged documents) and clusters (previous Pass 3 results per cluster).
+    Returns an empty plan - a full run - when there is nothing to reuse or
+    the lookup fails.
+    """
+    from dd_enhanced.core.incremental import ChangeDetector
+
+    try:
+        with transactional_session() as session:
+            detector = ChangeDetector(session, context_key=context_key)
+            previous_run_id = detector.find_previous_run(dd_id, run_id)
+            if not previous_run_id:
+                return {}
+
+            change_set = detector.detect_changes(
+                dd_id=dd_id,
+                current_run_id=run_id,
+                previous_run_id=previous_run_id,
+                current_documents=doc_dicts
+            )
+            reusable = detector.get_reusable_results(
+                previous_run_id, [d.document_id for d in change_set.unchanged_documents]
+            )
+            to_process, carried = change_set.split_documents(doc_dicts, reusable)
+            clusters = detector.get_cluster_results(previous_run_id) if carried else {}
+
+        logging.info(f"[BackgroundProcessor] Incremental run against {previous_run_id}: "
+                     f"{len(to_process)} documents to process, {len(carried)} carried forward "
+                     f"({change_set.get_summary()})")
+        return {"previous_run_id": previous_run_id, "carried": carried, "clusters": clusters}
+
+    except Exception as e:
+        logging.warning(f"[BackgroundProcessor] Change detection failed, running full analysis: {e}")
+        return {}
+
+
+def _save_incremental_state(run_id: str, doc_dicts: list, context_key: str, pass1_results: Dict[str, Any],
+                            pass2_result: Dict[str, Any], pass3_results: Dict[str, Any]):
+    """Save per-document and per-cluster results so later runs can carry them forward."""
+    from dd_enhanced.core.incremental import ChangeDetector
+
+    extractions = pass1_results.get("document_extractions", {})
+    analyses = pass2_result.get("document_results", {})
+    results = {}
+    for doc in doc_dicts:
+        doc_id = str(doc.get("id"))
+        if doc_id in extractions and doc_id in analyses:
+            results[doc_id] = {"pass1_result": extractions[doc_id], **analyses[doc_id]}
+
+    try:
+        with transactional_session() as session:
+            detector = ChangeDetector(session, context_key=context_key)
+            detector.save_state(run_id, doc_dicts, results)
+            detector.save_cluster_results(run_id, (pass3_results or {}).get("cluster_results", {}))
+    except Exception as e:
+        logging.warning(f"[BackgroundProcessor] Failed to save incremental state (non-fatal): {e}")
+
+
 def _load_dd_data_for_processing(dd_id: str, selected_doc_ids: list = None) -> Dict[str, Any]:
     """Load DD data for processing."""
     from config.blueprints.loader import load_blueprint
     from shared.dev_adapters.dev_config import get_dev_config
-    from DDProcessAllDev import extract_text_from_file_with_extension
+    from shared.text_extraction import get_document_texts
 
     try:
         # Convert string UUID to UUID object
@@ -902,19 +1002,19 @@ def _load_dd_data_for_processing(dd_id: str, selected_doc_ids: list = None) -> D
 
             logging.info(f"Smart selection: {len(documents)} selected → {len(docs_to_process)} to process")
 
-            # Extract document content
+            # Extract document content (cached per file version, misses in a process pool)
             dev_config = get_dev_config()
             local_storage_path = dev_config.get("local_storage_path", "/tmp/dd_storage")
 
+            try:
+                texts = get_document_texts(docs_to_process, local_storage_path)
+            except Exception as e:
+                logging.exception(f"[BackgroundProcessor] Text extraction failed: {e}")
+                texts = {}
+
             doc_dicts = []
             for doc in docs_to_process:
-                file_path = os.path.join(local_storage_path, "docs", str(doc.id))
-                extension = doc.type if doc.type else os.path.splitext(doc.original_file_name)[1].lstrip('.')
-
-                try:
-                    content = extract_text_from_file_with_extension(file_path, extension)
-                except:
-                    content = ""
+                content = texts.get(str(doc.id), "")
 
                 if content:
                     folder = folder_lookup.get(str(doc.folder_id))
@@ -959,8 +1059,36 @@ def _load_dd_data_for_processing(dd_id: str, selected_doc_ids: list = None) -> D
         return {"error": str(e)}
 
 
-def _run_pass1_with_progress(doc_dicts, client, checkpoint_id, total_docs, run_id: str = None):
-    """Run Pass 1 with per-document progress updates. Supports pause/cancel."""
+def _merge_pass1_result(combined_results: Dict[str, Any], doc: Dict, result: Dict) -> None:
+    """Merge one document's Pass 1 extraction into the combined results."""
+    combined_results["key_dates"].extend(result.get("key_dates", []))
+    combined_results["financial_figures"].extend(result.get("financial_figures", []))
+    combined_results["coc_clauses"].extend(result.get("coc_clauses", []))
+    combined_results["consent_requirements"].extend(result.get("consent_requirements", []))
+    combined_results["key_parties"].extend(result.get("key_parties", []))
+    combined_results["document_summaries"][doc["filename"]] = result.get("summary", "")
+    if not result.get("error"):
+        combined_results["document_extractions"][str(doc.get("id"))] = result
+
+
+def _run_pass1_with_progress(doc_dicts, client, checkpoint_id, total_docs, run_id: str = None,
+                             max_workers: int = None, cached_extractions: Dict[str, Dict] = None):
+    """
+    Run Pass 1 concurrently with throttled progress updates. Supports pause/cancel.
+
+    Documents are extracted on a thread pool (DD_PASS1_WORKERS). Results are
+    merged on this thread as they complete, so combined_results needs no
+    locking. Every PROGRESS_WRITE_INTERVAL seconds the checkpoint gets the
+    progress, the extractions so far and processed_doc_ids - so a resume
+    after pause timeout or restart skips finished documents - and the
+    pause/cancel flag is checked.
+
+    Documents with an entry in cached_extractions (doc_id -> extraction
+    carried forward from a previous run) are merged without an API call.
+    """
+    import time
+    from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
     try:
         from dd_enhanced.core.pass1_extract import extract_document
         logging.info(f"[BackgroundProcessor] Successfully imported extract_document")
@@ -974,25 +1102,96 @@ def _run_pass1_with_progress(doc_dicts, client, checkpoint_id, total_docs, run_i
         "coc_clauses": [],
         "consent_requirements": [],
         "key_parties": [],
-        "document_summaries": {}
+        "document_summaries": {},
+        "document_extractions": {}  # doc_id -> extraction (successful ones)
     }
     processed_doc_ids = []
+    completed_count = 0
+    last_doc = None
+
+    # Carried-forward extractions need no API call
+    cached_extractions = cached_extractions or {}
+    pending_docs = []
+    for doc in doc_dicts:
+        cached = cached_extractions.get(str(doc.get("id")))
+        if cached is None:
+            pending_docs.append(doc)
+            continue
+        _merge_pass1_result(combined_results, doc, cached)
+        processed_doc_ids.append(doc.get("id"))
+        completed_count += 1
+    if completed_count:
+        logging.info(f"[BackgroundProcessor] Pass 1 reusing {completed_count} extractions from previous run")
+
+    def save_progress():
+        updates = {
+            'documents_processed': completed_count,
+            'pass1_progress': int((completed_count / total_docs) * 100) if total_docs else 100,
+            'pass1_extractions': combined_results,
+            'processed_doc_ids': list(processed_doc_ids)
+        }
+        if last_doc:
+            updates['current_document_id'] = last_doc.get("id")
+            updates['current_document_name'] = last_doc.get("filename", "")
+        _update_checkpoint(checkpoint_id, updates)
+
+    def collect(futures):
+        nonlocal completed_count, last_doc
+        for future in futures:
+            doc = in_flight.pop(future)
+            completed_count += 1
+            last_doc = doc
+            try:
+                result = future.result()
+                _merge_pass1_result(combined_results, doc, result)
+                processed_doc_ids.append(doc.get("id"))
+
+            except Exception as e:
+                logging.exception(f"[BackgroundProcessor] Pass 1 error for {doc.get('filename')}: {e}")
+                # Update checkpoint with error so we can see what's happening
+                _update_checkpoint(checkpoint_id, {
+                    'last_error': f"Pass 1 error on {doc.get('filename', 'unknown')}: {str(e)[:500]}"
+                })
+                # Continue to next document rather than failing completely
+
+    workers = max(1, max_workers or PASS1_WORKERS)
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pass1")
+    in_flight = {}
+    next_idx = 0
+    last_write = time.monotonic()
+
+    try:
+        while next_idx < len(pending_docs) or in_flight:
+            # Keep the pool full
+            while next_idx < len(pending_docs) and len(in_flight) < workers:
+                doc = pending_docs[next_idx]
+                in_flight[executor.submit(extract_document, doc, client)] = doc
+                next_idx += 1
+
+            done, _ = wait(list(in_flight), timeout=PROGRESS_WRITE_INTERVAL, return_when=FIRST_COMPLETED)
+            collect(done)
+
+            if time.monotonic() - last_write < PROGRESS_WRITE_INTERVAL:
+                continue
+            last_write = time.monotonic()
+            save_progress()
+
+            # Check if we should stop (cancelled or paused)
+            should_stop, reason = _check_should_stop(checkpoint_id)
+            if not should_stop:
+                continue
 
-    for idx, doc in enumerate(doc_dicts):
-        # Check if we should stop (cancelled or paused)
-        should_stop, reason = _check_should_stop(checkpoint_id)
-        if should_stop:
             if reason == 'paused':
-                logging.info(f"[BackgroundProcessor] Pass 1 paused at doc {idx + 1}/{total_docs}")
+                # Let in-flight extractions finish so they are recorded before waiting
+                collect(wait(list(in_flight)).done)
+                save_progress()
+                logging.info(f"[BackgroundProcessor] Pass 1 paused at doc {completed_count}/{total_docs}")
                 wait_result = _wait_while_paused(checkpoint_id, run_id or '')
                 if wait_result == 'resumed':
                     logging.info(f"[BackgroundProcessor] Pass 1 resumed")
+                    last_write = time.monotonic()
                 elif wait_result == 'timeout':
-                    # Save state and exit - can resume later
-                    _save_intermediate_results(checkpoint_id, {
-                        'pass1_extractions': combined_results,
-                        'processed_doc_ids': processed_doc_ids
-                    })
+                    # State already saved - can resume later
                     return None  # Signal to exit thread
                 else:  # cancelled
                     logging.info(f"[BackgroundProcessor] Pass 1 cancelled while paused")
@@ -1001,39 +1200,16 @@ def _run_pass1_with_progress(doc_dicts, client, checkpoint_id, total_docs, run_i
                 # Cancelled or failed
                 logging.info(f"[BackgroundProcessor] Pass 1 stopped: {reason}")
                 return combined_results
-
-        try:
-            _update_checkpoint(checkpoint_id, {
-                'current_document_id': doc.get("id"),
-                'current_document_name': doc.get("filename", ""),
-                'documents_processed': idx,
-                'pass1_progress': int((idx / total_docs) * 100)
-            })
-
-            result = extract_document(doc, client)
-
-            # Merge results
-            combined_results["key_dates"].extend(result.get("key_dates", []))
-            combined_results["financial_figures"].extend(result.get("financial_figures", []))
-            combined_results["coc_clauses"].extend(result.get("coc_clauses", []))
-            combined_results["consent_requirements"].extend(result.get("consent_requirements", []))
-            combined_results["key_parties"].extend(result.get("key_parties", []))
-            combined_results["document_summaries"][doc["filename"]] = result.get("summary", "")
-            processed_doc_ids.append(doc.get("id"))
-
-        except Exception as e:
-            logging.exception(f"[BackgroundProcessor] Pass 1 error for {doc.get('filename')}: {e}")
-            # Update checkpoint with error so we can see what's happening
-            _update_checkpoint(checkpoint_id, {
-                'last_error': f"Pass 1 error on {doc.get('filename', 'unknown')}: {str(e)[:500]}"
-            })
-            # Continue to next document rather than failing completely
+    finally:
+        # Don't block a cancelled run on extractions that are still running
+        executor.shutdown(wait=False, cancel_futures=True)
 
     logging.info(f"[BackgroundProcessor] Pass 1 complete, processed {len(processed_doc_ids)} documents")
     _update_checkpoint(checkpoint_id, {
         'documents_processed': total_docs,
         'pass1_progress': 100,
         'pass1_extractions': combined_results,
+        'processed_doc_ids': list(processed_doc_ids),
         'current_document_name': None
     })
 
@@ -1043,12 +1219,18 @@ def _run_pass1_with_progress(doc_dicts, client, checkpoint_id, total_docs, run_i
 def _run_pass2_with_progress(
     doc_dicts, reference_docs, blueprint, client, checkpoint_id,
     transaction_context_str, prioritized_questions, total_docs, run_id: str = None,
-    pass1_results: Dict = None
+    pass1_results: Dict = None, cached_analyses: Dict[str, Dict] = None
 ):
-    """Run Pass 2 with per-document progress updates. Supports pause/cancel."""
+    """
+    Run Pass 2 with per-document progress updates. Supports pause/cancel.
+
+    Documents with an entry in cached_analyses (doc_id -> stored results
+    with 'pass2_findings' and 'pass2_blueprint_qa') reuse those results
+    instead of being analysed again; they still count towards gap detection.
+    """
     try:
         from dd_enhanced.core.pass2_analyze import analyze_document, _generate_gap_findings
-        from config.question_loader import QuestionLoader
+        from config.question_loader import get_question_loader
         logging.info(f"[BackgroundProcessor] Successfully imported analyze_document")
     except Exception as import_error:
         logging.exception(f"[BackgroundProcessor] Failed to import analyze_document: {import_error}")
@@ -1057,6 +1239,7 @@ def _run_pass2_with_progress(
     all_findings = []
     processed_doc_ids = []
     all_blueprint_qa = []  # Collect all Q&A pairs for blueprint answers view
+    document_results: Dict[str, Dict] = {}  # doc_id -> this document's findings and Q&A (for reuse)
 
     # Track questions asked vs answered for gap detection
     questions_asked: Dict[str, List[Dict]] = {}  # folder_category -> list of questions
@@ -1065,7 +1248,7 @@ def _run_pass2_with_progress(
     missing_info_by_folder: Dict[str, List[str]] = {}  # folder_category -> missing info items
 
     # Initialize QuestionLoader for folder-aware analysis
-    question_loader = QuestionLoader(blueprint) if blueprint else None
+    question_loader = get_question_loader(blueprint) if blueprint else None
 
     # Create RefDoc objects
     class RefDoc:
@@ -1076,7 +1259,64 @@ def _run_pass2_with_progress(
 
     ref_doc_objects = [RefDoc(d) for d in reference_docs]
 
-    for idx, doc in enumerate(doc_dicts):
+    def track_folder(doc):
+        folder_category = doc.get("folder_category")
+        # Track folder-specific questions for gap detection
+        if question_loader and folder_category:
+            folder_questions = question_loader.get_questions_for_folder(folder_category)
+            if folder_questions and folder_category not in questions_asked:
+                questions_asked[folder_category] = folder_questions
+            # Track which docs were analyzed per folder
+            if folder_category not in folder_docs_analyzed:
+                folder_docs_analyzed[folder_category] = []
+            folder_docs_analyzed[folder_category].append(doc.get("filename", ""))
+
+    def record(doc, findings, qa_pairs):
+        folder_category = doc.get("folder_category")
+
+        # Collect Q&A pairs for blueprint answers
+        if qa_pairs:
+            all_blueprint_qa.extend(qa_pairs)
+
+        all_findings.extend(findings)
+
+        # Track questions answered from findings for gap detection
+        for finding in findings:
+            if finding.get("blueprint_question_answered") and folder_category:
+                if folder_category not in questions_answered:
+                    questions_answered[folder_category] = set()
+                questions_answered[folder_category].add(
+                    finding.get("blueprint_question_answered").lower().strip()
+                )
+
+        # Snapshot: later passes annotate the shared finding dicts in place
+        document_results[str(doc.get("id"))] = {
+            "pass2_findings": copy.deepcopy(findings),
+            "pass2_blueprint_qa": copy.deepcopy(qa_pairs)
+        }
+        processed_doc_ids.append(doc.get("id"))
+
+    # Carried-forward documents first (no API calls)
+    cached_analyses = cached_analyses or {}
+    pending_docs = []
+    for doc in doc_dicts:
+        cached = cached_analyses.get(str(doc.get("id")))
+        if cached is None:
+            pending_docs.append(doc)
+            continue
+        track_folder(doc)
+        record(doc, cached.get("pass2_findings") or [], cached.get("pass2_blueprint_qa") or [])
+
+    reused_count = len(processed_doc_ids)
+    if reused_count:
+        logging.info(f"[BackgroundProcessor] Pass 2 reusing results for {reused_count} documents from previous run")
+        _update_checkpoint(checkpoint_id, {
+            'documents_processed': reused_count,
+            'pass2_progress': int((reused_count / total_docs) * 100) if total_docs else 100,
+            'findings_total': len(all_findings)
+        })
+
+    for idx, doc in enumerate(pending_docs, start=reused_count):
         # Check if we should stop (cancelled or paused)
         should_stop, reason = _check_should_stop(checkpoint_id)
         if should_stop:
@@ -1095,24 +1335,16 @@ def _run_pass2_with_progress(
                     return None  # Signal to exit thread
                 else:  # cancelled
                     logging.info(f"[BackgroundProcessor] Pass 2 cancelled while paused")
-                    return {"findings": all_findings, "blueprint_qa": all_blueprint_qa}
+                    return {"findings": all_findings, "blueprint_qa": all_blueprint_qa,
+                            "document_results": document_results}
             else:
                 logging.info(f"[BackgroundProcessor] Pass 2 stopped: {reason}")
-                return {"findings": all_findings, "blueprint_qa": all_blueprint_qa}
+                return {"findings": all_findings, "blueprint_qa": all_blueprint_qa,
+                        "document_results": document_results}
 
         try:
-            folder_category = doc.get("folder_category")
             filename = doc.get("filename", "")
-
-            # Track folder-specific questions for gap detection
-            if question_loader and folder_category:
-                folder_questions = question_loader.get_questions_for_folder(folder_category)
-                if folder_questions and folder_category not in questions_asked:
-                    questions_asked[folder_category] = folder_questions
-                # Track which docs were analyzed per folder
-                if folder_category not in folder_docs_analyzed:
-                    folder_docs_analyzed[folder_category] = []
-                folder_docs_analyzed[folder_category].append(filename)
+            track_folder(doc)
 
             _update_checkpoint(checkpoint_id, {
                 'current_document_id': doc.get("id"),
@@ -1131,14 +1363,10 @@ def _run_pass2_with_progress(
             # Extract findings and Q&A data
             findings = analysis_result.get("findings", [])
             qa_pairs = analysis_result.get("questions_answered", [])
-
-            # Collect Q&A pairs for blueprint answers
-            if qa_pairs:
-                all_blueprint_qa.extend(qa_pairs)
+            record(doc, findings, qa_pairs)
 
             # Update finding counts as we go
             if findings:
-                all_findings.extend(findings)
                 critical = sum(1 for f in all_findings if f.get("severity") == "critical")
                 high = sum(1 for f in all_findings if f.get("severity") == "high")
 
@@ -1148,17 +1376,6 @@ def _run_pass2_with_progress(
                     'findings_high': high
                 })
 
-                # Track questions answered from findings for gap detection
-                for finding in findings:
-                    if finding.get("blueprint_question_answered") and folder_category:
-                        if folder_category not in questions_answered:
-                            questions_answered[folder_category] = set()
-                        questions_answered[folder_category].add(
-                            finding.get("blueprint_question_answered").lower().strip()
-                        )
-
-            processed_doc_ids.append(doc.get("id"))
-
         except Exception as e:
             logging.warning(f"[BackgroundProcessor] Pass 2 error for {doc.get('filename')}: {e}")
 
@@ -1189,12 +1406,20 @@ def _run_pass2_with_progress(
 
     return {
         "findings": all_findings,
-        "blueprint_qa": all_blueprint_qa
+        "blueprint_qa": all_blueprint_qa,
+        "document_results": document_results
     }
 
 
-def _run_pass3_clustered_with_progress(doc_dicts, pass1_results, blueprint, client, checkpoint_id, run_id: str = None, pass2_findings: list = None):
-    """Run Pass 3 with per-cluster progress updates. Supports pause/cancel."""
+def _run_pass3_clustered_with_progress(doc_dicts, pass1_results, blueprint, client, checkpoint_id, run_id: str = None, pass2_findings: list = None,
+                                      previous_clusters: Dict[str, Dict] = None, carried_doc_ids: set = None):
+    """
+    Run Pass 3 with per-cluster progress updates. Supports pause/cancel.
+
+    A cluster in previous_clusters (cluster name -> previous run's
+    document_ids and cross_doc_findings) whose documents are the same and
+    all carried forward (carried_doc_ids) reuses its previous findings.
+    """
     import traceback
     import time
 
@@ -1238,6 +1463,9 @@ def _run_pass3_clustered_with_progress(doc_dicts, pass1_results, blueprint, clie
 
     all_cross_doc_findings = []
     clusters_status = {}
+    cluster_results = {}  # cluster_name -> document_ids + findings (for reuse by later runs)
+    previous_clusters = previous_clusters or {}
+    carried_doc_ids = carried_doc_ids or set()
     pass3_start_time = time.time()
 
     for idx, (cluster_name, docs) in enumerate(clustered_docs.items()):
@@ -1270,6 +1498,16 @@ def _run_pass3_clustered_with_progress(doc_dicts, pass1_results, blueprint, clie
                 logging.info(f"[BackgroundProcessor] Pass 3 stopped: {reason}")
                 break
 
+        doc_ids = sorted(str(d.get("id")) for d in docs)
+        previous = previous_clusters.get(cluster_name)
+        if previous and previous["document_ids"] == doc_ids and carried_doc_ids.issuperset(doc_ids):
+            findings = previous["cross_doc_findings"]
+            all_cross_doc_findings.extend(copy.deepcopy(findings))
+            cluster_results[cluster_name] = previous
+            clusters_status[cluster_name] = {"status": "reused", "findings": len(findings)}
+            print(f"[Pass 3] Cluster '{cluster_name}' unchanged - reusing {len(findings)} findings", flush=True)
+            continue
+
         try:
             _update_checkpoint(checkpoint_id, {
                 'current_stage': f'pass3_{cluster_name}',
@@ -1281,13 +1519,17 @@ def _run_pass3_clustered_with_progress(doc_dicts, pass1_results, blueprint, clie
             print(f"[Pass 3]   - pass1_results keys: {list(pass1_results.keys()) if pass1_results else 'None'}", flush=True)
             print(f"[Pass 3]   - blueprint type: {type(blueprint)}", flush=True)
 
-            cluster_results = analyze_cluster(
+            cluster_result = analyze_cluster(
                 cluster_name, docs, pass1_results, blueprint, client
             )
 
             cluster_elapsed = time.time() - cluster_start_time
-            findings = cluster_results.get("cross_doc_findings", [])
+            findings = cluster_result.get("cross_doc_findings", [])
             all_cross_doc_findings.extend(findings)
+            cluster_results[cluster_name] = {
+                "document_ids": doc_ids,
+                "cross_doc_findings": copy.deepcopy(findings)
+            }
             clusters_status[cluster_name] = {"status": "completed", "findings": len(findings)}
 
             print(f"[Pass 3] Cluster '{cluster_name}' completed in {cluster_elapsed:.1f}s - {len(findings)} findings", flush=True)
@@ -1324,7 +1566,8 @@ def _run_pass3_clustered_with_progress(doc_dicts, pass1_results, blueprint, clie
         "conflicts": [],
         "cascade_analysis": {"cascade_items": []},
         "authorization_issues": [],
-        "consent_matrix": []
+        "consent_matrix": [],
+        "cluster_results": cluster_results
     }
 
 
@@ -1395,6 +1638,7 @@ def _store_findings_to_db(dd_id, run_id, owned_by, doc_dicts, pass4_results, pas
             all_findings = pass4_results.get("all_findings", [])
             risk_cache = {}
             stored_count = 0
+            stored_findings = []  # (db_finding, source document name, category) for the findings feed
 
             for finding in all_findings:
                 try:
@@ -1532,6 +1776,10 @@ def _store_findings_to_db(dd_id, run_id, owned_by, doc_dicts, pass4_results, pas
                     )
                     session.add(db_finding)
                     stored_count += 1
+                    linked_doc = doc_id_lookup.get(str(doc_id)) if doc_id else None
+                    stored_findings.append((
+                        db_finding, linked_doc.original_file_name if linked_doc else source_doc, category
+                    ))
 
                 except Exception as e:
                     logging.warning(f"[BackgroundProcessor] Could not store finding: {e}")
@@ -1577,6 +1825,9 @@ def _store_findings_to_db(dd_id, run_id, owned_by, doc_dicts, pass4_results, pas
                     )
                     session.add(db_finding)
                     stored_count += 1
+                    stored_findings.append((
+                        db_finding, finding.get("source_document"), "Cross-Document Analysis"
+                    ))
 
                 except Exception as e:
                     logging.warning(f"[BackgroundProcessor] Could not store cross-doc finding: {e}")
@@ -1585,9 +1836,24 @@ def _store_findings_to_db(dd_id, run_id, owned_by, doc_dicts, pass4_results, pas
             for doc in documents:
                 doc.processing_status = 'processed'
 
+            # Append to the findings change feed (a failure here must not lose the findings)
+            session.flush()
+            feed_cursor = 0
+            try:
+                with session.begin_nested():
+                    feed_cursor = record_finding_events(session, dd_uuid, run_uuid, [
+                        delta_for_model(db_finding, source_name, category)
+                        for db_finding, source_name, category in stored_findings
+                    ])
+            except Exception as e:
+                logging.warning(f"[BackgroundProcessor] Could not record finding events: {e}")
+
             session.commit()
             logging.info(f"[BackgroundProcessor] Successfully stored {stored_count} findings to database")
 
+            if feed_cursor:
+                get_findings_feed().notify(str(dd_uuid), feed_cursor)
+
             return {"stored_count": stored_count}
 
     except Exception as e:
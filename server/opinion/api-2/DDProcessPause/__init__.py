@@ -16,6 +16,7 @@ import azure.functions as func
 
 from shared.session import transactional_session
 from shared.models import DDProcessingCheckpoint, DDAnalysisRun
+from shared.run_control import get_run_control, publish_run_command
 
 DEV_MODE = os.environ.get("DEV_MODE", "").lower() == "true"
 
@@ -150,6 +151,9 @@ def main(req: func.HttpRequest) -> func.HttpResponse:
 
             session.commit()
 
+            # Tell the processing thread now rather than at its next status check
+            publish_run_command(str(checkpoint.id), action)
+
             logging.info(f"[DDProcessPause] {action.capitalize()} successful for run: {run_id}")
 
             # If resuming, check if we need to spawn a new processing thread
@@ -467,3 +471,4 @@ def _run_resume_processing(
         # Clean up thread reference
         if run_id in _running_processes:
             del _running_processes[run_id]
+        get_run_control().forget(checkpoint_id)
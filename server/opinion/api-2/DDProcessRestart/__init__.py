@@ -21,6 +21,7 @@ import azure.functions as func
 
 from shared.session import transactional_session
 from shared.models import DDProcessingCheckpoint, DDAnalysisRun
+from shared.run_control import publish_run_command
 
 DEV_MODE = os.environ.get("DEV_MODE", "").lower() == "true"
 
@@ -182,6 +183,9 @@ def main(req: func.HttpRequest) -> func.HttpResponse:
 
             session.commit()
 
+        # Clear any paused/failed state still cached by this or other processes
+        publish_run_command(checkpoint_id, 'resume')
+
         # Spawn new processing thread
         thread_spawned = _spawn_restart_thread(
             run_id=run_id,
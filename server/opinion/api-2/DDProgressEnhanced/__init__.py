@@ -15,11 +15,14 @@ import azure.functions as func
 import json
 from datetime import datetime
 from shared.session import transactional_session
+from shared.db_instrumentation import instrumented
 from shared.models import DueDiligence, Folder
 from shared.document_selector import get_processable_documents
+from shared.finding_aggregates import read_run_buckets, dashboard_counts
 from sqlalchemy import text
 
 
+@instrumented()
 def main(req: func.HttpRequest) -> func.HttpResponse:
     """
     Get real-time processing progress for a DD run.
@@ -444,32 +447,10 @@ def main(req: func.HttpRequest) -> func.HttpResponse:
             actual_run_id = str(result.run_id) if result.run_id else run_id
 
             if actual_run_id:
-                # Filter by run_id for run-specific finding counts
-                # IMPORTANT: This severity mapping MUST match RiskSummary.tsx exactly:
-                #   - critical: action_priority = 'critical'
-                #   - high: status = 'Red' AND action_priority != 'critical', OR action_priority = 'high', OR finding_type = 'negative'
-                #   - medium: status = 'Amber'
-                #   - positive: status = 'Green' OR finding_type = 'positive'
-                #   - gap: finding_type = 'gap' OR status = 'Info'
-                #   - low: finding_type IN ('neutral', 'informational')
-                finding_query = text("""
-                    SELECT
-                        COUNT(*) as total,
-                        COUNT(*) FILTER (WHERE prf.action_priority = 'critical') as critical,
-                        COUNT(*) FILTER (WHERE (prf.status = 'Red' AND prf.action_priority != 'critical') OR prf.action_priority = 'high' OR (prf.finding_type = 'negative' AND prf.status != 'Red')) as high,
-                        COUNT(*) FILTER (WHERE prf.status = 'Amber') as medium,
-                        COUNT(*) FILTER (WHERE prf.status = 'Green' OR prf.finding_type = 'positive') as positive,
-                        COUNT(*) FILTER (WHERE prf.finding_type = 'gap' OR prf.status = 'Info') as gap,
-                        COUNT(*) FILTER (WHERE prf.finding_type IN ('neutral', 'informational')) as low
-                    FROM perspective_risk_finding prf
-                    JOIN perspective_risk pr ON prf.perspective_risk_id = pr.id
-                    JOIN perspective p ON pr.perspective_id = p.id
-                    JOIN due_diligence_member ddm ON p.member_id = ddm.id
-                    WHERE ddm.dd_id = :dd_id
-                    AND prf.run_id = :run_id
-                    AND prf.status != 'Deleted'
-                """)
-                finding_counts_row = session.execute(finding_query, {"dd_id": actual_dd_id, "run_id": actual_run_id}).fetchone()
+                # Filter by run_id for run-specific finding counts, summed from the
+                # run's precomputed finding buckets (shared/finding_aggregates.py).
+                # The severity mapping there MUST match RiskSummary.tsx exactly.
+                finding_counts = dashboard_counts(read_run_buckets(session, actual_run_id))
 
                 # Get deal blockers and conditions precedent from synthesis_data (authoritative source)
                 # These are stored in dd_analysis_run.synthesis_data, not computed from findings
@@ -506,19 +487,22 @@ def main(req: func.HttpRequest) -> func.HttpResponse:
                     AND prf.status != 'Deleted'
                 """)
                 finding_counts_row = session.execute(finding_query, {"dd_id": actual_dd_id}).fetchone()
+                finding_counts = {
+                    "total": finding_counts_row.total if finding_counts_row else 0,
+                    "critical": finding_counts_row.critical if finding_counts_row else 0,
+                    "high": finding_counts_row.high if finding_counts_row else 0,
+                    "medium": finding_counts_row.medium if finding_counts_row else 0,
+                    "positive": finding_counts_row.positive if finding_counts_row else 0,
+                    "gap": finding_counts_row.gap if finding_counts_row else 0,
+                    "low": finding_counts_row.low if finding_counts_row else 0,
+                }
                 deal_blockers_count = 0
                 cps_count = 0
                 warranties_count = 0
                 indemnities_count = 0
 
             finding_counts = {
-                "total": finding_counts_row.total if finding_counts_row else 0,
-                "critical": finding_counts_row.critical if finding_counts_row else 0,
-                "high": finding_counts_row.high if finding_counts_row else 0,
-                "medium": finding_counts_row.medium if finding_counts_row else 0,
-                "positive": finding_counts_row.positive if finding_counts_row else 0,
-                "gap": finding_counts_row.gap if finding_counts_row else 0,
-                "low": finding_counts_row.low if finding_counts_row else 0,
+                **finding_counts,
                 "deal_blockers": deal_blockers_count,
                 "conditions_precedent": cps_count,
                 "warranties": warranties_count,
@@ -18,6 +18,7 @@ from sqlalchemy import text
 from shared.session import transactional_session
 from shared.uploader import write_to_blob_storage, get_blob_sas_url
 from shared.audit import log_audit_event, AuditEventType
+from shared.finding_aggregates import read_run_buckets, group_counts
 
 logger = logging.getLogger(__name__)
 
@@ -420,21 +421,10 @@ def gather_report_data(session, dd_id: str, run_id: str) -> Dict:
         {'dd_id': dd_id}
     ).fetchone()
 
-    # Get severity breakdown
-    severity_result = session.execute(
-        text("""
-            SELECT
-                action_priority as severity,
-                COUNT(*) as count
-            FROM perspective_risk_finding
-            WHERE run_id = :run_id
-            AND status != 'Deleted'
-            GROUP BY action_priority
-        """),
-        {'run_id': run_id}
-    ).fetchall()
-
-    severity_breakdown = {row.severity or 'none': row.count for row in severity_result}
+    # Get severity breakdown from the run's precomputed finding buckets
+    severity_breakdown = {}
+    for (severity,), count in group_counts(read_run_buckets(session, run_id), 'action_priority').items():
+        severity_breakdown[severity or 'none'] = severity_breakdown.get(severity or 'none', 0) + count
 
     # Get deal blockers
     deal_blockers = session.execute(
@@ -8,12 +8,20 @@ Phase 7: Enterprise Features
 import azure.functions as func
 import json
 import logging
+from collections import namedtuple
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 from sqlalchemy import text
 
 from shared.session import transactional_session
 from shared.audit import log_audit_event, AuditEventType
+from shared.finding_aggregates import read_run_buckets, group_counts, exposure_by_currency
+
+# One row of the severity x category x folder summary
+SummaryRow = namedtuple('SummaryRow', ['severity', 'risk_category', 'folder_category', 'count'])
+
+# Summary rows are ordered by severity, then count descending
+SEVERITY_RANK = {'critical': 1, 'high': 2, 'medium': 3, 'low': 4}
 
 logger = logging.getLogger(__name__)
 
@@ -87,29 +95,17 @@ def build_risk_matrix(session, dd_id: str, run_id: Optional[str] = None) -> Dict
 
     # Get findings by priority (action_priority) and category (folder_category)
     # Note: Using action_priority as severity equivalent
-    findings_summary = session.execute(
-        text("""
-            SELECT
-                action_priority as severity,
-                COALESCE(risk_category, folder_category, 'General') as risk_category,
-                folder_category,
-                COUNT(*) as count
-            FROM perspective_risk_finding
-            WHERE run_id = :run_id
-            AND status != 'Deleted'
-            GROUP BY action_priority, COALESCE(risk_category, folder_category, 'General'), folder_category
-            ORDER BY
-                CASE action_priority
-                    WHEN 'critical' THEN 1
-                    WHEN 'high' THEN 2
-                    WHEN 'medium' THEN 3
-                    WHEN 'low' THEN 4
-                    ELSE 5
-                END,
-                count DESC
-        """),
-        {'run_id': run_id}
-    ).fetchall()
+    # Summed from the run's precomputed finding buckets (shared/finding_aggregates.py)
+    buckets = read_run_buckets(session, run_id)
+    findings_summary = sorted(
+        (
+            SummaryRow(severity, risk_category, folder_category, count)
+            for (severity, risk_category, folder_category), count in group_counts(
+                buckets, 'action_priority', 'risk_category', 'folder_category'
+            ).items()
+        ),
+        key=lambda row: (SEVERITY_RANK.get(row.severity, 5), -row.count)
+    )
 
     # Build severity breakdown
     severity_breakdown = {'critical': 0, 'high': 0, 'medium': 0, 'low': 0, 'none': 0}
@@ -187,21 +183,7 @@ def build_risk_matrix(session, dd_id: str, run_id: Optional[str] = None) -> Dict
     ).fetchall()
 
     # Also get financial exposure from findings
-    findings_exposure = session.execute(
-        text("""
-            SELECT
-                financial_exposure_currency as currency,
-                SUM(financial_exposure_amount) as total_value,
-                COUNT(*) as count
-            FROM perspective_risk_finding
-            WHERE run_id = :run_id
-            AND financial_exposure_amount IS NOT NULL
-            AND financial_exposure_amount > 0
-            GROUP BY financial_exposure_currency
-            ORDER BY total_value DESC
-        """),
-        {'run_id': run_id}
-    ).fetchall()
+    findings_exposure = exposure_by_currency(buckets)
 
     # Calculate overall risk score (0-100)
     risk_score = calculate_risk_score(severity_breakdown, coc_summary)
@@ -258,10 +240,7 @@ def build_risk_matrix(session, dd_id: str, run_id: Optional[str] = None) -> Dict
                 {'currency': row.currency, 'total_value': float(row.total_value), 'count': row.count}
                 for row in financial_exposure
             ],
-            'from_findings': [
-                {'currency': row.currency, 'total_value': float(row.total_value), 'count': row.count}
-                for row in findings_exposure
-            ]
+            'from_findings': findings_exposure
         },
         'total_exposure': {
             row.currency: float(row.total_value)
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+DD Enhanced - Finding Deduplication Benchmark
+
+Times core.finding_dedup on synthetic Pass 4 runs of increasing size and
+checks the MinHash/LSH clusters against exhaustive pairwise comparison.
+
+Synthetic findings are paraphrases of a pool of distinct issues (words
+drawn from a Zipf-weighted vocabulary plus issue-specific parties, amounts
+and clauses; words dropped or added, different documents and severities),
+spread across categories the way consolidated Pass 2/3 findings are.
+
+Run with:
+    python benchmark_dedup.py                       # 1k .. 10k findings
+    python benchmark_dedup.py --findings 20000 --no-exact
+"""
+import argparse
+import random
+import sys
+import time
+from itertools import accumulate
+from pathlib import Path
+
+# Add parent to path for imports
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from dd_enhanced.core import finding_dedup
+from dd_enhanced.core.finding_dedup import cluster_findings, deduplicate_findings
+
+CATEGORIES = ["change_of_control", "financial", "employment", "regulatory", "property",
+              "litigation", "intellectual_property", "tax", "environmental", "contracts"]
+SEVERITIES = ["critical", "high", "medium", "low"]
+VOCABULARY = (
+    "consent lender landlord supplier acceleration termination breach covenant waiver "
+    "indemnity warranty guarantee liability exposure penalty liquidated damages notice "
+    "period shareholder approval board resolution mining licence environmental permit "
+    "rehabilitation provision employee retention bonus pension exclusivity assignment "
+    "novation renewal escalation payment facility security cession pledge dispute claim "
+    "arbitration judgment royalty trademark patent transfer pricing assessment audit"
+).split() + [f"term{i}" for i in range(5000)]
+
+# Zipf-like word frequencies: the legal terms above are the most common
+_CUM_WEIGHTS = list(accumulate(1.0 / (rank + 1) for rank in range(len(VOCABULARY))))
+
+
+def make_findings(count: int, duplicate_rate: float, seed: int = 7):
+    """Synthetic findings: distinct issues plus noisy restatements of them."""
+    rng = random.Random(seed)
+    issue_count = max(1, int(count * (1 - duplicate_rate)))
+    issues = []
+    for i in range(issue_count):
+        words = list(dict.fromkeys(rng.choices(VOCABULARY, cum_weights=_CUM_WEIGHTS, k=rng.randint(10, 20))))
+        # Issue-specific detail: counterparty, amount, clause
+        words += [f"party{rng.randint(1, count)}", f"r{rng.randint(1, 999)}m", f"clause {rng.randint(1, 40)}.{rng.randint(1, 9)}"]
+        issues.append((rng.choice(CATEGORIES), words))
+
+    findings = []
+    for i in range(count):
+        category, words = issues[i] if i < issue_count else rng.choice(issues)
+        if i >= issue_count:
+            words = [w for w in words if rng.random() > 0.1]
+            if rng.random() < 0.5:
+                words = words + rng.choices(VOCABULARY, cum_weights=_CUM_WEIGHTS)
+        findings.append({
+            "category": category,
+            "description": "The " + " ".join(words) + ".",
+            "severity": rng.choice(SEVERITIES),
+            "deal_impact": rng.choice(["noted", "price_chip", "condition_precedent"]),
+            "document": f"Document {rng.randint(1, 400)}.pdf",
+        })
+    rng.shuffle(findings)
+    return findings
+
+
+def exact_clusters(findings):
+    """Reference clustering with every pair compared."""
+    saved = finding_dedup.EXACT_MAX_GROUP
+    finding_dedup.EXACT_MAX_GROUP = len(findings)
+    try:
+        return cluster_findings(findings, text=lambda f: f["description"], group=lambda f: f["category"])
+    finally:
+        finding_dedup.EXACT_MAX_GROUP = saved
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark finding deduplication")
+    parser.add_argument("--findings", type=int, default=10000, help="Largest run size")
+    parser.add_argument("--duplicate-rate", type=float, default=0.4, help="Share of findings that restate another")
+    parser.add_argument("--no-exact", action="store_true", help="Skip the pairwise reference comparison")
+    args = parser.parse_args()
+
+    sizes = sorted({s for s in (1000, 2500, 5000, args.findings) if s <= args.findings})
+    print(f"{'findings':>9} {'kept':>7} {'seconds':>8} {'us/finding':>11} {'exact s':>8} {'match':>6}")
+
+    for size in sizes:
+        findings = make_findings(size, args.duplicate_rate)
+
+        start = time.perf_counter()
+        deduplicated = deduplicate_findings(findings)
+        elapsed = time.perf_counter() - start
+
+        exact_elapsed, match = "-", "-"
+        if not args.no_exact:
+            start = time.perf_counter()
+            reference = exact_clusters(findings)
+            exact_elapsed = f"{time.perf_counter() - start:.2f}"
+            lsh = cluster_findings(findings, text=lambda f: f["description"], group=lambda f: f["category"])
+            match = "yes" if lsh == reference else f"{len(lsh) - len(reference):+d}"
+
+        print(f"{size:>9} {len(deduplicated):>7} {elapsed:>8.2f} {elapsed / size * 1e6:>11.0f} "
+              f"{exact_elapsed:>8} {match:>6}")
+
+
+if __name__ == "__main__":
+    main()
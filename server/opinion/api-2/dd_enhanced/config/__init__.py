@@ -4,7 +4,8 @@ Configuration and blueprints for DD Enhanced.
 import os
 from pathlib import Path
 from typing import Dict, Any, Optional
-import yaml
+
+from .blueprint_registry import get_blueprint_registry
 
 
 def get_blueprints_dir() -> Path:
@@ -28,8 +29,8 @@ def load_blueprint(name: str) -> Dict[str, Any]:
     if not blueprint_path.exists():
         raise FileNotFoundError(f"Blueprint not found: {blueprint_path}")
 
-    with open(blueprint_path, "r") as f:
-        return yaml.safe_load(f)
+    # Shared, read-only copy parsed once per process
+    return get_blueprint_registry().yaml_file(blueprint_path)
 
 
 def list_blueprints() -> list:
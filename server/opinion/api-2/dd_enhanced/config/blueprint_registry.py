@@ -0,0 +1,227 @@
+"""
+Process-wide registry of parsed blueprint and document-registry YAML.
+
+Every YAML file under blueprints/ and documents/ is parsed at most once per
+process and handed out as a read-only view (FrozenDict / FrozenList). Views
+behave like the dicts and lists yaml.safe_load returns (isinstance, json.dumps,
+iteration, .get), but raise TypeError on mutation because they are shared by
+every caller. copy.deepcopy() of a view returns ordinary mutable containers.
+
+Merged results (load_blueprint, load_document_registry) and derived lookups
+(critical questions, questions by category) are memoised alongside.
+
+Parsed files are also kept in a pickle cache on local disk, keyed by each
+file's mtime and size, so a cold start reads one pickle instead of parsing
+1.5MB of YAML. The cache is written once per cold load (after precompile() or
+a memoised merge that parsed new files), into a directory created 0700, and is
+only read back when it is owned by this user and not group/world-writable.
+Configuration:
+    DD_BLUEPRINT_CACHE      - "false" disables the disk cache (default "true")
+    DD_BLUEPRINT_CACHE_DIR  - cache directory (default dd_enhanced/config/.cache)
+
+The cache can be built ahead of time (e.g. at deploy) with:
+    python -m dd_enhanced.config.blueprint_registry
+"""
+import logging
+import os
+import pickle
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import yaml
+
+logger = logging.getLogger(__name__)
+
+CONFIG_DIR = Path(__file__).parent
+BLUEPRINTS_DIR = CONFIG_DIR / "blueprints"
+DOCS_DIR = CONFIG_DIR / "documents"
+
+CACHE_ENABLED = os.environ.get("DD_BLUEPRINT_CACHE", "true").lower() == "true"
+CACHE_DIR = os.environ.get("DD_BLUEPRINT_CACHE_DIR") or str(CONFIG_DIR / ".cache")
+
+# Bump when the cached representation changes
+CACHE_FORMAT = 1
+
+# libyaml's loader is much faster when PyYAML was built with it
+_YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def _read_only(self, *args, **kwargs):
+    raise TypeError(f"{type(self).__name__} from the blueprint registry is read-only; copy.deepcopy() it to modify")
+
+
+class FrozenDict(dict):
+    """Read-only dict shared between callers."""
+    __slots__ = ()
+    __setitem__ = __delitem__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+    __ior__ = _read_only
+
+    def __reduce__(self):
+        # pickle / copy.deepcopy produce plain (mutable) dicts
+        return (dict, (dict(self),))
+
+    def __copy__(self):
+        return dict(self)
+
+
+class FrozenList(list):
+    """Read-only list shared between callers."""
+    __slots__ = ()
+    __setitem__ = __delitem__ = _read_only
+    append = extend = insert = pop = remove = clear = sort = reverse = _read_only
+    __iadd__ = __imul__ = _read_only
+
+    def __reduce__(self):
+        return (list, (list(self),))
+
+    def __copy__(self):
+        return list(self)
+
+
+def freeze(value: Any) -> Any:
+    """Recursively convert parsed YAML into read-only views."""
+    if isinstance(value, dict):
+        return FrozenDict((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return FrozenList(freeze(item) for item in value)
+    return value
+
+
+class _DiskCache:
+    """Parsed YAML per file, pickled together and validated by (mtime_ns, size)."""
+
+    def __init__(self, cache_dir: Optional[str]):
+        self.path = os.path.join(cache_dir, f"yaml_v{CACHE_FORMAT}_{yaml.__version__}.pickle") if cache_dir else None
+        self.entries: Dict[str, Tuple[int, int, Any]] = {}
+        self.dirty = False
+        if self.path and os.path.exists(self.path) and self._trusted(self.path):
+            try:
+                with open(self.path, "rb") as f:
+                    self.entries = pickle.load(f)
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable blueprint cache {self.path}: {e}")
+                self.entries = {}
+
+    @staticmethod
+    def _trusted(path: str) -> bool:
+        """Only unpickle a cache file (and directory) owned by us and writable only by us."""
+        if not hasattr(os, "getuid"):
+            return True
+        for checked in (path, os.path.dirname(path)):
+            st = os.stat(checked)
+            if st.st_uid != os.getuid() or st.st_mode & 0o022:
+                logger.warning(f"Ignoring blueprint cache {path}: {checked} is not private to this user")
+                return False
+        return True
+
+    def get(self, key: str, stamp: Tuple[int, int]) -> Optional[Any]:
+        entry = self.entries.get(key)
+        if entry is not None and (entry[0], entry[1]) == stamp:
+            return entry[2]
+        return None
+
+    def put(self, key: str, stamp: Tuple[int, int], data: Any) -> None:
+        self.entries[key] = (stamp[0], stamp[1], data)
+        self.dirty = True
+
+    def save(self) -> None:
+        """Write the cache if anything was parsed since the last save."""
+        if not self.path or not self.dirty:
+            return
+        self.dirty = False
+        try:
+            os.makedirs(os.path.dirname(self.path), mode=0o700, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path), suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(self.entries, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            # Read-only or full disk: keep working from memory
+            logger.warning(f"Could not write blueprint cache {self.path}: {e}")
+
+
+class BlueprintRegistry:
+    """
+    Parsed, read-only blueprint and document-registry YAML for this process.
+
+    Args:
+        cache_dir: Disk cache directory (None disables the disk cache)
+    """
+
+    def __init__(self, cache_dir: Optional[str] = CACHE_DIR if CACHE_ENABLED else None):
+        self._lock = threading.RLock()
+        self._disk = _DiskCache(cache_dir)
+        self._files: Dict[Path, Any] = {}
+        self._memo: Dict[Tuple[str, str], Any] = {}
+
+    def yaml_file(self, path: Path) -> Any:
+        """
+        Parsed, frozen contents of a YAML file.
+
+        Raises FileNotFoundError if it does not exist.
+        """
+        path = Path(path)
+        with self._lock:
+            if path in self._files:
+                return self._files[path]
+
+            stat = path.stat()
+            stamp = (stat.st_mtime_ns, stat.st_size)
+            key = str(path.resolve())
+            data = self._disk.get(key, stamp)
+            if data is None:
+                with open(path, encoding="utf-8") as f:
+                    data = yaml.load(f, Loader=_YamlLoader)
+                self._disk.put(key, stamp, data)
+
+            frozen = freeze(data)
+            self._files[path] = frozen
+            return frozen
+
+    def memoise(self, kind: str, key: str, build):
+        """build() once per (kind, key); the result is shared, so build frozen values."""
+        with self._lock:
+            memo_key = (kind, key)
+            if memo_key not in self._memo:
+                self._memo[memo_key] = build()
+                self._disk.save()
+            return self._memo[memo_key]
+
+    def blueprint_file(self, name: str) -> Optional[Dict]:
+        """A blueprint YAML as written (no base questions merged), or None if missing."""
+        path = BLUEPRINTS_DIR / f"{name}.yaml"
+        if not path.exists():
+            return None
+        return self.yaml_file(path)
+
+    def precompile(self) -> int:
+        """Parse every blueprint and document YAML into the disk cache; returns the file count."""
+        paths = sorted(BLUEPRINTS_DIR.glob("*.yaml")) + sorted(DOCS_DIR.glob("*.yaml"))
+        with self._lock:
+            for path in paths:
+                self.yaml_file(path)
+            self._disk.save()
+        return len(paths)
+
+
+_registry: Optional[BlueprintRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_blueprint_registry() -> BlueprintRegistry:
+    """Process-wide BlueprintRegistry, created on first use."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = BlueprintRegistry()
+    return _registry
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    count = get_blueprint_registry().precompile()
+    print(f"Cached {count} YAML files in {CACHE_DIR}")
@@ -7,10 +7,11 @@ for determining which folder a document should be assigned to.
 Phase 2: Blueprint Folder Organisation
 """
 from typing import Dict, Any, Optional, List
-import yaml
 import os
 import logging
 
+from ..blueprint_registry import get_blueprint_registry
+
 logger = logging.getLogger(__name__)
 
 BLUEPRINT_DIR = os.path.dirname(__file__)
@@ -130,8 +131,8 @@ def load_folder_structure(transaction_type: str) -> Dict[str, Any]:
         return get_default_folder_structure()
 
     try:
-        with open(blueprint_file, 'r') as f:
-            blueprint = yaml.safe_load(f)
+        # Shared, read-only copy parsed once per process
+        blueprint = get_blueprint_registry().blueprint_file(blueprint_name)
 
         folder_structure = blueprint.get('folder_structure')
         if folder_structure:
@@ -2,10 +2,11 @@
 Blueprint loader utility.
 Loads and merges transaction-specific blueprints with base questions.
 """
-import yaml
 from pathlib import Path
 from typing import Dict, List, Optional
 
+from ..blueprint_registry import FrozenDict, FrozenList, get_blueprint_registry
+
 BLUEPRINTS_DIR = Path(__file__).parent
 
 
@@ -20,28 +21,31 @@ def load_blueprint(transaction_type: str) -> Dict:
                          infrastructure_ppp
 
     Returns:
-        Complete blueprint dict with base questions merged in
+        Complete blueprint dict with base questions merged in. The dict is
+        shared and read-only (see config.blueprint_registry).
     """
+    registry = get_blueprint_registry()
+    return registry.memoise("blueprint", transaction_type, lambda: _merge_blueprint(registry, transaction_type))
+
+
+def _merge_blueprint(registry, transaction_type: str) -> Dict:
     # Load base questions
     base_path = BLUEPRINTS_DIR / "_base_questions.yaml"
     base = {}
     if base_path.exists():
-        with open(base_path) as f:
-            base = yaml.safe_load(f) or {}
+        base = registry.yaml_file(base_path) or {}
 
     # Load transaction-specific blueprint
-    blueprint_path = BLUEPRINTS_DIR / f"{transaction_type}.yaml"
-    if not blueprint_path.exists():
+    blueprint = registry.blueprint_file(transaction_type)
+    if blueprint is None:
         raise ValueError(f"Unknown transaction type: {transaction_type}")
 
-    with open(blueprint_path) as f:
-        blueprint = yaml.safe_load(f)
-
     # Merge base questions into blueprint
-    blueprint["base_questions"] = base.get("common_questions", {})
-    blueprint["cross_document_validations"] = base.get("cross_document_validations", [])
-
-    return blueprint
+    return FrozenDict({
+        **blueprint,
+        "base_questions": base.get("common_questions", FrozenDict()),
+        "cross_document_validations": base.get("cross_document_validations", FrozenList()),
+    })
 
 
 def list_available_blueprints() -> List[str]:
@@ -84,6 +88,14 @@ def get_blueprint_summary(transaction_type: str) -> Dict:
 
 def get_questions_for_category(blueprint: Dict, category_name: str) -> List[Dict]:
     """Get all questions for a specific risk category."""
+    if isinstance(blueprint, FrozenDict):
+        by_category = _memoise_for(blueprint, "questions_by_category", lambda: FrozenDict(
+            # First category of a name wins, as in the scan below
+            (category.get("name"), category.get("standard_questions", []))
+            for category in reversed(blueprint.get("risk_categories", []))
+        ))
+        return by_category.get(category_name, [])
+
     for category in blueprint.get("risk_categories", []):
         if category.get("name") == category_name:
             return category.get("standard_questions", [])
@@ -92,6 +104,14 @@ def get_questions_for_category(blueprint: Dict, category_name: str) -> List[Dict
 
 def get_critical_questions(blueprint: Dict) -> List[Dict]:
     """Get all critical priority questions from a blueprint."""
+    if isinstance(blueprint, FrozenDict):
+        return _memoise_for(blueprint, "critical_questions", lambda: FrozenList(
+            FrozenDict(question) for question in _critical_questions(blueprint)
+        ))
+    return _critical_questions(blueprint)
+
+
+def _critical_questions(blueprint: Dict) -> List[Dict]:
     critical = []
     for category in blueprint.get("risk_categories", []):
         for question in category.get("standard_questions", []):
@@ -103,6 +123,11 @@ def get_critical_questions(blueprint: Dict) -> List[Dict]:
     return critical
 
 
+def _memoise_for(blueprint: FrozenDict, kind: str, build):
+    # Registry blueprints live for the whole process, so their id() is a stable key
+    return get_blueprint_registry().memoise(kind, str(id(blueprint)), build)
+
+
 def get_deal_blockers(blueprint: Dict) -> List[Dict]:
     """Get all deal blocker definitions from a blueprint."""
     return blueprint.get("deal_blockers", [])
@@ -7,13 +7,14 @@ Provides:
 3. Folder structure templates
 4. Missing document detection
 """
-import yaml
 import re
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
 
+from ..blueprint_registry import FrozenDict, FrozenList, get_blueprint_registry
+
 DOCS_DIR = Path(__file__).parent
 
 # Map similar transaction types to their base registry
@@ -57,41 +58,70 @@ def load_document_registry(transaction_type: str) -> Dict:
     """
     Load the document registry for a transaction type.
     Merges common documents with transaction-specific ones.
+
+    The result is shared and read-only (see config.blueprint_registry).
     """
+    registry = get_blueprint_registry()
+    return registry.memoise(
+        "document_registry", transaction_type,
+        lambda: _merge_document_registry(registry, transaction_type)
+    )
+
+
+def _merge_document_registry(registry, transaction_type: str) -> Dict:
     # Resolve transaction type alias if one exists
     resolved_type = TRANSACTION_TYPE_ALIASES.get(transaction_type, transaction_type)
 
     # Load common documents
-    common_path = DOCS_DIR / "_common_documents.yaml"
-    with open(common_path) as f:
-        common = yaml.safe_load(f) or {}
+    common = registry.yaml_file(DOCS_DIR / "_common_documents.yaml") or {}
 
     # Load transaction-specific documents
     specific_path = DOCS_DIR / f"{resolved_type}_docs.yaml"
     if not specific_path.exists():
         raise ValueError(f"No document registry for: {transaction_type}")
 
-    with open(specific_path) as f:
-        specific = yaml.safe_load(f) or {}
+    specific = registry.yaml_file(specific_path) or {}
 
     # Merge: specific overrides common where there's conflict
-    merged = {
-        "transaction_type": transaction_type,
-        "folder_structure": specific.get("folder_structure", []),
-        "categories": {},
-        "documents": []
-    }
-
-    # Merge categories
+    categories = {}
     for cat in common.get("categories", []):
-        merged["categories"][cat["name"]] = cat
+        categories[cat["name"]] = cat
     for cat in specific.get("categories", []):
-        merged["categories"][cat["name"]] = cat
+        categories[cat["name"]] = cat
 
-    # Merge documents (common first, then specific)
-    merged["documents"] = common.get("documents", []) + specific.get("documents", [])
+    return FrozenDict({
+        "transaction_type": transaction_type,
+        "folder_structure": specific.get("folder_structure", FrozenList()),
+        "categories": FrozenDict(categories),
+        # Merge documents (common first, then specific)
+        "documents": FrozenList(common.get("documents", []) + specific.get("documents", [])),
+    })
 
-    return merged
+
+def _document_matchers(transaction_type: str) -> List[Tuple[Dict, List, List[str], List[str]]]:
+    """
+    Per-document (doc, compiled patterns, lowercased common filenames, lowercased
+    keywords) for classify_document, built once per transaction type.
+    """
+    def build():
+        matchers = []
+        for doc in load_document_registry(transaction_type)["documents"]:
+            patterns = []
+            for pattern in doc.get("classification_patterns", []):
+                try:
+                    patterns.append(re.compile(pattern))
+                except re.error:
+                    # Invalid regex pattern, skip
+                    continue
+            matchers.append((
+                doc,
+                patterns,
+                [name.lower() for name in doc.get("common_filenames", [])],
+                [keyword.lower() for keyword in doc.get("content_keywords", [])],
+            ))
+        return matchers
+
+    return get_blueprint_registry().memoise("document_matchers", transaction_type, build)
 
 
 def classify_document(
@@ -105,7 +135,7 @@ def classify_document(
     Returns:
         Tuple of (category, suggested_folder, confidence_score)
     """
-    registry = load_document_registry(transaction_type)
+    matchers = _document_matchers(transaction_type)
 
     filename_lower = filename.lower()
     content_lower = content_preview.lower()[:5000]  # First 5000 chars
@@ -113,28 +143,24 @@ def classify_document(
     best_match = None
     best_score = 0.0
 
-    for doc in registry["documents"]:
+    for doc, patterns, common_names, keywords in matchers:
         score = 0.0
 
         # Check filename patterns
-        for pattern in doc.get("classification_patterns", []):
-            try:
-                if re.search(pattern, filename_lower):
-                    score += 0.4
-                if re.search(pattern, content_lower):
-                    score += 0.3
-            except re.error:
-                # Invalid regex pattern, skip
-                continue
+        for pattern in patterns:
+            if pattern.search(filename_lower):
+                score += 0.4
+            if pattern.search(content_lower):
+                score += 0.3
 
         # Check common filenames
-        for common_name in doc.get("common_filenames", []):
-            if common_name.lower() in filename_lower:
+        for common_name in common_names:
+            if common_name in filename_lower:
                 score += 0.5
 
         # Check content keywords
-        for keyword in doc.get("content_keywords", []):
-            if keyword.lower() in content_lower:
+        for keyword in keywords:
+            if keyword in content_lower:
                 score += 0.1
 
         if score > best_score:
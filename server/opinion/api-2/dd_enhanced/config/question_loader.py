@@ -11,15 +11,22 @@ Architecture:
 - FOLDER_TO_CLUSTER_MAP preserves existing Pass 3 cluster logic
 
 Usage:
-    loader = QuestionLoader(blueprint)
+    loader = get_question_loader(blueprint)
     questions = loader.get_questions_for_folder("01_Corporate")
     cross_doc_checks = loader.get_cross_doc_checks_for_folder("01_Corporate")
+
+get_question_loader() shares one loader per registry blueprint (see
+config.blueprint_registry). A loader memoises its per-folder and per-cluster
+lookups, so the lists it returns are shared: treat them as read-only.
 """
 
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass
+from functools import cached_property
 import logging
 
+from .blueprint_registry import FrozenDict, get_blueprint_registry
+
 logger = logging.getLogger(__name__)
 
 
@@ -57,12 +64,12 @@ class FolderQuestionSet:
     questions: List[Dict[str, Any]]  # List of {question, priority, cot_hint}
     cross_doc_checks: List[Dict[str, Any]]  # Cross-document validation checks
 
-    @property
+    @cached_property
     def critical_questions(self) -> List[Dict[str, Any]]:
         """Return only critical priority questions."""
         return [q for q in self.questions if q.get("priority") == "critical"]
 
-    @property
+    @cached_property
     def high_questions(self) -> List[Dict[str, Any]]:
         """Return high priority questions."""
         return [q for q in self.questions if q.get("priority") == "high"]
@@ -87,8 +94,18 @@ class QuestionLoader:
         """
         self.blueprint = blueprint or {}
         self._folder_questions_cache: Dict[str, FolderQuestionSet] = {}
+        # (method, folder or cluster, priority_filter) -> result
+        self._lookups: Dict[Tuple[str, str, Optional[str]], List[Dict[str, Any]]] = {}
         self._load_folder_questions()
 
+    def _memoised(self, method: str, name: str, priority_filter: Optional[str], build) -> List[Dict[str, Any]]:
+        key = (method, name, priority_filter)
+        result = self._lookups.get(key)
+        if result is None:
+            # A concurrent duplicate build is harmless; both results are equal
+            result = self._lookups[key] = build()
+        return result
+
     def _load_folder_questions(self) -> None:
         """Load folder_questions from blueprint into cache."""
         folder_questions = self.blueprint.get("folder_questions", {})
@@ -119,6 +136,16 @@ class QuestionLoader:
                 cross_doc_checks=cross_doc,
             )
 
+    def warm(self) -> "QuestionLoader":
+        """Build the unfiltered lookups for every known folder and cluster up front."""
+        for folder_category in list(FOLDER_TO_CLUSTER_MAP) + list(self._folder_questions_cache):
+            self.get_questions_for_folder(folder_category)
+            self.get_cross_doc_checks_for_folder(folder_category)
+        for cluster_name in CLUSTER_TO_FOLDERS_MAP:
+            self.get_questions_for_cluster(cluster_name)
+            self.get_cross_doc_checks_for_cluster(cluster_name)
+        return self
+
     def has_folder_questions(self) -> bool:
         """Check if blueprint has folder_questions section."""
         return bool(self._folder_questions_cache)
@@ -138,6 +165,16 @@ class QuestionLoader:
         Returns:
             List of question dicts with question, priority, detail, cot_hint
         """
+        return self._memoised(
+            "folder_questions", folder_category, priority_filter,
+            lambda: self._build_questions_for_folder(folder_category, priority_filter)
+        )
+
+    def _build_questions_for_folder(
+        self,
+        folder_category: str,
+        priority_filter: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
         # Try folder_questions first (Phase 3)
         if folder_category in self._folder_questions_cache:
             q_set = self._folder_questions_cache[folder_category]
@@ -206,7 +243,10 @@ class QuestionLoader:
             return self._folder_questions_cache[folder_category].cross_doc_checks
 
         # Fall back to cluster-based cross-doc checks
-        return self._get_fallback_cross_doc_checks(folder_category)
+        return self._memoised(
+            "folder_cross_doc_checks", folder_category, None,
+            lambda: self._get_fallback_cross_doc_checks(folder_category)
+        )
 
     def _get_fallback_cross_doc_checks(
         self,
@@ -252,6 +292,16 @@ class QuestionLoader:
         Returns:
             Combined questions from all folders mapped to this cluster
         """
+        return self._memoised(
+            "cluster_questions", cluster_name, priority_filter,
+            lambda: self._build_questions_for_cluster(cluster_name, priority_filter)
+        )
+
+    def _build_questions_for_cluster(
+        self,
+        cluster_name: str,
+        priority_filter: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
         folders = CLUSTER_TO_FOLDERS_MAP.get(cluster_name, [])
         all_questions = []
         seen_questions = set()  # Deduplicate
@@ -279,6 +329,12 @@ class QuestionLoader:
         Returns:
             Combined cross-doc checks from all folders mapped to this cluster
         """
+        return self._memoised(
+            "cluster_cross_doc_checks", cluster_name, None,
+            lambda: self._build_cross_doc_checks_for_cluster(cluster_name)
+        )
+
+    def _build_cross_doc_checks_for_cluster(self, cluster_name: str) -> List[Dict[str, Any]]:
         folders = CLUSTER_TO_FOLDERS_MAP.get(cluster_name, [])
         all_checks = []
         seen_checks = set()
@@ -322,6 +378,21 @@ class QuestionLoader:
         return self._folder_questions_cache.get(folder_category)
 
 
+def get_question_loader(blueprint: Optional[Dict] = None) -> QuestionLoader:
+    """
+    QuestionLoader for a blueprint, shared for blueprints from the registry.
+
+    Blueprints from config.blueprints.loader.load_blueprint are read-only and
+    live for the process, so their loader (and its memoised lookups) is built
+    once. Any other dict gets a fresh loader.
+    """
+    if isinstance(blueprint, FrozenDict):
+        return get_blueprint_registry().memoise(
+            "question_loader", str(id(blueprint)), lambda: QuestionLoader(blueprint).warm()
+        )
+    return QuestionLoader(blueprint)
+
+
 def get_cluster_for_folder(folder_category: str) -> Optional[str]:
     """
     Get the Pass 3 cluster for a folder category.
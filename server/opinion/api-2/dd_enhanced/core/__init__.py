@@ -3,6 +3,8 @@ Core processing modules for DD Enhanced.
 """
 
 from .claude_client import ClaudeClient, TokenUsage
+from .async_claude_client import AsyncClaudeClient, CompletionRequest, CompletionResult
+from .message_batches import BatchClaudeClient, MessageBatchConfig
 from .document_loader import load_documents, LoadedDocument, get_reference_documents
 from .pass1_extract import run_pass1_extraction
 from .pass2_analyze import run_pass2_analysis
@@ -12,6 +14,11 @@ from .pass4_synthesize import run_pass4_synthesis
 __all__ = [
     "ClaudeClient",
     "TokenUsage",
+    "AsyncClaudeClient",
+    "CompletionRequest",
+    "CompletionResult",
+    "BatchClaudeClient",
+    "MessageBatchConfig",
     "load_documents",
     "LoadedDocument",
     "get_reference_documents",
@@ -0,0 +1,332 @@
+"""
+Async Claude API client with a bounded-concurrency fan-out API.
+
+ClaudeClient.complete blocks its thread for the whole API call, so every
+parallel pass has had to bring its own ThreadPoolExecutor (each with its own
+max_workers, none sharing a budget). AsyncClaudeClient runs calls on
+anthropic.AsyncAnthropic instead: one event loop can hold hundreds of
+in-flight requests, and every request is admitted through the shared
+RateLimiter so all passes draw from one request/token/concurrency budget.
+
+Token usage, response caching and prompt caching behave exactly as in
+ClaudeClient - the async client is a subclass and reuses its helpers.
+
+Usage:
+    client = AsyncClaudeClient.from_client(claude_client)
+    requests = [
+        CompletionRequest(request_id=doc_id, prompt=prompt, model="haiku", json_mode=True)
+        for doc_id, prompt in prompts.items()
+    ]
+
+    # Sync callers: results in input order
+    results = client.run_many(requests, concurrency=50)
+
+    # Async callers: results as they finish
+    async for result in client.complete_many(requests, concurrency=50):
+        handle(result.request_id, result.response)
+"""
+import anthropic
+import asyncio
+import os
+import time
+import logging
+from dataclasses import dataclass, field
+from typing import Optional, Dict, Any, List, AsyncIterator, Callable
+
+from .claude_client import ClaudeClient
+from .response_cache import make_cache_key
+from .queue.rate_limiter import RateLimiter, estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on in-flight requests per complete_many call. The shared
+# RateLimiter (CLAUDE_MAX_CONCURRENT) still applies on top of this.
+DEFAULT_CONCURRENCY = int(os.environ.get("CLAUDE_ASYNC_CONCURRENCY", "50"))
+
+
+@dataclass
+class CompletionRequest:
+    """A single completion request for complete_many / run_many."""
+    request_id: Any
+    prompt: str
+    system: str = ""
+    model: str = "sonnet"
+    max_tokens: int = 4096
+    temperature: float = 0.1
+    json_mode: bool = False
+    pass_name: Optional[str] = None
+    use_cache: Optional[bool] = None
+    context_blocks: Optional[List[str]] = None
+    cache_system: bool = False
+
+
+@dataclass
+class CompletionResult:
+    """Result of a CompletionRequest, in the same shape ClaudeClient.complete returns."""
+    request_id: Any
+    response: Dict[str, Any]
+    elapsed_seconds: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return "error" not in self.response
+
+
+@dataclass
+class AsyncClaudeClient(ClaudeClient):
+    """
+    ClaudeClient with async completions and a rate-limited fan-out API.
+
+    The blocking complete()/complete_* methods are inherited unchanged, so an
+    AsyncClaudeClient can be passed anywhere a ClaudeClient is expected.
+    """
+
+    _async_client: Any = field(default=None, repr=False)
+    _async_loop: Any = field(default=None, repr=False)
+
+    @classmethod
+    def from_client(cls, client: ClaudeClient, rate_limiter: Optional[RateLimiter] = None) -> 'AsyncClaudeClient':
+        """
+        Wrap an existing ClaudeClient, sharing its usage tracking, response
+        cache and rate limiter (unless another limiter is given).
+
+        Returns the client unchanged if it is already an AsyncClaudeClient.
+        """
+        if isinstance(client, cls):
+            return client
+        return cls(
+            api_key=client.api_key,
+            usage=client.usage,
+            model_tier=client.model_tier,
+            response_cache=client.response_cache,
+            rate_limiter=rate_limiter or client.rate_limiter,
+        )
+
+    def _get_async_client(self) -> Any:
+        """
+        AsyncAnthropic client bound to the running event loop.
+
+        The underlying HTTP connection pool belongs to the loop that created
+        it, so a new client is made whenever run_many starts a fresh loop.
+        """
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_loop is not loop:
+            self._async_client = anthropic.AsyncAnthropic(api_key=self.api_key)
+            self._async_loop = loop
+        return self._async_client
+
+    async def acomplete(
+        self,
+        prompt: str,
+        system: str = "",
+        model: str = "sonnet",
+        max_tokens: int = 4096,
+        temperature: float = 0.1,
+        json_mode: bool = False,
+        pass_name: Optional[str] = None,
+        use_cache: Optional[bool] = None,
+        context_blocks: Optional[List[str]] = None,
+        cache_system: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Async equivalent of ClaudeClient.complete (same arguments and return shape).
+
+        Each API attempt is admitted through the shared RateLimiter; rate limit
+        errors are reported back to it so every caller backs off together.
+        """
+        resolved_model = self._resolve_model(model)
+        system_prompt = system if system else "You are an expert legal analyst."
+        context_blocks = [b for b in (context_blocks or []) if b]
+        messages = [{"role": "user", "content": self._build_user_content(prompt, context_blocks)}]
+        system_param = self._build_system_param(system_prompt, cache_system and not context_blocks)
+
+        cache_key = None
+        if self.response_cache is not None:
+            if use_cache is None:
+                use_cache = self.response_cache.is_enabled_for(pass_name)
+            if use_cache:
+                cache_prompt = context_blocks + [prompt] if context_blocks else prompt
+                cache_key = make_cache_key(resolved_model, system_prompt, cache_prompt, temperature, max_tokens)
+                cached = self._complete_from_cache(cache_key, json_mode)
+                if cached is not None:
+                    return cached
+
+        estimated_tokens = estimate_tokens(prompt, system_prompt, *context_blocks, max_output_tokens=max_tokens)
+        client = self._get_async_client()
+
+        for attempt in range(self.MAX_RETRIES):
+            if self.rate_limiter and not await self.rate_limiter.acquire_async(estimated_tokens, timeout=self.RATE_LIMIT_TIMEOUT):
+                return {"error": "Timed out waiting for rate limiter", "raw": ""}
+
+            actual_tokens = 0
+            try:
+                api_start = time.time()
+                response = await client.messages.create(
+                    model=resolved_model,
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    system=system_param,
+                    messages=messages
+                )
+                api_elapsed = time.time() - api_start
+
+                cache_read = getattr(response.usage, "cache_read_input_tokens", 0) or 0
+                cache_write = getattr(response.usage, "cache_creation_input_tokens", 0) or 0
+                actual_tokens = response.usage.input_tokens + response.usage.output_tokens + cache_read + cache_write
+                logger.debug(
+                    f"[AsyncClaudeClient.acomplete] {resolved_model} responded in {api_elapsed:.2f}s: "
+                    f"input={response.usage.input_tokens}, output={response.usage.output_tokens}, "
+                    f"cache_read={cache_read}, cache_write={cache_write}"
+                )
+
+                self.usage.add(
+                    resolved_model,
+                    response.usage.input_tokens,
+                    response.usage.output_tokens,
+                    cache_read_tokens=cache_read,
+                    cache_write_tokens=cache_write
+                )
+                if self.rate_limiter:
+                    self.rate_limiter.report_success(api_elapsed)
+
+                content = response.content[0].text
+
+                if json_mode:
+                    parsed = self._parse_json_response(content)
+                    if "error" in parsed:
+                        if attempt < self.MAX_RETRIES - 1:
+                            logger.warning(f"JSON parse failed, attempt {attempt + 1}/{self.MAX_RETRIES}")
+                            continue
+                    else:
+                        self._store_in_cache(cache_key, resolved_model, content, response.usage)
+                    return parsed
+
+                self._store_in_cache(cache_key, resolved_model, content, response.usage)
+                return {"text": content}
+
+            except anthropic.RateLimitError as e:
+                delay = self._retry_after(e) or self.RETRY_DELAY_BASE * (2 ** attempt)
+                logger.warning(f"Rate limited, waiting {delay}s (attempt {attempt + 1}/{self.MAX_RETRIES})")
+                if self.rate_limiter:
+                    # Shared backoff: the next acquire_async waits it out
+                    self.rate_limiter.report_rate_limit_error(retry_after=delay)
+                if attempt < self.MAX_RETRIES - 1:
+                    if not self.rate_limiter:
+                        await asyncio.sleep(delay)
+                else:
+                    return {"error": f"Rate limit exceeded after {self.MAX_RETRIES} attempts", "raw": str(e)}
+
+            except anthropic.APIStatusError as e:
+                if e.status_code == 529:  # Overloaded
+                    delay = self._retry_after(e) or self.RETRY_DELAY_BASE * (2 ** attempt)
+                    if self.rate_limiter:
+                        self.rate_limiter.report_overloaded()
+                    logger.warning(f"API overloaded, waiting {delay}s (attempt {attempt + 1}/{self.MAX_RETRIES})")
+                    if attempt < self.MAX_RETRIES - 1:
+                        await asyncio.sleep(delay)
+                    else:
+                        return {"error": f"API overloaded after {self.MAX_RETRIES} attempts", "raw": str(e)}
+                else:
+                    if self.rate_limiter:
+                        self.rate_limiter.report_error()
+                    return {"error": f"API error ({e.status_code}): {str(e)}", "raw": ""}
+
+            except anthropic.APIError as e:
+                logger.error(f"API error in async Claude call: {e}")
+                return {"error": f"API error: {str(e)}", "raw": ""}
+            except Exception as e:
+                logger.exception(f"Unexpected error in async Claude API call: {e}")
+                return {"error": f"Unexpected error: {str(e)}", "raw": ""}
+
+            finally:
+                if self.rate_limiter:
+                    self.rate_limiter.release(actual_tokens, estimated_tokens)
+
+        return {"error": "Max retries exceeded", "raw": ""}
+
+    async def _run_request(self, request: CompletionRequest, semaphore: asyncio.Semaphore) -> CompletionResult:
+        """Run one request under the fan-out semaphore."""
+        async with semaphore:
+            start = time.time()
+            response = await self.acomplete(
+                prompt=request.prompt,
+                system=request.system,
+                model=request.model,
+                max_tokens=request.max_tokens,
+                temperature=request.temperature,
+                json_mode=request.json_mode,
+                pass_name=request.pass_name,
+                use_cache=request.use_cache,
+                context_blocks=request.context_blocks,
+                cache_system=request.cache_system,
+            )
+            return CompletionResult(
+                request_id=request.request_id,
+                response=response,
+                elapsed_seconds=time.time() - start,
+            )
+
+    async def complete_many(
+        self,
+        requests: List[CompletionRequest],
+        concurrency: int = DEFAULT_CONCURRENCY
+    ) -> AsyncIterator[CompletionResult]:
+        """
+        Run many completions concurrently, yielding results as they finish.
+
+        Args:
+            requests: Requests to run
+            concurrency: Maximum in-flight requests for this call (the shared
+                RateLimiter's CLAUDE_MAX_CONCURRENT also applies)
+
+        Yields:
+            CompletionResult in completion order; match on request_id
+        """
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        tasks = [asyncio.ensure_future(self._run_request(r, semaphore)) for r in requests]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # Consumer stopped early - don't leave calls running on a closing loop
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    def run_many(
+        self,
+        requests: List[CompletionRequest],
+        concurrency: int = DEFAULT_CONCURRENCY,
+        progress_callback: Optional[Callable[[int, int, CompletionResult], None]] = None
+    ) -> List[CompletionResult]:
+        """
+        Blocking wrapper around complete_many for synchronous callers.
+
+        Must not be called from a thread that already runs an event loop.
+
+        Args:
+            requests: Requests to run
+            concurrency: Maximum in-flight requests
+            progress_callback: Optional callback(completed, total, result) per finished request
+
+        Returns:
+            CompletionResult list in the same order as requests
+        """
+        if not requests:
+            return []
+
+        async def collect() -> List[CompletionResult]:
+            by_index: Dict[int, CompletionResult] = {}
+            indexed = [
+                CompletionRequest(**{**r.__dict__, "request_id": i})
+                for i, r in enumerate(requests)
+            ]
+            async for result in self.complete_many(indexed, concurrency=concurrency):
+                by_index[result.request_id] = result
+                result.request_id = requests[result.request_id].request_id
+                if progress_callback:
+                    progress_callback(len(by_index), len(requests), result)
+            return [by_index[i] for i in range(len(requests))]
+
+        logger.info(f"Running {len(requests)} Claude requests with concurrency {concurrency}")
+        return asyncio.run(collect())
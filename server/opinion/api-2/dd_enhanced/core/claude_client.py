@@ -25,10 +25,20 @@ import json
 import re
 import time
 import logging
+import threading
 from dataclasses import dataclass, field
 from typing import Optional, Dict, Any, List
 from enum import Enum
 
+from .response_cache import (
+    ResponseCache,
+    ResponseCacheConfig,
+    CachedResponse,
+    get_response_cache,
+    make_cache_key,
+)
+from .queue.rate_limiter import RateLimiter, get_rate_limiter, estimate_tokens
+
 logger = logging.getLogger(__name__)
 
 
@@ -46,7 +56,12 @@ class ModelTier(Enum):
 
 @dataclass
 class TokenUsage:
-    """Track token usage and costs by model."""
+    """
+    Track token usage and costs by model.
+
+    add() and add_cache_hit() are thread-safe: one client's usage is
+    recorded from concurrent worker threads (e.g. Pass 1 extraction).
+    """
 
     # Pricing per million tokens (as of Dec 2024)
     PRICING = {
@@ -57,23 +72,109 @@ class TokenUsage:
         "claude-3-haiku-20240307": {"input": 0.25, "output": 1.25},
     }
 
+    # Prompt caching: writes are billed at a premium, reads at a steep discount
+    CACHE_WRITE_MULTIPLIER = 1.25
+    CACHE_READ_MULTIPLIER = 0.10
+
+    # Message Batches API: batch usage (including cache reads/writes) is billed at half price
+    BATCH_DISCOUNT = 0.50
+
     def __init__(self):
         self.input_tokens: int = 0
         self.output_tokens: int = 0
         self.by_model: Dict[str, Dict[str, int]] = {}
         self.call_count: int = 0
+        # Anthropic prompt caching (cached prefix tokens)
+        self.cache_read_tokens: int = 0
+        self.cache_write_tokens: int = 0
+        # Response cache hits (calls served without hitting the API)
+        self.cache_hits: int = 0
+        self.cache_hits_by_model: Dict[str, Dict[str, int]] = {}
+        # Calls served through the Message Batches API
+        self.batch_calls: int = 0
+        self._lock = threading.Lock()
+
+    def add(
+        self,
+        model: str,
+        input_tokens: int,
+        output_tokens: int,
+        cache_read_tokens: int = 0,
+        cache_write_tokens: int = 0,
+        batch: bool = False
+    ):
+        """
+        Add tokens to running total, tracked by model.
+
+        input_tokens excludes prompt-cached tokens (as reported by the API);
+        cache reads and writes are tracked separately because they are
+        billed at different rates. batch=True marks usage from the Message
+        Batches API, which is billed at BATCH_DISCOUNT off.
+        """
+        with self._lock:
+            self.input_tokens += input_tokens
+            self.output_tokens += output_tokens
+            self.cache_read_tokens += cache_read_tokens
+            self.cache_write_tokens += cache_write_tokens
+            self.call_count += 1
+
+            if model not in self.by_model:
+                self.by_model[model] = {"input": 0, "output": 0, "calls": 0, "cache_read": 0, "cache_write": 0}
+            self.by_model[model]["input"] += input_tokens
+            self.by_model[model]["output"] += output_tokens
+            self.by_model[model]["cache_read"] += cache_read_tokens
+            self.by_model[model]["cache_write"] += cache_write_tokens
+            self.by_model[model]["calls"] += 1
+
+            if batch:
+                self.batch_calls += 1
+                entry = self.by_model[model]
+                entry["batch_calls"] = entry.get("batch_calls", 0) + 1
+                entry["batch_input"] = entry.get("batch_input", 0) + input_tokens
+                entry["batch_output"] = entry.get("batch_output", 0) + output_tokens
+                entry["batch_cache_read"] = entry.get("batch_cache_read", 0) + cache_read_tokens
+                entry["batch_cache_write"] = entry.get("batch_cache_write", 0) + cache_write_tokens
+
+    def add_cache_hit(self, model: str, input_tokens: int, output_tokens: int):
+        """Record a call served from the response cache (tokens the API would have billed)."""
+        with self._lock:
+            self.cache_hits += 1
+
+            if model not in self.cache_hits_by_model:
+                self.cache_hits_by_model[model] = {"input": 0, "output": 0, "hits": 0}
+            self.cache_hits_by_model[model]["input"] += input_tokens
+            self.cache_hits_by_model[model]["output"] += output_tokens
+            self.cache_hits_by_model[model]["hits"] += 1
+
+    def _tokens_cost(self, model: str, input_tokens: int, output_tokens: int) -> float:
+        pricing = self.PRICING.get(model, self.PRICING["claude-sonnet-4-20250514"])
+        return (input_tokens / 1_000_000) * pricing["input"] + (output_tokens / 1_000_000) * pricing["output"]
 
-    def add(self, model: str, input_tokens: int, output_tokens: int):
-        """Add tokens to running total, tracked by model."""
-        self.input_tokens += input_tokens
-        self.output_tokens += output_tokens
-        self.call_count += 1
+    @property
+    def cost_avoided_usd(self) -> float:
+        """Cost the response cache avoided (what cache hits would have cost live)."""
+        return sum(
+            self._tokens_cost(model, tokens["input"], tokens["output"])
+            for model, tokens in self.cache_hits_by_model.items()
+        )
 
-        if model not in self.by_model:
-            self.by_model[model] = {"input": 0, "output": 0, "calls": 0}
-        self.by_model[model]["input"] += input_tokens
-        self.by_model[model]["output"] += output_tokens
-        self.by_model[model]["calls"] += 1
+    def _cache_costs(self, model: str, tokens: Dict[str, int]) -> tuple:
+        """(cache_read_cost, cache_write_cost) for a by_model entry."""
+        pricing = self.PRICING.get(model, self.PRICING["claude-sonnet-4-20250514"])
+        read_cost = (tokens.get("cache_read", 0) / 1_000_000) * pricing["input"] * self.CACHE_READ_MULTIPLIER
+        write_cost = (tokens.get("cache_write", 0) / 1_000_000) * pricing["input"] * self.CACHE_WRITE_MULTIPLIER
+        return read_cost, write_cost
+
+    def _batch_discount(self, model: str, tokens: Dict[str, int]) -> float:
+        """Amount saved on a by_model entry's Message Batches usage."""
+        if not tokens.get("batch_calls"):
+            return 0.0
+        read_cost, write_cost = self._cache_costs(model, {
+            "cache_read": tokens.get("batch_cache_read", 0),
+            "cache_write": tokens.get("batch_cache_write", 0),
+        })
+        full_cost = self._tokens_cost(model, tokens.get("batch_input", 0), tokens.get("batch_output", 0))
+        return (full_cost + read_cost + write_cost) * self.BATCH_DISCOUNT
 
     @property
     def cost_usd(self) -> float:
@@ -83,6 +184,8 @@ class TokenUsage:
             pricing = self.PRICING.get(model, self.PRICING["claude-sonnet-4-20250514"])
             total += (tokens["input"] / 1_000_000) * pricing["input"]
             total += (tokens["output"] / 1_000_000) * pricing["output"]
+            total += sum(self._cache_costs(model, tokens))
+            total -= self._batch_discount(model, tokens)
         return total
 
     def get_breakdown(self) -> Dict[str, Any]:
@@ -92,14 +195,39 @@ class TokenUsage:
             pricing = self.PRICING.get(model, self.PRICING["claude-sonnet-4-20250514"])
             input_cost = (tokens["input"] / 1_000_000) * pricing["input"]
             output_cost = (tokens["output"] / 1_000_000) * pricing["output"]
+            cache_read_cost, cache_write_cost = self._cache_costs(model, tokens)
+            batch_discount = self._batch_discount(model, tokens)
             breakdown[model] = {
                 "input_tokens": tokens["input"],
                 "output_tokens": tokens["output"],
+                "cache_read_input_tokens": tokens.get("cache_read", 0),
+                "cache_write_input_tokens": tokens.get("cache_write", 0),
                 "calls": tokens["calls"],
                 "input_cost_usd": input_cost,
                 "output_cost_usd": output_cost,
-                "total_cost_usd": input_cost + output_cost
+                "cache_read_cost_usd": cache_read_cost,
+                "cache_write_cost_usd": cache_write_cost,
+                "batch_calls": tokens.get("batch_calls", 0),
+                "batch_discount_usd": batch_discount,
+                "total_cost_usd": input_cost + output_cost + cache_read_cost + cache_write_cost - batch_discount
             }
+        for model, hits in self.cache_hits_by_model.items():
+            entry = breakdown.setdefault(model, {
+                "input_tokens": 0,
+                "output_tokens": 0,
+                "cache_read_input_tokens": 0,
+                "cache_write_input_tokens": 0,
+                "calls": 0,
+                "input_cost_usd": 0.0,
+                "output_cost_usd": 0.0,
+                "cache_read_cost_usd": 0.0,
+                "cache_write_cost_usd": 0.0,
+                "batch_calls": 0,
+                "batch_discount_usd": 0.0,
+                "total_cost_usd": 0.0
+            })
+            entry["cache_hits"] = hits["hits"]
+            entry["cache_cost_avoided_usd"] = self._tokens_cost(model, hits["input"], hits["output"])
         return breakdown
 
     def to_dict(self) -> Dict[str, Any]:
@@ -107,9 +235,14 @@ class TokenUsage:
         return {
             "input_tokens": self.input_tokens,
             "output_tokens": self.output_tokens,
+            "cache_read_tokens": self.cache_read_tokens,
+            "cache_write_tokens": self.cache_write_tokens,
             "call_count": self.call_count,
             "cost_usd": self.cost_usd,
-            "by_model": self.by_model
+            "by_model": self.by_model,
+            "cache_hits": self.cache_hits,
+            "cache_cost_avoided_usd": self.cost_avoided_usd,
+            "batch_calls": self.batch_calls
         }
 
 
@@ -200,11 +333,14 @@ class ClaudeClient:
 
     # Rate limiting configuration
     MAX_RETRIES = 3
-    RETRY_DELAY_BASE = 2  # seconds, will exponentially backoff
+    RETRY_DELAY_BASE = 2  # seconds, will exponentially backoff (retry-after header wins)
+    RATE_LIMIT_TIMEOUT = 300  # seconds to wait for rate limiter admission
 
     api_key: str = field(default_factory=lambda: os.environ.get("ANTHROPIC_API_KEY", ""))
     usage: TokenUsage = field(default_factory=TokenUsage)
     model_tier: ModelTier = field(default=ModelTier.HIGH_ACCURACY)  # Haiku-Sonnet-Opus-Opus for accuracy testing
+    response_cache: Optional[ResponseCache] = field(default=None, repr=False)
+    rate_limiter: Optional[RateLimiter] = field(default=None, repr=False)
     _client: Any = field(default=None, repr=False)
 
     def __post_init__(self):
@@ -212,6 +348,16 @@ class ClaudeClient:
             raise ValueError("ANTHROPIC_API_KEY environment variable not set")
         self._client = anthropic.Anthropic(api_key=self.api_key)
 
+        # Every call is admitted through the process-wide Claude rate limiter
+        if self.rate_limiter is None:
+            self.rate_limiter = get_rate_limiter()
+
+        # Response cache is opt-in (DD_RESPONSE_CACHE_ENABLED) unless one is passed in
+        if self.response_cache is None:
+            cache_config = ResponseCacheConfig.from_env()
+            if cache_config.enabled:
+                self.response_cache = get_response_cache(cache_config)
+
         # Allow setting tier from environment variable
         tier_env = os.environ.get("DD_MODEL_TIER", "").lower()
         if tier_env:
@@ -241,7 +387,11 @@ class ClaudeClient:
         model: str = "sonnet",
         max_tokens: int = 4096,
         temperature: float = 0.1,
-        json_mode: bool = False
+        json_mode: bool = False,
+        pass_name: Optional[str] = None,
+        use_cache: Optional[bool] = None,
+        context_blocks: Optional[List[str]] = None,
+        cache_system: bool = False
     ) -> Dict[str, Any]:
         """
         Send completion request to Claude with retry logic.
@@ -253,6 +403,14 @@ class ClaudeClient:
             max_tokens: Maximum response tokens
             temperature: Sampling temperature (low for consistency)
             json_mode: If True, expect JSON response and parse it
+            pass_name: Pass issuing the call; used for per-pass cache opt-in
+            use_cache: Force the response cache on/off (default: per-pass config)
+            context_blocks: Stable context sent ahead of the prompt (e.g. reference
+                documents shared by every call in a pass). A prompt-cache breakpoint
+                is placed after the last block so repeat calls read the prefix
+                (system + context) from Anthropic's prompt cache.
+            cache_system: Place a prompt-cache breakpoint on the system prompt
+                (useful when a long system prompt is reused without context_blocks)
 
         Returns:
             Dict with either {"text": str} or parsed JSON, or {"error": str, "raw": str}
@@ -260,11 +418,33 @@ class ClaudeClient:
         import traceback
 
         resolved_model = self._resolve_model(model)
-        messages = [{"role": "user", "content": prompt}]
-
-        print(f"[ClaudeClient.complete] Starting API call: model={resolved_model}, prompt_len={len(prompt)}, max_tokens={max_tokens}, json_mode={json_mode}", flush=True)
+        system_prompt = system if system else "You are an expert legal analyst."
+        context_blocks = [b for b in (context_blocks or []) if b]
+        messages = [{"role": "user", "content": self._build_user_content(prompt, context_blocks)}]
+        system_param = self._build_system_param(system_prompt, cache_system and not context_blocks)
+
+        cache_key = None
+        if self.response_cache is not None:
+            if use_cache is None:
+                use_cache = self.response_cache.is_enabled_for(pass_name)
+            if use_cache:
+                cache_prompt = context_blocks + [prompt] if context_blocks else prompt
+                cache_key = make_cache_key(resolved_model, system_prompt, cache_prompt, temperature, max_tokens)
+                cached = self._complete_from_cache(cache_key, json_mode)
+                if cached is not None:
+                    return cached
+
+        context_len = sum(len(b) for b in context_blocks)
+        print(f"[ClaudeClient.complete] Starting API call: model={resolved_model}, prompt_len={len(prompt)}, context_len={context_len}, max_tokens={max_tokens}, json_mode={json_mode}", flush=True)
+
+        estimated_tokens = estimate_tokens(prompt, system_prompt, *context_blocks, max_output_tokens=max_tokens)
 
         for attempt in range(self.MAX_RETRIES):
+            if self.rate_limiter and not self.rate_limiter.acquire(estimated_tokens, timeout=self.RATE_LIMIT_TIMEOUT):
+                print(f"[ClaudeClient.complete] Timed out waiting for rate limiter", flush=True)
+                return {"error": "Timed out waiting for rate limiter", "raw": ""}
+
+            actual_tokens = 0
             try:
                 print(f"[ClaudeClient.complete] Attempt {attempt + 1}/{self.MAX_RETRIES}...", flush=True)
                 api_start = time.time()
@@ -273,19 +453,26 @@ class ClaudeClient:
                     model=resolved_model,
                     max_tokens=max_tokens,
                     temperature=temperature,
-                    system=system if system else "You are an expert legal analyst.",
+                    system=system_param,
                     messages=messages
                 )
 
                 api_elapsed = time.time() - api_start
                 print(f"[ClaudeClient.complete] API response received in {api_elapsed:.2f}s", flush=True)
-                print(f"[ClaudeClient.complete] Tokens: input={response.usage.input_tokens}, output={response.usage.output_tokens}", flush=True)
+                cache_read = getattr(response.usage, "cache_read_input_tokens", 0) or 0
+                cache_write = getattr(response.usage, "cache_creation_input_tokens", 0) or 0
+                print(f"[ClaudeClient.complete] Tokens: input={response.usage.input_tokens}, output={response.usage.output_tokens}, cache_read={cache_read}, cache_write={cache_write}", flush=True)
+                actual_tokens = response.usage.input_tokens + response.usage.output_tokens + cache_read + cache_write
+                if self.rate_limiter:
+                    self.rate_limiter.report_success(api_elapsed)
 
                 # Track usage
                 self.usage.add(
                     resolved_model,
                     response.usage.input_tokens,
-                    response.usage.output_tokens
+                    response.usage.output_tokens,
+                    cache_read_tokens=cache_read,
+                    cache_write_tokens=cache_write
                 )
 
                 content = response.content[0].text
@@ -302,16 +489,22 @@ class ClaudeClient:
                             continue
                     else:
                         print(f"[ClaudeClient.complete] JSON parsed successfully, keys: {list(parsed.keys()) if isinstance(parsed, dict) else 'array'}", flush=True)
+                        self._store_in_cache(cache_key, resolved_model, content, response.usage)
                     return parsed
 
+                self._store_in_cache(cache_key, resolved_model, content, response.usage)
                 return {"text": content}
 
             except anthropic.RateLimitError as e:
-                delay = self.RETRY_DELAY_BASE * (2 ** attempt)
+                delay = self._retry_after(e) or self.RETRY_DELAY_BASE * (2 ** attempt)
                 print(f"[ClaudeClient.complete] RATE LIMITED, waiting {delay}s (attempt {attempt + 1}/{self.MAX_RETRIES})", flush=True)
                 logger.warning(f"Rate limited, waiting {delay}s (attempt {attempt + 1}/{self.MAX_RETRIES})")
+                if self.rate_limiter:
+                    # Shared backoff: the next acquire (ours and every other caller's) waits it out
+                    self.rate_limiter.report_rate_limit_error(retry_after=delay)
                 if attempt < self.MAX_RETRIES - 1:
-                    time.sleep(delay)
+                    if not self.rate_limiter:
+                        time.sleep(delay)
                 else:
                     print(f"[ClaudeClient.complete] Rate limit exceeded after all retries", flush=True)
                     return {"error": f"Rate limit exceeded after {self.MAX_RETRIES} attempts", "raw": str(e)}
@@ -319,14 +512,18 @@ class ClaudeClient:
             except anthropic.APIStatusError as e:
                 print(f"[ClaudeClient.complete] API STATUS ERROR: status={e.status_code}, message={str(e)}", flush=True)
                 if e.status_code == 529:  # Overloaded
-                    delay = self.RETRY_DELAY_BASE * (2 ** attempt)
+                    delay = self._retry_after(e) or self.RETRY_DELAY_BASE * (2 ** attempt)
                     print(f"[ClaudeClient.complete] API overloaded, waiting {delay}s", flush=True)
                     logger.warning(f"API overloaded, waiting {delay}s (attempt {attempt + 1}/{self.MAX_RETRIES})")
+                    if self.rate_limiter:
+                        self.rate_limiter.report_overloaded()
                     if attempt < self.MAX_RETRIES - 1:
                         time.sleep(delay)
                     else:
                         return {"error": f"API overloaded after {self.MAX_RETRIES} attempts", "raw": str(e)}
                 else:
+                    if self.rate_limiter:
+                        self.rate_limiter.report_error()
                     return {"error": f"API error ({e.status_code}): {str(e)}", "raw": ""}
 
             except anthropic.APIError as e:
@@ -339,9 +536,87 @@ class ClaudeClient:
                 logger.exception(f"Unexpected error in Claude API call: {e}")
                 return {"error": f"Unexpected error: {str(e)}", "raw": ""}
 
+            finally:
+                if self.rate_limiter:
+                    self.rate_limiter.release(actual_tokens, estimated_tokens)
+
         print(f"[ClaudeClient.complete] Max retries exceeded", flush=True)
         return {"error": "Max retries exceeded", "raw": ""}
 
+    @staticmethod
+    def _retry_after(error: Exception) -> Optional[float]:
+        """Seconds from a retry-after header on an API error, if present."""
+        response = getattr(error, "response", None)
+        headers = getattr(response, "headers", None) or {}
+        try:
+            value = headers.get("retry-after")
+            return float(value) if value else None
+        except (TypeError, ValueError):
+            return None
+
+    @staticmethod
+    def _build_user_content(prompt: str, context_blocks: List[str]) -> Any:
+        """
+        Build the user message content.
+
+        Without context blocks this is the plain prompt string. With context
+        blocks, the stable blocks come first and the last one carries a
+        cache_control breakpoint, so everything up to and including it
+        (system prompt + context) forms a cacheable prefix; the varying
+        prompt follows after the breakpoint.
+        """
+        if not context_blocks:
+            return prompt
+
+        content = [{"type": "text", "text": block} for block in context_blocks]
+        content[-1]["cache_control"] = {"type": "ephemeral"}
+        content.append({"type": "text", "text": prompt})
+        return content
+
+    @staticmethod
+    def _build_system_param(system_prompt: str, cache: bool) -> Any:
+        """System prompt as a plain string, or as a cacheable text block."""
+        if not cache:
+            return system_prompt
+        return [{"type": "text", "text": system_prompt, "cache_control": {"type": "ephemeral"}}]
+
+    def _complete_from_cache(self, cache_key: str, json_mode: bool) -> Optional[Dict[str, Any]]:
+        """Serve a completion from the response cache, or None on miss."""
+        entry = self.response_cache.get(cache_key)
+        if entry is None:
+            return None
+
+        if json_mode:
+            parsed = self._parse_json_response(entry.content)
+            if "error" in parsed:
+                # Never replay a response we can't use; fall through to a live call
+                self.response_cache.delete(cache_key)
+                return None
+            result = parsed
+        else:
+            result = {"text": entry.content}
+
+        self.usage.add_cache_hit(entry.model, entry.input_tokens, entry.output_tokens)
+        logger.debug(f"Response cache hit for {entry.model} ({entry.input_tokens} in / {entry.output_tokens} out)")
+        return result
+
+    def _store_in_cache(self, cache_key: Optional[str], model: str, content: str, usage: Any):
+        """Store a successful completion in the response cache (no-op when caching is off)."""
+        if cache_key is None or self.response_cache is None:
+            return
+        # Record the full input size so avoided cost is comparable to an uncached call
+        input_tokens = (
+            usage.input_tokens
+            + (getattr(usage, "cache_read_input_tokens", 0) or 0)
+            + (getattr(usage, "cache_creation_input_tokens", 0) or 0)
+        )
+        self.response_cache.set(cache_key, CachedResponse(
+            model=model,
+            content=content,
+            input_tokens=input_tokens,
+            output_tokens=usage.output_tokens
+        ))
+
     def _parse_json_response(self, content: str) -> Dict[str, Any]:
         """Extract and parse JSON from response, handling markdown code blocks."""
         # Try direct parse first
@@ -401,6 +676,7 @@ class ClaudeClient:
         logger.debug(f"Pass 1 (extraction) using model: {model}")
         # Remove json_mode from kwargs if passed to avoid duplicate argument error
         kwargs.pop('json_mode', None)
+        kwargs.setdefault('pass_name', 'pass1')
         return self.complete(
             prompt=prompt,
             system=system,
@@ -432,6 +708,7 @@ class ClaudeClient:
         logger.debug(f"Pass 2 (analysis) using model: {model}")
         # Remove json_mode from kwargs if passed to avoid duplicate argument error
         kwargs.pop('json_mode', None)
+        kwargs.setdefault('pass_name', 'pass2')
         return self.complete(
             prompt=prompt,
             system=system,
@@ -465,6 +742,7 @@ class ClaudeClient:
         logger.debug(f"Pass 4 (cross-doc) using model: {model}")
         # Remove json_mode from kwargs if passed to avoid duplicate argument error
         kwargs.pop('json_mode', None)
+        kwargs.setdefault('pass_name', 'pass4_crossdoc')
         return self.complete(
             prompt=prompt,
             system=system,
@@ -498,6 +776,7 @@ class ClaudeClient:
         logger.debug(f"Pass 6 (synthesis) using model: {model}")
         # Remove json_mode from kwargs if passed to avoid duplicate argument error
         kwargs.pop('json_mode', None)
+        kwargs.setdefault('pass_name', 'pass6_synthesize')
         return self.complete(
             prompt=prompt,
             system=system,
@@ -528,6 +807,7 @@ class ClaudeClient:
         logger.debug("Pass 7 (verification) using model: opus")
         # Remove json_mode from kwargs if passed to avoid duplicate argument error
         kwargs.pop('json_mode', None)
+        kwargs.setdefault('pass_name', 'pass7_verify')
         return self.complete(
             prompt=prompt,
             system=system,
@@ -550,6 +830,7 @@ class ClaudeClient:
         """
         # Remove json_mode from kwargs if passed to avoid duplicate argument error
         kwargs.pop('json_mode', None)
+        kwargs.setdefault('pass_name', 'critical')
         return self.complete(
             prompt=prompt,
             system=system,
@@ -581,6 +862,11 @@ class ClaudeClient:
             lines.append(f"  Calls:         {data['calls']:,}")
             lines.append(f"  Input tokens:  {data['input_tokens']:,}")
             lines.append(f"  Output tokens: {data['output_tokens']:,}")
+            if data['cache_read_input_tokens'] or data['cache_write_input_tokens']:
+                lines.append(f"  Cache read:    {data['cache_read_input_tokens']:,}")
+                lines.append(f"  Cache write:   {data['cache_write_input_tokens']:,}")
+            if data['batch_calls']:
+                lines.append(f"  Batch calls:   {data['batch_calls']:,} (-${data['batch_discount_usd']:.4f})")
             lines.append(f"  Cost:          ${data['total_cost_usd']:.4f}")
             lines.append("")
 
@@ -588,6 +874,8 @@ class ClaudeClient:
         lines.append(f"TOTAL TOKENS:    {self.usage.input_tokens + self.usage.output_tokens:,}")
         lines.append(f"TOTAL CALLS:     {self.usage.call_count:,}")
         lines.append(f"TOTAL COST:      ${self.usage.cost_usd:.4f} USD")
+        if self.usage.cache_hits:
+            lines.append(f"CACHE HITS:      {self.usage.cache_hits:,} (${self.usage.cost_avoided_usd:.4f} avoided)")
         lines.append("=" * 50)
 
         return "\n".join(lines)
@@ -597,8 +885,13 @@ class ClaudeClient:
         return {
             "total_input_tokens": self.usage.input_tokens,
             "total_output_tokens": self.usage.output_tokens,
+            "total_cache_read_tokens": self.usage.cache_read_tokens,
+            "total_cache_write_tokens": self.usage.cache_write_tokens,
             "total_calls": self.usage.call_count,
             "total_cost_usd": round(self.usage.cost_usd, 4),
+            "cache_hits": self.usage.cache_hits,
+            "cache_cost_avoided_usd": round(self.usage.cost_avoided_usd, 4),
+            "total_batch_calls": self.usage.batch_calls,
             "model_tier": self.model_tier.value,
             "breakdown": self.usage.get_breakdown()
         }
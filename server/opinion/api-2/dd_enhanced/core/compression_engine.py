@@ -2,7 +2,7 @@
 Compression Engine for Phase 4: Summary Compression + Batching
 
 Generates legally-focused compressed summaries at target token lengths.
-Uses Haiku for cost-efficient compression with ThreadPoolExecutor for parallelism.
+Uses Haiku for cost-efficient compression, fanned out on AsyncClaudeClient.
 
 Key features:
 - Priority-aware compression (critical docs get more detail)
@@ -20,12 +20,10 @@ Usage:
     )
 """
 
-from typing import Dict, Any, List, Optional, Callable
+from typing import Dict, Any, List, Optional, Callable, Tuple
 from dataclasses import dataclass, field
-from concurrent.futures import ThreadPoolExecutor, as_completed
 import json
 import logging
-import time
 
 try:
     import tiktoken
@@ -37,13 +35,12 @@ except ImportError:
 
 from .document_priority import PrioritizedDocument, DocumentPriority
 from .claude_client import ClaudeClient
+from .async_claude_client import AsyncClaudeClient, CompletionRequest, CompletionResult
 
 logger = logging.getLogger(__name__)
 
 # Compression configuration
-MAX_WORKERS = 5  # Parallel compression threads
-RETRY_DELAY = 2  # Seconds to wait on rate limit
-MAX_RETRIES = 3  # Max retries per document
+MAX_WORKERS = 20  # Concurrent compression requests
 INPUT_CHAR_LIMIT = 25000  # Max chars of document text to send
 
 
@@ -86,6 +83,11 @@ def count_tokens(text: str) -> int:
     return len(text) // 4
 
 
+COMPRESSION_SYSTEM_PROMPT = """You are a senior legal associate summarizing documents for due diligence.
+Output valid JSON only. Be precise with legal terminology.
+Focus on provisions that affect M&A transactions."""
+
+
 def compress_document(
     document: Dict[str, Any],
     prioritized: PrioritizedDocument,
@@ -104,6 +106,32 @@ def compress_document(
     Returns:
         CompressedDocument with summary and structured data
     """
+    prompt, doc_text, findings_text, finding_count = _build_compression_prompt(
+        document, prioritized, pass2_findings
+    )
+
+    # Call Haiku for cost-efficient compression
+    response = claude_client.complete_extraction(
+        prompt=prompt,
+        system=COMPRESSION_SYSTEM_PROMPT,
+        max_tokens=prioritized.compressed_token_target + 300,  # Allow buffer for JSON structure
+        pass_name="compression"
+    )
+
+    return _build_compressed_document(prioritized, response, doc_text, findings_text, finding_count)
+
+
+def _build_compression_prompt(
+    document: Dict[str, Any],
+    prioritized: PrioritizedDocument,
+    pass2_findings: List[Dict[str, Any]]
+) -> Tuple[str, str, str, int]:
+    """
+    Build the compression prompt for a document.
+
+    Returns:
+        Tuple of (prompt, document text, findings summary, finding count)
+    """
     target_tokens = prioritized.compressed_token_target
     doc_text = document.get('extracted_text', document.get('text', ''))
     doc_id = prioritized.document_id
@@ -187,18 +215,17 @@ CRITICAL INSTRUCTIONS:
 - Keep summary at target length - be concise but preserve legal substance
 - For risk_flags, only include actual concerns, not confirmations"""
 
-    system_prompt = """You are a senior legal associate summarizing documents for due diligence.
-Output valid JSON only. Be precise with legal terminology.
-Focus on provisions that affect M&A transactions."""
+    return prompt, doc_text, findings_text, len(doc_findings)
 
-    # Call Haiku for cost-efficient compression
-    response = claude_client.complete_extraction(
-        prompt=prompt,
-        system=system_prompt,
-        max_tokens=target_tokens + 300  # Allow buffer for JSON structure
-    )
 
-    # Parse response
+def _build_compressed_document(
+    prioritized: PrioritizedDocument,
+    response: Dict[str, Any],
+    doc_text: str,
+    findings_text: str,
+    finding_count: int
+) -> CompressedDocument:
+    """Turn a compression response into a CompressedDocument (fallback on error)."""
     if "error" in response:
         logger.warning(f"Compression failed for {prioritized.document_name}: {response.get('error')}")
         return _create_fallback_compression(prioritized, doc_text, findings_text, response.get('error'))
@@ -223,7 +250,7 @@ Focus on provisions that affect M&A transactions."""
         key_amounts=parsed.get('key_amounts', [])[:10],
         risk_flags=parsed.get('risk_flags', [])[:10],
         pass2_finding_summary=findings_text[:500],
-        finding_count=len(doc_findings),
+        finding_count=finding_count,
         original_tokens=prioritized.estimated_tokens,
         compression_ratio=_calculate_compression_ratio(prioritized.estimated_tokens, summary_tokens),
     )
@@ -289,37 +316,6 @@ def _calculate_compression_ratio(original: int, compressed: int) -> float:
     return max(0.0, (1 - (compressed / original)) * 100)
 
 
-def _compress_with_retry(
-    document: Dict[str, Any],
-    prioritized: PrioritizedDocument,
-    pass2_findings: List[Dict[str, Any]],
-    claude_client: ClaudeClient,
-    max_retries: int = MAX_RETRIES
-) -> CompressedDocument:
-    """Compress a document with retry logic for rate limits."""
-    last_error = None
-
-    for attempt in range(max_retries):
-        try:
-            return compress_document(document, prioritized, pass2_findings, claude_client)
-        except Exception as e:
-            last_error = str(e)
-            if 'rate' in last_error.lower() or '429' in last_error:
-                wait_time = RETRY_DELAY * (attempt + 1)
-                logger.warning(f"Rate limit hit, waiting {wait_time}s before retry")
-                time.sleep(wait_time)
-            else:
-                logger.error(f"Compression error for {prioritized.document_name}: {e}")
-                break
-
-    return _create_fallback_compression(
-        prioritized,
-        document.get('extracted_text', ''),
-        '',
-        last_error or 'Unknown error'
-    )
-
-
 def compress_all_documents(
     documents: List[Dict[str, Any]],
     prioritized_docs: List[PrioritizedDocument],
@@ -335,9 +331,10 @@ def compress_all_documents(
         documents: List of full document dicts
         prioritized_docs: List of PrioritizedDocument from priority system
         pass2_findings: List of findings from Pass 2
-        claude_client: Claude API client
+        claude_client: Claude API client (a BatchClaudeClient submits message batches)
         progress_callback: Optional callback(current, total, message)
-        max_workers: Number of parallel compression threads
+        max_workers: Maximum concurrent compression requests (the shared
+            rate limiter also applies)
 
     Returns:
         List of CompressedDocument in priority order
@@ -354,53 +351,54 @@ def compress_all_documents(
         if filename:
             doc_lookup[filename] = d
 
-    def compress_one(prioritized: PrioritizedDocument) -> CompressedDocument:
+    def find_document(prioritized: PrioritizedDocument) -> Dict[str, Any]:
         doc = doc_lookup.get(prioritized.document_id)
         if not doc:
             doc = doc_lookup.get(prioritized.document_name, {})
-
-        return _compress_with_retry(
-            document=doc,
-            prioritized=prioritized,
-            pass2_findings=pass2_findings,
-            claude_client=claude_client
+        return doc
+
+    # Build every prompt up front, then fan out on the async client
+    model = claude_client.get_model_for_pass("pass1")
+    requests: List[CompletionRequest] = []
+    prepared: List[Tuple[str, str, int]] = []
+    for i, prioritized in enumerate(prioritized_docs):
+        prompt, doc_text, findings_text, finding_count = _build_compression_prompt(
+            find_document(prioritized), prioritized, pass2_findings
         )
+        prepared.append((doc_text, findings_text, finding_count))
+        requests.append(CompletionRequest(
+            request_id=i,
+            prompt=prompt,
+            system=COMPRESSION_SYSTEM_PROMPT,
+            model=model,
+            max_tokens=prioritized.compressed_token_target + 300,  # Allow buffer for JSON structure
+            json_mode=True,
+            pass_name="compression",
+        ))
+
+    def on_complete(completed: int, total: int, result: CompletionResult):
+        if progress_callback:
+            progress_callback(
+                completed,
+                total,
+                f"Compressed {prioritized_docs[result.request_id].document_name}"
+            )
+
+    logger.info(f"Compressing {total} documents with concurrency {max_workers}")
+
+    async_client = AsyncClaudeClient.from_client(claude_client)
+    results = async_client.run_many(requests, concurrency=max_workers, progress_callback=on_complete)
+
+    for prioritized, (doc_text, findings_text, finding_count), result in zip(prioritized_docs, prepared, results):
+        try:
+            compressed.append(_build_compressed_document(
+                prioritized, result.response, doc_text, findings_text, finding_count
+            ))
+        except Exception as e:
+            logger.error(f"Compression failed for {prioritized.document_name}: {e}")
+            compressed.append(_create_fallback_compression(prioritized, doc_text, '', str(e)))
 
-    # Use ThreadPoolExecutor for parallel compression
-    logger.info(f"Compressing {total} documents with {max_workers} workers")
-
-    completed = 0
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        # Submit all compression tasks
-        future_to_doc = {
-            executor.submit(compress_one, p): p
-            for p in prioritized_docs
-        }
-
-        # Collect results as they complete
-        for future in as_completed(future_to_doc):
-            prioritized = future_to_doc[future]
-            try:
-                result = future.result()
-                compressed.append(result)
-            except Exception as e:
-                logger.error(f"Compression failed for {prioritized.document_name}: {e}")
-                compressed.append(_create_fallback_compression(
-                    prioritized,
-                    doc_lookup.get(prioritized.document_id, {}).get('extracted_text', ''),
-                    '',
-                    str(e)
-                ))
-
-            completed += 1
-            if progress_callback:
-                progress_callback(
-                    completed,
-                    total,
-                    f"Compressed {prioritized.document_name}"
-                )
-
-    # Re-sort by priority (as_completed returns in completion order)
+    # Sort by priority
     compressed.sort(key=lambda x: (x.priority.value, -x.original_tokens))
 
     # Log compression stats
@@ -18,6 +18,8 @@ from .entity_transformer import (
 
 from .graph_builder import KnowledgeGraphBuilder, GraphStats
 
+from .reference_index import DocumentReferenceIndex
+
 from .graph_queries import GraphQueryEngine, QueryResult
 
 from .relationship_enricher import RelationshipEnricher
@@ -35,6 +37,7 @@ __all__ = [
     # Builder
     'KnowledgeGraphBuilder',
     'GraphStats',
+    'DocumentReferenceIndex',
     # Queries
     'GraphQueryEngine',
     'QueryResult',
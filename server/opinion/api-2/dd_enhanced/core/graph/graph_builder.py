@@ -3,10 +3,22 @@ Graph Builder for Knowledge Graph (Phase 5)
 
 Populates the relational graph tables from extracted entities.
 Handles deduplication, relationship creation, and progress tracking.
+
+By default rows are built in bulk: vertices and edges are accumulated in
+memory, deduplicated, and written with one multi-row INSERT per table per
+batch (flushed at each periodic commit) instead of one round trip per row.
+Existing parties are prefetched with a single SELECT, and source_documents
+for parties seen in several documents are merged in memory and written
+once per party per flush.
+
+Configuration:
+    DD_GRAPH_BULK_BATCH_SIZE: maximum rows per multi-row INSERT (default: 500)
 """
 
 from typing import Dict, List, Any, Optional, Set
 from dataclasses import dataclass
+import json
+import os
 import uuid
 import logging
 from datetime import datetime
@@ -24,9 +36,45 @@ from .entity_transformer import (
     DateEntity,
 )
 from .relationship_enricher import RelationshipEnrichment
+from .reference_index import DocumentReferenceIndex
 
 logger = logging.getLogger(__name__)
 
+# Rows per multi-row INSERT. Postgres allows 65535 bind parameters per
+# statement; the widest table (kg_obligation) has 15 columns.
+GRAPH_BULK_BATCH_SIZE = int(os.environ.get("DD_GRAPH_BULK_BATCH_SIZE", "500"))
+
+# Columns written for each table, in INSERT order. Vertex and edge rows are
+# built as dicts keyed by these names for both the per-row and bulk paths.
+_INSERT_COLUMNS: Dict[str, tuple] = {
+    'kg_party': ('id', 'dd_id', 'run_id', 'name', 'normalized_name', 'party_type', 'role',
+                 'jurisdiction', 'registration_number', 'first_seen_document_id', 'source_documents'),
+    'kg_agreement': ('id', 'dd_id', 'run_id', 'document_id', 'name', 'agreement_type',
+                     'effective_date', 'expiry_date', 'governing_law',
+                     'has_change_of_control', 'has_assignment_restriction', 'has_consent_requirement'),
+    'kg_obligation': ('id', 'dd_id', 'run_id', 'document_id', 'agreement_id', 'description',
+                      'obligation_type', 'obligor_party_id', 'obligee_party_id',
+                      'clause_reference', 'due_date', 'due_date_description',
+                      'amount', 'currency', 'is_material'),
+    'kg_trigger': ('id', 'dd_id', 'run_id', 'document_id', 'agreement_id', 'trigger_type',
+                   'description', 'clause_reference', 'threshold_description', 'consequences'),
+    'kg_amount': ('id', 'dd_id', 'run_id', 'document_id', 'value', 'currency',
+                  'context', 'amount_type', 'clause_reference'),
+    'kg_date': ('id', 'dd_id', 'run_id', 'document_id', 'date_value',
+                'date_description', 'significance', 'date_type', 'is_critical'),
+    'kg_edge_party_to': ('dd_id', 'party_id', 'target_type', 'agreement_id', 'document_id', 'role'),
+    'kg_edge_references': ('dd_id', 'source_document_id', 'target_document_id',
+                           'source_agreement_id', 'target_agreement_id',
+                           'reference_type', 'reference_text'),
+}
+
+_ON_CONFLICT: Dict[str, str] = {
+    'kg_edge_party_to': 'ON CONFLICT (party_id, target_type, document_id, agreement_id) DO NOTHING',
+}
+
+# Bulk flush order: parents before the rows that reference them
+_FLUSH_ORDER = list(_INSERT_COLUMNS)
+
 
 @dataclass
 class GraphStats:
@@ -51,18 +99,37 @@ class KnowledgeGraphBuilder:
     - Create vertices (nodes) in kg_* tables
     - Create edges (relationships) in kg_edge_* tables
     - Track build progress
+
+    With bulk=True (the default) rows are buffered and written in batches by
+    flush(); bulk=False keeps the original one-statement-per-row behaviour.
     """
 
-    def __init__(self, db_session: Session, dd_id: str, run_id: Optional[str] = None):
+    def __init__(
+        self,
+        db_session: Session,
+        dd_id: str,
+        run_id: Optional[str] = None,
+        bulk: bool = True,
+        batch_size: int = GRAPH_BULK_BATCH_SIZE
+    ):
         self.db = db_session
         self.dd_id = dd_id
         self.run_id = run_id
+        self.bulk = bulk
+        self.batch_size = max(1, batch_size)
 
         # Cache for deduplication
         self._party_cache: Dict[str, str] = {}  # normalized_name -> party_id
         self._agreement_cache: Dict[str, str] = {}  # document_id -> agreement_id
         self._document_cache: Dict[str, str] = {}  # document_name -> document_id
 
+        # Bulk mode buffers
+        self._pending: Dict[str, List[Dict[str, Any]]] = {table: [] for table in _INSERT_COLUMNS}
+        self._pending_edge_keys: Set[tuple] = set()
+        self._party_docs: Dict[str, List[str]] = {}  # party_id -> all known source documents
+        self._party_persisted_docs: Dict[str, Set[str]] = {}  # party_id -> source documents in the DB
+        self._dirty_parties: Set[str] = set()  # existing parties with new source documents
+
     def clear_existing_graph(self) -> None:
         """
         Clear existing graph data for this DD before rebuilding.
@@ -94,6 +161,13 @@ class KnowledgeGraphBuilder:
             )
 
         self.db.commit()
+
+        self._party_cache.clear()
+        self._agreement_cache.clear()
+        self._party_docs.clear()
+        self._party_persisted_docs.clear()
+        self._dirty_parties.clear()
+        self._pending_edge_keys.clear()
         logger.info(f"Cleared graph data from {len(tables_to_clear)} tables")
 
     def build_graph(
@@ -127,6 +201,9 @@ class KnowledgeGraphBuilder:
 
         logger.info(f"Building graph for {total_docs} documents")
 
+        if self.bulk:
+            self._prefetch_parties()
+
         try:
             for i, doc_entities in enumerate(document_entities):
                 if progress_callback:
@@ -155,12 +232,17 @@ class KnowledgeGraphBuilder:
 
                 # Commit periodically to avoid large transactions
                 if (i + 1) % 50 == 0:
+                    self.flush()
                     self.db.commit()
                     self._update_build_status(build_status_id, stats)
 
+            # Agreements must be written before cross-references look them up
+            self.flush()
+
             # Resolve cross-references after all documents processed
             refs_resolved = self._resolve_cross_references(enrichments or [])
             stats.edges += refs_resolved
+            self.flush()
 
             # Final commit
             self.db.commit()
@@ -269,6 +351,19 @@ class KnowledgeGraphBuilder:
         for party in parties:
             normalized = party.normalized_name
 
+            # Bulk mode: existing parties were prefetched, so the cache is authoritative
+            if self.bulk:
+                party_id = self._party_cache.get(normalized)
+                if party_id is None:
+                    party_id = str(uuid.uuid4())
+                    self._write('kg_party', self._party_row(party_id, party, normalized))
+                    self._party_docs[party_id] = []
+                    self._party_persisted_docs[party_id] = set()
+                    self._party_cache[normalized] = party_id
+                self._add_party_source_document(party_id, party.source_document_id)
+                party_ids[normalized] = party_id
+                continue
+
             # Check cache first
             if normalized in self._party_cache:
                 party_ids[normalized] = self._party_cache[normalized]
@@ -294,38 +389,62 @@ class KnowledgeGraphBuilder:
             else:
                 # Create new party
                 party_id = str(uuid.uuid4())
-                self.db.execute(
-                    text("""
-                        INSERT INTO kg_party (id, dd_id, run_id, name, normalized_name, party_type, role,
-                                             jurisdiction, registration_number, first_seen_document_id, source_documents)
-                        VALUES (:id, :dd_id, :run_id, :name, :normalized_name, :party_type, :role,
-                                :jurisdiction, :registration_number, :first_seen_document_id, :source_documents)
-                    """),
-                    {
-                        'id': party_id,
-                        'dd_id': self.dd_id,
-                        'run_id': self.run_id,
-                        'name': party.name,
-                        'normalized_name': normalized,
-                        'party_type': party.party_type,
-                        'role': party.role,
-                        'jurisdiction': party.jurisdiction,
-                        'registration_number': party.registration_number,
-                        'first_seen_document_id': party.source_document_id or None,
-                        'source_documents': f'["{party.source_document_id}"]' if party.source_document_id else '[]'
-                    }
-                )
+                row = self._party_row(party_id, party, normalized)
+                row['source_documents'] = json.dumps([party.source_document_id] if party.source_document_id else [])
+                self._write('kg_party', row)
 
             self._party_cache[normalized] = party_id
             party_ids[normalized] = party_id
 
         return party_ids
 
+    def _party_row(self, party_id: str, party: PartyEntity, normalized: str) -> Dict[str, Any]:
+        """kg_party row for a new party (source_documents is filled in by the caller/flush)."""
+        return {
+            'id': party_id,
+            'dd_id': self.dd_id,
+            'run_id': self.run_id,
+            'name': party.name,
+            'normalized_name': normalized,
+            'party_type': party.party_type,
+            'role': party.role,
+            'jurisdiction': party.jurisdiction,
+            'registration_number': party.registration_number,
+            'first_seen_document_id': party.source_document_id or None,
+            'source_documents': '[]'
+        }
+
+    def _prefetch_parties(self) -> None:
+        """Load this DD's existing parties in one query (bulk mode dedup cache)."""
+        rows = self.db.execute(
+            text("""
+                SELECT id, normalized_name, source_documents FROM kg_party
+                WHERE dd_id = :dd_id
+            """),
+            {'dd_id': self.dd_id}
+        ).fetchall()
+
+        for row in rows:
+            party_id = str(row[0])
+            docs = row[2] if isinstance(row[2], list) else json.loads(row[2] or '[]')
+            self._party_cache[row[1]] = party_id
+            self._party_docs[party_id] = [str(d) for d in docs]
+            self._party_persisted_docs[party_id] = set(self._party_docs[party_id])
+
+        logger.info(f"Prefetched {len(rows)} existing parties for DD {self.dd_id}")
+
     def _add_party_source_document(self, party_id: str, document_id: str) -> None:
         """Add a document to a party's source_documents array."""
         if not document_id:
             return
 
+        if self.bulk:
+            docs = self._party_docs.setdefault(party_id, [])
+            if document_id not in docs:
+                docs.append(document_id)
+                self._dirty_parties.add(party_id)
+            return
+
         self.db.execute(
             text("""
                 UPDATE kg_party
@@ -344,15 +463,8 @@ class KnowledgeGraphBuilder:
         """Create an agreement node."""
         agreement_id = str(uuid.uuid4())
 
-        self.db.execute(
-            text("""
-                INSERT INTO kg_agreement (id, dd_id, run_id, document_id, name, agreement_type,
-                                         effective_date, expiry_date, governing_law,
-                                         has_change_of_control, has_assignment_restriction, has_consent_requirement)
-                VALUES (:id, :dd_id, :run_id, :document_id, :name, :agreement_type,
-                        :effective_date, :expiry_date, :governing_law,
-                        :has_change_of_control, :has_assignment_restriction, :has_consent_requirement)
-            """),
+        self._write(
+            'kg_agreement',
             {
                 'id': agreement_id,
                 'dd_id': self.dd_id,
@@ -392,17 +504,8 @@ class KnowledgeGraphBuilder:
             normalized = self._normalize_party_name(obligation.obligee)
             obligee_id = party_ids.get(normalized) or self._party_cache.get(normalized)
 
-        self.db.execute(
-            text("""
-                INSERT INTO kg_obligation (id, dd_id, run_id, document_id, agreement_id, description,
-                                          obligation_type, obligor_party_id, obligee_party_id,
-                                          clause_reference, due_date, due_date_description,
-                                          amount, currency, is_material)
-                VALUES (:id, :dd_id, :run_id, :document_id, :agreement_id, :description,
-                        :obligation_type, :obligor_party_id, :obligee_party_id,
-                        :clause_reference, :due_date, :due_date_description,
-                        :amount, :currency, :is_material)
-            """),
+        self._write(
+            'kg_obligation',
             {
                 'id': obligation_id,
                 'dd_id': self.dd_id,
@@ -433,13 +536,8 @@ class KnowledgeGraphBuilder:
         """Create a trigger node."""
         trigger_id = str(uuid.uuid4())
 
-        self.db.execute(
-            text("""
-                INSERT INTO kg_trigger (id, dd_id, run_id, document_id, agreement_id, trigger_type,
-                                       description, clause_reference, threshold_description, consequences)
-                VALUES (:id, :dd_id, :run_id, :document_id, :agreement_id, :trigger_type,
-                        :description, :clause_reference, :threshold_description, :consequences)
-            """),
+        self._write(
+            'kg_trigger',
             {
                 'id': trigger_id,
                 'dd_id': self.dd_id,
@@ -464,13 +562,8 @@ class KnowledgeGraphBuilder:
         """Create an amount node."""
         amount_id = str(uuid.uuid4())
 
-        self.db.execute(
-            text("""
-                INSERT INTO kg_amount (id, dd_id, run_id, document_id, value, currency,
-                                      context, amount_type, clause_reference)
-                VALUES (:id, :dd_id, :run_id, :document_id, :value, :currency,
-                        :context, :amount_type, :clause_reference)
-            """),
+        self._write(
+            'kg_amount',
             {
                 'id': amount_id,
                 'dd_id': self.dd_id,
@@ -494,13 +587,8 @@ class KnowledgeGraphBuilder:
         """Create a date node."""
         date_id = str(uuid.uuid4())
 
-        self.db.execute(
-            text("""
-                INSERT INTO kg_date (id, dd_id, run_id, document_id, date_value,
-                                    date_description, significance, date_type, is_critical)
-                VALUES (:id, :dd_id, :run_id, :document_id, :date_value,
-                        :date_description, :significance, :date_type, :is_critical)
-            """),
+        self._write(
+            'kg_date',
             {
                 'id': date_id,
                 'dd_id': self.dd_id,
@@ -524,18 +612,15 @@ class KnowledgeGraphBuilder:
         document_id: Optional[str] = None
     ) -> None:
         """Create a PARTY_TO edge."""
-        self.db.execute(
-            text("""
-                INSERT INTO kg_edge_party_to (dd_id, party_id, target_type, agreement_id, document_id, role)
-                VALUES (:dd_id, :party_id, :target_type, :agreement_id, :document_id, NULL)
-                ON CONFLICT (party_id, target_type, document_id, agreement_id) DO NOTHING
-            """),
+        self._write(
+            'kg_edge_party_to',
             {
                 'dd_id': self.dd_id,
                 'party_id': party_id,
                 'target_type': target_type,
                 'agreement_id': target_id if target_type == 'agreement' else None,
-                'document_id': document_id if target_type == 'document' else target_id
+                'document_id': document_id if target_type == 'document' else target_id,
+                'role': None
             }
         )
 
@@ -568,6 +653,7 @@ class KnowledgeGraphBuilder:
                 'document_id': str(row[0]),
                 'agreement_id': str(row[2]) if row[2] else None
             }
+        doc_index = DocumentReferenceIndex(doc_lookup)
 
         # Process each enrichment's cross-references
         for enrichment in enrichments:
@@ -580,51 +666,132 @@ class KnowledgeGraphBuilder:
 
                 # Try to find the target document
                 target_doc = self._find_referenced_document(
-                    ref_text, likely_type, doc_lookup
+                    ref_text, likely_type, doc_index
                 )
 
                 if target_doc:
-                    self.db.execute(
-                        text("""
-                            INSERT INTO kg_edge_references (dd_id, source_document_id, target_document_id,
-                                                           source_agreement_id, target_agreement_id,
-                                                           reference_type, reference_text)
-                            VALUES (:dd_id, :source_doc, :target_doc,
-                                    :source_agreement, :target_agreement,
-                                    :ref_type, :ref_text)
-                        """),
+                    created = self._write(
+                        'kg_edge_references',
                         {
                             'dd_id': self.dd_id,
-                            'source_doc': source_doc_id,
-                            'target_doc': target_doc.get('document_id'),
-                            'source_agreement': self._agreement_cache.get(source_doc_id),
-                            'target_agreement': target_doc.get('agreement_id'),
-                            'ref_type': ref_type,
-                            'ref_text': ref.get('reference_text', '')[:500]
+                            'source_document_id': source_doc_id,
+                            'target_document_id': target_doc.get('document_id'),
+                            'source_agreement_id': self._agreement_cache.get(source_doc_id),
+                            'target_agreement_id': target_doc.get('agreement_id'),
+                            'reference_type': ref_type,
+                            'reference_text': ref.get('reference_text', '')[:500]
                         }
                     )
-                    edges_created += 1
+                    if created:
+                        edges_created += 1
 
         return edges_created
 
+    def _write(self, table: str, row: Dict[str, Any]) -> bool:
+        """
+        Insert a row, or buffer it for flush() in bulk mode.
+
+        Edge rows (no id column) that duplicate one already buffered in this
+        build are dropped. Returns False if the row was dropped.
+        """
+        if 'id' not in row:
+            key = (table,) + tuple(row[column] for column in _INSERT_COLUMNS[table])
+            if key in self._pending_edge_keys:
+                return False
+            self._pending_edge_keys.add(key)
+
+        if not self.bulk:
+            self._insert_rows(table, [row])
+            return True
+
+        self._pending[table].append(row)
+        return True
+
+    def _insert_rows(self, table: str, rows: List[Dict[str, Any]]) -> None:
+        """Write rows with one multi-row INSERT per batch_size rows."""
+        columns = _INSERT_COLUMNS[table]
+        for start in range(0, len(rows), self.batch_size):
+            batch = rows[start:start + self.batch_size]
+            params: Dict[str, Any] = {}
+            values = []
+            for i, row in enumerate(batch):
+                values.append("(" + ", ".join(f":{column}_{i}" for column in columns) + ")")
+                for column in columns:
+                    params[f"{column}_{i}"] = row[column]
+
+            self.db.execute(
+                text(
+                    f"INSERT INTO {table} ({', '.join(columns)}) VALUES "
+                    + ", ".join(values) + " " + _ON_CONFLICT.get(table, "")
+                ),
+                params
+            )
+
+    def flush(self) -> None:
+        """
+        Write all buffered rows (bulk mode), parents before children, then
+        append newly seen source documents to existing parties.
+        Does not commit.
+        """
+        if not self.bulk:
+            return
+
+        for row in self._pending['kg_party']:
+            docs = self._party_docs.get(row['id'], [])
+            row['source_documents'] = json.dumps(docs)
+            self._party_persisted_docs[row['id']] = set(docs)
+            self._dirty_parties.discard(row['id'])
+
+        written = 0
+        for table in _FLUSH_ORDER:
+            rows = self._pending[table]
+            if rows:
+                self._insert_rows(table, rows)
+                written += len(rows)
+                self._pending[table] = []
+
+        updates = []
+        for party_id in self._dirty_parties:
+            persisted = self._party_persisted_docs.setdefault(party_id, set())
+            new_docs = [d for d in self._party_docs.get(party_id, []) if d not in persisted]
+            if new_docs:
+                updates.append({'party_id': party_id, 'doc_ids': json.dumps(new_docs)})
+                persisted.update(new_docs)
+        self._dirty_parties.clear()
+
+        for start in range(0, len(updates), self.batch_size):
+            batch = updates[start:start + self.batch_size]
+            params: Dict[str, Any] = {}
+            values = []
+            for i, update in enumerate(batch):
+                values.append(f"(CAST(:party_id_{i} AS uuid), CAST(:doc_ids_{i} AS jsonb))")
+                params[f"party_id_{i}"] = update['party_id']
+                params[f"doc_ids_{i}"] = update['doc_ids']
+
+            self.db.execute(
+                text(f"""
+                    UPDATE kg_party p
+                    SET source_documents = p.source_documents || COALESCE((
+                        SELECT jsonb_agg(d.value) FROM jsonb_array_elements(v.doc_ids) d
+                        WHERE NOT p.source_documents @> jsonb_build_array(d.value)
+                    ), '[]'::jsonb)
+                    FROM (VALUES {", ".join(values)}) AS v(party_id, doc_ids)
+                    WHERE p.id = v.party_id
+                """),
+                params
+            )
+
+        if written or updates:
+            logger.debug(f"Flushed {written} graph rows and {len(updates)} party source updates")
+
     def _find_referenced_document(
         self,
         ref_text: str,
         likely_type: str,
-        doc_lookup: Dict[str, Dict]
+        doc_index: DocumentReferenceIndex
     ) -> Optional[Dict]:
-        """Find a document that matches a cross-reference."""
-        # Simple matching - look for document names in the reference text
-        for doc_name, doc_info in doc_lookup.items():
-            # Check if document name appears in reference text
-            if doc_name and doc_name in ref_text:
-                return doc_info
-
-            # Check if likely_type matches document name
-            if likely_type and likely_type in doc_name:
-                return doc_info
-
-        return None
+        """Find the best-matching document for a cross-reference (see DocumentReferenceIndex)."""
+        return doc_index.find(ref_text, likely_type)
 
     def _normalize_party_name(self, name: str) -> str:
         """Normalize a party name for matching."""
@@ -0,0 +1,157 @@
+"""
+Document Reference Index for Knowledge Graph (Phase 5)
+
+Matches cross-reference text from the RelationshipEnricher ("as defined in
+the Shareholders Agreement") to documents in the data room.
+
+Document names are tokenised once into an inverted index (token -> documents).
+Only each name's rarest tokens are indexed for candidate selection (prefix
+filtering): a document can only reach MIN_NAME_COVERAGE if the reference
+contains one of them, so each reference scores a handful of documents
+instead of scanning every name. Candidates are ranked by:
+
+1. IDF-weighted share of the document name's tokens found in the reference
+2. Total IDF weight matched (more specific names win: "loan agreement first
+   amendment" over "loan agreement")
+3. Whether the name appears as a phrase in the reference text
+
+If no name matches, the enricher's likely_document_type is matched as a
+phrase against the names. Ties break on name then document ID, so results
+do not depend on query or insertion order.
+"""
+
+from typing import Dict, List, Optional, Set, Tuple
+import math
+import os
+import re
+
+# Minimum IDF-weighted share of a document name's tokens that must appear in
+# a reference for a token-overlap match
+MIN_NAME_COVERAGE = 0.75
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+_STOPWORDS = {
+    'a', 'an', 'and', 'as', 'at', 'by', 'dated', 'for', 'in', 'is', 'of',
+    'on', 'or', 'the', 'this', 'to', 'under', 'with',
+}
+
+# Match tiers, strongest first
+TIER_NAME = 2
+TIER_LIKELY_TYPE = 1
+
+
+def _normalize(text: str) -> str:
+    """Lowercase and collapse punctuation to single spaces."""
+    return " ".join(_TOKEN.findall((text or "").lower()))
+
+
+def _tokens(text: str) -> List[str]:
+    return [t for t in _TOKEN.findall((text or "").lower()) if t not in _STOPWORDS]
+
+
+class DocumentReferenceIndex:
+    """
+    Inverted index over document names for cross-reference resolution.
+
+    Built from the {lowercased file name: {document_id, agreement_id}} lookup
+    used by KnowledgeGraphBuilder._resolve_cross_references.
+    """
+
+    def __init__(self, doc_lookup: Dict[str, Dict]):
+        # Deterministic document order regardless of query result order
+        self._docs: List[Tuple[str, Dict]] = sorted(
+            ((name, info) for name, info in doc_lookup.items() if name),
+            key=lambda item: (item[0], str(item[1].get('document_id')))
+        )
+        self._phrases: List[str] = []
+        self._token_sets: List[Set[str]] = []
+        self._postings: Dict[str, List[int]] = {}
+        self._prefix_postings: Dict[str, List[int]] = {}
+
+        for i, (name, _) in enumerate(self._docs):
+            stem = os.path.splitext(name)[0]
+            self._phrases.append(_normalize(stem))
+            tokens = set(_tokens(stem))
+            self._token_sets.append(tokens)
+            for token in tokens:
+                self._postings.setdefault(token, []).append(i)
+
+        total = max(1, len(self._docs))
+        self._idf: Dict[str, float] = {
+            token: math.log(1 + total / len(docs)) for token, docs in self._postings.items()
+        }
+        self._weights: List[float] = [sum(self._idf[t] for t in tokens) for tokens in self._token_sets]
+
+        for i, tokens in enumerate(self._token_sets):
+            # Smallest set of rarest tokens whose weight exceeds what a match may miss
+            budget = (1 - MIN_NAME_COVERAGE) * self._weights[i]
+            covered = 0.0
+            for token in sorted(tokens, key=lambda t: (-self._idf[t], t)):
+                self._prefix_postings.setdefault(token, []).append(i)
+                covered += self._idf[token]
+                if covered > budget:
+                    break
+
+        self._cache: Dict[Tuple[str, str], Optional[Dict]] = {}
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def find(self, ref_text: str, likely_type: str = "") -> Optional[Dict]:
+        """
+        Best-matching document info for a reference, or None.
+
+        Args:
+            ref_text: Reference text as extracted ("the Loan Agreement dated ...")
+            likely_type: Enricher's guess at the referenced document type
+        """
+        key = (ref_text or "", likely_type or "")
+        if key not in self._cache:
+            match = self._best_match(*key)
+            self._cache[key] = self._docs[match][1] if match is not None else None
+        return self._cache[key]
+
+    def _best_match(self, ref_text: str, likely_type: str) -> Optional[int]:
+        best: Optional[tuple] = None
+
+        ref_phrase = f" {_normalize(ref_text)} "
+        ref_tokens = set(_tokens(ref_text))
+        for i in self._candidates(ref_tokens):
+            matched = sum(self._idf[t] for t in self._token_sets[i] & ref_tokens)
+            coverage = matched / self._weights[i]
+            if coverage < MIN_NAME_COVERAGE:
+                continue
+            phrase = f" {self._phrases[i]} " in ref_phrase
+            score = (TIER_NAME, round(coverage, 6), round(matched, 6), phrase, -i)
+            if best is None or score > best:
+                best = score
+
+        if best is None and likely_type:
+            type_phrase = _normalize(likely_type)
+            type_tokens = set(_tokens(likely_type))
+            for i in self._containing(type_tokens):
+                if f" {type_phrase} " in f" {self._phrases[i]} ":
+                    # Prefer the name the type describes most completely
+                    score = (TIER_LIKELY_TYPE, 0.0, -float(len(self._token_sets[i] - type_tokens)), False, -i)
+                    if best is None or score > best:
+                        best = score
+
+        return -best[-1] if best is not None else None
+
+    def _candidates(self, ref_tokens: Set[str]) -> Set[int]:
+        """Documents with one of their prefix (rarest) tokens in the reference."""
+        candidates: Set[int] = set()
+        for token in ref_tokens:
+            candidates.update(self._prefix_postings.get(token, ()))
+        return candidates
+
+    def _containing(self, tokens: Set[str]) -> Set[int]:
+        """Documents whose names contain every token."""
+        if not tokens:
+            return set()
+        postings = sorted((self._postings.get(t, []) for t in tokens), key=len)
+        result = set(postings[0])
+        for docs in postings[1:]:
+            result.intersection_update(docs)
+        return result
@@ -8,16 +8,26 @@ Change detection is based on:
 - AI classification changes
 
 This approach catches both content changes AND changes that affect
-which questions are asked during analysis.
+which questions are asked during analysis. An optional context key (model
+tier, question set, transaction context) is folded into every hash, so a
+change there marks every document as modified.
+
+Stored per run:
+- dd_document_processing_state: document hashes plus Pass 1 extraction,
+  Pass 2 findings and blueprint Q&A per document
+- dd_cluster_processing_state: Pass 3 cross-document findings per cluster
 """
 
-from typing import Dict, List, Any, Optional, Set
+from typing import Dict, List, Any, Optional, Set, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
 import hashlib
+import json
 import logging
 
+from sqlalchemy import text
+
 logger = logging.getLogger(__name__)
 
 
@@ -81,6 +91,31 @@ class ChangeSet:
             len(self.unchanged_documents)
         )
 
+    def split_documents(
+        self,
+        documents: List[Dict[str, Any]],
+        reusable: Dict[str, Dict[str, Any]]
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+        """
+        Split documents into those to (re)process and results to carry forward.
+
+        A document is carried forward when it is unchanged and the previous
+        run stored both its Pass 1 and Pass 2 results; everything else
+        (new, modified, or unchanged without stored results) is processed.
+
+        Returns:
+            (documents_to_process, carried) where carried maps document ID
+            to its stored results
+        """
+        unchanged_ids = {d.document_id for d in self.unchanged_documents}
+        carried = {
+            doc_id: results for doc_id, results in reusable.items()
+            if doc_id in unchanged_ids
+            and results.get('pass1_completed') and results.get('pass2_completed')
+        }
+        to_process = [d for d in documents if str(d.get('id')) not in carried]
+        return to_process, carried
+
     def get_summary(self) -> Dict[str, Any]:
         """Get summary of changes."""
         return {
@@ -102,8 +137,16 @@ class ChangeDetector:
     Detects changes between DD runs for incremental processing.
     """
 
-    def __init__(self, db_session):
+    def __init__(self, db_session, context_key: str = ''):
+        """
+        Args:
+            db_session: SQLAlchemy session
+            context_key: Run settings that affect every document's results
+                (e.g. model tier and transaction context); runs only reuse
+                results from runs with the same key
+        """
         self.db = db_session
+        self.context_key = context_key
 
     def compute_document_hash(self, document: Dict[str, Any]) -> str:
         """
@@ -113,12 +156,15 @@ class ChangeDetector:
         - extracted_text (content)
         - folder_category (affects question selection)
         - ai_category (affects question selection)
+        - the detector's context_key, when set
         """
         content_parts = [
             document.get('extracted_text', document.get('text', '')),
             document.get('folder_category', ''),
             document.get('ai_category', document.get('ai_document_type', ''))
         ]
+        if self.context_key:
+            content_parts.append(self.context_key)
 
         combined = '|'.join(str(p) for p in content_parts)
         return hashlib.sha256(combined.encode()).hexdigest()[:32]
@@ -268,7 +314,7 @@ class ChangeDetector:
 
     def _get_current_documents(self, dd_id: str) -> List[Dict[str, Any]]:
         """Get current documents for a DD from database."""
-        result = self.db.execute("""
+        result = self.db.execute(text("""
             SELECT
                 d.id,
                 d.original_file_name,
@@ -278,9 +324,9 @@ class ChangeDetector:
                 d.updated_at
             FROM document d
             JOIN folder f ON d.folder_id = f.id
-            WHERE f.dd_id = %(dd_id)s
+            WHERE f.dd_id = :dd_id
             AND d.is_original = false
-        """, {'dd_id': dd_id})
+        """), {'dd_id': dd_id})
 
         documents = []
         for row in result.fetchall():
@@ -301,7 +347,7 @@ class ChangeDetector:
 
     def _get_previous_state(self, run_id: str) -> Dict[str, Dict[str, Any]]:
         """Get document state from previous run."""
-        result = self.db.execute("""
+        result = self.db.execute(text("""
             SELECT
                 document_id,
                 document_name,
@@ -309,8 +355,8 @@ class ChangeDetector:
                 folder_category,
                 ai_category
             FROM dd_document_processing_state
-            WHERE run_id = %(run_id)s
-        """, {'run_id': run_id})
+            WHERE run_id = :run_id
+        """), {'run_id': run_id})
 
         state = {}
         for row in result.fetchall():
@@ -323,36 +369,86 @@ class ChangeDetector:
 
         return state
 
-    def save_state(self, run_id: str, documents: List[Dict[str, Any]]):
+    def find_previous_run(self, dd_id: str, current_run_id: str) -> Optional[str]:
+        """
+        Find the most recent completed run of this DD with saved document state.
+
+        Returns:
+            Run ID to diff against, or None if there is none
+        """
+        row = self.db.execute(text("""
+            SELECT r.id
+            FROM dd_analysis_run r
+            WHERE r.dd_id = :dd_id
+            AND r.id != :run_id
+            AND r.status = 'completed'
+            AND EXISTS (
+                SELECT 1 FROM dd_document_processing_state s WHERE s.run_id = r.id
+            )
+            ORDER BY r.run_number DESC
+            LIMIT 1
+        """), {'dd_id': dd_id, 'run_id': current_run_id}).fetchone()
+
+        return str(row.id) if row else None
+
+    def save_state(
+        self,
+        run_id: str,
+        documents: List[Dict[str, Any]],
+        results: Optional[Dict[str, Dict[str, Any]]] = None
+    ):
         """
         Save document state for future change detection.
 
         Should be called after successful processing.
+
+        Args:
+            run_id: Run the state belongs to
+            documents: Documents processed in the run
+            results: Optional document ID -> {'pass1_result', 'pass2_findings',
+                'pass2_blueprint_qa'}; documents with both Pass 1 and Pass 2
+                results become reusable by later runs
         """
+        results = results or {}
+        rows = []
         for doc in documents:
-            doc_hash = self.compute_document_hash(doc)
-            content_hash = hashlib.sha256(
-                doc.get('extracted_text', doc.get('text', '')).encode()
-            ).hexdigest()[:16]
+            doc_results = results.get(str(doc.get('id')), {})
+            pass1_result = doc_results.get('pass1_result')
+            pass2_findings = doc_results.get('pass2_findings')
+            rows.append({
+                'run_id': run_id,
+                'document_id': doc.get('id'),
+                'document_name': doc.get('original_file_name', doc.get('filename')),
+                'content_hash': self.compute_document_hash(doc),
+                'folder_category': doc.get('folder_category', ''),
+                'ai_category': doc.get('ai_category', doc.get('ai_document_type', '')),
+                'pass1_result': json.dumps(pass1_result) if pass1_result is not None else None,
+                'pass2_findings': json.dumps(pass2_findings) if pass2_findings is not None else None,
+                'pass2_blueprint_qa': json.dumps(doc_results.get('pass2_blueprint_qa') or []),
+                'pass1_completed': pass1_result is not None,
+                'pass2_completed': pass2_findings is not None,
+            })
 
-            self.db.execute("""
+        if rows:
+            self.db.execute(text("""
                 INSERT INTO dd_document_processing_state
-                (run_id, document_id, document_name, content_hash, folder_category, ai_category)
-                VALUES (%(run_id)s, %(document_id)s, %(document_name)s, %(content_hash)s,
-                        %(folder_category)s, %(ai_category)s)
+                (run_id, document_id, document_name, content_hash, folder_category, ai_category,
+                 pass1_result, pass2_findings, pass2_blueprint_qa, pass1_completed, pass2_completed)
+                VALUES (:run_id, :document_id, :document_name, :content_hash,
+                        :folder_category, :ai_category,
+                        CAST(:pass1_result AS jsonb), CAST(:pass2_findings AS jsonb),
+                        CAST(:pass2_blueprint_qa AS jsonb), :pass1_completed, :pass2_completed)
                 ON CONFLICT (run_id, document_id) DO UPDATE SET
                 content_hash = EXCLUDED.content_hash,
                 folder_category = EXCLUDED.folder_category,
                 ai_category = EXCLUDED.ai_category,
+                pass1_result = COALESCE(EXCLUDED.pass1_result, dd_document_processing_state.pass1_result),
+                pass2_findings = COALESCE(EXCLUDED.pass2_findings, dd_document_processing_state.pass2_findings),
+                pass2_blueprint_qa = EXCLUDED.pass2_blueprint_qa,
+                pass1_completed = EXCLUDED.pass1_completed OR dd_document_processing_state.pass1_completed,
+                pass2_completed = EXCLUDED.pass2_completed OR dd_document_processing_state.pass2_completed,
                 updated_at = NOW()
-            """, {
-                'run_id': run_id,
-                'document_id': doc.get('id'),
-                'document_name': doc.get('original_file_name', doc.get('filename')),
-                'content_hash': doc_hash,
-                'folder_category': doc.get('folder_category', ''),
-                'ai_category': doc.get('ai_category', doc.get('ai_document_type', ''))
-            })
+            """), rows)
 
         self.db.commit()
         logger.info(f"Saved state for {len(documents)} documents in run {run_id}")
@@ -370,19 +466,19 @@ class ChangeDetector:
         if not unchanged_doc_ids:
             return {}
 
-        placeholders = ','.join(['%s'] * len(unchanged_doc_ids))
-        result = self.db.execute(f"""
+        result = self.db.execute(text("""
             SELECT
                 document_id,
                 pass1_result,
                 pass2_findings,
+                pass2_blueprint_qa,
                 pass1_completed,
                 pass2_completed
             FROM dd_document_processing_state
-            WHERE run_id = %s
-            AND document_id IN ({placeholders})
+            WHERE run_id = :run_id
+            AND document_id = ANY(CAST(:document_ids AS uuid[]))
             AND pass1_completed = true
-        """, [previous_run_id] + unchanged_doc_ids)
+        """), {'run_id': previous_run_id, 'document_ids': list(unchanged_doc_ids)})
 
         reusable = {}
         for row in result.fetchall():
@@ -390,6 +486,7 @@ class ChangeDetector:
             reusable[doc_id] = {
                 'pass1_result': row.pass1_result,
                 'pass2_findings': row.pass2_findings,
+                'pass2_blueprint_qa': row.pass2_blueprint_qa or [],
                 'pass1_completed': row.pass1_completed,
                 'pass2_completed': row.pass2_completed
             }
@@ -411,12 +508,12 @@ class ChangeDetector:
         params = {'run_id': run_id, 'document_id': document_id}
 
         if pass1_result is not None:
-            updates.append("pass1_result = %(pass1_result)s, pass1_completed = true")
-            params['pass1_result'] = pass1_result
+            updates.append("pass1_result = CAST(:pass1_result AS jsonb), pass1_completed = true")
+            params['pass1_result'] = json.dumps(pass1_result)
 
         if pass2_findings is not None:
-            updates.append("pass2_findings = %(pass2_findings)s, pass2_completed = true")
-            params['pass2_findings'] = pass2_findings
+            updates.append("pass2_findings = CAST(:pass2_findings AS jsonb), pass2_completed = true")
+            params['pass2_findings'] = json.dumps(pass2_findings)
 
         if entity_extracted:
             updates.append("entity_extracted = true")
@@ -426,9 +523,61 @@ class ChangeDetector:
 
         if updates:
             updates.append("updated_at = NOW()")
-            self.db.execute(f"""
+            self.db.execute(text(f"""
                 UPDATE dd_document_processing_state
                 SET {', '.join(updates)}
-                WHERE run_id = %(run_id)s AND document_id = %(document_id)s
-            """, params)
+                WHERE run_id = :run_id AND document_id = :document_id
+            """), params)
             self.db.commit()
+
+    def save_cluster_results(self, run_id: str, clusters: Dict[str, Dict[str, Any]]):
+        """
+        Save Pass 3 results per document cluster for reuse by later runs.
+
+        Args:
+            run_id: Run the results belong to
+            clusters: cluster name -> {'document_ids', 'cross_doc_findings'}
+        """
+        rows = [
+            {
+                'run_id': run_id,
+                'cluster_name': name,
+                'document_ids': json.dumps(sorted(str(d) for d in cluster.get('document_ids', []))),
+                'cross_doc_findings': json.dumps(cluster.get('cross_doc_findings', [])),
+            }
+            for name, cluster in clusters.items()
+        ]
+        if not rows:
+            return
+
+        self.db.execute(text("""
+            INSERT INTO dd_cluster_processing_state
+            (run_id, cluster_name, document_ids, cross_doc_findings)
+            VALUES (:run_id, :cluster_name, CAST(:document_ids AS jsonb), CAST(:cross_doc_findings AS jsonb))
+            ON CONFLICT (run_id, cluster_name) DO UPDATE SET
+            document_ids = EXCLUDED.document_ids,
+            cross_doc_findings = EXCLUDED.cross_doc_findings
+        """), rows)
+        self.db.commit()
+        logger.info(f"Saved Pass 3 results for {len(rows)} clusters in run {run_id}")
+
+    def get_cluster_results(self, run_id: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Get a run's Pass 3 results per cluster.
+
+        A cluster's findings can be reused when the cluster holds exactly the
+        same documents and none of them changed.
+        """
+        result = self.db.execute(text("""
+            SELECT cluster_name, document_ids, cross_doc_findings
+            FROM dd_cluster_processing_state
+            WHERE run_id = :run_id
+        """), {'run_id': run_id})
+
+        return {
+            row.cluster_name: {
+                'document_ids': sorted(str(d) for d in (row.document_ids or [])),
+                'cross_doc_findings': row.cross_doc_findings or [],
+            }
+            for row in result.fetchall()
+        }
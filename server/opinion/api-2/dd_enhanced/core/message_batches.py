@@ -0,0 +1,375 @@
+"""
+Anthropic Message Batches execution for latency-tolerant passes.
+
+Pass 1 extraction, Pass 2 per-document analysis, document classification and
+compression are independent per document and nobody is waiting on any single
+response. Submitting them through the Message Batches API instead of as live
+calls halves their cost and takes them out of the per-minute request/token
+budget entirely, at the price of latency (most batches finish within an hour,
+the API allows up to 24).
+
+BatchClaudeClient is a drop-in AsyncClaudeClient: run_many() submits the
+requests as one or more message batches, polls until they end, maps results
+back by request and falls back to live calls for stragglers (errored,
+expired, unparseable or still pending at max_wait). Because
+AsyncClaudeClient.from_client returns an AsyncClaudeClient unchanged, any
+code that fans out through from_client(...).run_many - Pass 2 in the
+orchestrator, compress_all_documents - uses batches when handed a
+BatchClaudeClient. Single calls (complete/acomplete) stay live.
+
+Configuration (environment):
+    DD_USE_MESSAGE_BATCHES           Batch mode for orchestrated runs (default false)
+    DD_CLASSIFY_USE_MESSAGE_BATCHES  Batch mode for document classification (default false)
+    CLAUDE_BATCH_POLL_SECONDS        Seconds between status polls (default 30)
+    CLAUDE_BATCH_MAX_WAIT_SECONDS    Give up on a batch and go live after this (default 21600)
+    CLAUDE_BATCH_MAX_REQUESTS        Requests per submitted batch (default 10000)
+    CLAUDE_BATCH_MIN_REQUESTS        Smaller fan-outs run live (default 10)
+    CLAUDE_BATCH_FALLBACK_LIVE       Re-run stragglers as live calls (default true)
+
+Usage:
+    client = BatchClaudeClient.from_client(claude_client)
+    results = client.run_many(requests)  # same contract as AsyncClaudeClient.run_many
+"""
+import anthropic
+import os
+import time
+import logging
+from dataclasses import dataclass, field
+from typing import Optional, Dict, Any, List, Callable, Tuple
+
+from .claude_client import ClaudeClient
+from .async_claude_client import AsyncClaudeClient, CompletionRequest, CompletionResult, DEFAULT_CONCURRENCY
+from .response_cache import make_cache_key
+from .queue.rate_limiter import RateLimiter
+
+logger = logging.getLogger(__name__)
+
+# API limits per batch are 100,000 requests and 256 MB; stay well under the size cap
+MAX_BATCH_REQUESTS = 100_000
+MAX_BATCH_CHARS = 200_000_000
+
+# After cancelling an overdue batch, wait this long for it to end so
+# already-finished results can still be collected
+CANCEL_GRACE_SECONDS = 120
+
+
+def _env_bool(name: str, default: str) -> bool:
+    return os.environ.get(name, default).lower() == "true"
+
+
+@dataclass
+class MessageBatchConfig:
+    """Configuration for Message Batches execution."""
+    enabled: bool = False
+    classify_enabled: bool = False
+    poll_interval_seconds: float = 30.0
+    max_wait_seconds: float = 21600.0
+    max_requests_per_batch: int = 10000
+    min_requests: int = 10
+    fallback_to_live: bool = True
+
+    @classmethod
+    def from_env(cls) -> 'MessageBatchConfig':
+        """Load configuration from environment variables."""
+        return cls(
+            enabled=_env_bool("DD_USE_MESSAGE_BATCHES", "false"),
+            classify_enabled=_env_bool("DD_CLASSIFY_USE_MESSAGE_BATCHES", "false"),
+            poll_interval_seconds=float(os.environ.get("CLAUDE_BATCH_POLL_SECONDS", "30")),
+            max_wait_seconds=float(os.environ.get("CLAUDE_BATCH_MAX_WAIT_SECONDS", "21600")),
+            max_requests_per_batch=min(
+                int(os.environ.get("CLAUDE_BATCH_MAX_REQUESTS", "10000")), MAX_BATCH_REQUESTS
+            ),
+            min_requests=int(os.environ.get("CLAUDE_BATCH_MIN_REQUESTS", "10")),
+            fallback_to_live=_env_bool("CLAUDE_BATCH_FALLBACK_LIVE", "true"),
+        )
+
+
+@dataclass
+class _PendingRequest:
+    """A request submitted to a batch, awaiting its result."""
+    index: int
+    request: CompletionRequest
+    model: str
+    cache_key: Optional[str]
+
+
+@dataclass
+class BatchClaudeClient(AsyncClaudeClient):
+    """
+    AsyncClaudeClient whose run_many goes through the Message Batches API.
+
+    Token usage is recorded with batch pricing; the response cache is read
+    before submitting and written with every successful result.
+    """
+
+    batch_config: MessageBatchConfig = field(default_factory=MessageBatchConfig.from_env)
+
+    @classmethod
+    def from_client(
+        cls,
+        client: ClaudeClient,
+        rate_limiter: Optional[RateLimiter] = None,
+        batch_config: Optional[MessageBatchConfig] = None
+    ) -> 'BatchClaudeClient':
+        """
+        Wrap an existing ClaudeClient, sharing its usage tracking, response
+        cache and rate limiter (used for live fallback calls).
+
+        Returns the client unchanged if it is already a BatchClaudeClient.
+        """
+        if isinstance(client, cls):
+            return client
+        return cls(
+            api_key=client.api_key,
+            usage=client.usage,
+            model_tier=client.model_tier,
+            response_cache=client.response_cache,
+            rate_limiter=rate_limiter or client.rate_limiter,
+            batch_config=batch_config or MessageBatchConfig.from_env(),
+        )
+
+    def run_many(
+        self,
+        requests: List[CompletionRequest],
+        concurrency: int = DEFAULT_CONCURRENCY,
+        progress_callback: Optional[Callable[[int, int, CompletionResult], None]] = None
+    ) -> List[CompletionResult]:
+        """
+        Run requests through message batches (same contract as AsyncClaudeClient.run_many).
+
+        Fan-outs smaller than batch_config.min_requests run live - a batch
+        round trip is not worth it for a handful of calls.
+
+        Args:
+            requests: Requests to run
+            concurrency: Maximum in-flight requests for live fallback calls
+            progress_callback: Optional callback(completed, total, result) per finished request
+
+        Returns:
+            CompletionResult list in the same order as requests
+        """
+        if len(requests) < self.batch_config.min_requests:
+            return super().run_many(requests, concurrency=concurrency, progress_callback=progress_callback)
+
+        total = len(requests)
+        results: Dict[int, CompletionResult] = {}
+
+        def record(index: int, response: Dict[str, Any], elapsed: float):
+            result = CompletionResult(
+                request_id=requests[index].request_id,
+                response=response,
+                elapsed_seconds=elapsed,
+            )
+            results[index] = result
+            if progress_callback:
+                progress_callback(len(results), total, result)
+
+        # Response cache first - cached requests never reach the batch
+        pending: List[_PendingRequest] = []
+        for index, request in enumerate(requests):
+            model, cache_key, cached = self._lookup_cache(request)
+            if cached is not None:
+                record(index, cached, 0.0)
+            else:
+                pending.append(_PendingRequest(index, request, model, cache_key))
+
+        stragglers: List[_PendingRequest] = []
+        if pending:
+            start = time.time()
+            stragglers = self._run_batches(
+                pending,
+                on_result=lambda p, response: record(p.index, response, time.time() - start)
+            )
+
+        if stragglers:
+            if self.batch_config.fallback_to_live:
+                logger.info(f"[BatchClaudeClient.run_many] Running {len(stragglers)} straggler(s) as live calls")
+                already_done = len(results)
+
+                def on_live(completed: int, _total: int, result: CompletionResult):
+                    if progress_callback:
+                        progress_callback(already_done + completed, total, result)
+
+                live = super().run_many([p.request for p in stragglers], concurrency=concurrency, progress_callback=on_live)
+                for p, result in zip(stragglers, live):
+                    results[p.index] = result
+            else:
+                for p in stragglers:
+                    record(p.index, {"error": "Message batch did not return a result", "raw": ""}, 0.0)
+
+        return [results[i] for i in range(total)]
+
+    def _lookup_cache(self, request: CompletionRequest) -> Tuple[str, Optional[str], Optional[Dict[str, Any]]]:
+        """(resolved_model, cache_key, cached_response) for a request, as acomplete computes them."""
+        model = self._resolve_model(request.model)
+        if self.response_cache is None:
+            return model, None, None
+
+        use_cache = request.use_cache
+        if use_cache is None:
+            use_cache = self.response_cache.is_enabled_for(request.pass_name)
+        if not use_cache:
+            return model, None, None
+
+        system_prompt = request.system if request.system else "You are an expert legal analyst."
+        context_blocks = [b for b in (request.context_blocks or []) if b]
+        cache_prompt = context_blocks + [request.prompt] if context_blocks else request.prompt
+        cache_key = make_cache_key(model, system_prompt, cache_prompt, request.temperature, request.max_tokens)
+        return model, cache_key, self._complete_from_cache(cache_key, request.json_mode)
+
+    def _build_batch_params(self, pending: _PendingRequest) -> Dict[str, Any]:
+        """Messages API params for one batch entry (same shape acomplete sends)."""
+        request = pending.request
+        system_prompt = request.system if request.system else "You are an expert legal analyst."
+        context_blocks = [b for b in (request.context_blocks or []) if b]
+        return {
+            "model": pending.model,
+            "max_tokens": request.max_tokens,
+            "temperature": request.temperature,
+            "system": self._build_system_param(system_prompt, request.cache_system and not context_blocks),
+            "messages": [{"role": "user", "content": self._build_user_content(request.prompt, context_blocks)}],
+        }
+
+    @staticmethod
+    def _request_chars(request: CompletionRequest) -> int:
+        return len(request.prompt) + len(request.system or "") + sum(len(b) for b in (request.context_blocks or []) if b)
+
+    def _chunk(self, pending: List[_PendingRequest]) -> List[List[_PendingRequest]]:
+        """Split requests into batches within the per-batch request and size limits."""
+        chunks: List[List[_PendingRequest]] = [[]]
+        chars = 0
+        for p in pending:
+            size = self._request_chars(p.request)
+            if chunks[-1] and (len(chunks[-1]) >= self.batch_config.max_requests_per_batch
+                               or chars + size > MAX_BATCH_CHARS):
+                chunks.append([])
+                chars = 0
+            chunks[-1].append(p)
+            chars += size
+        return [c for c in chunks if c]
+
+    def _run_batches(
+        self,
+        pending: List[_PendingRequest],
+        on_result: Callable[[_PendingRequest, Dict[str, Any]], None]
+    ) -> List[_PendingRequest]:
+        """
+        Submit, poll and collect message batches.
+
+        Returns the requests that did not produce a usable result.
+        """
+        stragglers: List[_PendingRequest] = []
+        outstanding: Dict[str, Dict[str, _PendingRequest]] = {}
+
+        for chunk in self._chunk(pending):
+            by_custom_id = {f"req-{p.index}": p for p in chunk}
+            try:
+                batch = self._client.messages.batches.create(requests=[
+                    {"custom_id": custom_id, "params": self._build_batch_params(p)}
+                    for custom_id, p in by_custom_id.items()
+                ])
+            except anthropic.APIError as e:
+                logger.error(f"[BatchClaudeClient._run_batches] Batch submission failed for {len(chunk)} requests: {e}")
+                stragglers.extend(chunk)
+                continue
+            logger.info(f"[BatchClaudeClient._run_batches] Submitted batch {batch.id} with {len(chunk)} requests")
+            outstanding[batch.id] = by_custom_id
+
+        deadline = time.time() + self.batch_config.max_wait_seconds
+        cancelled = False
+        while outstanding:
+            time.sleep(self.batch_config.poll_interval_seconds)
+
+            for batch_id in list(outstanding):
+                try:
+                    batch = self._client.messages.batches.retrieve(batch_id)
+                except anthropic.APIError as e:
+                    logger.warning(f"[BatchClaudeClient._run_batches] Polling batch {batch_id} failed: {e}")
+                    continue
+
+                counts = batch.request_counts
+                logger.info(
+                    f"[BatchClaudeClient._run_batches] Batch {batch_id}: {batch.processing_status} "
+                    f"(processing={counts.processing}, succeeded={counts.succeeded}, errored={counts.errored})"
+                )
+                if batch.processing_status == "ended":
+                    stragglers.extend(self._collect_results(batch_id, outstanding.pop(batch_id), on_result))
+
+            if outstanding and time.time() >= deadline:
+                if cancelled:
+                    logger.warning(
+                        f"[BatchClaudeClient._run_batches] {len(outstanding)} batch(es) did not end after cancel"
+                    )
+                    for by_custom_id in outstanding.values():
+                        stragglers.extend(by_custom_id.values())
+                    break
+                # Cancel overdue batches; requests already processed are still returned once they end
+                for batch_id in outstanding:
+                    try:
+                        self._client.messages.batches.cancel(batch_id)
+                    except anthropic.APIError as e:
+                        logger.warning(f"[BatchClaudeClient._run_batches] Cancelling batch {batch_id} failed: {e}")
+                logger.warning(
+                    f"[BatchClaudeClient._run_batches] {len(outstanding)} batch(es) exceeded "
+                    f"{self.batch_config.max_wait_seconds:.0f}s, cancelled"
+                )
+                cancelled = True
+                deadline = time.time() + CANCEL_GRACE_SECONDS
+
+        return stragglers
+
+    def _collect_results(
+        self,
+        batch_id: str,
+        by_custom_id: Dict[str, _PendingRequest],
+        on_result: Callable[[_PendingRequest, Dict[str, Any]], None]
+    ) -> List[_PendingRequest]:
+        """Map an ended batch's results back to requests; returns those without a usable result."""
+        unresolved = dict(by_custom_id)
+        try:
+            for entry in self._client.messages.batches.results(batch_id):
+                p = unresolved.get(entry.custom_id)
+                if p is None:
+                    continue
+                if entry.result.type != "succeeded":
+                    logger.debug(f"[BatchClaudeClient._collect_results] {entry.custom_id}: {entry.result.type}")
+                    continue
+
+                response = self._handle_message(p, entry.result.message)
+                if response is not None:
+                    del unresolved[entry.custom_id]
+                    on_result(p, response)
+        except anthropic.APIError as e:
+            logger.error(f"[BatchClaudeClient._collect_results] Reading results of batch {batch_id} failed: {e}")
+
+        if unresolved:
+            logger.warning(
+                f"[BatchClaudeClient._collect_results] Batch {batch_id}: "
+                f"{len(unresolved)}/{len(by_custom_id)} requests without a usable result"
+            )
+        return list(unresolved.values())
+
+    def _handle_message(self, pending: _PendingRequest, message: Any) -> Optional[Dict[str, Any]]:
+        """Record usage and build the complete()-shaped response, or None if JSON parsing failed."""
+        cache_read = getattr(message.usage, "cache_read_input_tokens", 0) or 0
+        cache_write = getattr(message.usage, "cache_creation_input_tokens", 0) or 0
+        self.usage.add(
+            pending.model,
+            message.usage.input_tokens,
+            message.usage.output_tokens,
+            cache_read_tokens=cache_read,
+            cache_write_tokens=cache_write,
+            batch=True
+        )
+
+        content = message.content[0].text
+        if pending.request.json_mode:
+            parsed = self._parse_json_response(content)
+            if "error" in parsed:
+                # Live fallback retries the parse like complete() does
+                return None
+            self._store_in_cache(pending.cache_key, pending.model, content, message.usage)
+            return parsed
+
+        self._store_in_cache(pending.cache_key, pending.model, content, message.usage)
+        return {"text": content}
@@ -9,6 +9,7 @@ from .parallel_orchestrator import (
     ProcessingMode,
     OrchestratorConfig,
     ProcessingResult,
+    ProcessingCancelled,
     ParallelOrchestrator,
     create_orchestrator,
 )
@@ -17,6 +18,7 @@ __all__ = [
     'ProcessingMode',
     'OrchestratorConfig',
     'ProcessingResult',
+    'ProcessingCancelled',
     'ParallelOrchestrator',
     'create_orchestrator',
 ]
@@ -3,6 +3,8 @@ Parallel processing orchestrator for DD analysis.
 
 Auto-switches between sequential and parallel processing based on document count.
 Threshold is configurable via DD_PARALLEL_THRESHOLD environment variable.
+Above the threshold, DD_USE_MESSAGE_BATCHES=true selects batch mode: the
+per-document passes go through the Anthropic Message Batches API instead.
 """
 
 import os
@@ -12,15 +14,23 @@ from typing import Dict, List, Any, Optional, Callable
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
-from concurrent.futures import ThreadPoolExecutor, as_completed
 import threading
 
 logger = logging.getLogger(__name__)
 
 
+# Longest a paused run waits between passes before giving up
+PAUSE_TIMEOUT_SECONDS = 3600
+
+
+class ProcessingCancelled(Exception):
+    """Raised between passes when the run has been cancelled."""
+
+
 class ProcessingMode(Enum):
     SEQUENTIAL = "sequential"
     PARALLEL = "parallel"
+    BATCH = "batch"  # Parallel pipeline, per-document passes via Message Batches API
 
 
 @dataclass
@@ -32,10 +42,8 @@ class OrchestratorConfig:
     # Worker configuration
     max_workers: int = 20  # Increased from 10 for better throughput
 
-    # Rate limiting
-    requests_per_minute: int = 50
-    tokens_per_minute: int = 100000
-    max_concurrent: int = 10
+    # Rate limits come from the process-wide Claude limiter (CLAUDE_* env vars,
+    # see queue.rate_limiter.get_rate_limiter), shared with ClaudeClient
 
     # Synthesis configuration
     opus_threshold: int = 300  # Use Opus for 300+ docs
@@ -48,19 +56,21 @@ class OrchestratorConfig:
     # Incremental processing
     enable_incremental: bool = True
 
+    # Message Batches API for per-document passes (overnight runs: half price,
+    # outside per-minute rate limits, but results take minutes to hours)
+    use_message_batches: bool = False
+
     @classmethod
     def from_env(cls) -> 'OrchestratorConfig':
         """Load configuration from environment variables."""
         return cls(
             parallel_threshold=int(os.environ.get("DD_PARALLEL_THRESHOLD", "100")),
             max_workers=int(os.environ.get("DD_PARALLEL_WORKERS", "10")),
-            requests_per_minute=int(os.environ.get("CLAUDE_REQUESTS_PER_MINUTE", "50")),
-            tokens_per_minute=int(os.environ.get("CLAUDE_TOKENS_PER_MINUTE", "100000")),
-            max_concurrent=int(os.environ.get("CLAUDE_MAX_CONCURRENT", "10")),
             opus_threshold=int(os.environ.get("DD_OPUS_THRESHOLD", "300")),
             batch_size=int(os.environ.get("DD_BATCH_SIZE", "20")),
             max_retries=int(os.environ.get("DD_MAX_RETRIES", "3")),
             enable_incremental=os.environ.get("DD_ENABLE_INCREMENTAL", "true").lower() == "true",
+            use_message_batches=os.environ.get("DD_USE_MESSAGE_BATCHES", "false").lower() == "true",
         )
 
 
@@ -150,10 +160,14 @@ class ParallelOrchestrator:
         # Processing state
         self._lock = threading.Lock()
         self._cancelled = False
+        self._control_key: Optional[str] = None
 
     def determine_mode(self, doc_count: int) -> ProcessingMode:
         """Determine processing mode based on document count."""
         if doc_count >= self.config.parallel_threshold:
+            if self.config.use_message_batches:
+                logger.info(f"Document count {doc_count} >= threshold {self.config.parallel_threshold}, using BATCH mode")
+                return ProcessingMode.BATCH
             logger.info(f"Document count {doc_count} >= threshold {self.config.parallel_threshold}, using PARALLEL mode")
             return ProcessingMode.PARALLEL
         else:
@@ -174,11 +188,13 @@ class ParallelOrchestrator:
         include_tier3: bool = False,
         entity_map: Optional[List[Dict[str, Any]]] = None,
         validated_context: Optional[Dict[str, Any]] = None,
+        control_key: Optional[str] = None,
     ) -> ProcessingResult:
         """
         Process all documents in a DD project.
 
-        Automatically selects sequential or parallel mode based on document count.
+        Automatically selects sequential, parallel or batch mode based on
+        document count and configuration.
 
         Args:
             dd_id: DD project ID
@@ -193,11 +209,14 @@ class ParallelOrchestrator:
             include_tier3: Whether to include tier 3 questions
             entity_map: Optional list of entity dicts for party validation
             validated_context: User-validated corrections from Checkpoint C (post-analysis)
+            control_key: Optional checkpoint ID; the run then follows pause/resume/cancel
+                commands published through shared.run_control between passes
 
         Returns:
             ProcessingResult with all findings and statistics
         """
         started_at = datetime.utcnow()
+        self._control_key = control_key
         doc_count = len(documents)
         mode = self.determine_mode(doc_count)
 
@@ -245,6 +264,7 @@ class ParallelOrchestrator:
                     include_tier3=include_tier3,
                     entity_map=entity_map,
                     validated_context=validated_context,
+                    mode=mode,
                 )
 
             result.completed_at = datetime.utcnow()
@@ -252,6 +272,13 @@ class ParallelOrchestrator:
 
             return result
 
+        except ProcessingCancelled as e:
+            logger.info(f"Processing stopped for run {run_id}: {e}")
+            result.error = str(e)
+            result.completed_at = datetime.utcnow()
+            result.duration_seconds = (result.completed_at - started_at).total_seconds()
+            return result
+
         except Exception as e:
             logger.exception(f"Processing failed: {e}")
             result.error = str(e)
@@ -296,39 +323,13 @@ class ParallelOrchestrator:
         doc_count = len(documents)
 
         # Check for incremental processing
-        documents_to_process = documents
-        cached_results = {}
-
-        if self.config.enable_incremental and previous_run_id and self.db_session:
-            if checkpoint_callback:
-                checkpoint_callback('change_detection', {})
-
-            from dd_enhanced.core.incremental import ChangeDetector
-            detector = ChangeDetector(self.db_session)
-            change_set = detector.detect_changes(
-                dd_id=dd_id,
-                current_run_id=run_id,
-                previous_run_id=previous_run_id,
-                current_documents=documents
-            )
+        if checkpoint_callback and self.config.enable_incremental and previous_run_id and self.db_session:
+            checkpoint_callback('change_detection', {})
 
-            if not change_set.has_changes:
-                logger.info("No changes detected, using cached results")
-                # Return cached results
-                cached_results = detector.get_reusable_results(
-                    previous_run_id,
-                    [d.document_id for d in change_set.unchanged_documents]
-                )
-                result.documents_from_cache = len(cached_results)
-            else:
-                # Only process changed documents
-                documents_to_process = [
-                    d for d in documents
-                    if str(d.get('id')) in change_set.documents_to_process
-                ]
-                result.documents_from_cache = len(change_set.unchanged_documents)
-                logger.info(f"Processing {len(documents_to_process)} changed documents, "
-                           f"reusing {result.documents_from_cache} cached results")
+        documents_to_process, carried = self._split_for_incremental(
+            dd_id, run_id, documents, previous_run_id
+        )
+        result.documents_from_cache = len(carried)
 
         # Pass 1: Extract & Index
         if checkpoint_callback:
@@ -343,6 +344,7 @@ class ParallelOrchestrator:
             verbose=False
         )
         result.pass1_results = pass1_results
+        new_pass1_results = {key: list(value) for key, value in pass1_results.items() if isinstance(value, list)}
 
         # Build knowledge graph
         if checkpoint_callback:
@@ -362,6 +364,8 @@ class ParallelOrchestrator:
             max_questions=150
         )
 
+        self._check_run_control()
+
         # Pass 2: Per-Document Analysis
         if checkpoint_callback:
             checkpoint_callback('pass2_analysis', {})
@@ -389,8 +393,12 @@ class ParallelOrchestrator:
             entity_map=entity_map,
             progress_callback=progress_callback  # Per-document progress updates
         )
+        new_pass2_findings = list(pass2_findings)
+        self._merge_carried_results(pass1_results, pass2_findings, carried)
         result.pass2_findings = pass2_findings
 
+        self._check_run_control()
+
         # Pass 3: Cross-Document Synthesis
         if checkpoint_callback:
             checkpoint_callback('pass3_crossdoc', {})
@@ -408,6 +416,8 @@ class ParallelOrchestrator:
         )
         result.pass3_results = pass3_results
 
+        self._check_run_control()
+
         # Pass 4: Deal Synthesis
         if checkpoint_callback:
             checkpoint_callback('pass4_synthesis', {})
@@ -426,6 +436,8 @@ class ParallelOrchestrator:
         )
         result.pass4_results = pass4_results
 
+        self._check_run_control()
+
         # Pass 5: Verification (QC)
         if checkpoint_callback:
             checkpoint_callback('pass5_verification', {})
@@ -453,6 +465,10 @@ class ParallelOrchestrator:
             result.total_output_tokens = cost_summary.get('total_output_tokens', 0)
             result.estimated_cost_usd = cost_summary.get('total_cost_usd', 0.0)
 
+        # Save processing state for incremental reuse
+        if self.config.enable_incremental and self.db_session:
+            self._save_processing_state(run_id, documents, new_pass1_results, new_pass2_findings, carried)
+
         result.success = True
         result.documents_processed = len(documents_to_process)
 
@@ -475,103 +491,75 @@ class ParallelOrchestrator:
         include_tier3: bool = False,
         entity_map: Optional[List[Dict[str, Any]]] = None,
         validated_context: Optional[Dict[str, Any]] = None,
+        mode: ProcessingMode = ProcessingMode.PARALLEL,
     ) -> ProcessingResult:
         """
         Process documents in parallel using worker pool.
 
         Uses job queue for document distribution and hierarchical
-        synthesis for aggregating results.
+        synthesis for aggregating results. In BATCH mode Pass 1 and Pass 2
+        are submitted as message batches; stragglers fall back to live calls.
         """
-        from dd_enhanced.core.queue import create_job_queue, RateLimiter, RateLimitConfig
+        from dd_enhanced.core.queue import create_job_queue, get_rate_limiter
         from dd_enhanced.core.queue.worker_pool import WorkerPool, WorkerConfig
         from dd_enhanced.core.synthesis import create_synthesis_pipeline, SynthesisLevel
-        from dd_enhanced.core.pass1_extract import run_pass1_extraction
+        from dd_enhanced.core.pass1_extract import build_extraction_request, collect_pass1_results
         from dd_enhanced.core.question_prioritizer import prioritize_questions
+        from dd_enhanced.core.async_claude_client import AsyncClaudeClient, CompletionRequest
 
         result = ProcessingResult(
             success=False,
-            mode=ProcessingMode.PARALLEL,
+            mode=mode,
             started_at=datetime.utcnow(),
         )
 
         doc_count = len(documents)
 
-        # Initialize rate limiter
-        rate_config = RateLimitConfig(
-            requests_per_minute=self.config.requests_per_minute,
-            tokens_per_minute=self.config.tokens_per_minute,
-            max_concurrent=self.config.max_concurrent,
-        )
-        rate_limiter = RateLimiter(rate_config)
+        # Share the process-wide Claude rate limiter so Pass 2 fan-out and the
+        # sequential passes draw from one budget (configured from CLAUDE_* env vars)
+        rate_limiter = getattr(self.claude_client, 'rate_limiter', None) or get_rate_limiter()
+
+        # Fan-out client for the per-document passes
+        if mode == ProcessingMode.BATCH:
+            from dd_enhanced.core.message_batches import BatchClaudeClient
+            fanout_client = BatchClaudeClient.from_client(self.claude_client, rate_limiter=rate_limiter)
+        else:
+            fanout_client = AsyncClaudeClient.from_client(self.claude_client, rate_limiter=rate_limiter)
 
         # Initialize job queue
         job_queue = create_job_queue()
 
         # Check for incremental processing
-        documents_to_process = documents
-        cached_pass1 = {}
-        cached_pass2 = {}
-
-        if self.config.enable_incremental and previous_run_id and self.db_session:
-            if checkpoint_callback:
-                checkpoint_callback('change_detection', {'mode': 'parallel'})
-
-            from dd_enhanced.core.incremental import ChangeDetector
-            detector = ChangeDetector(self.db_session)
-            change_set = detector.detect_changes(
-                dd_id=dd_id,
-                current_run_id=run_id,
-                previous_run_id=previous_run_id,
-                current_documents=documents
-            )
+        if checkpoint_callback and self.config.enable_incremental and previous_run_id and self.db_session:
+            checkpoint_callback('change_detection', {'mode': 'parallel'})
 
-            unchanged_ids = [d.document_id for d in change_set.unchanged_documents]
-            if unchanged_ids:
-                reusable = detector.get_reusable_results(previous_run_id, unchanged_ids)
-                for doc_id, results in reusable.items():
-                    if results.get('pass1_completed'):
-                        cached_pass1[doc_id] = results.get('pass1_result', {})
-                    if results.get('pass2_completed'):
-                        cached_pass2[doc_id] = results.get('pass2_findings', [])
-
-                result.documents_from_cache = len(reusable)
-
-            # Only process changed documents
-            documents_to_process = [
-                d for d in documents
-                if str(d.get('id')) in change_set.documents_to_process
-            ]
-
-            logger.info(f"Parallel processing: {len(documents_to_process)} changed, "
-                       f"{result.documents_from_cache} cached")
+        documents_to_process, carried = self._split_for_incremental(
+            dd_id, run_id, documents, previous_run_id
+        )
+        result.documents_from_cache = len(carried)
 
         # ===== PASS 1: Parallel Extraction =====
         if checkpoint_callback:
             checkpoint_callback('pass1_parallel', {
                 'documents_to_process': len(documents_to_process),
-                'cached': result.documents_from_cache
+                'cached': result.documents_from_cache,
+                'mode': mode.value
             })
 
         if progress_callback:
             progress_callback(0, 6, f"Running Pass 1: Parallel extraction ({len(documents_to_process)} docs)")
 
-        # For Pass 1, we still run sequentially but could parallelize in future
-        # The main bottleneck is Pass 2 which we parallelize below
-        pass1_results = run_pass1_extraction(
+        pass1_requests = [
+            CompletionRequest(request_id=i, json_mode=True, pass_name="pass1", **build_extraction_request(doc))
+            for i, doc in enumerate(documents_to_process)
+        ]
+        pass1_completions = fanout_client.run_many(pass1_requests, concurrency=self.config.max_workers)
+        pass1_results = collect_pass1_results(
             documents_to_process,
-            self.claude_client,
-            verbose=False
+            [completion.response for completion in pass1_completions]
         )
         result.pass1_results = pass1_results
-
-        # Merge cached Pass 1 results
-        for doc_id, cached_result in cached_pass1.items():
-            # Merge into pass1_results structure
-            for key in ['key_dates', 'financial_figures', 'coc_clauses', 'consent_requirements', 'parties']:
-                if key in cached_result:
-                    if key not in pass1_results:
-                        pass1_results[key] = []
-                    pass1_results[key].extend(cached_result.get(key, []))
+        new_pass1_results = {key: list(value) for key, value in pass1_results.items() if isinstance(value, list)}
 
         # ===== Build Knowledge Graph =====
         if checkpoint_callback:
@@ -590,6 +578,8 @@ class ParallelOrchestrator:
             max_questions=150
         )
 
+        self._check_run_control()
+
         # ===== PASS 2: Parallel Analysis =====
         if checkpoint_callback:
             checkpoint_callback('pass2_parallel', {
@@ -614,69 +604,62 @@ class ParallelOrchestrator:
         failed_docs = []
         processed_count = 0
 
-        def process_document(doc: Dict) -> Dict[str, Any]:
-            """Process a single document through Pass 2."""
-            from dd_enhanced.core.pass2_analyze import analyze_single_document
+        from dd_enhanced.core.pass2_analyze import build_analysis_request, process_analysis_response
 
+        # Build every Pass 2 request up front, then fan out (or submit as message batches)
+        requests = []
+        for i, doc in enumerate(documents_to_process):
             try:
-                with rate_limiter:
-                    findings = analyze_single_document(
-                        doc,
-                        ref_doc_objects,
-                        blueprint,
-                        self.claude_client,
-                        transaction_context=transaction_context,
-                        prioritized_questions=prioritized_questions,
-                        entity_map=entity_map,
-                    )
-                    return {
-                        'success': True,
-                        'doc_id': doc.get('id'),
-                        'findings': findings
-                    }
+                request = build_analysis_request(
+                    doc,
+                    ref_doc_objects,
+                    blueprint,
+                    transaction_context=transaction_context,
+                    prioritized_questions=prioritized_questions,
+                    entity_map=entity_map,
+                )
+            except Exception as e:
+                logger.error(f"Failed to build Pass 2 request for {doc.get('filename')}: {e}")
+                failed_docs.append({'doc_id': doc.get('id'), 'error': str(e)})
+                continue
+
+            if request is None:
+                # Skipped document (reference doc or needs review) - nothing to analyze
+                processed_count += 1
+                continue
+
+            requests.append(CompletionRequest(
+                request_id=i,
+                model=self.claude_client.get_model_for_pass("pass2"),
+                json_mode=True,
+                pass_name="pass2",
+                **request
+            ))
+
+        total = len(documents_to_process)
+
+        def on_complete(completed: int, _total: int, completion):
+            nonlocal processed_count
+            doc = documents_to_process[completion.request_id]
+            try:
+                if not completion.ok:
+                    raise RuntimeError(completion.response.get('error', 'Unknown error'))
+                all_findings.extend(process_analysis_response(doc, completion.response))
+                processed_count += 1
             except Exception as e:
                 logger.error(f"Failed to process document {doc.get('filename')}: {e}")
-                return {
-                    'success': False,
-                    'doc_id': doc.get('id'),
-                    'error': str(e)
-                }
+                failed_docs.append({'doc_id': doc.get('id'), 'error': str(e)})
 
-        # Use ThreadPoolExecutor for parallel processing
-        with ThreadPoolExecutor(max_workers=self.config.max_workers) as executor:
-            futures = {
-                executor.submit(process_document, doc): doc
-                for doc in documents_to_process
-            }
+            # Update progress more frequently (every 5 docs)
+            current = processed_count + len(failed_docs)
+            if progress_callback and (current % 5 == 0 or current == total):
+                progress_callback(1, 6, f"Pass 2: {current}/{total} documents analyzed")
 
-            for future in as_completed(futures):
-                doc = futures[future]
-                try:
-                    result_data = future.result()
-                    if result_data['success']:
-                        all_findings.extend(result_data['findings'])
-                        processed_count += 1
-                    else:
-                        failed_docs.append({
-                            'doc_id': result_data['doc_id'],
-                            'error': result_data.get('error', 'Unknown error')
-                        })
-                except Exception as e:
-                    failed_docs.append({
-                        'doc_id': doc.get('id'),
-                        'error': str(e)
-                    })
-
-                # Update progress more frequently (every 5 docs)
-                total = len(documents_to_process)
-                current = processed_count + len(failed_docs)
-                if progress_callback and (current % 5 == 0 or current == total):
-                    progress_callback(1, 6, f"Pass 2: {current}/{total} documents analyzed")
-
-        # Merge cached Pass 2 findings
-        for doc_id, cached_findings in cached_pass2.items():
-            if isinstance(cached_findings, list):
-                all_findings.extend(cached_findings)
+        fanout_client.run_many(requests, concurrency=self.config.max_workers, progress_callback=on_complete)
+
+        # Merge carried-forward Pass 1 extractions and Pass 2 findings
+        new_pass2_findings = list(all_findings)
+        self._merge_carried_results(pass1_results, all_findings, carried)
 
         result.pass2_findings = all_findings
         result.documents_processed = processed_count
@@ -687,6 +670,8 @@ class ParallelOrchestrator:
             logger.warning(f"Failed to process {len(failed_docs)} documents")
             result.partial_results = True
 
+        self._check_run_control()
+
         # ===== PASS 3: Hierarchical Cross-Document Synthesis =====
         if checkpoint_callback:
             checkpoint_callback('pass3_hierarchical', {
@@ -709,6 +694,8 @@ class ParallelOrchestrator:
         )
         result.pass3_results = pass3_results
 
+        self._check_run_control()
+
         # ===== PASS 4: Deal Synthesis =====
         if checkpoint_callback:
             checkpoint_callback('pass4_synthesis', {'mode': 'parallel'})
@@ -730,6 +717,8 @@ class ParallelOrchestrator:
         )
         result.pass4_results = pass4_results
 
+        self._check_run_control()
+
         # ===== PASS 5: Verification =====
         if checkpoint_callback:
             checkpoint_callback('pass5_verification', {'mode': 'parallel'})
@@ -750,6 +739,8 @@ class ParallelOrchestrator:
         )
         result.pass5_results = pass5_result.to_dict() if hasattr(pass5_result, 'to_dict') else pass5_result
 
+        self._check_run_control()
+
         # ===== Hierarchical Synthesis (for parallel mode) =====
         if checkpoint_callback:
             checkpoint_callback('hierarchical_synthesis', {'doc_count': doc_count})
@@ -778,12 +769,12 @@ class ParallelOrchestrator:
 
         # Save processing state for incremental reuse
         if self.config.enable_incremental and self.db_session:
-            self._save_processing_state(run_id, documents, pass1_results, all_findings)
+            self._save_processing_state(run_id, documents, new_pass1_results, new_pass2_findings, carried)
 
         result.success = len(failed_docs) < len(documents) * 0.5  # Success if <50% failed
 
         if progress_callback:
-            progress_callback(6, 6, "Parallel processing complete")
+            progress_callback(6, 6, f"{mode.value.capitalize()} processing complete")
 
         return result
 
@@ -945,41 +936,103 @@ class ParallelOrchestrator:
             logger.warning(f"Hierarchical synthesis failed (non-fatal): {e}")
             return {}
 
+    def _split_for_incremental(
+        self,
+        dd_id: str,
+        run_id: str,
+        documents: List[Dict[str, Any]],
+        previous_run_id: Optional[str],
+    ) -> tuple:
+        """
+        Diff documents against the previous run.
+
+        Returns (documents_to_process, carried) where carried maps unchanged
+        document IDs to the previous run's stored results. Without a previous
+        run (or with incremental processing disabled) every document is
+        processed.
+        """
+        if not (self.config.enable_incremental and previous_run_id and self.db_session):
+            return documents, {}
+
+        from dd_enhanced.core.incremental import ChangeDetector
+        detector = ChangeDetector(self.db_session)
+        change_set = detector.detect_changes(
+            dd_id=dd_id,
+            current_run_id=run_id,
+            previous_run_id=previous_run_id,
+            current_documents=documents
+        )
+        reusable = detector.get_reusable_results(
+            previous_run_id,
+            [d.document_id for d in change_set.unchanged_documents]
+        )
+        documents_to_process, carried = change_set.split_documents(documents, reusable)
+
+        logger.info(f"Incremental processing: {len(documents_to_process)} to process, "
+                    f"{len(carried)} carried forward from run {previous_run_id}")
+        return documents_to_process, carried
+
+    def _merge_carried_results(
+        self,
+        pass1_results: Dict[str, Any],
+        pass2_findings: List[Dict],
+        carried: Dict[str, Dict[str, Any]],
+    ):
+        """Merge carried-forward Pass 1 extractions and Pass 2 findings in place."""
+        for doc_results in carried.values():
+            cached_pass1 = doc_results.get('pass1_result') or {}
+            for key in ['key_dates', 'financial_figures', 'coc_clauses', 'consent_requirements', 'parties', 'covenants']:
+                if key in cached_pass1:
+                    pass1_results.setdefault(key, []).extend(cached_pass1.get(key, []))
+
+            cached_findings = doc_results.get('pass2_findings')
+            if isinstance(cached_findings, list):
+                pass2_findings.extend(cached_findings)
+
     def _save_processing_state(
         self,
         run_id: str,
         documents: List[Dict],
         pass1_results: Dict,
         pass2_findings: List[Dict],
+        carried: Optional[Dict[str, Dict[str, Any]]] = None,
     ):
-        """Save processing state for incremental reuse."""
+        """
+        Save processing state for incremental reuse.
+
+        pass1_results/pass2_findings hold this run's own results; carried
+        results are saved again under this run so the next run can diff
+        against it alone.
+        """
         try:
             from dd_enhanced.core.incremental import ChangeDetector
 
-            detector = ChangeDetector(self.db_session)
-            detector.save_state(run_id, documents)
+            findings_by_doc: Dict[str, List[Dict]] = {}
+            for finding in pass2_findings:
+                findings_by_doc.setdefault(finding.get('source_document'), []).append(finding)
 
-            # Save per-document results
+            # Per-document results
+            results = {
+                doc_id: {
+                    'pass1_result': doc_results.get('pass1_result') or {},
+                    'pass2_findings': doc_results.get('pass2_findings') or [],
+                }
+                for doc_id, doc_results in (carried or {}).items()
+            }
             for doc in documents:
-                doc_id = doc.get('id')
+                if str(doc.get('id')) in results:
+                    continue
                 doc_name = doc.get('filename', '')
-
-                # Find Pass 1 extraction for this document
                 doc_pass1 = self._find_doc_extraction(pass1_results, doc_name)
-
-                # Find Pass 2 findings for this document
-                doc_pass2 = [
-                    f for f in pass2_findings
-                    if f.get('source_document') == doc_name
-                ]
-
+                doc_pass2 = findings_by_doc.get(doc_name, [])
                 if doc_pass1 or doc_pass2:
-                    detector.update_processing_state(
-                        run_id=run_id,
-                        document_id=doc_id,
-                        pass1_result=doc_pass1,
-                        pass2_findings=doc_pass2,
-                    )
+                    results[str(doc.get('id'))] = {
+                        'pass1_result': doc_pass1 or {},
+                        'pass2_findings': doc_pass2,
+                    }
+
+            detector = ChangeDetector(self.db_session)
+            detector.save_state(run_id, documents, results)
 
         except Exception as e:
             logger.warning(f"Failed to save processing state: {e}")
@@ -1007,11 +1060,43 @@ class ParallelOrchestrator:
         return doc_extraction if has_data else None
 
     def cancel(self):
-        """Cancel ongoing processing."""
+        """Cancel ongoing processing (takes effect at the next pass boundary)."""
         with self._lock:
             self._cancelled = True
         logger.info("Processing cancellation requested")
 
+    def _check_run_control(self) -> None:
+        """
+        Raise ProcessingCancelled if the run was cancelled; block while it is paused.
+
+        Checks cancel() and, with a control_key, the shared run control (an
+        in-memory lookup, not a database query).
+        """
+        with self._lock:
+            if self._cancelled:
+                raise ProcessingCancelled("Processing cancelled")
+
+        if not self._control_key:
+            return
+        try:
+            from shared.run_control import get_run_control
+            run_control = get_run_control()
+        except Exception as e:
+            logger.debug(f"Run control unavailable: {e}")
+            return
+
+        should_stop, reason = run_control.should_stop(self._control_key)
+        if not should_stop:
+            return
+        if reason == 'paused':
+            logger.info("Processing paused, waiting for resume")
+            wait_result = run_control.wait_while_paused(self._control_key, PAUSE_TIMEOUT_SECONDS)
+            if wait_result == 'resumed':
+                return
+            if wait_result == 'timeout':
+                raise ProcessingCancelled(f"Processing stopped after {PAUSE_TIMEOUT_SECONDS}s paused")
+        raise ProcessingCancelled("Processing cancelled")
+
 
 def create_orchestrator(
     claude_client: Optional[Any] = None,
@@ -53,7 +53,8 @@ def extract_document(
         system=EXTRACTION_SYSTEM_PROMPT,
         json_mode=True,
         max_tokens=4096,
-        temperature=0.1
+        temperature=0.1,
+        pass_name="pass1"
     )
 
     if "error" in response:
@@ -64,7 +65,8 @@ def extract_document(
             "consent_requirements": [],
             "key_parties": [],
             "document_references": [],  # Phase 1 Enhancement
-            "summary": f"Extraction failed: {response.get('error')}"
+            "summary": f"Extraction failed: {response.get('error')}",
+            "error": response.get("error")
         }
 
     # Normalize field names to match expected format
@@ -79,6 +81,26 @@ def extract_document(
     }
 
 
+def build_extraction_request(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Build the Pass 1 completion kwargs for a document.
+
+    Used by run_pass1_extraction and by callers that fan out or batch Pass 1
+    themselves (pass json_mode=True, pass_name="pass1" alongside).
+    """
+    prompt = build_extraction_prompt(
+        document_text=doc["text"][:50000],  # Limit to ~50k chars
+        document_name=doc["filename"],
+        doc_type=doc["doc_type"]
+    )
+    return {
+        "prompt": prompt,
+        "system": EXTRACTION_SYSTEM_PROMPT,
+        "max_tokens": 4096,
+        "temperature": 0.1,
+    }
+
+
 def run_pass1_extraction(
     documents: List[Dict],
     client: ClaudeClient,
@@ -92,6 +114,31 @@ def run_pass1_extraction(
         client: Claude API client
         verbose: Print progress
 
+    Returns:
+        Dict with aggregated extractions and per-document results
+    """
+    responses = []
+    for i, doc in enumerate(documents, 1):
+        if verbose:
+            print(f"  [{i}/{len(documents)}] Extracting from {doc['filename']}...")
+
+        # Call Claude
+        responses.append(client.complete(
+            json_mode=True,
+            pass_name="pass1",
+            **build_extraction_request(doc)
+        ))
+
+    return collect_pass1_results(documents, responses)
+
+
+def collect_pass1_results(
+    documents: List[Dict],
+    responses: List[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """
+    Aggregate per-document Pass 1 responses (same order as documents).
+
     Returns:
         Dict with aggregated extractions and per-document results
     """
@@ -107,26 +154,8 @@ def run_pass1_extraction(
         "document_references": [],  # Phase 1 Enhancement: References to other docs
     }
 
-    for i, doc in enumerate(documents, 1):
+    for doc, response in zip(documents, responses):
         filename = doc["filename"]
-        if verbose:
-            print(f"  [{i}/{len(documents)}] Extracting from {filename}...")
-
-        # Build extraction prompt
-        prompt = build_extraction_prompt(
-            document_text=doc["text"][:50000],  # Limit to ~50k chars
-            document_name=filename,
-            doc_type=doc["doc_type"]
-        )
-
-        # Call Claude
-        response = client.complete(
-            prompt=prompt,
-            system=EXTRACTION_SYSTEM_PROMPT,
-            json_mode=True,
-            max_tokens=4096,
-            temperature=0.1
-        )
 
         if "error" in response:
             print(f"    Warning: Extraction failed for {filename}: {response.get('error')}")
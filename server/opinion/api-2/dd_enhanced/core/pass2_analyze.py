@@ -22,8 +22,8 @@ if _dd_enhanced_path not in sys.path:
 
 from .claude_client import ClaudeClient
 from .document_loader import LoadedDocument
-from prompts.analysis import get_analysis_system_prompt, build_analysis_prompt
-from config.question_loader import QuestionLoader, should_skip_folder
+from prompts.analysis import get_analysis_system_prompt, build_analysis_prompt, build_analysis_context
+from config.question_loader import QuestionLoader, get_question_loader, should_skip_folder
 
 logger = logging.getLogger(__name__)
 
@@ -69,18 +69,55 @@ def analyze_document(
     Returns:
         List of findings from this document (or dict if return_qa_data=True)
     """
+    request = build_analysis_request(
+        doc,
+        reference_docs,
+        blueprint,
+        transaction_context=transaction_context,
+        prioritized_questions=prioritized_questions,
+        question_loader=question_loader,
+        entity_map=entity_map
+    )
+    if request is None:
+        return {"findings": [], "questions_answered": []} if return_qa_data else []
+
+    # Call Claude (uses complete_analysis which uses Sonnet)
+    response = client.complete_analysis(**request)
+
+    return process_analysis_response(doc, response, return_qa_data=return_qa_data)
+
+
+def build_analysis_request(
+    doc: Dict,
+    reference_docs: List[LoadedDocument],
+    blueprint: Optional[Dict],
+    transaction_context: str = DEFAULT_TRANSACTION_CONTEXT,
+    prioritized_questions: Optional[List[Dict]] = None,
+    question_loader: Optional[QuestionLoader] = None,
+    entity_map: Optional[List[Dict]] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Build the Pass 2 request for a single document.
+
+    Split out of analyze_document so callers that fan requests out
+    concurrently (AsyncClaudeClient.complete_many) build identical prompts.
+
+    Returns:
+        Keyword arguments for ClaudeClient.complete_analysis, or None if the
+        document is skipped (reference docs, 99_Needs_Review)
+    """
     filename = doc.get("filename", "unknown")
     doc_type = doc.get("doc_type", "")
     folder_category = doc.get("folder_category", None)  # Phase 3: folder context
 
     # Skip reference docs in per-doc analysis (they're already in context)
     if doc_type in ("constitutional", "governance"):
-        return []
+        return None
 
     # Phase 3: Skip 99_Needs_Review documents
     if folder_category and should_skip_folder(folder_category):
         logger.info(f"Skipping {filename} - folder {folder_category} needs manual review")
-        return []
+        return None
 
     # Phase 3: Get folder-specific questions if available
     folder_questions = None
@@ -105,19 +142,37 @@ def analyze_document(
         prioritized_questions=prioritized_questions,
         folder_category=folder_category,
         folder_questions=folder_questions,
-        entity_map=entity_map
+        entity_map=entity_map,
+        shared_context_in_prefix=True
     )
 
     # Get blueprint-aware system prompt
     system_prompt = get_analysis_system_prompt(blueprint)
 
-    # Call Claude (uses complete_analysis which uses Sonnet)
-    response = client.complete_analysis(
-        prompt=prompt,
-        system=system_prompt,
-        max_tokens=8192,
-        temperature=0.1
-    )
+    # Transaction context + reference docs go first as a prompt-cached prefix
+    return {
+        "prompt": prompt,
+        "system": system_prompt,
+        "max_tokens": 8192,
+        "temperature": 0.1,
+        "context_blocks": [build_analysis_context(transaction_context, ref_context)],
+    }
+
+
+def process_analysis_response(
+    doc: Dict,
+    response: Dict[str, Any],
+    return_qa_data: bool = False
+):
+    """
+    Turn a Pass 2 response for a document into findings.
+
+    Returns:
+        List of findings (or dict with 'findings' and 'questions_answered'
+        if return_qa_data=True); empty on an error response
+    """
+    filename = doc.get("filename", "unknown")
+    folder_category = doc.get("folder_category", None)
 
     if "error" in response:
         return {"findings": [], "questions_answered": []} if return_qa_data else []
@@ -233,7 +288,7 @@ def run_pass2_analysis(
     missing_info_by_folder: Dict[str, List[str]] = {}  # folder_category -> missing info items
 
     # Phase 3: Initialize QuestionLoader for folder-aware analysis
-    question_loader = QuestionLoader(blueprint) if blueprint else None
+    question_loader = get_question_loader(blueprint) if blueprint else None
     if question_loader and question_loader.has_folder_questions():
         if verbose:
             logger.info("Using folder-aware analysis with blueprint folder_questions")
@@ -243,6 +298,10 @@ def run_pass2_analysis(
     if verbose and reference_docs:
         print(f"  Reference docs in context: {[d.filename for d in reference_docs]}")
 
+    # Stable prefix shared by every per-document call (prompt-cached)
+    shared_context = build_analysis_context(transaction_context, ref_context)
+    system_prompt = get_analysis_system_prompt(blueprint)
+
     for i, doc in enumerate(documents, 1):
         filename = doc["filename"]
         doc_type = doc["doc_type"]
@@ -292,18 +351,19 @@ def run_pass2_analysis(
             prioritized_questions=prioritized_questions,  # Pass prioritized questions
             folder_category=folder_category,  # Phase 3
             folder_questions=folder_questions,  # Phase 3
-            entity_map=entity_map  # Entity mapping for party validation
+            entity_map=entity_map,  # Entity mapping for party validation
+            shared_context_in_prefix=True
         )
 
-        # Get blueprint-aware system prompt
-        system_prompt = get_analysis_system_prompt(blueprint)
-
         # Call Claude (uses complete_analysis which uses Sonnet)
+        # The shared prefix is byte-identical for every document, so after the
+        # first call it is read from Anthropic's prompt cache
         response = client.complete_analysis(
             prompt=prompt,
             system=system_prompt,
             max_tokens=8192,
-            temperature=0.1
+            temperature=0.1,
+            context_blocks=[shared_context]
         )
 
         if "error" in response:
@@ -38,6 +38,7 @@ from .document_clusters import (
 )
 from config.question_loader import (
     QuestionLoader,
+    get_question_loader,
     FOLDER_TO_CLUSTER_MAP,
     get_cluster_for_folder,
     should_skip_folder,
@@ -207,9 +208,15 @@ def build_cluster_analysis_prompt(
     cluster_context: str,
     questions: List[str],
     reference_findings: Optional[List[Dict]] = None,
-    blueprint: Optional[Dict] = None
+    blueprint: Optional[Dict] = None,
+    context_in_prefix: bool = False
 ) -> str:
-    """Build the prompt for analyzing a single cluster."""
+    """
+    Build the prompt for analyzing a single cluster.
+
+    With context_in_prefix=True the cluster documents are not inlined; the
+    caller sends cluster_context ahead of the prompt as a prompt-cached block.
+    """
 
     cluster_info = get_cluster_info(cluster_name)
     cluster_description = cluster_info.description if cluster_info else cluster_name
@@ -246,7 +253,7 @@ DOCUMENT GROUP: {cluster_name.replace('_', ' ').title()} - {cluster_description}
 {prior_context}
 
 DOCUMENTS IN THIS GROUP:
-{cluster_context}
+{"[Provided above, before these instructions.]" if context_in_prefix else cluster_context}
 
 CROSS-DOCUMENT ANALYSIS QUESTIONS:
 {questions_text}
@@ -479,14 +486,15 @@ Output valid JSON only."""
             context,
             questions,
             reference_findings,
-            blueprint
+            blueprint,
+            context_in_prefix=True
         )
         print(f"[analyze_cluster] Prompt built, length={len(prompt)} chars", flush=True)
 
         # Call Claude
         print(f"[analyze_cluster] Calling Claude API (complete_crossdoc)...", flush=True)
         api_start = time.time()
-        result = client.complete_crossdoc(prompt, system_prompt)
+        result = client.complete_crossdoc(prompt, system_prompt, context_blocks=[context])
         api_elapsed = time.time() - api_start
         print(f"[analyze_cluster] Claude API returned in {api_elapsed:.2f}s", flush=True)
 
@@ -562,7 +570,7 @@ def run_pass3_clustered(
     # Phase 3: Initialize QuestionLoader for folder-aware cross-doc checks
     try:
         print(f"[run_pass3_clustered] Initializing QuestionLoader...", flush=True)
-        question_loader = QuestionLoader(blueprint) if blueprint else None
+        question_loader = get_question_loader(blueprint) if blueprint else None
         use_folder_clustering = any(doc.get("folder_category") for doc in documents)
         print(f"[run_pass3_clustered] Use folder clustering: {use_folder_clustering}", flush=True)
 
@@ -657,13 +665,14 @@ Output valid JSON only."""
                 context,
                 questions,
                 reference_findings if cluster_name != "corporate_governance" else None,
-                blueprint
+                blueprint,
+                context_in_prefix=True
             )
             print(f"[run_pass3_clustered] Prompt built: {len(prompt)} chars", flush=True)
 
             print(f"[run_pass3_clustered] Calling Claude API for '{cluster_name}'...", flush=True)
             api_start = time.time()
-            result = client.complete_crossdoc(prompt, system_prompt)
+            result = client.complete_crossdoc(prompt, system_prompt, context_blocks=[context])
             api_elapsed = time.time() - api_start
             print(f"[run_pass3_clustered] Claude API returned in {api_elapsed:.2f}s", flush=True)
 
@@ -29,6 +29,7 @@ from prompts.crossdoc import (
     build_authorization_check_prompt,
     build_consent_matrix_prompt,
     build_missing_document_prompt,
+    DOCUMENTS_PROVIDED_ABOVE,
 )
 
 
@@ -73,6 +74,8 @@ def run_pass3_crossdoc_synthesis(
 
     # Build combined document context
     # This is the key: ALL documents in ONE context
+    # It is sent as a prompt-cached prefix, so the five sub-analyses below
+    # pay full input price for it only once
     doc_context = _build_full_document_context(documents)
 
     if verbose:
@@ -166,13 +169,14 @@ def _detect_conflicts(
 ) -> List[Dict]:
     """Detect conflicts between documents."""
 
-    prompt = build_conflict_detection_prompt(doc_context, blueprint)
+    prompt = build_conflict_detection_prompt(DOCUMENTS_PROVIDED_ABOVE, blueprint)
 
     response = client.complete_critical(
         prompt=prompt,
         system=system_prompt,
         json_mode=True,
-        max_tokens=4096
+        max_tokens=4096,
+        context_blocks=[doc_context]
     )
 
     if "error" in response:
@@ -191,7 +195,7 @@ def _map_coc_cascade(
     """Map how change of control cascades across all documents."""
 
     prompt = build_cascade_mapping_prompt(
-        doc_context,
+        DOCUMENTS_PROVIDED_ABOVE,
         trigger_event="100% share acquisition",
         blueprint=blueprint
     )
@@ -200,7 +204,8 @@ def _map_coc_cascade(
         prompt=prompt,
         system=system_prompt,
         json_mode=True,
-        max_tokens=8192
+        max_tokens=8192,
+        context_blocks=[doc_context]
     )
 
     if "error" in response:
@@ -218,13 +223,14 @@ def _validate_authorizations(
 ) -> List[Dict]:
     """Check if Board Resolution authorizes what MOI/SHA require."""
 
-    prompt = build_authorization_check_prompt(doc_context, blueprint)
+    prompt = build_authorization_check_prompt(DOCUMENTS_PROVIDED_ABOVE, blueprint)
 
     response = client.complete_critical(
         prompt=prompt,
         system=system_prompt,
         json_mode=True,
-        max_tokens=4096
+        max_tokens=4096,
+        context_blocks=[doc_context]
     )
 
     if "error" in response:
@@ -252,13 +258,14 @@ def _build_consent_matrix_result(
 ) -> List[Dict]:
     """Build comprehensive consent matrix."""
 
-    prompt = build_consent_matrix_prompt(doc_context, blueprint)
+    prompt = build_consent_matrix_prompt(DOCUMENTS_PROVIDED_ABOVE, blueprint)
 
     response = client.complete_critical(
         prompt=prompt,
         system=system_prompt,
         json_mode=True,
-        max_tokens=4096
+        max_tokens=4096,
+        context_blocks=[doc_context]
     )
 
     if "error" in response:
@@ -277,13 +284,14 @@ def _detect_missing_documents(
 ) -> Dict:
     """Detect documents referenced but not provided in the data room."""
 
-    prompt = build_missing_document_prompt(doc_context, document_names, blueprint)
+    prompt = build_missing_document_prompt(DOCUMENTS_PROVIDED_ABOVE, document_names, blueprint)
 
     response = client.complete_critical(
         prompt=prompt,
         system=system_prompt,
         json_mode=True,
-        max_tokens=4096
+        max_tokens=4096,
+        context_blocks=[doc_context]
     )
 
     if "error" in response:
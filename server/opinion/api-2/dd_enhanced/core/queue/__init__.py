@@ -3,8 +3,9 @@ Queue module for parallel document processing.
 
 Provides:
 - Job queue (Redis with in-memory fallback)
-- Rate limiter (token bucket algorithm)
+- Rate limiter (token bucket algorithm, adaptive concurrency)
 - Worker pool (parallel job processing)
+- Job audit writer (batched dd_job_execution writes)
 """
 
 from .job_queue import (
@@ -25,6 +26,7 @@ from .rate_limiter import (
     RateLimitedContext,
     get_rate_limiter,
     reset_rate_limiter,
+    estimate_tokens,
 )
 
 from .worker_pool import (
@@ -34,6 +36,11 @@ from .worker_pool import (
     WorkerPool,
 )
 
+from .audit_writer import (
+    AuditWriterStats,
+    JobAuditWriter,
+)
+
 __all__ = [
     # Job Queue
     'Job',
@@ -51,9 +58,13 @@ __all__ = [
     'RateLimitedContext',
     'get_rate_limiter',
     'reset_rate_limiter',
+    'estimate_tokens',
     # Worker Pool
     'WorkerConfig',
     'WorkerStats',
     'DocumentWorker',
     'WorkerPool',
+    # Audit Writer
+    'AuditWriterStats',
+    'JobAuditWriter',
 ]
@@ -0,0 +1,260 @@
+"""
+Batched, asynchronous job audit writer for the worker pool.
+
+Workers record job start / complete / fail events with record(), which only
+enqueues. One background thread drains the queue, coalesces events for the
+same (run_id, job_id) and writes each batch to dd_job_execution with one
+executemany per statement, in one transaction. A batch is flushed when it
+reaches batch_size events or flush_interval seconds after its first event.
+
+The queue is bounded: when the database falls behind, record() blocks (up to
+put_timeout seconds, then the event is dropped and counted) instead of
+letting the backlog grow without limit. stop() flushes everything queued.
+
+The audit trail is best effort, as before: a failed batch is logged and
+dropped, it never fails a job.
+"""
+
+from typing import Dict, List, Any, Optional, Callable, Tuple
+from dataclasses import dataclass
+import json
+import queue
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+# (run_id, job_id)
+JobKey = Tuple[str, str]
+
+_UPSERT_COLUMNS = (
+    'run_id', 'job_id', 'job_type', 'document_id', 'batch_id', 'cluster_id',
+    'status', 'priority', 'retry_count', 'estimated_tokens', 'worker_id', 'started_at',
+    'completed_at', 'duration_ms', 'actual_tokens', 'result_summary', 'error_message',
+)
+
+_UPDATE_COLUMNS = (
+    'run_id', 'job_id', 'status', 'retry_count', 'completed_at', 'duration_ms',
+    'actual_tokens', 'result_summary', 'error_message',
+)
+
+# Jobs whose start is in the batch: insert, or reset a retried job's row (a
+# restart clears the previous attempt's outcome unless this batch ended it too)
+_UPSERT_SQL = """
+    INSERT INTO dd_job_execution
+    (run_id, job_id, job_type, document_id, batch_id, cluster_id,
+     status, priority, retry_count, estimated_tokens, worker_id, started_at,
+     completed_at, duration_ms, actual_tokens, result_summary, error_message)
+    VALUES (:run_id, :job_id, :job_type, :document_id, :batch_id, :cluster_id,
+            :status, :priority, :retry_count, :estimated_tokens, :worker_id, :started_at,
+            :completed_at, :duration_ms, :actual_tokens, CAST(:result_summary AS jsonb), :error_message)
+    ON CONFLICT (run_id, job_id) DO UPDATE SET
+    status = EXCLUDED.status,
+    retry_count = EXCLUDED.retry_count,
+    worker_id = EXCLUDED.worker_id,
+    started_at = EXCLUDED.started_at,
+    completed_at = EXCLUDED.completed_at,
+    duration_ms = EXCLUDED.duration_ms,
+    actual_tokens = EXCLUDED.actual_tokens,
+    result_summary = EXCLUDED.result_summary,
+    error_message = EXCLUDED.error_message
+"""
+
+# Jobs whose start was written by an earlier batch
+_UPDATE_SQL = """
+    UPDATE dd_job_execution
+    SET status = :status,
+        retry_count = COALESCE(:retry_count, retry_count),
+        completed_at = :completed_at,
+        duration_ms = :duration_ms,
+        actual_tokens = COALESCE(:actual_tokens, actual_tokens),
+        result_summary = COALESCE(CAST(:result_summary AS jsonb), result_summary),
+        error_message = COALESCE(:error_message, error_message)
+    WHERE run_id = :run_id AND job_id = :job_id
+"""
+
+
+@dataclass
+class AuditWriterStats:
+    """Counters for the audit writer."""
+    events_recorded: int = 0
+    events_dropped: int = 0
+    rows_written: int = 0
+    batches_written: int = 0
+    batches_failed: int = 0
+
+
+class JobAuditWriter:
+    """
+    Background writer for dd_job_execution.
+
+    Args:
+        db_session: Session used only by the writer thread (the caller must not
+            use it concurrently)
+        session_factory: Alternative to db_session - a context manager that
+            yields a session and commits on exit (e.g. shared.session.transactional_session)
+        batch_size: Flush after this many events
+        flush_interval: Flush this many seconds after a batch's first event
+        max_queue: Queue bound; record() blocks when it is full
+        put_timeout: Seconds record() blocks on a full queue before dropping
+    """
+
+    def __init__(
+        self,
+        db_session=None,
+        session_factory: Optional[Callable] = None,
+        batch_size: int = 200,
+        flush_interval: float = 1.0,
+        max_queue: int = 10000,
+        put_timeout: float = 30.0,
+    ):
+        if db_session is None and session_factory is None:
+            raise ValueError("JobAuditWriter needs a db_session or a session_factory")
+        self.db_session = db_session
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+
+        self.stats = AuditWriterStats()
+        self._queue: "queue.Queue[Optional[Tuple[str, Dict[str, Any]]]]" = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._stats_lock = threading.Lock()
+
+    def start(self):
+        """Start the writer thread."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, name="dd_audit_writer", daemon=True)
+        self._thread.start()
+
+    def record(self, action: str, data: Dict[str, Any]):
+        """
+        Queue a job event ('start', 'complete' or 'fail').
+
+        Same signature as DocumentWorker's db_writer callback. Blocks while
+        the queue is full (backpressure), dropping the event after put_timeout.
+        """
+        try:
+            self._queue.put((action, data), timeout=self.put_timeout)
+            with self._stats_lock:
+                self.stats.events_recorded += 1
+        except queue.Full:
+            with self._stats_lock:
+                self.stats.events_dropped += 1
+            logger.warning(f"Audit queue full for {self.put_timeout}s, dropped {action} event for job {data.get('job_id')}")
+
+    def stop(self, timeout: float = 30.0):
+        """Flush queued events and stop the writer thread."""
+        if not self._thread:
+            return
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            logger.warning("Audit queue full at shutdown, stopping without a final flush")
+        self._thread.join(timeout=timeout)
+        if self._thread.is_alive():
+            logger.warning(f"Audit writer did not finish flushing within {timeout}s")
+        self._thread = None
+        logger.info(f"Audit writer stopped: {self.stats}")
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is None:
+                break
+
+            batch = [item]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            self._flush(batch)
+
+        # Anything queued behind the stop marker
+        leftover = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                leftover.append(item)
+        if leftover:
+            self._flush(leftover)
+
+    def _flush(self, batch: List[Tuple[str, Dict[str, Any]]]):
+        upserts, updates = coalesce_job_events(batch)
+        try:
+            if self.session_factory:
+                with self.session_factory() as session:
+                    self._execute(session, upserts, updates)
+            else:
+                self._execute(self.db_session, upserts, updates)
+                self.db_session.commit()
+            self.stats.batches_written += 1
+            self.stats.rows_written += len(upserts) + len(updates)
+        except Exception as e:
+            self.stats.batches_failed += 1
+            logger.warning(f"Failed to write {len(batch)} job events to Postgres: {e}")
+            if self.db_session is not None and not self.session_factory:
+                try:
+                    self.db_session.rollback()
+                except Exception:
+                    pass
+
+    @staticmethod
+    def _execute(session, upserts: List[Dict[str, Any]], updates: List[Dict[str, Any]]):
+        from sqlalchemy import text
+        # A list of parameter sets runs as one executemany per statement
+        if upserts:
+            session.execute(text(_UPSERT_SQL), upserts)
+        if updates:
+            session.execute(text(_UPDATE_SQL), updates)
+
+
+def coalesce_job_events(
+    events: List[Tuple[str, Dict[str, Any]]]
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Merge events per (run_id, job_id) in arrival order.
+
+    A 'start' discards what earlier events in the batch recorded for the job,
+    so a restarted job does not carry the previous attempt's completed_at or
+    error_message.
+
+    Returns (upserts, updates): rows for jobs started in this batch, and
+    end-only rows for jobs started in an earlier batch.
+    """
+    merged: Dict[JobKey, Dict[str, Any]] = {}
+    started: Dict[JobKey, bool] = {}
+
+    for action, data in events:
+        key = (str(data.get('run_id')), str(data.get('job_id')))
+        if action == 'start':
+            merged[key] = dict(data)
+            started[key] = True
+        else:
+            merged.setdefault(key, {}).update(data)
+
+    upserts, updates = [], []
+    for key, row in merged.items():
+        if row.get('result_summary') is not None and not isinstance(row['result_summary'], str):
+            row['result_summary'] = json.dumps(row['result_summary'], default=str)
+        if started.get(key):
+            upserts.append({column: row.get(column) for column in _UPSERT_COLUMNS})
+        else:
+            updates.append({column: row.get(column) for column in _UPDATE_COLUMNS})
+    return upserts, updates
@@ -1,16 +1,26 @@
 """
-Rate limiter for Claude API calls using token bucket algorithm.
+Rate limiter for LLM API calls using token bucket algorithm.
 
 Prevents hitting API rate limits while maximizing throughput.
-Configurable via environment variables:
-- CLAUDE_REQUESTS_PER_MINUTE (default: 50)
-- CLAUDE_TOKENS_PER_MINUTE (default: 100000)
-- CLAUDE_MAX_CONCURRENT (default: 10)
+Concurrency adapts AIMD-style: it grows by one slot per window of
+successful requests and halves on 429/overloaded responses, so parallel
+passes settle at the highest concurrency the account sustains.
+
+One limiter per provider quota (see get_rate_limiter). Configurable via
+environment variables, prefixed per limiter (CLAUDE_ for "claude",
+AZURE_OPENAI_ for "azure_openai", ...):
+- <PREFIX>_REQUESTS_PER_MINUTE (default: 50)
+- <PREFIX>_TOKENS_PER_MINUTE (default: 100000)
+- <PREFIX>_MAX_CONCURRENT (default: 10) - starting concurrency
+- <PREFIX>_MIN_CONCURRENT (default: 1)
+- <PREFIX>_MAX_CONCURRENT_CEILING (default: 2x max_concurrent)
+- <PREFIX>_ADAPTIVE_CONCURRENCY (default: true)
 """
 
 from typing import Dict, Optional, Any
 from dataclasses import dataclass
 from datetime import datetime, timedelta
+import asyncio
 import threading
 import time
 import logging
@@ -29,16 +39,37 @@ class RateLimitConfig:
     backoff_multiplier: float = 1.5
     max_backoff_seconds: int = 300
 
+    # Adaptive (AIMD) concurrency
+    adaptive_concurrency: bool = True
+    min_concurrent: int = 1
+    max_concurrent_ceiling: int = 0  # 0 = 2x max_concurrent
+    decrease_factor: float = 0.5
+    latency_tolerance: float = 2.0  # Hold growth while latency > tolerance x baseline
+
     @classmethod
-    def from_env(cls) -> 'RateLimitConfig':
-        """Create config from environment variables."""
+    def from_env(cls, prefix: str = "CLAUDE", **defaults) -> 'RateLimitConfig':
+        """
+        Create config from environment variables.
+
+        Args:
+            prefix: Environment variable prefix (e.g. "CLAUDE", "AZURE_OPENAI")
+            **defaults: Field defaults used when a variable is not set
+        """
+        base = cls(**defaults)
+
+        def env(name: str, default: Any) -> str:
+            return os.environ.get(f"{prefix}_{name}", str(default))
+
         return cls(
-            requests_per_minute=int(os.environ.get("CLAUDE_REQUESTS_PER_MINUTE", "50")),
-            tokens_per_minute=int(os.environ.get("CLAUDE_TOKENS_PER_MINUTE", "100000")),
-            max_concurrent=int(os.environ.get("CLAUDE_MAX_CONCURRENT", "10")),
-            retry_after_seconds=int(os.environ.get("CLAUDE_RETRY_AFTER_SECONDS", "60")),
-            backoff_multiplier=float(os.environ.get("CLAUDE_BACKOFF_MULTIPLIER", "1.5")),
-            max_backoff_seconds=int(os.environ.get("CLAUDE_MAX_BACKOFF_SECONDS", "300"))
+            requests_per_minute=int(env("REQUESTS_PER_MINUTE", base.requests_per_minute)),
+            tokens_per_minute=int(env("TOKENS_PER_MINUTE", base.tokens_per_minute)),
+            max_concurrent=int(env("MAX_CONCURRENT", base.max_concurrent)),
+            retry_after_seconds=int(env("RETRY_AFTER_SECONDS", base.retry_after_seconds)),
+            backoff_multiplier=float(env("BACKOFF_MULTIPLIER", base.backoff_multiplier)),
+            max_backoff_seconds=int(env("MAX_BACKOFF_SECONDS", base.max_backoff_seconds)),
+            adaptive_concurrency=env("ADAPTIVE_CONCURRENCY", "true").lower() in ("true", "1", "yes"),
+            min_concurrent=int(env("MIN_CONCURRENT", base.min_concurrent)),
+            max_concurrent_ceiling=int(env("MAX_CONCURRENT_CEILING", base.max_concurrent_ceiling)),
         )
 
 
@@ -105,6 +136,17 @@ class TokenBucket:
             # Wait a bit before trying again
             time.sleep(min(wait_time, 0.1))
 
+    def adjust(self, tokens: float):
+        """
+        Credit (positive) or debit (negative) the bucket after the fact.
+
+        Used to reconcile an up-front estimate with actual usage. A debit may
+        take the bucket negative, which simply delays the next acquire.
+        """
+        with self.lock:
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens + tokens)
+
     def try_acquire(self, tokens: float = 1) -> bool:
         """Non-blocking attempt to acquire tokens."""
         return self.acquire(tokens, blocking=False)
@@ -127,8 +169,18 @@ class TokenBucket:
 
 class RateLimiter:
     """
-    Composite rate limiter for Claude API.
-    Manages both request rate and token rate limits.
+    Composite rate limiter for LLM APIs.
+    Manages request rate, token rate and (adaptive) concurrency limits.
+
+    Call pattern:
+        if limiter.acquire(estimated_tokens):
+            try:
+                response = make_api_call()
+                limiter.report_success(latency_seconds)
+            except RateLimitError as e:
+                limiter.report_rate_limit_error(retry_after)
+            finally:
+                limiter.release(actual_tokens, estimated_tokens)
     """
 
     def __init__(self, config: RateLimitConfig = None):
@@ -146,10 +198,22 @@ class RateLimiter:
             capacity=self.config.tokens_per_minute
         )
 
-        # Concurrent request semaphore
-        self.concurrent_semaphore = threading.Semaphore(self.config.max_concurrent)
+        # Concurrent request slots; the limit moves between min and ceiling
         self.concurrent_count = 0
         self.concurrent_lock = threading.Lock()
+        self._slot_available = threading.Condition(self.concurrent_lock)
+        self.min_concurrent = max(1, self.config.min_concurrent)
+        self.concurrency_ceiling = max(
+            self.config.max_concurrent,
+            self.config.max_concurrent_ceiling or self.config.max_concurrent * 2
+        )
+        self.concurrency_limit = self.config.max_concurrent
+
+        # AIMD state
+        self._increase_credit = 0.0
+        self._last_decrease = 0.0
+        self.latency_ewma: Optional[float] = None
+        self.latency_baseline: Optional[float] = None
 
         # Backoff tracking
         self.backoff_until: Optional[datetime] = None
@@ -161,7 +225,15 @@ class RateLimiter:
 
         logger.info(f"Rate limiter initialized: {self.config.requests_per_minute} req/min, "
                    f"{self.config.tokens_per_minute} tokens/min, "
-                   f"{self.config.max_concurrent} concurrent")
+                   f"{self.config.max_concurrent} concurrent "
+                   f"(adaptive={self.config.adaptive_concurrency}, ceiling={self.concurrency_ceiling})")
+
+    def _backoff_remaining(self) -> float:
+        """Seconds left in the current backoff period (0 if none)."""
+        with self.lock:
+            if self.backoff_until and datetime.utcnow() < self.backoff_until:
+                return (self.backoff_until - datetime.utcnow()).total_seconds()
+            return 0.0
 
     def acquire(self, estimated_tokens: int = 1000, timeout: float = 300) -> bool:
         """
@@ -176,46 +248,46 @@ class RateLimiter:
         """
         start_time = time.time()
 
-        # Check backoff
-        with self.lock:
-            if self.backoff_until and datetime.utcnow() < self.backoff_until:
-                wait_time = (self.backoff_until - datetime.utcnow()).total_seconds()
-                if wait_time > timeout:
-                    logger.warning(f"Backoff period ({wait_time:.1f}s) exceeds timeout ({timeout}s)")
-                    return False
-                logger.info(f"Rate limit backoff: waiting {wait_time:.1f}s")
-                time.sleep(wait_time)
+        def remaining() -> float:
+            return timeout - (time.time() - start_time)
 
-        remaining_timeout = timeout - (time.time() - start_time)
-        if remaining_timeout <= 0:
-            return False
+        # Check backoff (re-checked in case another caller extended it while we slept)
+        wait_time = self._backoff_remaining()
+        while wait_time > 0:
+            if wait_time > remaining():
+                logger.warning(f"Backoff period ({wait_time:.1f}s) exceeds timeout ({timeout}s)")
+                return False
+            logger.info(f"Rate limit backoff: waiting {wait_time:.1f}s")
+            time.sleep(wait_time)
+            wait_time = self._backoff_remaining()
 
         # Acquire concurrent slot
-        if not self.concurrent_semaphore.acquire(timeout=remaining_timeout):
-            logger.warning("Timeout waiting for concurrent slot")
-            return False
-
-        with self.concurrent_lock:
+        with self._slot_available:
+            if not self._slot_available.wait_for(
+                lambda: self.concurrent_count < self.concurrency_limit,
+                timeout=max(0.0, remaining())
+            ):
+                logger.warning("Timeout waiting for concurrent slot")
+                return False
             self.concurrent_count += 1
 
-        remaining_timeout = timeout - (time.time() - start_time)
-        if remaining_timeout <= 0:
+        if remaining() <= 0:
             self._release_concurrent()
             return False
 
         # Acquire request token
-        if not self.request_bucket.acquire(1, blocking=True, timeout=remaining_timeout):
+        if not self.request_bucket.acquire(1, blocking=True, timeout=remaining()):
             logger.warning("Timeout waiting for request rate limit")
             self._release_concurrent()
             return False
 
-        remaining_timeout = timeout - (time.time() - start_time)
-        if remaining_timeout <= 0:
+        if remaining() <= 0:
             self._release_concurrent()
             return False
 
-        # Acquire token budget
-        if not self.token_bucket.acquire(estimated_tokens, blocking=True, timeout=remaining_timeout):
+        # Acquire token budget (never more than the bucket can hold)
+        tokens = min(estimated_tokens, self.token_bucket.capacity)
+        if not self.token_bucket.acquire(tokens, blocking=True, timeout=remaining()):
             logger.warning("Timeout waiting for token rate limit")
             self._release_concurrent()
             return False
@@ -225,18 +297,84 @@ class RateLimiter:
 
         return True
 
+    async def acquire_async(self, estimated_tokens: int = 1000, timeout: float = 300) -> bool:
+        """
+        Async variant of acquire() for use on an event loop.
+
+        Draws from the same buckets and concurrency slots as acquire(), so
+        threaded and async callers share one budget. Waits with asyncio.sleep
+        instead of blocking the loop. Release with release() as usual.
+
+        Args:
+            estimated_tokens: Estimated tokens for this request
+            timeout: Maximum time to wait
+
+        Returns:
+            True if permission granted, False if timeout
+        """
+        start_time = time.time()
+
+        def remaining() -> float:
+            return timeout - (time.time() - start_time)
+
+        # Check backoff
+        wait_time = self._backoff_remaining()
+        while wait_time > 0:
+            if wait_time > remaining():
+                logger.warning(f"Backoff period ({wait_time:.1f}s) exceeds timeout ({timeout}s)")
+                return False
+            logger.info(f"Rate limit backoff: waiting {wait_time:.1f}s")
+            await asyncio.sleep(wait_time)
+            wait_time = self._backoff_remaining()
+
+        # Acquire concurrent slot
+        while not self._try_acquire_slot():
+            if remaining() <= 0:
+                logger.warning("Timeout waiting for concurrent slot")
+                return False
+            await asyncio.sleep(0.05)
+
+        # Acquire request token, then token budget
+        for bucket, amount, label in (
+            (self.request_bucket, 1, "request"),
+            # Never ask for more than the bucket can hold, or we'd wait forever
+            (self.token_bucket, min(estimated_tokens, self.token_bucket.capacity), "token"),
+        ):
+            while not bucket.try_acquire(amount):
+                if remaining() <= 0:
+                    logger.warning(f"Timeout waiting for {label} rate limit")
+                    self._release_concurrent()
+                    return False
+                await asyncio.sleep(min(bucket.time_until_available(amount), remaining(), 0.5))
+
+        with self.lock:
+            self.total_requests += 1
+
+        return True
+
+    def _try_acquire_slot(self) -> bool:
+        """Take a concurrent slot if one is free under the current limit."""
+        with self.concurrent_lock:
+            if self.concurrent_count < self.concurrency_limit:
+                self.concurrent_count += 1
+                return True
+            return False
+
     def _release_concurrent(self):
         """Release concurrent slot."""
-        with self.concurrent_lock:
+        with self._slot_available:
             self.concurrent_count -= 1
-        self.concurrent_semaphore.release()
+            self._slot_available.notify()
 
-    def release(self, actual_tokens: int = 0):
+    def release(self, actual_tokens: int = 0, estimated_tokens: Optional[int] = None):
         """
         Release concurrent request slot after request completes.
 
         Args:
-            actual_tokens: Actual tokens used (for tracking)
+            actual_tokens: Actual tokens used (input + output)
+            estimated_tokens: The estimate passed to acquire(); when given, the
+                token bucket is credited or debited by the difference so the
+                budget tracks real usage
         """
         self._release_concurrent()
 
@@ -244,13 +382,68 @@ class RateLimiter:
             with self.lock:
                 self.total_tokens_used += actual_tokens
 
-    def report_success(self):
-        """Report successful request - reset error tracking."""
+        # A call that failed before using tokens (e.g. 429) gets its estimate back
+        if estimated_tokens is not None:
+            self.token_bucket.adjust(min(estimated_tokens, self.token_bucket.capacity) - actual_tokens)
+
+    def _set_concurrency_limit(self, limit: int, reason: str):
+        """Move the concurrency limit within [min_concurrent, ceiling]."""
+        limit = max(self.min_concurrent, min(self.concurrency_ceiling, limit))
+        with self._slot_available:
+            previous = self.concurrency_limit
+            if limit == previous:
+                return
+            self.concurrency_limit = limit
+            if limit > previous:
+                self._slot_available.notify(limit - previous)
+        logger.info(f"Concurrency limit {previous} -> {limit} ({reason})")
+
+    def _decrease_concurrency(self, reason: str):
+        """Multiplicative decrease, at most once per latency window."""
+        if not self.config.adaptive_concurrency:
+            return
+        now = time.time()
+        with self.lock:
+            # A burst of in-flight requests all fail together; count it once
+            if now - self._last_decrease < max(1.0, self.latency_ewma or 0.0):
+                return
+            self._last_decrease = now
+            self._increase_credit = 0.0
+        self._set_concurrency_limit(int(self.concurrency_limit * self.config.decrease_factor), reason)
+
+    def report_success(self, latency_seconds: Optional[float] = None):
+        """
+        Report successful request - reset error tracking and grow concurrency.
+
+        Concurrency grows by one slot per `limit` successes (additive increase),
+        held while observed latency is well above its baseline, since rising
+        latency means the API is queueing us rather than serving us faster.
+        """
         with self.lock:
             self.consecutive_errors = 0
 
-    def report_rate_limit_error(self, retry_after: int = None):
-        """Report 429 rate limit error - trigger backoff."""
+            congested = False
+            if latency_seconds is not None:
+                if self.latency_ewma is None:
+                    self.latency_ewma = latency_seconds
+                else:
+                    self.latency_ewma = 0.8 * self.latency_ewma + 0.2 * latency_seconds
+                if self.latency_baseline is None or self.latency_ewma < self.latency_baseline:
+                    self.latency_baseline = self.latency_ewma
+                congested = self.latency_ewma > self.config.latency_tolerance * self.latency_baseline
+
+            if not self.config.adaptive_concurrency or congested:
+                return
+
+            self._increase_credit += 1.0 / max(1, self.concurrency_limit)
+            if self._increase_credit < 1.0:
+                return
+            self._increase_credit = 0.0
+
+        self._set_concurrency_limit(self.concurrency_limit + 1, "additive increase")
+
+    def report_rate_limit_error(self, retry_after: float = None):
+        """Report 429 rate limit error - trigger backoff for all callers and cut concurrency."""
         with self.lock:
             self.consecutive_errors += 1
             self.rate_limit_hits += 1
@@ -266,11 +459,21 @@ class RateLimiter:
             # Cap backoff
             backoff_seconds = min(backoff_seconds, self.config.max_backoff_seconds)
 
-            self.backoff_until = datetime.utcnow() + timedelta(seconds=backoff_seconds)
+            until = datetime.utcnow() + timedelta(seconds=backoff_seconds)
+            if self.backoff_until is None or until > self.backoff_until:
+                self.backoff_until = until
             logger.warning(f"Rate limit hit #{self.rate_limit_hits}. "
                           f"Backing off for {backoff_seconds:.1f}s "
                           f"(consecutive errors: {self.consecutive_errors})")
 
+        self._decrease_concurrency("rate limited")
+
+    def report_overloaded(self):
+        """Report 529/5xx overload - cut concurrency without a global backoff."""
+        with self.lock:
+            self.consecutive_errors += 1
+        self._decrease_concurrency("API overloaded")
+
     def report_error(self):
         """Report other error - increment error count but don't trigger full backoff."""
         with self.lock:
@@ -287,8 +490,10 @@ class RateLimiter:
             return {
                 'request_tokens_available': self.request_bucket.available(),
                 'api_tokens_available': self.token_bucket.available(),
-                'concurrent_available': self.config.max_concurrent - self.concurrent_count,
+                'concurrent_available': self.concurrency_limit - self.concurrent_count,
                 'concurrent_in_use': self.concurrent_count,
+                'concurrency_limit': self.concurrency_limit,
+                'latency_ewma_seconds': self.latency_ewma,
                 'consecutive_errors': self.consecutive_errors,
                 'in_backoff': in_backoff,
                 'backoff_remaining_seconds': backoff_remaining,
@@ -298,7 +503,9 @@ class RateLimiter:
                 'config': {
                     'requests_per_minute': self.config.requests_per_minute,
                     'tokens_per_minute': self.config.tokens_per_minute,
-                    'max_concurrent': self.config.max_concurrent
+                    'max_concurrent': self.config.max_concurrent,
+                    'concurrency_ceiling': self.concurrency_ceiling,
+                    'adaptive_concurrency': self.config.adaptive_concurrency
                 }
             }
 
@@ -312,34 +519,59 @@ class RateLimiter:
         request_wait = self.request_bucket.time_until_available(1)
         token_wait = self.token_bucket.time_until_available(estimated_tokens)
 
-        # Check backoff
-        backoff_wait = 0
-        with self.lock:
-            if self.backoff_until and datetime.utcnow() < self.backoff_until:
-                backoff_wait = (self.backoff_until - datetime.utcnow()).total_seconds()
+        return max(request_wait, token_wait, self._backoff_remaining())
+
 
-        return max(request_wait, token_wait, backoff_wait)
+def estimate_tokens(*texts: str, max_output_tokens: int = 0) -> int:
+    """
+    Rough token estimate (4 chars per token) for rate limiter admission.
+
+    Pass the request's max_tokens as max_output_tokens: release() reconciles
+    against input plus output, so the output budget must be reserved up front.
+    """
+    return sum(len(t or "") for t in texts) // 4 + max_output_tokens
 
 
-# Global rate limiter instance
-_rate_limiter: Optional[RateLimiter] = None
+# Environment prefix and defaults per named limiter (one per provider quota)
+LIMITER_PROFILES: Dict[str, Dict[str, Any]] = {
+    "claude": {"prefix": "CLAUDE", "defaults": {}},
+    "azure_openai": {"prefix": "AZURE_OPENAI", "defaults": {}},
+    "azure_openai_embeddings": {
+        "prefix": "AZURE_OPENAI_EMBEDDINGS",
+        "defaults": {"requests_per_minute": 900, "tokens_per_minute": 150000},
+    },
+}
+
+# Global rate limiter instances, by name
+_rate_limiters: Dict[str, RateLimiter] = {}
 _rate_limiter_lock = threading.Lock()
 
 
-def get_rate_limiter(config: RateLimitConfig = None) -> RateLimiter:
-    """Get the global rate limiter instance."""
-    global _rate_limiter
+def get_rate_limiter(config: RateLimitConfig = None, name: str = "claude") -> RateLimiter:
+    """
+    Get a global rate limiter instance.
+
+    Args:
+        config: Config used if the limiter does not exist yet (default: from env)
+        name: Which quota to limit against - "claude" (Anthropic),
+            "azure_openai" (chat completions) or "azure_openai_embeddings"
+    """
     with _rate_limiter_lock:
-        if _rate_limiter is None:
-            _rate_limiter = RateLimiter(config)
-        return _rate_limiter
+        if name not in _rate_limiters:
+            if config is None:
+                profile = LIMITER_PROFILES.get(name, {"prefix": name.upper(), "defaults": {}})
+                config = RateLimitConfig.from_env(profile["prefix"], **profile["defaults"])
+            _rate_limiters[name] = RateLimiter(config)
+        return _rate_limiters[name]
 
 
-def reset_rate_limiter(config: RateLimitConfig = None):
-    """Reset the global rate limiter (useful for testing)."""
-    global _rate_limiter
+def reset_rate_limiter(config: RateLimitConfig = None, name: str = "claude"):
+    """Reset a global rate limiter (useful for testing)."""
     with _rate_limiter_lock:
-        _rate_limiter = RateLimiter(config) if config else None
+        if config:
+            _rate_limiters[name] = RateLimiter(config)
+        else:
+            _rate_limiters.pop(name, None)
 
 
 class RateLimitedContext:
@@ -353,26 +585,32 @@ class RateLimitedContext:
                 ctx.report_tokens(result.usage.total_tokens)
     """
 
-    def __init__(self, estimated_tokens: int = 1000, timeout: float = 300):
+    def __init__(self, estimated_tokens: int = 1000, timeout: float = 300, name: str = "claude"):
         self.estimated_tokens = estimated_tokens
         self.timeout = timeout
-        self.rate_limiter = get_rate_limiter()
+        self.rate_limiter = get_rate_limiter(name=name)
         self.acquired = False
         self.actual_tokens = 0
+        self.started_at = 0.0
 
     def __enter__(self) -> 'RateLimitedContext':
         self.acquired = self.rate_limiter.acquire(
             estimated_tokens=self.estimated_tokens,
             timeout=self.timeout
         )
+        self.started_at = time.time()
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         if self.acquired:
-            self.rate_limiter.release(self.actual_tokens)
+            # Only reconcile the estimate when the caller reported actual usage
+            self.rate_limiter.release(
+                self.actual_tokens,
+                self.estimated_tokens if self.actual_tokens else None
+            )
 
             if exc_type is None:
-                self.rate_limiter.report_success()
+                self.rate_limiter.report_success(time.time() - self.started_at)
             elif '429' in str(exc_val) or 'rate limit' in str(exc_val).lower():
                 self.rate_limiter.report_rate_limit_error()
             else:
@@ -3,6 +3,10 @@ Worker pool for parallel document processing.
 
 Manages a pool of worker threads that process jobs from the queue.
 Configurable via environment variable: DD_PARALLEL_WORKERS (default: 10)
+
+Job events go to dd_job_execution through a JobAuditWriter (batched on a
+background thread), configured by DD_AUDIT_BATCH_SIZE, DD_AUDIT_FLUSH_INTERVAL
+and DD_AUDIT_QUEUE_SIZE.
 """
 
 from typing import Dict, List, Any, Optional, Callable
@@ -15,7 +19,8 @@ import logging
 import os
 
 from .job_queue import JobQueueInterface, Job, JobType, JobStatus
-from .rate_limiter import get_rate_limiter, RateLimiter, RateLimitedContext
+from .rate_limiter import get_rate_limiter, RateLimiter
+from .audit_writer import JobAuditWriter
 
 logger = logging.getLogger(__name__)
 
@@ -28,6 +33,11 @@ class WorkerConfig:
     shutdown_timeout: float = 60.0
     job_timeout: float = 300.0  # 5 minutes per job
 
+    # Job audit writer (dd_job_execution)
+    audit_batch_size: int = 200
+    audit_flush_interval: float = 1.0
+    audit_queue_size: int = 10000
+
     @classmethod
     def from_env(cls) -> 'WorkerConfig':
         """Create config from environment variables."""
@@ -35,7 +45,10 @@ class WorkerConfig:
             num_workers=int(os.environ.get("DD_PARALLEL_WORKERS", "10")),
             poll_interval=float(os.environ.get("DD_WORKER_POLL_INTERVAL", "0.5")),
             shutdown_timeout=float(os.environ.get("DD_WORKER_SHUTDOWN_TIMEOUT", "60")),
-            job_timeout=float(os.environ.get("DD_JOB_TIMEOUT", "300"))
+            job_timeout=float(os.environ.get("DD_JOB_TIMEOUT", "300")),
+            audit_batch_size=int(os.environ.get("DD_AUDIT_BATCH_SIZE", "200")),
+            audit_flush_interval=float(os.environ.get("DD_AUDIT_FLUSH_INTERVAL", "1.0")),
+            audit_queue_size=int(os.environ.get("DD_AUDIT_QUEUE_SIZE", "10000"))
         )
 
 
@@ -69,7 +82,7 @@ class DocumentWorker:
         self.job_queue = job_queue
         self.rate_limiter = rate_limiter
         self.job_handlers = job_handlers
-        self.db_writer = db_writer  # Callback to write job status to Postgres
+        self.db_writer = db_writer  # Callback that queues job status for Postgres
 
         self.stats = WorkerStats(worker_id=worker_id)
         self.current_job: Optional[Job] = None
@@ -80,26 +93,18 @@ class DocumentWorker:
         if not handler:
             raise ValueError(f"No handler registered for job type: {job.job_type}")
 
-        estimated_tokens = job.estimated_tokens or 2000
-
-        with RateLimitedContext(estimated_tokens=estimated_tokens, timeout=300) as ctx:
-            if not ctx.acquired:
-                raise TimeoutError("Timed out waiting for rate limit permission")
-
-            # Execute the handler
-            start_time = time.time()
-            result = handler(job)
-            duration_ms = int((time.time() - start_time) * 1000)
-
-            # Report actual tokens if available
-            if isinstance(result, dict) and 'tokens_used' in result:
-                ctx.report_tokens(result['tokens_used'])
+        # Handlers call ClaudeClient, which acquires from the shared rate
+        # limiter per API call - holding a slot for the whole job here
+        # would double-count and can starve the handler's own calls.
+        start_time = time.time()
+        result = handler(job)
+        duration_ms = int((time.time() - start_time) * 1000)
 
-            return {
-                'result': result,
-                'duration_ms': duration_ms,
-                'worker_id': self.worker_id
-            }
+        return {
+            'result': result,
+            'duration_ms': duration_ms,
+            'worker_id': self.worker_id
+        }
 
     def run(
         self,
@@ -256,12 +261,24 @@ class WorkerPool:
         self,
         job_queue: JobQueueInterface,
         config: WorkerConfig = None,
-        db_session=None
+        db_session=None,
+        session_factory: Optional[Callable] = None
     ):
+        """
+        Args:
+            job_queue: Queue to take jobs from
+            config: Worker configuration (from environment if None)
+            db_session: Session for the job audit trail; only the audit
+                writer thread uses it
+            session_factory: Alternative to db_session, e.g.
+                shared.session.transactional_session (one session per batch)
+        """
         self.job_queue = job_queue
         self.config = config or WorkerConfig.from_env()
         self.rate_limiter = get_rate_limiter()
         self.db_session = db_session
+        self.session_factory = session_factory
+        self.audit_writer: Optional[JobAuditWriter] = None
 
         self.workers: List[DocumentWorker] = []
         self.executor: Optional[ThreadPoolExecutor] = None
@@ -281,58 +298,6 @@ class WorkerPool:
         self.job_handlers[job_type] = handler
         logger.debug(f"Registered handler for {job_type.value}")
 
-    def _db_writer(self, action: str, data: Dict[str, Any]):
-        """Write job status to Postgres for audit trail."""
-        if not self.db_session:
-            return
-
-        try:
-            if action == 'start':
-                self.db_session.execute("""
-                    INSERT INTO dd_job_execution
-                    (run_id, job_id, job_type, document_id, batch_id, cluster_id,
-                     status, priority, retry_count, estimated_tokens, worker_id, started_at)
-                    VALUES (%(run_id)s, %(job_id)s, %(job_type)s, %(document_id)s,
-                            %(batch_id)s, %(cluster_id)s, %(status)s, %(priority)s,
-                            %(retry_count)s, %(estimated_tokens)s, %(worker_id)s, %(started_at)s)
-                    ON CONFLICT (run_id, job_id) DO UPDATE SET
-                    status = EXCLUDED.status,
-                    retry_count = EXCLUDED.retry_count,
-                    worker_id = EXCLUDED.worker_id,
-                    started_at = EXCLUDED.started_at
-                """, data)
-
-            elif action == 'complete':
-                self.db_session.execute("""
-                    UPDATE dd_job_execution
-                    SET status = %(status)s,
-                        completed_at = %(completed_at)s,
-                        duration_ms = %(duration_ms)s,
-                        actual_tokens = %(actual_tokens)s,
-                        result_summary = %(result_summary)s
-                    WHERE run_id = %(run_id)s AND job_id = %(job_id)s
-                """, data)
-
-            elif action == 'fail':
-                self.db_session.execute("""
-                    UPDATE dd_job_execution
-                    SET status = %(status)s,
-                        completed_at = %(completed_at)s,
-                        duration_ms = %(duration_ms)s,
-                        error_message = %(error_message)s,
-                        retry_count = %(retry_count)s
-                    WHERE run_id = %(run_id)s AND job_id = %(job_id)s
-                """, data)
-
-            self.db_session.commit()
-
-        except Exception as e:
-            logger.warning(f"Failed to write job status to Postgres: {e}")
-            try:
-                self.db_session.rollback()
-            except Exception:
-                pass
-
     def start(self, dd_id: str, job_types: List[JobType]):
         """Start the worker pool."""
         if self.is_running:
@@ -348,13 +313,23 @@ class WorkerPool:
             thread_name_prefix="dd_worker"
         )
 
+        if self.db_session is not None or self.session_factory is not None:
+            self.audit_writer = JobAuditWriter(
+                db_session=self.db_session,
+                session_factory=self.session_factory,
+                batch_size=self.config.audit_batch_size,
+                flush_interval=self.config.audit_flush_interval,
+                max_queue=self.config.audit_queue_size,
+            )
+            self.audit_writer.start()
+
         for i in range(self.config.num_workers):
             worker = DocumentWorker(
                 worker_id=i,
                 job_queue=self.job_queue,
                 rate_limiter=self.rate_limiter,
                 job_handlers=self.job_handlers,
-                db_writer=self._db_writer if self.db_session else None
+                db_writer=self.audit_writer.record if self.audit_writer else None
             )
             self.workers.append(worker)
 
@@ -375,6 +350,11 @@ class WorkerPool:
             # Wait for workers to finish current jobs
             self.executor.shutdown(wait=True, cancel_futures=False)
 
+        if self.audit_writer:
+            # Flush queued job events (after the workers have stopped adding them)
+            self.audit_writer.stop(timeout=self.config.shutdown_timeout)
+            self.audit_writer = None
+
         self.workers.clear()
         self.futures.clear()
         self.is_running = False
@@ -402,7 +382,8 @@ class WorkerPool:
             'total_processed': sum(w.stats.jobs_processed for w in self.workers),
             'total_failed': sum(w.stats.jobs_failed for w in self.workers),
             'workers': worker_stats,
-            'rate_limiter': self.rate_limiter.get_stats()
+            'rate_limiter': self.rate_limiter.get_stats(),
+            'audit_writer': vars(self.audit_writer.stats).copy() if self.audit_writer else None
         }
 
     def wait_for_completion(
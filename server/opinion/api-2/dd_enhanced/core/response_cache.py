@@ -0,0 +1,421 @@
+"""
+Content-addressed response cache for Claude API calls.
+
+Identical requests (model, system, prompt, temperature, max_tokens) return
+identical-enough responses for our purposes, so a restart, resume or re-run
+over an unchanged data room can replay stored responses instead of paying
+for the same call twice.
+
+Supports:
+- In-memory LRU tier (per process, fastest)
+- SQLite disk tier (survives restarts, shared by threads in a process)
+- TTL and size-based eviction on both tiers
+
+Configurable via environment variables:
+- DD_RESPONSE_CACHE_ENABLED (default: false)
+- DD_RESPONSE_CACHE_PATH (default: <tmp>/dd_response_cache.sqlite)
+- DD_RESPONSE_CACHE_TTL_SECONDS (default: 604800 - 7 days)
+- DD_RESPONSE_CACHE_MEMORY_ENTRIES (default: 512)
+- DD_RESPONSE_CACHE_MAX_DISK_ENTRIES (default: 50000)
+- DD_RESPONSE_CACHE_PASSES (default: "pass1,pass2,classification,compression") -
+  passes that opt in; cross-doc, synthesis and verification are not cached
+  by default because their inputs depend on the whole run
+"""
+
+from typing import Dict, Any, List, Optional, Set, Union
+from dataclasses import dataclass, field
+from collections import OrderedDict
+from abc import ABC, abstractmethod
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Bump when the stored entry format changes so stale entries are ignored
+CACHE_KEY_VERSION = "v1"
+
+# Per-document passes whose inputs are fully determined by one document
+DEFAULT_CACHED_PASSES = "pass1,pass2,classification,compression"
+
+
+@dataclass
+class ResponseCacheConfig:
+    """Configuration for the response cache."""
+    enabled: bool = False
+    db_path: str = field(default_factory=lambda: os.path.join(tempfile.gettempdir(), "dd_response_cache.sqlite"))
+    ttl_seconds: int = 7 * 24 * 3600
+    memory_entries: int = 512
+    max_disk_entries: int = 50000
+    cached_passes: Set[str] = field(default_factory=lambda: set(DEFAULT_CACHED_PASSES.split(",")))
+
+    @classmethod
+    def from_env(cls) -> 'ResponseCacheConfig':
+        """Create config from environment variables."""
+        passes = os.environ.get("DD_RESPONSE_CACHE_PASSES", DEFAULT_CACHED_PASSES)
+        return cls(
+            enabled=os.environ.get("DD_RESPONSE_CACHE_ENABLED", "").lower() in ("true", "1", "yes"),
+            db_path=os.environ.get(
+                "DD_RESPONSE_CACHE_PATH",
+                os.path.join(tempfile.gettempdir(), "dd_response_cache.sqlite")
+            ),
+            ttl_seconds=int(os.environ.get("DD_RESPONSE_CACHE_TTL_SECONDS", str(7 * 24 * 3600))),
+            memory_entries=int(os.environ.get("DD_RESPONSE_CACHE_MEMORY_ENTRIES", "512")),
+            max_disk_entries=int(os.environ.get("DD_RESPONSE_CACHE_MAX_DISK_ENTRIES", "50000")),
+            cached_passes={p.strip() for p in passes.split(",") if p.strip()}
+        )
+
+
+def make_cache_key(
+    model: str,
+    system: str,
+    prompt: Union[str, List[str]],
+    temperature: float,
+    max_tokens: int
+) -> str:
+    """
+    Build a content-addressed key for a completion request.
+
+    The key is a SHA-256 over a canonical JSON encoding of the inputs so that
+    any change to the model, prompt or sampling parameters yields a new key.
+    prompt may be a list when the request carries separate context blocks.
+    """
+    payload = json.dumps(
+        [CACHE_KEY_VERSION, model, system, prompt, round(float(temperature), 4), int(max_tokens)],
+        ensure_ascii=False,
+        separators=(",", ":")
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CachedResponse:
+    """A stored completion: raw text plus the usage it originally cost."""
+    model: str
+    content: str
+    input_tokens: int
+    output_tokens: int
+    created_at: float = field(default_factory=time.time)
+
+    def to_json(self) -> str:
+        return json.dumps({
+            'model': self.model,
+            'content': self.content,
+            'input_tokens': self.input_tokens,
+            'output_tokens': self.output_tokens,
+            'created_at': self.created_at
+        })
+
+    @staticmethod
+    def from_json(data: str) -> 'CachedResponse':
+        d = json.loads(data)
+        return CachedResponse(
+            model=d['model'],
+            content=d['content'],
+            input_tokens=d.get('input_tokens', 0),
+            output_tokens=d.get('output_tokens', 0),
+            created_at=d.get('created_at', 0.0)
+        )
+
+
+class ResponseCacheBackend(ABC):
+    """Abstract interface for response cache storage tiers."""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[CachedResponse]:
+        """Return the cached response for key, or None if missing/expired."""
+        pass
+
+    @abstractmethod
+    def set(self, key: str, value: CachedResponse):
+        """Store a response under key."""
+        pass
+
+    @abstractmethod
+    def delete(self, key: str):
+        """Remove a single entry."""
+        pass
+
+    @abstractmethod
+    def clear(self):
+        """Remove all entries."""
+        pass
+
+    def close(self):
+        """Release any held resources."""
+        pass
+
+
+class InMemoryLRUCache(ResponseCacheBackend):
+    """
+    Thread-safe in-memory LRU tier with TTL.
+    """
+
+    def __init__(self, max_entries: int = 512, ttl_seconds: int = 7 * 24 * 3600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: 'OrderedDict[str, CachedResponse]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if self.ttl_seconds and time.time() - entry.created_at > self.ttl_seconds:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, value: CachedResponse):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteResponseCache(ResponseCacheBackend):
+    """
+    SQLite-backed disk tier with TTL and size-based eviction.
+
+    One connection per thread (sqlite3 connections are not shareable across
+    threads); WAL mode lets concurrent readers proceed while a writer commits.
+    """
+
+    # Evict in chunks rather than on every insert
+    EVICTION_CHECK_INTERVAL = 100
+
+    def __init__(self, db_path: str, max_entries: int = 50000, ttl_seconds: int = 7 * 24 * 3600):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._writes_since_eviction = 0
+
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+
+        conn = self._conn()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS response_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_accessed REAL NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_response_cache_accessed ON response_cache (last_accessed)")
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT value, created_at FROM response_cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        value, created_at = row
+        now = time.time()
+        if self.ttl_seconds and now - created_at > self.ttl_seconds:
+            self.delete(key)
+            return None
+
+        with self._write_lock:
+            conn.execute("UPDATE response_cache SET last_accessed = ? WHERE key = ?", (now, key))
+            conn.commit()
+
+        try:
+            return CachedResponse.from_json(value)
+        except (ValueError, KeyError):
+            self.delete(key)
+            return None
+
+    def set(self, key: str, value: CachedResponse):
+        conn = self._conn()
+        now = time.time()
+        with self._write_lock:
+            conn.execute(
+                "INSERT OR REPLACE INTO response_cache (key, value, created_at, last_accessed) VALUES (?, ?, ?, ?)",
+                (key, value.to_json(), value.created_at, now)
+            )
+            conn.commit()
+            self._writes_since_eviction += 1
+            if self._writes_since_eviction >= self.EVICTION_CHECK_INTERVAL:
+                self._writes_since_eviction = 0
+                self._evict(conn)
+
+    def _evict(self, conn: sqlite3.Connection):
+        """Drop expired entries, then least-recently-used entries over the size cap."""
+        if self.ttl_seconds:
+            conn.execute(
+                "DELETE FROM response_cache WHERE created_at < ?",
+                (time.time() - self.ttl_seconds,)
+            )
+        count = conn.execute("SELECT COUNT(*) FROM response_cache").fetchone()[0]
+        if count > self.max_entries:
+            conn.execute("""
+                DELETE FROM response_cache WHERE key IN (
+                    SELECT key FROM response_cache ORDER BY last_accessed ASC LIMIT ?
+                )
+            """, (count - self.max_entries,))
+        conn.commit()
+
+    def delete(self, key: str):
+        conn = self._conn()
+        with self._write_lock:
+            conn.execute("DELETE FROM response_cache WHERE key = ?", (key,))
+            conn.commit()
+
+    def clear(self):
+        conn = self._conn()
+        with self._write_lock:
+            conn.execute("DELETE FROM response_cache")
+            conn.commit()
+
+    def close(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+class ResponseCache:
+    """
+    Two-tier response cache: in-memory LRU in front of an optional disk tier.
+
+    Usage:
+        cache = get_response_cache()
+        key = make_cache_key(model, system, prompt, temperature, max_tokens)
+        hit = cache.get(key)
+        if hit is None:
+            ...call API...
+            cache.set(key, CachedResponse(model, text, input_tokens, output_tokens))
+    """
+
+    def __init__(self, config: ResponseCacheConfig = None, disk: Optional[ResponseCacheBackend] = None):
+        self.config = config or ResponseCacheConfig.from_env()
+        self.memory = InMemoryLRUCache(self.config.memory_entries, self.config.ttl_seconds)
+        self.disk = disk
+        if self.disk is None and self.config.db_path:
+            try:
+                self.disk = SQLiteResponseCache(
+                    self.config.db_path,
+                    max_entries=self.config.max_disk_entries,
+                    ttl_seconds=self.config.ttl_seconds
+                )
+            except sqlite3.Error as e:
+                logger.warning(f"Response cache disk tier unavailable ({e}), using memory only")
+                self.disk = None
+
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+
+        logger.info(f"Response cache initialized: memory={self.config.memory_entries} entries, "
+                    f"disk={'sqlite:' + self.config.db_path if self.disk else 'disabled'}, "
+                    f"ttl={self.config.ttl_seconds}s")
+
+    def is_enabled_for(self, pass_name: Optional[str]) -> bool:
+        """Whether calls made on behalf of pass_name opt in to caching."""
+        return self.config.enabled and pass_name is not None and pass_name in self.config.cached_passes
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        entry = self.memory.get(key)
+        if entry is None and self.disk is not None:
+            try:
+                entry = self.disk.get(key)
+            except sqlite3.Error as e:
+                logger.warning(f"Response cache read failed: {e}")
+                entry = None
+            if entry is not None:
+                self.memory.set(key, entry)
+
+        with self._stats_lock:
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return entry
+
+    def set(self, key: str, value: CachedResponse):
+        self.memory.set(key, value)
+        if self.disk is not None:
+            try:
+                self.disk.set(key, value)
+            except sqlite3.Error as e:
+                logger.warning(f"Response cache write failed: {e}")
+
+    def delete(self, key: str):
+        self.memory.delete(key)
+        if self.disk is not None:
+            self.disk.delete(key)
+
+    def clear(self):
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': (self.hits / total) if total else 0.0,
+                'memory_entries': len(self.memory),
+                'disk_enabled': self.disk is not None,
+                'cached_passes': sorted(self.config.cached_passes),
+            }
+
+
+# Global response cache instance
+_response_cache: Optional[ResponseCache] = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache(config: ResponseCacheConfig = None) -> ResponseCache:
+    """Get the global response cache instance."""
+    global _response_cache
+    with _response_cache_lock:
+        if _response_cache is None:
+            _response_cache = ResponseCache(config)
+        return _response_cache
+
+
+def reset_response_cache(config: ResponseCacheConfig = None):
+    """Reset the global response cache (useful for testing)."""
+    global _response_cache
+    with _response_cache_lock:
+        if _response_cache is not None and _response_cache.disk is not None:
+            _response_cache.disk.close()
+        _response_cache = ResponseCache(config) if config else None
@@ -23,6 +23,8 @@ import json
 import logging
 import os
 
+from ..finding_dedup import deduplicate_findings
+
 logger = logging.getLogger(__name__)
 
 
@@ -434,21 +436,14 @@ Write in professional legal prose. Be direct and clear. Quantify where possible.
         )
 
     def _deduplicate_findings(self, findings: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Deduplicate similar findings based on title and description."""
-        seen_signatures = set()
-        unique = []
-
-        for finding in findings:
-            # Create signature from key fields
-            title = finding.get('title', finding.get('description', ''))[:50].lower()
-            finding_type = finding.get('finding_type', finding.get('type', ''))
-            signature = f"{finding_type}:{title}"
-
-            if signature not in seen_signatures:
-                seen_signatures.add(signature)
-                unique.append(finding)
-
-        return unique
+        """Deduplicate similar findings based on title and description, keeping the most severe."""
+        return deduplicate_findings(
+            findings,
+            text=lambda f: f.get('title', f.get('description', '')),
+            group=lambda f: f.get('finding_type', f.get('type', '')),
+            key=lambda f: f.get('title', f.get('description', ''))[:50].lower(),
+            document=lambda f: f.get('source_document', f.get('document')),
+        )
 
     def _format_findings(self, findings: List[Dict[str, Any]]) -> str:
         """Format findings for prompt inclusion."""
@@ -214,6 +214,23 @@ When analyzing acquisition transactions where target financials are available:
 ANALYSIS_SYSTEM_PROMPT = get_analysis_system_prompt()
 
 
+def build_analysis_context(transaction_context: str, reference_docs_text: str) -> str:
+    """
+    Build the part of the Pass 2 prompt that is identical for every document
+    in a run: transaction context plus constitutional/governance reference docs.
+    """
+    return f"""TRANSACTION CONTEXT:
+{transaction_context}
+
+---
+
+REFERENCE DOCUMENTS (Constitutional/Governance - use these to validate requirements):
+{reference_docs_text}
+
+---
+"""
+
+
 def build_analysis_prompt(
     document_text: str,
     document_name: str,
@@ -224,11 +241,16 @@ def build_analysis_prompt(
     prioritized_questions: Optional[List[Dict]] = None,
     folder_category: Optional[str] = None,
     folder_questions: Optional[List[Dict]] = None,
-    entity_map: Optional[List[Dict]] = None
+    entity_map: Optional[List[Dict]] = None,
+    shared_context_in_prefix: bool = False
 ) -> str:
     """
     Build the analysis prompt for a single document.
 
+    When shared_context_in_prefix is True, the transaction context and
+    reference documents are omitted here: the caller sends them once as a
+    prompt-cached prefix built by build_analysis_context().
+
     KEY IMPROVEMENTS:
     1. Reference documents (MOI, SHA) are always included for validation
     2. Blueprint questions are injected to guide specific analysis
@@ -260,18 +282,18 @@ def build_analysis_prompt(
     # Entity mapping context for party validation
     entity_context_section = _build_entity_context_section(entity_map)
 
-    return f"""Analyze this document for the transaction described below.
-
-TRANSACTION CONTEXT:
-{transaction_context}
+    if shared_context_in_prefix:
+        shared_section = """Analyze this document for the transaction described in the TRANSACTION CONTEXT above,
+validating requirements against the REFERENCE DOCUMENTS provided above.
 
 ---
+"""
+    else:
+        shared_section = f"""Analyze this document for the transaction described below.
 
-REFERENCE DOCUMENTS (Constitutional/Governance - use these to validate requirements):
-{reference_docs_text}
-
----
+{build_analysis_context(transaction_context, reference_docs_text)}"""
 
+    return f"""{shared_section}
 DOCUMENT BEING ANALYZED: {document_name} ({doc_type})
 {document_text}
 
@@ -18,6 +18,11 @@ BLUEPRINT-DRIVEN: The cross-doc prompts now dynamically include:
 from typing import Optional, Dict, List
 
 
+# Stand-in for all_documents_text when the combined document context is sent
+# once as a prompt-cached prefix ahead of the prompt instead of inline
+DOCUMENTS_PROVIDED_ABOVE = "[The full text of every document is provided above, before these instructions.]"
+
+
 def get_crossdoc_system_prompt(blueprint: Optional[Dict] = None) -> str:
     """Generate system prompt, optionally customized based on blueprint."""
     transaction_type = blueprint.get("transaction_type", "corporate acquisition") if blueprint else "corporate acquisition"
@@ -0,0 +1,46 @@
+"""
+Migration: Add extracted_text_hash column to document table
+
+Keys the cached page-tagged text in document.extracted_text_with_pages to the
+SHA-256 of the file it was extracted from, so text extraction runs once per
+file version instead of on every classification/mapping/processing run.
+
+Run with: python migrations/add_extracted_text_hash.py
+"""
+import os
+import sys
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from shared.session import engine
+from sqlalchemy import text
+
+
+def migrate():
+    """Add extracted_text_hash column to document table."""
+
+    with engine.connect() as conn:
+        result = conn.execute(text("""
+            SELECT column_name
+            FROM information_schema.columns
+            WHERE table_name = 'document'
+            AND column_name = 'extracted_text_hash'
+        """))
+
+        if result.fetchone():
+            print("Column 'extracted_text_hash' already exists in document table")
+        else:
+            print("Adding 'extracted_text_hash' column to document table...")
+            conn.execute(text("""
+                ALTER TABLE document
+                ADD COLUMN extracted_text_hash VARCHAR(64)
+            """))
+            print("Successfully added 'extracted_text_hash' column")
+
+        conn.commit()
+        print("\nMigration completed successfully!")
+
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,48 @@
+"""
+Migration: Add findings event log
+
+Creates dd_finding_event, the append-only change feed read by
+DDFindingsStream. One row per finding stored by a processing run; clients
+page through it with the seq cursor (see shared/finding_events.py).
+
+Run with: python migrations/add_finding_events.py
+"""
+import os
+import sys
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from shared.session import engine
+from sqlalchemy import text
+
+
+def migrate():
+    """Create the findings event log table."""
+
+    with engine.connect() as conn:
+        print("Creating table dd_finding_event...")
+        conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS dd_finding_event (
+                seq BIGSERIAL PRIMARY KEY,
+                dd_id UUID NOT NULL REFERENCES due_diligence(id) ON DELETE CASCADE,
+                run_id UUID,
+                finding_id UUID,
+                event_type VARCHAR(20) NOT NULL DEFAULT 'created',
+                payload JSONB NOT NULL,
+                created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+            )
+        """))
+
+        print("Creating index on (dd_id, seq)...")
+        conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS idx_dd_finding_event_dd_seq
+            ON dd_finding_event(dd_id, seq)
+        """))
+
+        conn.commit()
+        print("\nMigration completed successfully!")
+
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,51 @@
+"""
+Migration: Add incremental run state
+
+Extends the per-run document state (created by add_parallel_processing.py)
+so a later run of the same DD can carry forward results for unchanged
+documents:
+- dd_document_processing_state.pass2_blueprint_qa: Pass 2 blueprint Q&A
+- dd_cluster_processing_state: Pass 3 cross-document findings per cluster
+
+Run with: python migrations/add_incremental_run_state.py
+"""
+import os
+import sys
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from shared.session import engine
+from sqlalchemy import text
+
+
+def migrate():
+    """Add incremental run state column and table."""
+
+    with engine.connect() as conn:
+        print("Adding 'pass2_blueprint_qa' column to dd_document_processing_state...")
+        conn.execute(text("""
+            ALTER TABLE dd_document_processing_state
+            ADD COLUMN IF NOT EXISTS pass2_blueprint_qa JSONB DEFAULT '[]'::jsonb
+        """))
+
+        print("Creating table dd_cluster_processing_state...")
+        conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS dd_cluster_processing_state (
+                id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+                run_id UUID NOT NULL REFERENCES dd_analysis_run(id) ON DELETE CASCADE,
+                cluster_name VARCHAR(100) NOT NULL,
+                document_ids JSONB NOT NULL DEFAULT '[]'::jsonb,
+                cross_doc_findings JSONB NOT NULL DEFAULT '[]'::jsonb,
+                created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+
+                UNIQUE(run_id, cluster_name)
+            )
+        """))
+
+        conn.commit()
+        print("\nMigration completed successfully!")
+
+
+if __name__ == "__main__":
+    migrate()
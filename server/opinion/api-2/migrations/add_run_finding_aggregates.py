@@ -0,0 +1,182 @@
+"""
+Migration: Add per-run finding aggregates
+
+Creates dd_run_finding_aggregate, a per-run summary of perspective_risk_finding
+counted by (action_priority, risk category, folder, status, finding_type,
+deal_impact, exposure currency). A row trigger on perspective_risk_finding keeps
+it current on insert, update and delete, whichever code path writes the
+finding. Dashboards (DDRiskMatrix, DDReportGenerate, DDProgressEnhanced) read
+these few rows instead of scanning findings (see shared/finding_aggregates.py).
+
+Also adds an index matching the top-risks ordering so get_top_risks reads the
+first rows of an index instead of sorting every finding of the run.
+
+Existing runs are backfilled. Safe to re-run: the backfill rebuilds the table.
+
+Run with: python migrations/add_run_finding_aggregates.py
+"""
+import os
+import sys
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from shared.session import engine
+from sqlalchemy import text
+
+
+# Bucket columns; NULLs are stored as '' so they take part in the unique key
+BUCKET_VALUES = """
+    f.run_id,
+    COALESCE(f.action_priority::text, ''),
+    COALESCE(f.risk_category, f.folder_category, 'General'),
+    COALESCE(f.folder_category, ''),
+    COALESCE(f.status::text, ''),
+    COALESCE(f.finding_type::text, ''),
+    COALESCE(f.deal_impact::text, ''),
+    COALESCE(f.financial_exposure_currency, '')
+"""
+
+
+def migrate():
+    """Create the aggregate table, its maintenance trigger and the top-risks index."""
+
+    with engine.connect() as conn:
+        print("Creating table dd_run_finding_aggregate...")
+        conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS dd_run_finding_aggregate (
+                run_id UUID NOT NULL REFERENCES dd_analysis_run(id) ON DELETE CASCADE,
+                action_priority VARCHAR(20) NOT NULL,
+                risk_category VARCHAR(100) NOT NULL,
+                folder_category VARCHAR(50) NOT NULL,
+                status VARCHAR(20) NOT NULL,
+                finding_type VARCHAR(30) NOT NULL,
+                deal_impact VARCHAR(30) NOT NULL,
+                exposure_currency VARCHAR(10) NOT NULL,
+                finding_count INTEGER NOT NULL DEFAULT 0,
+                exposure_count INTEGER NOT NULL DEFAULT 0,
+                exposure_total NUMERIC NOT NULL DEFAULT 0,
+                PRIMARY KEY (run_id, action_priority, risk_category, folder_category,
+                             status, finding_type, deal_impact, exposure_currency)
+            )
+        """))
+
+        print("Creating aggregate maintenance functions...")
+        conn.execute(text(f"""
+            CREATE OR REPLACE FUNCTION dd_run_finding_aggregate_apply(f perspective_risk_finding, delta INTEGER)
+            RETURNS void AS $$
+            DECLARE
+                has_exposure BOOLEAN := COALESCE(f.financial_exposure_amount > 0, FALSE);
+            BEGIN
+                IF f.run_id IS NULL THEN
+                    RETURN;
+                END IF;
+
+                IF delta < 0 THEN
+                    -- Never insert for a removal: the run may be mid-delete (its rows cascade away)
+                    UPDATE dd_run_finding_aggregate a
+                    SET finding_count = a.finding_count + delta,
+                        exposure_count = a.exposure_count + CASE WHEN has_exposure THEN delta ELSE 0 END,
+                        exposure_total = a.exposure_total
+                            + CASE WHEN has_exposure THEN delta * f.financial_exposure_amount::numeric ELSE 0 END
+                    WHERE (a.run_id, a.action_priority, a.risk_category, a.folder_category,
+                           a.status, a.finding_type, a.deal_impact, a.exposure_currency)
+                        = ({BUCKET_VALUES});
+                    RETURN;
+                END IF;
+
+                INSERT INTO dd_run_finding_aggregate AS a
+                    (run_id, action_priority, risk_category, folder_category,
+                     status, finding_type, deal_impact, exposure_currency,
+                     finding_count, exposure_count, exposure_total)
+                VALUES (
+                    {BUCKET_VALUES},
+                    delta,
+                    CASE WHEN has_exposure THEN delta ELSE 0 END,
+                    CASE WHEN has_exposure THEN delta * f.financial_exposure_amount::numeric ELSE 0 END
+                )
+                ON CONFLICT (run_id, action_priority, risk_category, folder_category,
+                             status, finding_type, deal_impact, exposure_currency)
+                DO UPDATE SET
+                    finding_count = a.finding_count + EXCLUDED.finding_count,
+                    exposure_count = a.exposure_count + EXCLUDED.exposure_count,
+                    exposure_total = a.exposure_total + EXCLUDED.exposure_total;
+            END;
+            $$ LANGUAGE plpgsql
+        """))
+
+        conn.execute(text("""
+            CREATE OR REPLACE FUNCTION dd_run_finding_aggregate_trigger()
+            RETURNS trigger AS $$
+            BEGIN
+                IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                    PERFORM dd_run_finding_aggregate_apply(OLD, -1);
+                END IF;
+                IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                    PERFORM dd_run_finding_aggregate_apply(NEW, 1);
+                END IF;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql
+        """))
+
+        print("Creating trigger on perspective_risk_finding...")
+        conn.execute(text("""
+            DROP TRIGGER IF EXISTS trg_dd_run_finding_aggregate ON perspective_risk_finding
+        """))
+        conn.execute(text("""
+            CREATE TRIGGER trg_dd_run_finding_aggregate
+            AFTER INSERT OR DELETE OR UPDATE OF
+                run_id, action_priority, risk_category, folder_category, status,
+                finding_type, deal_impact, financial_exposure_currency, financial_exposure_amount
+            ON perspective_risk_finding
+            FOR EACH ROW EXECUTE FUNCTION dd_run_finding_aggregate_trigger()
+        """))
+
+        # Rebuild under a lock so no finding is counted twice or missed
+        print("Backfilling aggregates for existing runs...")
+        conn.execute(text("LOCK TABLE perspective_risk_finding IN SHARE ROW EXCLUSIVE MODE"))
+        conn.execute(text("DELETE FROM dd_run_finding_aggregate"))
+        conn.execute(text(f"""
+            INSERT INTO dd_run_finding_aggregate
+                (run_id, action_priority, risk_category, folder_category,
+                 status, finding_type, deal_impact, exposure_currency,
+                 finding_count, exposure_count, exposure_total)
+            SELECT
+                {BUCKET_VALUES},
+                COUNT(*),
+                COUNT(*) FILTER (WHERE f.financial_exposure_amount > 0),
+                COALESCE(SUM(f.financial_exposure_amount::numeric) FILTER (WHERE f.financial_exposure_amount > 0), 0)
+            FROM perspective_risk_finding f
+            WHERE f.run_id IS NOT NULL
+            GROUP BY {BUCKET_VALUES}
+        """))
+
+        print("Creating top-risks index on perspective_risk_finding...")
+        conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS idx_prf_run_top_risks
+            ON perspective_risk_finding (
+                run_id,
+                (CASE action_priority
+                    WHEN 'critical' THEN 1
+                    WHEN 'high' THEN 2
+                    WHEN 'medium' THEN 3
+                    WHEN 'low' THEN 4
+                    ELSE 5
+                END),
+                (CASE deal_impact
+                    WHEN 'deal_blocker' THEN 1
+                    WHEN 'condition_precedent' THEN 2
+                    WHEN 'price_chip' THEN 3
+                    ELSE 4
+                END)
+            )
+            WHERE status != 'Deleted'
+        """))
+
+        conn.commit()
+        print("\nMigration completed successfully!")
+
+
+if __name__ == "__main__":
+    migrate()
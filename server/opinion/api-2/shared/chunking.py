@@ -0,0 +1,210 @@
+# File: server/opinion/api-2/shared/chunking.py
+"""
+Token-aware streaming chunker for RAG ingest.
+
+Splits page text into chunks of at most max_tokens tokens, counted with the
+same cl100k_base encoding as dd_enhanced.core.compression_engine.count_tokens
+(4 chars/token when tiktoken is unavailable):
+
+- Clause/section headings ("Clause 15.2", "Section 4", "12.3.1 ...") are
+  preferred chunk boundaries: a chunk that is at least CLAUSE_BREAK_MIN_FILL
+  full is closed before a new clause starts.
+- Otherwise text is packed greedily, splitting oversized spans at paragraph,
+  line, sentence and word boundaries (characters as a last resort).
+- Chunks closed because they are full carry overlap_tokens of trailing text
+  into the next chunk; chunks closed at a clause heading start clean.
+
+Chunks are yielded one at a time, so pages (themselves possibly a generator)
+stream through chunking and embedding without materialising the whole
+document. Each chunk carries its provenance:
+
+    {
+        "page_number": 3,
+        "chunk_index": 0,             # per page, as used in search index IDs
+        "text": "...",
+        "char_start": 0,              # offsets into the page text
+        "char_end": 2140,
+        "token_count": 498,
+        "clause_refs": ["15.2", "15.3"]
+    }
+
+Configurable via environment variables:
+- CHUNK_MAX_TOKENS (default: 512)
+- CHUNK_OVERLAP_TOKENS (default: 64)
+
+Usage:
+    for chunk in iter_page_chunks(pages):
+        ...
+"""
+
+import os
+import re
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    from dd_enhanced.core.compression_engine import count_tokens
+except Exception:
+    # dd_enhanced (or its dependencies) unavailable: same 4 chars/token fallback
+    def count_tokens(text: str) -> int:
+        return len(text) // 4
+
+CHUNK_MAX_TOKENS = int(os.environ.get("CHUNK_MAX_TOKENS", "512"))
+CHUNK_OVERLAP_TOKENS = int(os.environ.get("CHUNK_OVERLAP_TOKENS", "64"))
+
+# Bump whenever chunk boundaries change; resumable ingest progress
+# (next_chunk_to_process) is only valid for the version that produced it
+CHUNKING_VERSION = "2"
+
+# Close a chunk at a clause heading once it is at least this full
+CLAUSE_BREAK_MIN_FILL = 0.5
+
+# Chunk keys carried through embedding alongside chunk/page_number/chunk_index
+CHUNK_PROVENANCE_KEYS = ("char_start", "char_end", "token_count", "clause_refs")
+
+# Clause/section headings at the start of a line; group 1 is the reference
+_CLAUSE_HEADING = re.compile(
+    r"^[ \t]*("
+    r"(?i:(?:clause|section|article|schedule|annexure|annex|part)\s+(?:\d+(?:\.\d+)*|[ivxlc]+))\b"
+    r"|\d+(?:\.\d+)+\b"
+    r"|\d+\.(?=[ \t]+[A-Z])"
+    r")",
+    re.MULTILINE
+)
+
+# Split points from coarsest to finest; each split keeps the separator with
+# the preceding span so spans always concatenate back to the original text
+_SEPARATORS = [
+    re.compile(r"\n[ \t]*\n\s*"),       # paragraphs
+    re.compile(r"\n\s*"),               # lines
+    re.compile(r"(?<=[.;:!?])\s+"),     # sentences
+    re.compile(r"\s+"),                 # words
+]
+
+# (start, end, tokens, clause_ref) within the page text
+_Span = Tuple[int, int, int, Optional[str]]
+
+
+def _clause_ref(heading: str) -> str:
+    """Normalised reference for a heading match ("CLAUSE 15.2" -> "Clause 15.2", "3." -> "3")."""
+    ref = " ".join(heading.split()).rstrip(".")
+    return ref[:1].upper() + ref[1:].lower() if ref[:1].isalpha() else ref
+
+
+def _split_span(text: str, start: int, end: int, max_tokens: int, level: int = 0) -> Iterator[Tuple[int, int, int]]:
+    """Cover text[start:end] with (start, end, tokens) spans of at most max_tokens."""
+    tokens = count_tokens(text[start:end])
+    if tokens <= max_tokens:
+        yield start, end, tokens
+        return
+
+    if level >= len(_SEPARATORS):
+        # No separator left: cut proportionally by characters
+        step = max(1, (end - start) * max_tokens // (tokens + 1))
+        for piece_start in range(start, end, step):
+            yield from _split_span(text, piece_start, min(end, piece_start + step), max_tokens, level)
+        return
+
+    piece_start = start
+    for match in _SEPARATORS[level].finditer(text, start, end):
+        if match.end() >= end:
+            break
+        if match.start() > piece_start:
+            yield from _split_span(text, piece_start, match.end(), max_tokens, level + 1)
+            piece_start = match.end()
+    yield from _split_span(text, piece_start, end, max_tokens, level + 1)
+
+
+def _page_spans(text: str, max_tokens: int, clause: Optional[str]) -> Iterator[Tuple[_Span, bool]]:
+    """Spans of a page with the clause they belong to, flagging clause starts."""
+    boundaries = [(m.start(), _clause_ref(m.group(1))) for m in _CLAUSE_HEADING.finditer(text)]
+    if not boundaries or boundaries[0][0] > 0:
+        boundaries.insert(0, (0, None))
+
+    for n, (section_start, heading) in enumerate(boundaries):
+        section_end = boundaries[n + 1][0] if n + 1 < len(boundaries) else len(text)
+        if heading is not None:
+            clause = heading
+        for i, (start, end, tokens) in enumerate(_split_span(text, section_start, section_end, max_tokens)):
+            yield (start, end, tokens, clause), heading is not None and i == 0
+
+
+def _make_chunk(text: str, page_number, chunk_index: int, spans: List[_Span]) -> Optional[Dict]:
+    start, end = spans[0][0], spans[-1][1]
+    raw = text[start:end]
+    stripped = raw.strip()
+    if not stripped:
+        return None
+    start += len(raw) - len(raw.lstrip())
+    clause_refs = list(dict.fromkeys(span[3] for span in spans if span[3]))
+    return {
+        "page_number": page_number,
+        "chunk_index": chunk_index,
+        "text": stripped,
+        "char_start": start,
+        "char_end": start + len(stripped),
+        "token_count": sum(span[2] for span in spans),
+        "clause_refs": clause_refs,
+    }
+
+
+def iter_page_chunks(
+    pages: Iterable[Dict],
+    max_tokens: int = CHUNK_MAX_TOKENS,
+    overlap_tokens: int = CHUNK_OVERLAP_TOKENS
+) -> Iterator[Dict]:
+    """
+    Yield token-bounded chunks for pages of {"page_number", "text"}.
+
+    Chunks never span pages; the clause in force at the end of one page
+    carries over to the next.
+    """
+    max_tokens = max(1, max_tokens)
+    overlap_tokens = max(0, min(overlap_tokens, max_tokens // 2))
+    clause: Optional[str] = None
+
+    for page in pages:
+        text = page.get("text") or ""
+        page_number = page.get("page_number")
+        chunk_index = 0
+        current: List[_Span] = []
+        current_tokens = 0
+
+        for span, starts_clause in _page_spans(text, max_tokens, clause):
+            clause = span[3]
+            at_clause_break = starts_clause and current_tokens >= CLAUSE_BREAK_MIN_FILL * max_tokens
+            if current and (at_clause_break or current_tokens + span[2] > max_tokens):
+                chunk = _make_chunk(text, page_number, chunk_index, current)
+                if chunk:
+                    yield chunk
+                    chunk_index += 1
+
+                # Carry trailing spans as overlap unless starting a new clause
+                carried: List[_Span] = []
+                if not at_clause_break:
+                    carried_tokens = 0
+                    for previous in reversed(current):
+                        if carried_tokens + previous[2] > overlap_tokens:
+                            break
+                        carried.insert(0, previous)
+                        carried_tokens += previous[2]
+                    while carried and carried_tokens + span[2] > max_tokens:
+                        carried_tokens -= carried.pop(0)[2]
+                current = carried
+                current_tokens = sum(s[2] for s in current)
+
+            current.append(span)
+            current_tokens += span[2]
+
+        if current:
+            chunk = _make_chunk(text, page_number, chunk_index, current)
+            if chunk:
+                yield chunk
+
+
+def iter_text_chunks(
+    text: str,
+    max_tokens: int = CHUNK_MAX_TOKENS,
+    overlap_tokens: int = CHUNK_OVERLAP_TOKENS
+) -> Iterator[Dict]:
+    """Chunks of a single unpaged text (page_number 1)."""
+    return iter_page_chunks([{"page_number": 1, "text": text}], max_tokens, overlap_tokens)
@@ -0,0 +1,150 @@
+# File: server/opinion/api_2/shared/db_instrumentation.py
+#
+# Query counting, timing and slow-query logging for SQLAlchemy engines.
+#
+# instrument_engine() hooks an engine's cursor events. Queries are counted
+# into every active query_stats() scope of the current thread/context, so a
+# request handler or background run can report how many statements it ran,
+# how long they took and which statements repeated (N+1 patterns). Queries
+# slower than DB_SLOW_QUERY_MS are logged with the function that issued them.
+#
+# Usage:
+#     @instrumented()
+#     def main(req): ...
+#
+#     with query_stats("pass2") as stats:
+#         ...
+#     stats.summary()
+
+import contextvars
+import functools
+import logging
+import os
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+# Queries at least this slow are logged with their originating function
+SLOW_QUERY_MS = float(os.environ.get("DB_SLOW_QUERY_MS", "500"))
+
+# Frames from these files are skipped when finding a query's origin
+_INTERNAL_FILES = (os.sep + "sqlalchemy" + os.sep, os.sep + "contextlib.py", __file__)
+
+
+@dataclass
+class QueryStats:
+    """Queries issued inside one query_stats() scope."""
+    label: str
+    query_count: int = 0
+    total_ms: float = 0.0
+    slow_count: int = 0
+    elapsed_ms: float = 0.0
+    statements: Dict[str, int] = field(default_factory=dict)  # statement -> executions
+
+    def record(self, statement: str, duration_ms: float) -> None:
+        self.query_count += 1
+        self.total_ms += duration_ms
+        if duration_ms >= SLOW_QUERY_MS:
+            self.slow_count += 1
+        self.statements[statement] = self.statements.get(statement, 0) + 1
+
+    def summary(self, top: int = 5) -> Dict[str, Any]:
+        """Counts and timings, with the most repeated statements first."""
+        repeated = sorted(self.statements.items(), key=lambda item: item[1], reverse=True)[:top]
+        return {
+            "label": self.label,
+            "queries": self.query_count,
+            "db_ms": round(self.total_ms, 1),
+            "elapsed_ms": round(self.elapsed_ms, 1),
+            "slow_queries": self.slow_count,
+            "top_statements": [
+                {"count": count, "statement": " ".join(statement.split())[:200]}
+                for statement, count in repeated
+            ],
+        }
+
+
+_active_stats: contextvars.ContextVar[Tuple[QueryStats, ...]] = contextvars.ContextVar(
+    "db_query_stats", default=()
+)
+
+
+@contextmanager
+def query_stats(label: str, log: bool = True):
+    """
+    Count queries issued inside the block (nested scopes all count them).
+
+    Threads start with no active scope, so a background worker opens its
+    own. Logs the summary on exit when log is true and any query ran.
+    """
+    stats = QueryStats(label=label)
+    token = _active_stats.set(_active_stats.get() + (stats,))
+    started = time.perf_counter()
+    try:
+        yield stats
+    finally:
+        stats.elapsed_ms = (time.perf_counter() - started) * 1000
+        _active_stats.reset(token)
+        if log and stats.query_count:
+            logger.info(f"[db] {stats.summary()}")
+
+
+def instrumented(label: Optional[str] = None):
+    """Decorator: run the function inside query_stats (label defaults to module.function)."""
+    def decorator(func):
+        scope_label = label or f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with query_stats(scope_label):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _query_origin() -> str:
+    """module:function:line of the first caller outside SQLAlchemy and this module."""
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if not any(part in filename for part in _INTERNAL_FILES):
+            return f"{frame.f_globals.get('__name__', filename)}:{frame.f_code.co_name}:{frame.f_lineno}"
+        frame = frame.f_back
+    return "unknown"
+
+
+def instrument_engine(engine) -> None:
+    """Attach query timing and slow-query logging to an engine."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.get("query_started")
+        if not started:
+            return
+        duration_ms = (time.perf_counter() - started.pop()) * 1000
+
+        for stats in _active_stats.get():
+            stats.record(statement, duration_ms)
+
+        if duration_ms >= SLOW_QUERY_MS:
+            logger.warning(
+                f"[db] Slow query ({duration_ms:.0f} ms) from {_query_origin()}: "
+                f"{' '.join(statement.split())[:500]}"
+            )
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(exception_context):
+        # after_cursor_execute does not fire for failed statements
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_started"):
+            conn.info["query_started"].pop()
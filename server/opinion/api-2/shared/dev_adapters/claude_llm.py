@@ -5,6 +5,8 @@ import os
 import time
 from typing import List, Dict, Any, Optional
 from .dev_config import get_dev_config
+from shared.rate_limit import get_llm_rate_limiter, estimate_message_tokens, retry_after_seconds
+from shared.chunking import CHUNK_PROVENANCE_KEYS
 
 import anthropic
 
@@ -70,7 +72,15 @@ def call_llm_with(*, messages: List[Dict], temperature: float = 0, max_tokens: i
     base_delay = 2
     max_delay = 60
 
+    # Same process-wide Claude budget as dd_enhanced's ClaudeClient
+    limiter = get_llm_rate_limiter("claude")
+    estimated_tokens = estimate_message_tokens(claude_messages, system_prompt, max_output_tokens=max_tokens)
+
     for attempt in range(max_retries):
+        if limiter and not limiter.acquire(estimated_tokens):
+            raise TimeoutError("Timed out waiting for Claude rate limiter")
+
+        actual_tokens = 0
         try:
             logging.info(f"[Claude] API call attempt {attempt + 1}/{max_retries}")
 
@@ -89,7 +99,11 @@ def call_llm_with(*, messages: List[Dict], temperature: float = 0, max_tokens: i
             if temperature > 0:
                 kwargs["temperature"] = temperature
 
+            call_start = time.time()
             response = client.messages.create(**kwargs)
+            actual_tokens = response.usage.input_tokens + response.usage.output_tokens
+            if limiter:
+                limiter.report_success(time.time() - call_start)
 
             # Extract text from response
             reply = ""
@@ -107,11 +121,16 @@ def call_llm_with(*, messages: List[Dict], temperature: float = 0, max_tokens: i
             return reply
 
         except anthropic.RateLimitError as e:
-            wait_time = min(base_delay * (2 ** attempt), max_delay)
+            response_headers = getattr(getattr(e, "response", None), "headers", None)
+            wait_time = min(retry_after_seconds(response_headers, base_delay * (2 ** attempt)), max_delay)
             logging.warning(f"[Claude] Rate limited. Waiting {wait_time}s...")
 
             if attempt < max_retries - 1:
-                time.sleep(wait_time)
+                if limiter:
+                    # Shared backoff: the next acquire waits it out, for every caller
+                    limiter.report_rate_limit_error(retry_after=wait_time)
+                else:
+                    time.sleep(wait_time)
                 continue
             else:
                 raise
@@ -119,6 +138,8 @@ def call_llm_with(*, messages: List[Dict], temperature: float = 0, max_tokens: i
         except anthropic.APIError as e:
             wait_time = min(base_delay * (2 ** attempt), max_delay)
             logging.error(f"[Claude] API error: {e}")
+            if limiter and getattr(e, "status_code", None) == 529:
+                limiter.report_overloaded()
 
             if attempt < max_retries - 1:
                 time.sleep(wait_time)
@@ -136,6 +157,10 @@ def call_llm_with(*, messages: List[Dict], temperature: float = 0, max_tokens: i
             else:
                 raise
 
+        finally:
+            if limiter:
+                limiter.release(actual_tokens, estimated_tokens)
+
     raise Exception("Max retries exceeded without successful response")
 
 def call_llm_with_search(*, messages: List[Dict], max_tokens: int = 4000,
@@ -314,7 +339,8 @@ def create_chunks_and_embeddings_from_pages(pages: List[Dict], batch_size: int =
             "chunk": page["text"],
             "page_number": page["page_number"],
             "chunk_index": page.get("chunk_index", i),
-            "embedding": embedding
+            "embedding": embedding,
+            **{field: page[field] for field in CHUNK_PROVENANCE_KEYS if field in page}
         })
 
     return results
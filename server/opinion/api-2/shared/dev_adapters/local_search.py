@@ -1,14 +1,52 @@
 # Local Search Adapter - Simple text search to replace Azure Cognitive Search
+#
+# Each index is an in-memory BM25 inverted index: postings lists (term -> {slot: tf}),
+# cached document lengths and IDF, and per-field metadata bitmaps for filters.
+# Embeddings are held in a float32 matrix (one row per entry) and searched with
+# a single matrix-vector product; large indices add an IVF approximate index.
+# Adds and deletes are incremental, and indices are persisted to disk
+# (LOCAL_SEARCH_INDEX_PATH, default {local_storage_path}/search_indices) so they
+# survive function host restarts.
+#
+# Configuration:
+#   LOCAL_SEARCH_PERSIST: "false" to keep indices in memory only (default: true)
+#   LOCAL_SEARCH_INDEX_PATH: directory for persisted indices
+#   LOCAL_SEARCH_SAVE_INTERVAL: minimum seconds between saves of a changing index (default: 5)
+#   LOCAL_SEARCH_ANN_THRESHOLD: vectors before the approximate index is built (default: 100000, 0 = never)
+#   LOCAL_SEARCH_ANN_NPROBE: partitions scored per approximate query (default: 16)
+import atexit
+import heapq
 import json
 import logging
 import os
+import pickle
 import re
-from typing import List, Dict, Any, Optional
-from collections import defaultdict
+import threading
+import time
+from typing import List, Dict, Any, Optional, Iterable, Tuple
+from collections import Counter
 import math
 
-# In-memory search index for dev purposes
-_search_indices = defaultdict(list)
+import numpy as np
+
+from .dev_config import get_dev_config
+
+LOCAL_SEARCH_PERSIST = os.environ.get("LOCAL_SEARCH_PERSIST", "true").lower() in ("true", "1", "yes")
+LOCAL_SEARCH_SAVE_INTERVAL = float(os.environ.get("LOCAL_SEARCH_SAVE_INTERVAL", "5"))
+LOCAL_SEARCH_ANN_THRESHOLD = int(os.environ.get("LOCAL_SEARCH_ANN_THRESHOLD", "100000"))
+LOCAL_SEARCH_ANN_NPROBE = int(os.environ.get("LOCAL_SEARCH_ANN_NPROBE", "16"))
+
+# Filtered vector queries matching at most this many entries are scored
+# exactly even when the approximate index exists
+ANN_EXACT_FILTER_LIMIT = 20000
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# Entry fields that are never filtered on through bitmaps
+_UNINDEXED_FIELDS = ('content', 'embedding')
+_INDEX_FORMAT_VERSION = 2
+_READABLE_FORMAT_VERSIONS = (1, 2)
 
 def _normalize_text(text: str) -> str:
     """Normalize text for searching"""
@@ -25,29 +63,488 @@ def _tokenize(text: str) -> List[str]:
     tokens = re.findall(r'\b\w+\b', text)
     return tokens
 
-def _calculate_bm25_score(query_tokens: List[str], doc_tokens: List[str],
-                          avg_doc_length: float, k1: float = 1.5, b: float = 0.75) -> float:
-    """Calculate BM25 relevance score"""
-    if not query_tokens or not doc_tokens:
-        return 0.0
+def _is_bitmap_value(value: Any) -> bool:
+    return value is None or isinstance(value, (str, int, float, bool))
+
+def _iter_bits(bitmap: bytes) -> Iterable[int]:
+    """Slot numbers set in a little-endian bitmap."""
+    for byte_index, byte in enumerate(bitmap):
+        while byte:
+            low = byte & -byte
+            yield byte_index * 8 + low.bit_length() - 1
+            byte ^= low
+
+class _VectorStore:
+    """
+    Embeddings for one index as a float32 matrix, one row per entry slot.
+
+    Rows are stored unit-normalised so cosine similarity is a dot product;
+    `norms` keeps each vector's length and zero vectors never match. Once
+    LOCAL_SEARCH_ANN_THRESHOLD vectors are stored, an IVF index (spherical
+    k-means partitions) is trained and unfiltered queries only score rows in
+    the LOCAL_SEARCH_ANN_NPROBE partitions nearest the query. New vectors
+    are assigned to the existing partitions; the partitions are retrained
+    when the index has doubled since the last training.
+    """
+
+    def __init__(self):
+        self.dim: Optional[int] = None
+        self.matrix = np.zeros((0, 0), dtype=np.float32)
+        self.norms = np.zeros(0, dtype=np.float32)
+        self.present = np.zeros(0, dtype=bool)
+        self.assignments = np.zeros(0, dtype=np.int32)
+        self.centroids: Optional[np.ndarray] = None
+        self.count = 0
+        self.trained_count = 0
+
+    def _ensure_capacity(self, slot: int):
+        capacity = len(self.present)
+        if slot < capacity:
+            return
+        new_capacity = max(1024, capacity * 2, slot + 1)
+        matrix = np.zeros((new_capacity, self.dim), dtype=np.float32)
+        matrix[:capacity] = self.matrix
+        self.matrix = matrix
+        self.norms = np.concatenate([self.norms, np.zeros(new_capacity - capacity, dtype=np.float32)])
+        self.present = np.concatenate([self.present, np.zeros(new_capacity - capacity, dtype=bool)])
+        self.assignments = np.concatenate([self.assignments, np.full(new_capacity - capacity, -1, dtype=np.int32)])
+
+    def set(self, slot: int, embedding) -> bool:
+        """Store a slot's embedding; False if its dimension does not match the index."""
+        vector = np.asarray(embedding, dtype=np.float32).ravel()
+        if self.dim is None:
+            self.dim = len(vector)
+            self.matrix = np.zeros((0, self.dim), dtype=np.float32)
+        if len(vector) != self.dim:
+            logging.warning(f"[LocalSearch] Ignoring {len(vector)}-d embedding in a {self.dim}-d index")
+            return False
+
+        self._ensure_capacity(slot)
+        norm = float(np.linalg.norm(vector))
+        self.matrix[slot] = vector / norm if norm else 0.0
+        self.norms[slot] = norm
+        if not self.present[slot]:
+            self.count += 1
+        self.present[slot] = True
+        if self.centroids is not None:
+            self.assignments[slot] = int(np.argmax(self.centroids @ self.matrix[slot]))
+        return True
+
+    def discard(self, slot: int):
+        if slot < len(self.present) and self.present[slot]:
+            self.present[slot] = False
+            self.norms[slot] = 0.0
+            self.assignments[slot] = -1
+            self.count -= 1
+
+    def vector(self, slot: int) -> Optional[np.ndarray]:
+        if slot < len(self.present) and self.present[slot]:
+            return self.matrix[slot] * self.norms[slot]
+        return None
+
+    def maybe_train(self):
+        """(Re)build the approximate index once the store is large enough."""
+        if LOCAL_SEARCH_ANN_THRESHOLD <= 0 or self.count < LOCAL_SEARCH_ANN_THRESHOLD:
+            return
+        if self.centroids is not None and self.count < 2 * self.trained_count:
+            return
+
+        start = time.time()
+        rows = np.flatnonzero(self.present & (self.norms > 0))
+        nlist = int(min(4096, max(16, math.sqrt(len(rows)))))
+        rng = np.random.default_rng(0)
+        sample = self.matrix[rng.choice(rows, size=min(len(rows), nlist * 32), replace=False)]
+        centroids = sample[rng.choice(len(sample), size=nlist, replace=False)].copy()
+
+        for _ in range(10):
+            labels = self._nearest(sample, centroids)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            lengths = np.linalg.norm(sums, axis=1)
+            filled = lengths > 0
+            centroids[filled] = sums[filled] / lengths[filled, None]
+
+        self.centroids = centroids
+        self.assignments[:] = -1
+        self.assignments[rows] = self._nearest(self.matrix[rows], centroids)
+        self.trained_count = self.count
+        logging.info(f"[LocalSearch] Built approximate index: {len(rows)} vectors, "
+                     f"{nlist} partitions in {time.time() - start:.1f}s")
+
+    @staticmethod
+    def _nearest(vectors: np.ndarray, centroids: np.ndarray, chunk: int = 8192) -> np.ndarray:
+        labels = np.empty(len(vectors), dtype=np.int32)
+        for start in range(0, len(vectors), chunk):
+            labels[start:start + chunk] = np.argmax(vectors[start:start + chunk] @ centroids.T, axis=1)
+        return labels
+
+    def search(self, query, top_k: int, mask: Optional[np.ndarray] = None) -> List[Tuple[float, int]]:
+        """
+        Top-k (cosine similarity, slot) pairs with positive similarity.
+
+        Args:
+            query: Query embedding
+            top_k: Number of results
+            mask: Optional boolean array of slots allowed by filters
+        """
+        query = np.asarray(query, dtype=np.float32).ravel()
+        if self.dim is None or len(query) != self.dim or top_k <= 0:
+            return []
+        query_norm = float(np.linalg.norm(query))
+        if query_norm == 0:
+            return []
+        query = query / query_norm
+
+        n = len(self.present)
+        valid = self.present & (self.norms > 0)
+        if mask is not None:
+            allowed = np.zeros(n, dtype=bool)
+            allowed[:min(n, len(mask))] = mask[:n]
+            valid &= allowed
+        if self.centroids is not None and (mask is None or np.count_nonzero(valid) > ANN_EXACT_FILTER_LIMIT):
+            nprobe = min(LOCAL_SEARCH_ANN_NPROBE, len(self.centroids))
+            probe = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+            # Lookup table indexed by partition; unassigned slots (-1) hit the False tail
+            probed = np.zeros(len(self.centroids) + 1, dtype=bool)
+            probed[probe] = True
+            valid &= probed[self.assignments]
+
+        rows = np.flatnonzero(valid)
+        if not len(rows):
+            return []
+        if len(rows) > n // 4:
+            # Dense: one product over the whole matrix beats gathering rows
+            scores = (self.matrix @ query)[rows]
+        else:
+            scores = self.matrix[rows] @ query
+
+        k = min(top_k, len(rows))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind='stable')]
+        return [(float(scores[i]), int(rows[i])) for i in top if scores[i] > 0]
+
+class _InvertedIndex:
+    """
+    BM25 inverted index for one search index.
+
+    Entries live in numbered slots (freed slots are reused). Postings map
+    term -> {slot: term frequency}; bitmaps map (field, value) -> bytearray
+    with one bit per slot for metadata filters.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.lock = threading.RLock()
+        self.dirty = False
+        self.last_saved = 0.0
+        self._reset()
+
+    def _reset(self):
+        self.ids: List[Optional[str]] = []
+        self.contents: List[Optional[str]] = []
+        self.metadata: List[Optional[Dict]] = []
+        self.term_freqs: List[Optional[Dict[str, int]]] = []
+        self.lengths: List[int] = []
+        self.id_to_slot: Dict[str, int] = {}
+        self.free_slots: List[int] = []
+        self.postings: Dict[str, Dict[int, int]] = {}
+        self.bitmaps: Dict[Tuple[str, Any], bytearray] = {}
+        self.total_length = 0
+        self._idf_cache: Dict[str, float] = {}
+        self.vectors = _VectorStore()
+
+    def __len__(self) -> int:
+        return len(self.id_to_slot)
+
+    # ---------- mutation ----------
+
+    def add(self, doc_id: str, content: str, metadata: Dict,
+            term_freqs: Optional[Dict[str, int]] = None) -> int:
+        if doc_id in self.id_to_slot:
+            self.remove(doc_id)
+
+        if term_freqs is None:
+            term_freqs = dict(Counter(_tokenize(content)))
+        embedding = metadata.get('embedding')
+        if 'embedding' in metadata:
+            metadata = {k: v for k, v in metadata.items() if k != 'embedding'}
+        slot = self.free_slots.pop() if self.free_slots else len(self.ids)
+        if slot == len(self.ids):
+            for column in (self.ids, self.contents, self.metadata, self.term_freqs):
+                column.append(None)
+            self.lengths.append(0)
+
+        length = sum(term_freqs.values())
+        self.ids[slot] = doc_id
+        self.contents[slot] = content
+        self.metadata[slot] = metadata
+        self.term_freqs[slot] = term_freqs
+        self.lengths[slot] = length
+        self.id_to_slot[doc_id] = slot
+        self.total_length += length
+        if embedding is not None and len(embedding):
+            self.vectors.set(slot, embedding)
+
+        for term, tf in term_freqs.items():
+            self.postings.setdefault(term, {})[slot] = tf
+        for key in self._bitmap_keys(slot):
+            bitmap = self.bitmaps.setdefault(key, bytearray())
+            if len(bitmap) <= slot >> 3:
+                bitmap.extend(bytes((slot >> 3) + 1 - len(bitmap)))
+            bitmap[slot >> 3] |= 1 << (slot & 7)
+
+        self._idf_cache.clear()
+        self.dirty = True
+        return slot
+
+    def remove(self, doc_id: str) -> bool:
+        slot = self.id_to_slot.pop(doc_id, None)
+        if slot is None:
+            return False
+
+        for term in self.term_freqs[slot]:
+            docs = self.postings.get(term)
+            if docs is not None:
+                docs.pop(slot, None)
+                if not docs:
+                    del self.postings[term]
+        for key in self._bitmap_keys(slot):
+            bitmap = self.bitmaps.get(key)
+            if bitmap is not None:
+                bitmap[slot >> 3] &= ~(1 << (slot & 7)) & 0xFF
+                if not any(bitmap):
+                    del self.bitmaps[key]
+
+        self.total_length -= self.lengths[slot]
+        self.vectors.discard(slot)
+        self.ids[slot] = self.contents[slot] = self.metadata[slot] = self.term_freqs[slot] = None
+        self.lengths[slot] = 0
+        self.free_slots.append(slot)
+        self._idf_cache.clear()
+        self.dirty = True
+        return True
 
-    doc_length = len(doc_tokens)
-    score = 0.0
+    def clear(self):
+        self._reset()
+        self.dirty = True
+
+    def _bitmap_keys(self, slot: int) -> List[Tuple[str, Any]]:
+        keys = [('id', self.ids[slot])]
+        for field, value in self.metadata[slot].items():
+            if field not in _UNINDEXED_FIELDS and _is_bitmap_value(value):
+                keys.append((field, value))
+        return keys
+
+    # ---------- queries ----------
+
+    def idf(self, term: str) -> float:
+        idf = self._idf_cache.get(term)
+        if idf is None:
+            df = len(self.postings.get(term, ()))
+            n = len(self.id_to_slot)
+            idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+            self._idf_cache[term] = idf
+        return idf
+
+    def filter_bitmap(self, filters: Optional[Dict]) -> Tuple[Optional[bytes], List[Tuple[str, Any]]]:
+        """
+        Combine bitmap-indexed filters into one slot bitmap.
+
+        Returns (bitmap or None if no bitmap filters, remaining filters that
+        must be checked per entry). An empty bitmap means nothing matches.
+        """
+        if not filters:
+            return None, []
+        mask = None
+        residual = []
+        for key, value in filters.items():
+            if key in _UNINDEXED_FIELDS or not _is_bitmap_value(value):
+                residual.append((key, value))
+                continue
+            bits = int.from_bytes(self.bitmaps.get((key, value), b''), 'little')
+            mask = bits if mask is None else mask & bits
+            if not mask:
+                return b'', residual
+        if mask is None:
+            return None, residual
+        return mask.to_bytes((mask.bit_length() + 7) // 8, 'little'), residual
+
+    def matches(self, slot: int, residual: List[Tuple[str, Any]]) -> bool:
+        for key, value in residual:
+            doc_value = self.ids[slot] if key == 'id' else None
+            if not doc_value:
+                doc_value = self.contents[slot] if key == 'content' else self.metadata[slot].get(key)
+            if doc_value != value:
+                return False
+        return True
 
-    # Count term frequencies in document
-    doc_tf = defaultdict(int)
-    for token in doc_tokens:
-        doc_tf[token] += 1
+    def live_slots(self, bitmap: Optional[bytes]) -> Iterable[int]:
+        if bitmap is None:
+            return list(self.id_to_slot.values())
+        return _iter_bits(bitmap)
 
-    for term in query_tokens:
-        if term in doc_tf:
-            tf = doc_tf[term]
-            # Simplified BM25 formula
-            numerator = tf * (k1 + 1)
-            denominator = tf + k1 * (1 - b + b * (doc_length / avg_doc_length))
-            score += numerator / denominator
+    def bm25(self, query_tokens: List[str], top_k: int, filters: Optional[Dict]) -> List[Tuple[float, int]]:
+        """Top-k (score, slot) pairs for a query."""
+        bitmap, residual = self.filter_bitmap(filters)
+        if bitmap == b'' or not self.id_to_slot:
+            return []
+
+        query_tf = Counter(t for t in query_tokens if t in self.postings)
+        avg_length = self.total_length / len(self.id_to_slot) or 1.0
+        weights = {term: qtf * self.idf(term) * (BM25_K1 + 1) for term, qtf in query_tf.items()}
+
+        def term_score(term: str, tf: int, slot: int) -> float:
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * self.lengths[slot] / avg_length)
+            return weights[term] * tf / (tf + norm)
+
+        scores: Dict[int, float] = {}
+        posting_work = sum(len(self.postings[t]) for t in query_tf)
+        if bitmap is not None and posting_work > int.from_bytes(bitmap, 'little').bit_count():
+            # Selective filter: score the filtered slots directly
+            for slot in _iter_bits(bitmap):
+                tfs = self.term_freqs[slot]
+                score = sum(term_score(t, tfs[t], slot) for t in query_tf if t in tfs)
+                if score > 0:
+                    scores[slot] = score
+        else:
+            for term in query_tf:
+                for slot, tf in self.postings[term].items():
+                    if bitmap is not None and not (slot >> 3 < len(bitmap) and bitmap[slot >> 3] >> (slot & 7) & 1):
+                        continue
+                    scores[slot] = scores.get(slot, 0.0) + term_score(term, tf, slot)
+
+        if residual:
+            scores = {slot: score for slot, score in scores.items() if self.matches(slot, residual)}
+        top = heapq.nlargest(top_k, scores.items(), key=lambda item: (item[1], -item[0]))
+        return [(score, slot) for slot, score in top]
+
+    def vector_search(self, query_embedding, top_k: int, filters: Optional[Dict]) -> List[Tuple[float, int]]:
+        """Top-k (cosine similarity, slot) pairs for a query embedding."""
+        bitmap, residual = self.filter_bitmap(filters)
+        if bitmap == b'':
+            return []
+        mask = None
+        if bitmap is not None:
+            mask = np.unpackbits(np.frombuffer(bitmap, dtype=np.uint8), bitorder='little').astype(bool)
+        if residual:
+            allowed = np.zeros(len(self.ids), dtype=bool)
+            for slot in self.live_slots(bitmap):
+                allowed[slot] = self.matches(slot, residual)
+            mask = allowed
+        return self.vectors.search(query_embedding, top_k, mask)
+
+    def result(self, slot: int, score: float) -> Dict:
+        return {
+            'id': self.ids[slot],
+            'content': self.contents[slot],
+            'score': score,
+            **self.metadata[slot]
+        }
+
+    # ---------- persistence ----------
+
+    def to_state(self) -> Dict:
+        entries = []
+        vectors = []
+        for doc_id, slot in self.id_to_slot.items():
+            vector = self.vectors.vector(slot)
+            if vector is not None:
+                vectors.append(vector)
+            entries.append((doc_id, self.contents[slot], self.metadata[slot], self.term_freqs[slot],
+                            len(vectors) - 1 if vector is not None else -1))
+        return {
+            'version': _INDEX_FORMAT_VERSION,
+            'name': self.name,
+            'entries': entries,
+            'vectors': np.stack(vectors) if vectors else None,
+            'centroids': self.vectors.centroids,
+            'trained_count': self.vectors.trained_count,
+        }
+
+    def load_state(self, state: Dict):
+        self._reset()
+        # Centroids first so loaded vectors are assigned to their partitions
+        self.vectors.centroids = state.get('centroids')
+        self.vectors.trained_count = state.get('trained_count', 0)
+        vectors = state.get('vectors')
+        for entry in state.get('entries', []):
+            # Version 1 entries kept the embedding in metadata
+            doc_id, content, metadata, term_freqs = entry[:4]
+            slot = self.add(doc_id, content, metadata, term_freqs)
+            if len(entry) > 4 and entry[4] >= 0:
+                self.vectors.set(slot, vectors[entry[4]])
+        self.vectors.maybe_train()
+        self.dirty = False
+
+# In-memory search indices for dev purposes, loaded from disk on first use
+_search_indices: Dict[str, _InvertedIndex] = {}
+_indices_lock = threading.Lock()
+
+def _index_dir() -> str:
+    path = os.environ.get("LOCAL_SEARCH_INDEX_PATH")
+    if not path:
+        path = os.path.join(get_dev_config().get("local_storage_path", "/tmp/dd_storage"), "search_indices")
+    return path
+
+def _index_file(index_name: str) -> str:
+    return os.path.join(_index_dir(), re.sub(r'[^\w.-]', '_', index_name) + ".pkl")
+
+def _get_index(index_name: str) -> _InvertedIndex:
+    """Get an index, loading its persisted copy the first time it is used."""
+    index = _search_indices.get(index_name)
+    if index is not None:
+        return index
+    with _indices_lock:
+        index = _search_indices.get(index_name)
+        if index is None:
+            index = _InvertedIndex(index_name)
+            if LOCAL_SEARCH_PERSIST and os.path.exists(_index_file(index_name)):
+                try:
+                    with open(_index_file(index_name), 'rb') as f:
+                        state = pickle.load(f)
+                    if state.get('version') in _READABLE_FORMAT_VERSIONS:
+                        index.load_state(state)
+                        logging.info(f"[LocalSearch] Loaded index '{index_name}' ({len(index)} docs) from disk")
+                except Exception as e:
+                    logging.warning(f"[LocalSearch] Could not load index '{index_name}' from disk: {e}")
+            index.last_saved = time.time()
+            _search_indices[index_name] = index
+        return index
+
+def save_index(index_name: str, force: bool = True) -> bool:
+    """
+    Persist an index to disk (no-op when LOCAL_SEARCH_PERSIST is off).
 
-    return score
+    With force=False the save is skipped if the index was saved less than
+    LOCAL_SEARCH_SAVE_INTERVAL seconds ago; flush_indices() at exit writes
+    anything left dirty.
+    """
+    index = _search_indices.get(index_name)
+    if not LOCAL_SEARCH_PERSIST or index is None:
+        return False
+    with index.lock:
+        if not index.dirty or (not force and time.time() - index.last_saved < LOCAL_SEARCH_SAVE_INTERVAL):
+            return False
+        try:
+            path = _index_file(index_name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(index.to_state(), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+            index.dirty = False
+            index.last_saved = time.time()
+            return True
+        except Exception as e:
+            logging.warning(f"[LocalSearch] Could not save index '{index_name}': {e}")
+            return False
+
+def flush_indices():
+    """Persist every index with unsaved changes."""
+    for index_name in list(_search_indices):
+        save_index(index_name)
+
+atexit.register(flush_indices)
 
 # ============== Search Index Operations ==============
 
@@ -63,25 +560,18 @@ def add_to_index(index_name: str, documents: List[Dict]) -> bool:
         bool: True if successful
     """
     try:
-        for doc in documents:
-            doc_id = doc.get('id') or doc.get('doc_id')
-            content = doc.get('content', '')
-
-            # Create searchable entry
-            entry = {
-                'id': doc_id,
-                'content': content,
-                'tokens': _tokenize(content),
-                'metadata': {k: v for k, v in doc.items() if k not in ('id', 'content', 'tokens')}
-            }
-
-            # Remove existing entry with same ID
-            _search_indices[index_name] = [
-                d for d in _search_indices[index_name] if d['id'] != doc_id
-            ]
-
-            _search_indices[index_name].append(entry)
-
+        index = _get_index(index_name)
+        with index.lock:
+            for doc in documents:
+                doc_id = doc.get('id') or doc.get('doc_id')
+                content = doc.get('content', '')
+                metadata = {k: v for k, v in doc.items() if k not in ('id', 'content', 'tokens')}
+
+                # Replaces any existing entry with the same ID
+                index.add(doc_id, content, metadata)
+            index.vectors.maybe_train()
+
+        save_index(index_name, force=False)
         logging.info(f"✅ [LocalSearch] Added {len(documents)} docs to index '{index_name}'")
         return True
 
@@ -92,7 +582,7 @@ def add_to_index(index_name: str, documents: List[Dict]) -> bool:
 def search(index_name: str, query: str, top_k: int = 10,
            filters: Dict = None) -> List[Dict]:
     """
-    Search the index
+    Search the index (BM25)
 
     Args:
         index_name: Name of the search index
@@ -104,9 +594,9 @@ def search(index_name: str, query: str, top_k: int = 10,
         List of matching documents with scores
     """
     try:
-        index = _search_indices.get(index_name, [])
+        index = _get_index(index_name)
 
-        if not index:
+        if not len(index):
             logging.warning(f"[LocalSearch] Index '{index_name}' is empty")
             return []
 
@@ -115,39 +605,12 @@ def search(index_name: str, query: str, top_k: int = 10,
         if not query_tokens:
             return []
 
-        # Calculate average document length
-        total_tokens = sum(len(doc['tokens']) for doc in index)
-        avg_doc_length = total_tokens / len(index) if index else 1
-
-        # Score all documents
-        scored_docs = []
-        for doc in index:
-            # Apply filters
-            if filters:
-                skip = False
-                for key, value in filters.items():
-                    doc_value = doc.get(key) or doc.get('metadata', {}).get(key)
-                    if doc_value != value:
-                        skip = True
-                        break
-                if skip:
-                    continue
-
-            score = _calculate_bm25_score(query_tokens, doc['tokens'], avg_doc_length)
-
-            if score > 0:
-                scored_docs.append({
-                    'id': doc['id'],
-                    'content': doc['content'],
-                    'score': score,
-                    **doc.get('metadata', {})
-                })
-
-        # Sort by score and return top_k
-        scored_docs.sort(key=lambda x: x['score'], reverse=True)
-
-        logging.info(f"[LocalSearch] Found {len(scored_docs)} results for '{query[:50]}...'")
-        return scored_docs[:top_k]
+        with index.lock:
+            top = index.bm25(query_tokens, top_k, filters)
+            results = [index.result(slot, score) for score, slot in top]
+
+        logging.info(f"[LocalSearch] Found {len(results)} results for '{query[:50]}...'")
+        return results
 
     except Exception as e:
         logging.error(f"❌ [LocalSearch] Search error: {e}")
@@ -157,6 +620,9 @@ def delete_from_index(index_name: str, doc_ids: List[str]) -> bool:
     """
     Delete documents from the index
 
+    Entries are matched on their own ID or on their 'doc_id' field, so
+    passing a document ID removes all of its chunks.
+
     Args:
         index_name: Name of the search index
         doc_ids: List of document IDs to delete
@@ -165,14 +631,18 @@ def delete_from_index(index_name: str, doc_ids: List[str]) -> bool:
         bool: True if successful
     """
     try:
-        original_count = len(_search_indices.get(index_name, []))
-
-        _search_indices[index_name] = [
-            doc for doc in _search_indices.get(index_name, [])
-            if doc['id'] not in doc_ids
-        ]
-
-        deleted_count = original_count - len(_search_indices[index_name])
+        index = _get_index(index_name)
+        deleted_count = 0
+
+        with index.lock:
+            for doc_id in doc_ids:
+                chunk_bitmap = bytes(index.bitmaps.get(('doc_id', doc_id), b''))
+                chunk_ids = [index.ids[slot] for slot in _iter_bits(chunk_bitmap)]
+                for entry_id in [doc_id] + chunk_ids:
+                    if index.remove(entry_id):
+                        deleted_count += 1
+
+        save_index(index_name, force=False)
         logging.info(f"🗑️ [LocalSearch] Deleted {deleted_count} docs from '{index_name}'")
         return True
 
@@ -182,7 +652,12 @@ def delete_from_index(index_name: str, doc_ids: List[str]) -> bool:
 
 def clear_index(index_name: str) -> bool:
     """Clear all documents from an index"""
-    _search_indices[index_name] = []
+    index = _get_index(index_name)
+    with index.lock:
+        index.clear()
+        if LOCAL_SEARCH_PERSIST and os.path.exists(_index_file(index_name)):
+            os.remove(_index_file(index_name))
+        index.dirty = False
     logging.info(f"🗑️ [LocalSearch] Cleared index '{index_name}'")
     return True
 
@@ -244,68 +719,35 @@ def delete_documents(index_name: str, keys: List[str]) -> Dict:
         'value': [{'key': key, 'status': success} for key in keys]
     }
 
-# ============== Vector Search (Simplified) ==============
+# ============== Vector Search ==============
 
 def vector_search(index_name: str, query_embedding: List[float],
                   top_k: int = 10, filters: Dict = None) -> List[Dict]:
     """
     Vector similarity search using cosine similarity
 
-    Note: This is a simplified implementation. For production,
-    you'd want to use a proper vector database.
+    Scores every (filtered) embedding with one matrix-vector product, or
+    only the nearest partitions once the index is large enough for the
+    approximate index (LOCAL_SEARCH_ANN_THRESHOLD).
 
     Args:
         index_name: Index name
         query_embedding: Query vector
         top_k: Number of results
-        filters: Optional filters
+        filters: Optional filters (e.g., {'doc_id': 'xxx'})
 
     Returns:
         List of results with similarity scores
     """
     try:
-        index = _search_indices.get(index_name, [])
+        index = _get_index(index_name)
 
-        if not index:
+        if not len(index):
             return []
 
-        def cosine_similarity(a: List[float], b: List[float]) -> float:
-            if len(a) != len(b):
-                return 0.0
-            dot_product = sum(x * y for x, y in zip(a, b))
-            norm_a = math.sqrt(sum(x * x for x in a))
-            norm_b = math.sqrt(sum(x * x for x in b))
-            if norm_a == 0 or norm_b == 0:
-                return 0.0
-            return dot_product / (norm_a * norm_b)
-
-        scored_docs = []
-        for doc in index:
-            # Apply filters
-            if filters:
-                skip = False
-                for key, value in filters.items():
-                    doc_value = doc.get(key) or doc.get('metadata', {}).get(key)
-                    if doc_value != value:
-                        skip = True
-                        break
-                if skip:
-                    continue
-
-            # Calculate similarity if document has embedding
-            doc_embedding = doc.get('metadata', {}).get('embedding')
-            if doc_embedding:
-                score = cosine_similarity(query_embedding, doc_embedding)
-                if score > 0:
-                    scored_docs.append({
-                        'id': doc['id'],
-                        'content': doc['content'],
-                        'score': score,
-                        **{k: v for k, v in doc.get('metadata', {}).items() if k != 'embedding'}
-                    })
-
-        scored_docs.sort(key=lambda x: x['score'], reverse=True)
-        return scored_docs[:top_k]
+        with index.lock:
+            top = index.vector_search(query_embedding, top_k, filters)
+            return [index.result(slot, score) for score, slot in top]
 
     except Exception as e:
         logging.error(f"❌ [LocalSearch] Vector search error: {e}")
@@ -0,0 +1,232 @@
+# File: server/opinion/api-2/shared/embedding_cache.py
+"""
+Content-addressed embedding cache.
+
+Embeddings are a pure function of (model, dimensions, text), so re-uploads,
+renames and repeated query prompts can reuse stored vectors instead of
+calling the embeddings API again.
+
+Two tiers:
+- In-memory LRU (per process; vectors packed as float32 bytes, ~6KB each
+  instead of ~50KB as a list of Python floats)
+- SQLite on disk (survives restarts; vectors stored as float32 blobs),
+  evicted least-recently-used beyond a size cap
+
+Configurable via environment variables:
+- EMBEDDING_CACHE_ENABLED (default: true)
+- EMBEDDING_CACHE_PATH (default: <tmp>/embedding_cache.sqlite)
+- EMBEDDING_CACHE_MEMORY_ENTRIES (default: 4096)
+- EMBEDDING_CACHE_MAX_DISK_ENTRIES (default: 200000)
+
+Usage:
+    cache = get_embedding_cache()
+    keys = [embedding_cache_key(model, dims, text) for text in texts]
+    hits = cache.get_many(keys)            # {key: [floats]}
+    cache.set_many({key: embedding, ...})
+"""
+
+import array
+import hashlib
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence
+
+# Bump when the stored format changes so stale entries are ignored
+CACHE_KEY_VERSION = "v1"
+
+EMBEDDING_CACHE_ENABLED = os.environ.get("EMBEDDING_CACHE_ENABLED", "true").lower() in ("true", "1", "yes")
+EMBEDDING_CACHE_PATH = os.environ.get(
+    "EMBEDDING_CACHE_PATH",
+    os.path.join(tempfile.gettempdir(), "embedding_cache.sqlite")
+)
+EMBEDDING_CACHE_MEMORY_ENTRIES = int(os.environ.get("EMBEDDING_CACHE_MEMORY_ENTRIES", "4096"))
+EMBEDDING_CACHE_MAX_DISK_ENTRIES = int(os.environ.get("EMBEDDING_CACHE_MAX_DISK_ENTRIES", "200000"))
+
+# SQLite limits bound parameters per statement
+_SQL_BATCH = 500
+
+
+def embedding_cache_key(model: str, dimensions: int, text: str) -> str:
+    """SHA-256 key over the embedding model, output dimensions and exact text."""
+    payload = f"{CACHE_KEY_VERSION}\x1f{model}\x1f{int(dimensions)}\x1f{text}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _to_blob(embedding: Sequence[float]) -> bytes:
+    return array.array("f", embedding).tobytes()
+
+
+def _from_blob(blob: bytes) -> List[float]:
+    values = array.array("f")
+    values.frombytes(blob)
+    return values.tolist()
+
+
+class EmbeddingCache:
+    """Thread-safe two-tier (memory LRU + SQLite) embedding cache."""
+
+    # Evict on disk in chunks rather than on every insert
+    EVICTION_CHECK_INTERVAL = 1000
+
+    def __init__(
+        self,
+        db_path: Optional[str] = EMBEDDING_CACHE_PATH,
+        memory_entries: int = EMBEDDING_CACHE_MEMORY_ENTRIES,
+        max_disk_entries: int = EMBEDDING_CACHE_MAX_DISK_ENTRIES
+    ):
+        self.memory_entries = memory_entries
+        self.max_disk_entries = max_disk_entries
+        self._memory: 'OrderedDict[str, bytes]' = OrderedDict()  # key -> float32 blob
+        self._memory_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._local = threading.local()
+        self._writes_since_eviction = 0
+        self.db_path = None
+
+        if db_path:
+            try:
+                db_dir = os.path.dirname(db_path)
+                if db_dir:
+                    os.makedirs(db_dir, exist_ok=True)
+                self.db_path = db_path
+                conn = self._conn()
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS embedding_cache (
+                        key TEXT PRIMARY KEY,
+                        embedding BLOB NOT NULL,
+                        last_accessed REAL NOT NULL
+                    )
+                """)
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_embedding_cache_accessed ON embedding_cache (last_accessed)")
+                conn.commit()
+            except Exception as e:
+                logging.warning(f"[embedding_cache] Disk tier unavailable, using memory only: {e}")
+                self.db_path = None
+
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite3 connections are not shareable across threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _remember(self, key: str, blob: bytes):
+        with self._memory_lock:
+            self._memory[key] = blob
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, List[float]]:
+        """Cached embeddings for the keys that have one."""
+        found: Dict[str, List[float]] = {}
+        with self._memory_lock:
+            blobs = {}
+            for key in keys:
+                blob = self._memory.get(key)
+                if blob is not None:
+                    self._memory.move_to_end(key)
+                    blobs[key] = blob
+        for key, blob in blobs.items():
+            found[key] = _from_blob(blob)
+
+        missing = list(dict.fromkeys(k for k in keys if k not in found))
+        if not missing or not self.db_path:
+            return found
+
+        try:
+            conn = self._conn()
+            from_disk = {}
+            for start in range(0, len(missing), _SQL_BATCH):
+                chunk = missing[start:start + _SQL_BATCH]
+                rows = conn.execute(
+                    f"SELECT key, embedding FROM embedding_cache WHERE key IN ({','.join('?' * len(chunk))})",
+                    chunk
+                ).fetchall()
+                for key, blob in rows:
+                    from_disk[key] = blob
+
+            if from_disk:
+                now = time.time()
+                with self._write_lock:
+                    conn.executemany(
+                        "UPDATE embedding_cache SET last_accessed = ? WHERE key = ?",
+                        [(now, key) for key in from_disk]
+                    )
+                    conn.commit()
+                for key, blob in from_disk.items():
+                    self._remember(key, blob)
+                    found[key] = _from_blob(blob)
+        except Exception as e:
+            logging.warning(f"[embedding_cache] Disk lookup failed: {e}")
+
+        return found
+
+    def set_many(self, embeddings: Dict[str, Sequence[float]]):
+        """Store embeddings by key."""
+        if not embeddings:
+            return
+        blobs = {key: _to_blob(embedding) for key, embedding in embeddings.items()}
+        for key, blob in blobs.items():
+            self._remember(key, blob)
+        if not self.db_path:
+            return
+
+        try:
+            conn = self._conn()
+            now = time.time()
+            with self._write_lock:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO embedding_cache (key, embedding, last_accessed) VALUES (?, ?, ?)",
+                    [(key, blob, now) for key, blob in blobs.items()]
+                )
+                conn.commit()
+                self._writes_since_eviction += len(embeddings)
+                if self._writes_since_eviction >= self.EVICTION_CHECK_INTERVAL:
+                    self._writes_since_eviction = 0
+                    self._evict(conn)
+        except Exception as e:
+            logging.warning(f"[embedding_cache] Disk write failed: {e}")
+
+    def _evict(self, conn: sqlite3.Connection):
+        """Drop least-recently-used entries over the size cap."""
+        count = conn.execute("SELECT COUNT(*) FROM embedding_cache").fetchone()[0]
+        if count > self.max_disk_entries:
+            conn.execute("""
+                DELETE FROM embedding_cache WHERE key IN (
+                    SELECT key FROM embedding_cache ORDER BY last_accessed ASC LIMIT ?
+                )
+            """, (count - self.max_disk_entries,))
+            conn.commit()
+
+    def clear(self):
+        with self._memory_lock:
+            self._memory.clear()
+        if self.db_path:
+            conn = self._conn()
+            with self._write_lock:
+                conn.execute("DELETE FROM embedding_cache")
+                conn.commit()
+
+
+_embedding_cache: Optional[EmbeddingCache] = None
+_embedding_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    """Process-wide embedding cache, or None if EMBEDDING_CACHE_ENABLED is off."""
+    global _embedding_cache
+    if not EMBEDDING_CACHE_ENABLED:
+        return None
+    with _embedding_cache_lock:
+        if _embedding_cache is None:
+            _embedding_cache = EmbeddingCache()
+        return _embedding_cache
@@ -0,0 +1,143 @@
+# File: server/opinion/api-2/shared/embedding_clusters.py
+"""
+Embedding Similarity Clustering
+
+Groups items whose embeddings have cosine similarity >= a threshold, e.g.
+near-duplicate findings before they are merged:
+
+- Embeddings are normalised once into a float32 matrix, so similarity is a
+  dot product and each block of rows is compared with one matrix product.
+- Items are only compared within their group (e.g. finding type).
+- Similar pairs are joined with union-find, so clusters are the connected
+  components of the similarity graph and do not depend on item order.
+- Groups larger than LSH_MIN_GROUP_SIZE only compare items that share a
+  random-hyperplane (SimHash) LSH bucket instead of every pair.
+
+Usage:
+    clusters = cluster_embeddings(embeddings, 0.80, groups=[f["type"] for f in findings])
+    # [[0, 3], [1], [2, 4, 5], ...] - indices, clusters ordered by first member
+"""
+
+import logging
+from typing import Dict, Hashable, List, Optional, Sequence
+
+import numpy as np
+
+# Rows compared per matrix product in exact mode
+BLOCK_SIZE = 1024
+
+# Groups with more items than this use LSH candidate generation
+LSH_MIN_GROUP_SIZE = 5000
+
+# SimHash banding: LSH_BANDS bands of LSH_ROWS hyperplane bits each. At a
+# cosine threshold of 0.8 a true pair collides in at least one band with
+# probability ~0.97.
+LSH_BANDS = 20
+LSH_ROWS = 8
+
+
+class _UnionFind:
+    """Disjoint sets over 0..n-1 with path halving and union by size."""
+
+    def __init__(self, n: int):
+        self.parent = list(range(n))
+        self.size = [1] * n
+
+    def find(self, x: int) -> int:
+        parent = self.parent
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def union(self, a: int, b: int) -> None:
+        ra, rb = self.find(a), self.find(b)
+        if ra == rb:
+            return
+        if self.size[ra] < self.size[rb]:
+            ra, rb = rb, ra
+        self.parent[rb] = ra
+        self.size[ra] += self.size[rb]
+
+
+def normalize_embeddings(embeddings: Sequence[Sequence[float]]) -> np.ndarray:
+    """Embeddings as a float32 matrix of unit rows (zero vectors stay zero)."""
+    matrix = np.asarray(embeddings, dtype=np.float32)
+    if matrix.ndim != 2:
+        raise ValueError(f"Expected a list of equal-length embeddings, got shape {matrix.shape}")
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+
+def _union_similar_exact(matrix: np.ndarray, members: np.ndarray, threshold: float, uf: _UnionFind) -> None:
+    """Union every pair of members with similarity >= threshold (blockwise)."""
+    vectors = matrix[members]
+    for start in range(0, len(members), BLOCK_SIZE):
+        block = vectors[start:start + BLOCK_SIZE]
+        # Only compare against this block and later rows: each pair once
+        sims = block @ vectors[start:].T
+        rows, cols = np.nonzero(sims >= threshold)
+        for r, c in zip(rows.tolist(), cols.tolist()):
+            if c > r:
+                uf.union(int(members[start + r]), int(members[start + c]))
+
+
+def _union_similar_lsh(matrix: np.ndarray, members: np.ndarray, threshold: float, uf: _UnionFind) -> None:
+    """Union similar pairs among members that share a SimHash band bucket."""
+    rng = np.random.default_rng(0)
+    planes = rng.standard_normal((matrix.shape[1], LSH_BANDS * LSH_ROWS)).astype(np.float32)
+    bits = (matrix[members] @ planes) > 0
+    weights = 1 << np.arange(LSH_ROWS, dtype=np.int64)
+
+    for band in range(LSH_BANDS):
+        keys = bits[:, band * LSH_ROWS:(band + 1) * LSH_ROWS].astype(np.int64) @ weights
+        order = np.argsort(keys, kind="stable")
+        boundaries = np.flatnonzero(np.diff(keys[order])) + 1
+        for bucket in np.split(order, boundaries):
+            if len(bucket) > 1:
+                _union_similar_exact(matrix, members[bucket], threshold, uf)
+
+
+def cluster_embeddings(
+    embeddings: Sequence[Sequence[float]],
+    similarity_threshold: float = 0.85,
+    groups: Optional[Sequence[Hashable]] = None,
+) -> List[List[int]]:
+    """
+    Cluster items by embedding cosine similarity.
+
+    Args:
+        embeddings: One embedding per item (all the same dimension)
+        similarity_threshold: Minimum cosine similarity to link two items
+        groups: Optional group key per item; items in different groups are
+            never linked
+
+    Returns:
+        Clusters as sorted lists of item indices, ordered by first index.
+        Every item appears in exactly one cluster.
+    """
+    n = len(embeddings)
+    if n == 0:
+        return []
+
+    matrix = normalize_embeddings(embeddings)
+    uf = _UnionFind(n)
+
+    members_by_group: Dict[Hashable, List[int]] = {}
+    for i in range(n):
+        members_by_group.setdefault(groups[i] if groups is not None else None, []).append(i)
+
+    for group, members in members_by_group.items():
+        if len(members) < 2:
+            continue
+        members = np.asarray(members)
+        if len(members) > LSH_MIN_GROUP_SIZE:
+            logging.info(f"[embedding_clusters] LSH candidate search for {len(members)} items in group {group!r}")
+            _union_similar_lsh(matrix, members, similarity_threshold, uf)
+        else:
+            _union_similar_exact(matrix, members, similarity_threshold, uf)
+
+    clusters: Dict[int, List[int]] = {}
+    for i in range(n):
+        clusters.setdefault(uf.find(i), []).append(i)
+    return sorted(clusters.values(), key=lambda cluster: cluster[0])
@@ -0,0 +1,133 @@
+# File: server/opinion/api_2/shared/finding_aggregates.py
+#
+# Per-run finding counts for dashboards, read from dd_run_finding_aggregate.
+#
+# A trigger on perspective_risk_finding keeps one row per (run, action_priority,
+# risk category, folder, status, finding_type, deal_impact, exposure currency)
+# bucket up to date on every insert, status change and delete. A run has tens
+# of buckets however many findings it has, so the breakdowns below are sums
+# over a handful of rows instead of GROUP BY scans of the findings table.
+#
+# Buckets keep Deleted findings (status 'Deleted') so that a status change only
+# moves a count between buckets; the helpers exclude them unless noted.
+#
+# Requires migrations/add_run_finding_aggregates.py.
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+
+
+@dataclass(frozen=True)
+class FindingBucket:
+    """Finding counts for one combination of finding attributes within a run."""
+    action_priority: Optional[str]
+    risk_category: str  # COALESCE(risk_category, folder_category, 'General')
+    folder_category: Optional[str]
+    status: Optional[str]
+    finding_type: Optional[str]
+    deal_impact: Optional[str]
+    exposure_currency: Optional[str]
+    finding_count: int
+    exposure_count: int
+    exposure_total: float
+
+    @property
+    def deleted(self) -> bool:
+        return self.status == 'Deleted'
+
+
+def read_run_buckets(session, run_id: str) -> List[FindingBucket]:
+    """All non-empty buckets of a run (Deleted findings included)."""
+    rows = session.execute(
+        text("""
+            SELECT action_priority, risk_category, folder_category, status, finding_type,
+                   deal_impact, exposure_currency, finding_count, exposure_count, exposure_total
+            FROM dd_run_finding_aggregate
+            WHERE run_id = :run_id
+            AND finding_count > 0
+        """),
+        {'run_id': str(run_id)}
+    ).fetchall()
+
+    # '' stands for NULL in the bucket key
+    return [
+        FindingBucket(
+            action_priority=row.action_priority or None,
+            risk_category=row.risk_category,
+            folder_category=row.folder_category or None,
+            status=row.status or None,
+            finding_type=row.finding_type or None,
+            deal_impact=row.deal_impact or None,
+            exposure_currency=row.exposure_currency or None,
+            finding_count=row.finding_count,
+            exposure_count=row.exposure_count,
+            exposure_total=float(row.exposure_total),
+        )
+        for row in rows
+    ]
+
+
+def group_counts(buckets: List[FindingBucket], *fields: str) -> Dict[Tuple, int]:
+    """Non-deleted finding counts grouped by bucket fields, e.g. ('action_priority',)."""
+    counts: Dict[Tuple, int] = {}
+    for bucket in buckets:
+        if bucket.deleted:
+            continue
+        key = tuple(getattr(bucket, field) for field in fields)
+        counts[key] = counts.get(key, 0) + bucket.finding_count
+    return counts
+
+
+def exposure_by_currency(buckets: List[FindingBucket]) -> List[Dict]:
+    """
+    Financial exposure of findings with an amount > 0, per currency, largest first.
+
+    Includes Deleted findings, as the findings-table query it replaces did.
+    """
+    totals: Dict[Optional[str], List] = {}
+    for bucket in buckets:
+        if bucket.exposure_count:
+            total = totals.setdefault(bucket.exposure_currency, [0.0, 0])
+            total[0] += bucket.exposure_total
+            total[1] += bucket.exposure_count
+    return [
+        {'currency': currency, 'total_value': value, 'count': count}
+        for currency, (value, count) in sorted(totals.items(), key=lambda item: item[1][0], reverse=True)
+    ]
+
+
+def dashboard_counts(buckets: List[FindingBucket]) -> Dict[str, int]:
+    """
+    Severity counts as shown by RiskSummary.tsx (the mapping must match it exactly):
+      - critical: action_priority = 'critical'
+      - high: status = 'Red' AND action_priority != 'critical', OR action_priority = 'high', OR finding_type = 'negative'
+      - medium: status = 'Amber'
+      - positive: status = 'Green' OR finding_type = 'positive'
+      - gap: finding_type = 'gap' OR status = 'Info'
+      - low: finding_type IN ('neutral', 'informational')
+    """
+    counts = {'total': 0, 'critical': 0, 'high': 0, 'medium': 0, 'positive': 0, 'gap': 0, 'low': 0}
+    for bucket in buckets:
+        if bucket.deleted:
+            continue
+        n = bucket.finding_count
+        priority, status, finding_type = bucket.action_priority, bucket.status, bucket.finding_type
+        counts['total'] += n
+        if priority == 'critical':
+            counts['critical'] += n
+        # NULL comparisons are false in the SQL this mirrors
+        if ((status == 'Red' and priority is not None and priority != 'critical')
+                or priority == 'high'
+                or (finding_type == 'negative' and status is not None and status != 'Red')):
+            counts['high'] += n
+        if status == 'Amber':
+            counts['medium'] += n
+        if status == 'Green' or finding_type == 'positive':
+            counts['positive'] += n
+        if finding_type == 'gap' or status == 'Info':
+            counts['gap'] += n
+        if finding_type in ('neutral', 'informational'):
+            counts['low'] += n
+    return counts
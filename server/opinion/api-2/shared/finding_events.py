@@ -0,0 +1,257 @@
+# File: server/opinion/api_2/shared/finding_events.py
+#
+# Append-only findings change feed for live dashboards (DDFindingsStream).
+#
+# _store_findings_to_db appends one dd_finding_event row per stored finding.
+# Each row has an increasing seq. A client keeps the last seq it received as
+# its cursor and asks for rows after it. Writers for one DD hold an advisory
+# lock until commit, so seq order matches commit order and a cursor cannot
+# skip a row that commits later.
+#
+# After committing, the writer calls get_findings_feed().notify(dd_id, seq).
+# A long-poll request reads the log once. It reads again only when a
+# notification arrives or its wait times out. Notifications reach other
+# processes through a shared.pubsub transport (DD_FINDINGS_FEED_BACKEND,
+# default auto).
+#
+# Requires migrations/add_finding_events.py.
+
+import datetime
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import text
+
+from shared.pubsub import LocalTransport, create_transport
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "dd_finding_events"
+
+# Map status to severity
+STATUS_TO_SEVERITY = {
+    "Red": "high",
+    "Amber": "medium",
+    "Green": "low",
+    "Info": "info",
+    "New": "medium",
+    "Deleted": "low"
+}
+
+# Map finding_type to deal impact
+FINDING_TYPE_TO_IMPACT = {
+    "negative": "noted",
+    "positive": "none",
+    "neutral": "none",
+    "gap": "condition_precedent",
+    "informational": "none"
+}
+
+# Map action_priority to severity
+ACTION_PRIORITY_TO_SEVERITY = {
+    "critical": "high",
+    "high": "high",
+    "medium": "medium",
+    "low": "low",
+    "none": "low"
+}
+
+
+def finding_delta(
+    finding_id: str,
+    status: Optional[str],
+    finding_type: Optional[str],
+    action_priority: Optional[str],
+    requires_action: Optional[bool],
+    confidence_score: Optional[float],
+    direct_answer: Optional[str],
+    evidence_quote: Optional[str],
+    source_document: Optional[str],
+    category: Optional[str],
+    analysis_pass: Optional[int] = None,
+    clause_reference: Optional[str] = None,
+    timestamp: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Live-finding dict as returned by DDFindingsStream."""
+    # Use status for severity, fall back to action_priority
+    severity = STATUS_TO_SEVERITY.get(status, "medium")
+    if action_priority:
+        severity = ACTION_PRIORITY_TO_SEVERITY.get(action_priority, severity)
+
+    return {
+        "id": finding_id,
+        "findingId": finding_id,
+        "timestamp": timestamp or datetime.datetime.utcnow().isoformat(),
+        "sourceDocument": source_document or "Unknown",
+        "category": category or "other",
+        "severity": severity,
+        "dealImpact": FINDING_TYPE_TO_IMPACT.get(finding_type, "noted") if finding_type else "noted",
+        "description": "",
+        "pass": "crossdoc" if analysis_pass == 3 else "analyze",
+        "clauseReference": clause_reference,
+        "requiresAction": requires_action or False,
+        "confidenceScore": float(confidence_score) if confidence_score else 0.5,
+        "directAnswer": direct_answer,
+        "evidenceQuote": evidence_quote
+    }
+
+
+def delta_for_model(db_finding, source_document: Optional[str], category: Optional[str]) -> Dict[str, Any]:
+    """finding_delta for a flushed PerspectiveRiskFinding."""
+    delta = finding_delta(
+        finding_id=str(db_finding.id),
+        status=db_finding.status,
+        finding_type=db_finding.finding_type,
+        action_priority=db_finding.action_priority,
+        requires_action=db_finding.requires_action,
+        confidence_score=db_finding.confidence_score,
+        direct_answer=db_finding.direct_answer,
+        evidence_quote=db_finding.evidence_quote,
+        source_document=source_document,
+        category=category,
+        analysis_pass=db_finding.analysis_pass,
+        clause_reference=db_finding.clause_reference,
+    )
+    delta["description"] = db_finding.phrase or ""
+    return delta
+
+
+def record_finding_events(session, dd_id: str, run_id: Optional[str], deltas: List[Dict[str, Any]]) -> int:
+    """
+    Append 'created' events for finding deltas in the caller's transaction.
+
+    Returns the highest seq written for the DD (0 if none). Call
+    get_findings_feed().notify(dd_id, seq) after the transaction commits.
+    """
+    if not deltas:
+        return 0
+
+    # Serialise writers per DD until commit so seq order matches commit order
+    session.execute(
+        text("SELECT pg_advisory_xact_lock(hashtext(:lock_key))"),
+        {"lock_key": f"dd_finding_event:{dd_id}"}
+    )
+    session.execute(
+        text("""
+            INSERT INTO dd_finding_event (dd_id, run_id, finding_id, event_type, payload)
+            VALUES (:dd_id, :run_id, :finding_id, 'created', CAST(:payload AS jsonb))
+        """),
+        [
+            {
+                "dd_id": str(dd_id),
+                "run_id": str(run_id) if run_id else None,
+                "finding_id": delta["id"],
+                "payload": json.dumps(delta, default=str),
+            }
+            for delta in deltas
+        ]
+    )
+    return latest_cursor(session, dd_id)
+
+
+def latest_cursor(session, dd_id: str) -> int:
+    """Highest seq for a DD (0 if it has no events)."""
+    row = session.execute(
+        text("SELECT COALESCE(MAX(seq), 0) FROM dd_finding_event WHERE dd_id = :dd_id"),
+        {"dd_id": str(dd_id)}
+    ).fetchone()
+    return int(row[0])
+
+
+def read_finding_events(session, dd_id: str, cursor: int, limit: int) -> List[Dict[str, Any]]:
+    """Events after cursor, oldest first: [{'seq', 'type', 'runId', 'finding'}]."""
+    rows = session.execute(
+        text("""
+            SELECT seq, event_type, run_id::text, payload
+            FROM dd_finding_event
+            WHERE dd_id = :dd_id AND seq > :cursor
+            ORDER BY seq
+            LIMIT :limit
+        """),
+        {"dd_id": str(dd_id), "cursor": cursor, "limit": limit}
+    ).fetchall()
+    return [
+        {"seq": row[0], "type": row[1], "runId": row[2], "finding": row[3]}
+        for row in rows
+    ]
+
+
+class FindingsFeed:
+    """Latest known seq per DD in this process; long-poll requests wait on it."""
+
+    def __init__(self, transport=None):
+        self._transport = transport or LocalTransport(CHANNEL)
+        self._latest: Dict[str, int] = {}
+        self._reconnects = 0
+        self._changed = threading.Condition()
+        self._transport.start(self._on_message, self._on_reconnect)
+
+    @property
+    def backend(self) -> str:
+        return self._transport.name
+
+    def notify(self, dd_id: str, seq: int) -> None:
+        """Wake waiters for a DD here and in other processes (call after commit)."""
+        self._advance(str(dd_id), seq)
+        try:
+            self._transport.publish(json.dumps({"dd_id": str(dd_id), "seq": seq}))
+        except Exception as e:
+            # Remote waiters pick the events up when their wait times out
+            logger.warning(f"[FindingsFeed] Could not broadcast seq {seq} for {dd_id} via {self.backend}: {e}")
+
+    def wait(self, dd_id: str, cursor: int, timeout: float) -> bool:
+        """
+        Block until an event after cursor is announced for the DD, or timeout.
+
+        Returns True if one was announced (or the transport reconnected and
+        one may have been missed). False only means no notification arrived;
+        the caller should still read the log once more.
+        """
+        key = str(dd_id)
+        deadline = time.monotonic() + timeout
+        with self._changed:
+            reconnects = self._reconnects
+            while self._latest.get(key, 0) <= cursor and self._reconnects == reconnects:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._changed.wait(timeout=remaining)
+            return True
+
+    def _advance(self, key: str, seq: int) -> None:
+        with self._changed:
+            if seq > self._latest.get(key, 0):
+                self._latest[key] = seq
+                self._changed.notify_all()
+
+    def _on_message(self, payload: str) -> None:
+        try:
+            message = json.loads(payload)
+            self._advance(message["dd_id"], int(message["seq"]))
+        except Exception as e:
+            logger.warning(f"[FindingsFeed] Ignoring malformed message {payload!r}: {e}")
+
+    def _on_reconnect(self) -> None:
+        # Release waiters so notifications missed while disconnected are covered by a re-read
+        with self._changed:
+            self._reconnects += 1
+            self._changed.notify_all()
+
+
+_findings_feed: Optional[FindingsFeed] = None
+_findings_feed_lock = threading.Lock()
+
+
+def get_findings_feed() -> FindingsFeed:
+    """Process-wide FindingsFeed, created on first use."""
+    global _findings_feed
+    if _findings_feed is None:
+        with _findings_feed_lock:
+            if _findings_feed is None:
+                backend = os.environ.get("DD_FINDINGS_FEED_BACKEND", "auto")
+                _findings_feed = FindingsFeed(create_transport(CHANNEL, backend))
+    return _findings_feed
@@ -0,0 +1,618 @@
+# File: server/opinion/api_2/shared/graph_view.py
+#
+# In-memory view engine for the knowledge graph visualisation (DDGraphData).
+#
+# A DD's graph (kg_party, kg_agreement, kg_trigger, material kg_obligation,
+# agreement documents and the edges between them) is loaded once into a
+# KnowledgeGraph: node payloads in visualisation format, an adjacency list and
+# a per-type index. Views are then answered from memory:
+#   - view_type picks the node types; edges are kept when both ends are shown
+#   - focus_node + depth is a breadth-first traversal from the focus node
+#   - clusters are connected components, found with union-find
+#   - views larger than max_nodes keep the best-connected nodes and report
+#     what was hidden per cluster (level of detail for very large graphs)
+#
+# Loaded graphs are cached per (dd_id, run_id) in each worker process. Every
+# request reads a build stamp from kg_build_status (one indexed row per run);
+# KnowledgeGraphBuilder rewrites that row when it clears, builds or fails a
+# graph, so a rebuild in any process invalidates the cached copy everywhere.
+#
+# Configuration:
+#   DD_GRAPH_CACHE_SIZE - graphs kept per worker process (default 16)
+#   DD_GRAPH_MAX_NODES  - default node budget per view, 0 for no limit (default 2000)
+
+import logging
+import os
+import threading
+from collections import OrderedDict, deque
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+GRAPH_CACHE_SIZE = int(os.environ.get("DD_GRAPH_CACHE_SIZE", "16"))
+GRAPH_MAX_NODES = int(os.environ.get("DD_GRAPH_MAX_NODES", "2000"))
+
+# Node type configurations for visualization
+NODE_CONFIGS = {
+    'party': {
+        'color': '#4F46E5',  # Indigo
+        'shape': 'circle',
+        'size_base': 20
+    },
+    'agreement': {
+        'color': '#059669',  # Emerald
+        'shape': 'square',
+        'size_base': 25
+    },
+    'trigger': {
+        'color': '#DC2626',  # Red
+        'shape': 'triangle',
+        'size_base': 15
+    },
+    'obligation': {
+        'color': '#D97706',  # Amber
+        'shape': 'diamond',
+        'size_base': 12
+    },
+    'document': {
+        'color': '#6B7280',  # Gray
+        'shape': 'rectangle',
+        'size_base': 18
+    }
+}
+
+# Node types shown by each view_type (documents only with include_documents)
+VIEW_NODE_TYPES = {
+    'full': ('party', 'agreement', 'trigger', 'obligation', 'document'),
+    'obligations': ('party', 'agreement', 'trigger', 'obligation', 'document'),
+    'parties': ('party',),
+    'agreements': ('agreement', 'party'),
+    'triggers': ('trigger', 'agreement'),
+}
+DEFAULT_VIEW_NODE_TYPES = ('party', 'agreement', 'trigger', 'document')
+
+# Per-type caps on whole-graph views (focus views are bounded by depth instead)
+VIEW_TYPE_LIMITS = {
+    'obligation': 50,
+    'document': 100,
+}
+
+
+class FocusNodeNotFound(KeyError):
+    """The focus node is not part of the requested view."""
+
+
+class KnowledgeGraph:
+    """
+    A DD's knowledge graph held in memory for visualisation.
+
+    Node and edge dicts are shared by every view of the graph and must not be
+    modified by callers.
+    """
+
+    def __init__(self):
+        self.nodes: Dict[str, Dict[str, Any]] = {}
+        self.edges: List[Dict[str, Any]] = []
+        self.adjacency: Dict[str, List[int]] = {}  # node id -> indexes into edges
+        self.by_type: Dict[str, List[str]] = {node_type: [] for node_type in NODE_CONFIGS}
+
+    def add_node(self, node: Dict[str, Any]) -> None:
+        self.nodes[node['id']] = node
+        self.adjacency[node['id']] = []
+        self.by_type[node['type']].append(node['id'])
+
+    def add_edge(self, edge: Dict[str, Any]) -> None:
+        """Add an edge between two loaded nodes; edges to unknown nodes are ignored."""
+        source, target = edge['source'], edge['target']
+        if source not in self.nodes or target not in self.nodes:
+            return
+        index = len(self.edges)
+        self.edges.append(edge)
+        self.adjacency[source].append(index)
+        if target != source:
+            self.adjacency[target].append(index)
+
+    def neighbours(self, node_id: str, visible: Set[str]) -> Iterable[Tuple[str, int]]:
+        """(neighbour id, edge index) pairs of node_id within the visible nodes."""
+        for index in self.adjacency[node_id]:
+            edge = self.edges[index]
+            other = edge['target'] if edge['source'] == node_id else edge['source']
+            if other in visible:
+                yield other, index
+
+    def view(
+        self,
+        view_type: str = 'full',
+        focus_node: Optional[str] = None,
+        depth: int = 2,
+        include_documents: bool = False,
+        max_nodes: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Nodes, edges, clusters and stats of one view of the graph.
+
+        Raises FocusNodeNotFound if focus_node is given but not shown by this view.
+        """
+        node_types = [
+            node_type for node_type in VIEW_NODE_TYPES.get(view_type, DEFAULT_VIEW_NODE_TYPES)
+            if node_type != 'document' or include_documents
+        ]
+
+        if focus_node:
+            candidates = {node_id for node_type in node_types for node_id in self.by_type[node_type]}
+            if focus_node not in candidates:
+                raise FocusNodeNotFound(focus_node)
+            visible = self._within_depth(focus_node, depth, candidates)
+        else:
+            visible = set()
+            for node_type in node_types:
+                ids = self.by_type[node_type]
+                limit = VIEW_TYPE_LIMITS.get(node_type)
+                visible.update(ids[:limit] if limit else ids)
+
+        # Keep the graph's load order so responses are stable between requests
+        ordered = [node_id for node_id in self.nodes if node_id in visible]
+        edge_indexes = self._edges_within(ordered, visible)
+
+        components = connected_components(ordered, (self.edges[i] for i in edge_indexes))
+
+        hidden: Set[str] = set()
+        if max_nodes and len(ordered) > max_nodes:
+            hidden = self._least_connected(ordered, edge_indexes, max_nodes, keep=focus_node)
+            ordered = [node_id for node_id in ordered if node_id not in hidden]
+            visible = set(ordered)
+            edge_indexes = [
+                i for i in edge_indexes
+                if self.edges[i]['source'] in visible and self.edges[i]['target'] in visible
+            ]
+
+        nodes = [self.nodes[node_id] for node_id in ordered]
+        edges = [self.edges[i] for i in edge_indexes]
+
+        return {
+            'nodes': nodes,
+            'edges': edges,
+            'clusters': self._clusters(components, hidden),
+            'stats': graph_stats(nodes, edges),
+            'hidden_nodes': len(hidden),
+        }
+
+    def _within_depth(self, focus_node: str, depth: int, candidates: Set[str]) -> Set[str]:
+        """Nodes reachable from focus_node in at most depth hops through candidates."""
+        reached = {focus_node}
+        queue = deque([(focus_node, 0)])
+        while queue:
+            node_id, hops = queue.popleft()
+            if hops >= depth:
+                continue
+            for other, _ in self.neighbours(node_id, candidates):
+                if other not in reached:
+                    reached.add(other)
+                    queue.append((other, hops + 1))
+        return reached
+
+    def _edges_within(self, ordered: List[str], visible: Set[str]) -> List[int]:
+        """Indexes (in load order) of edges with both ends visible."""
+        indexes = set()
+        for node_id in ordered:
+            for _, index in self.neighbours(node_id, visible):
+                indexes.add(index)
+        return sorted(indexes)
+
+    def _least_connected(self, ordered: List[str], edge_indexes: List[int], max_nodes: int,
+                         keep: Optional[str]) -> Set[str]:
+        """The nodes to hide so that max_nodes remain, dropping the lowest-degree nodes first."""
+        degree = dict.fromkeys(ordered, 0)
+        for index in edge_indexes:
+            edge = self.edges[index]
+            degree[edge['source']] += 1
+            degree[edge['target']] += 1
+        if keep in degree:
+            degree[keep] = len(edge_indexes) + 1
+        # sorted() is stable, so equal degrees keep load order
+        ranked = sorted(ordered, key=lambda node_id: degree[node_id], reverse=True)
+        return set(ranked[max_nodes:])
+
+    def _clusters(self, components: List[List[str]], hidden: Set[str]) -> List[Dict[str, Any]]:
+        clusters = []
+        for component in components:
+            shown = [node_id for node_id in component if node_id not in hidden]
+            if not shown:
+                continue
+            types: Dict[str, int] = {}
+            for node_id in shown:
+                node_type = self.nodes[node_id]['type']
+                types[node_type] = types.get(node_type, 0) + 1
+            clusters.append({
+                'id': f"cluster_{len(clusters)}",
+                'nodes': shown,
+                'size': len(shown),
+                'types': types,
+                'hidden': len(component) - len(shown),
+            })
+        return sorted(clusters, key=lambda c: c['size'], reverse=True)
+
+
+def connected_components(node_ids: List[str], edges: Iterable[Dict[str, Any]]) -> List[List[str]]:
+    """
+    Connected components by union-find, each listed in node_ids order.
+
+    Components are ordered by their first node in node_ids.
+    """
+    index = {node_id: i for i, node_id in enumerate(node_ids)}
+    parent = list(range(len(node_ids)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]  # path halving
+            i = parent[i]
+        return i
+
+    for edge in edges:
+        a, b = index.get(edge['source']), index.get(edge['target'])
+        if a is None or b is None:
+            continue
+        root_a, root_b = find(a), find(b)
+        if root_a != root_b:
+            # The lower index stays the root so component order follows node_ids
+            if root_b < root_a:
+                root_a, root_b = root_b, root_a
+            parent[root_b] = root_a
+
+    components: Dict[int, List[str]] = {}
+    for i, node_id in enumerate(node_ids):
+        components.setdefault(find(i), []).append(node_id)
+    return list(components.values())
+
+
+def graph_stats(nodes: List[Dict[str, Any]], edges: List[Dict[str, Any]]) -> Dict[str, int]:
+    """Counts shown in the graph view header."""
+    counts: Dict[str, int] = {}
+    coc_agreements = consent_required = 0
+    for node in nodes:
+        counts[node['type']] = counts.get(node['type'], 0) + 1
+        if node['type'] == 'agreement':
+            coc_agreements += bool(node['metadata'].get('has_coc'))
+            consent_required += bool(node['metadata'].get('has_consent'))
+    return {
+        'total_nodes': len(nodes),
+        'total_edges': len(edges),
+        'parties': counts.get('party', 0),
+        'agreements': counts.get('agreement', 0),
+        'triggers': counts.get('trigger', 0),
+        'obligations': counts.get('obligation', 0),
+        'coc_agreements': coc_agreements,
+        'consent_required': consent_required
+    }
+
+
+def _node(node_type: str, node_id: str, label: str, metadata: Dict[str, Any],
+          size: Optional[int] = None) -> Dict[str, Any]:
+    config = NODE_CONFIGS[node_type]
+    return {
+        'id': node_id,
+        'label': label,
+        'type': node_type,
+        'color': config['color'],
+        'shape': config['shape'],
+        'size': config['size_base'] if size is None else size,
+        'metadata': metadata
+    }
+
+
+def _truncate(label: str, length: int) -> str:
+    return label if len(label) <= length else label[:length - 3] + '...'
+
+
+def load_knowledge_graph(session, dd_id: str, run_id: Optional[str] = None) -> KnowledgeGraph:
+    """
+    Read a DD's knowledge graph from the kg_* tables.
+
+    run_id restricts vertices to one analysis run; None loads every run of the DD.
+    """
+    params = {'dd_id': dd_id, 'run_id': run_id}
+
+    def run_filter(alias: str) -> str:
+        return f"AND {alias}.run_id = :run_id" if run_id else ""
+
+    graph = KnowledgeGraph()
+
+    parties = session.execute(
+        text(f"""
+            SELECT
+                p.id,
+                p.name,
+                p.party_type,
+                p.role,
+                p.jurisdiction,
+                COUNT(DISTINCT e.document_id) as doc_count,
+                COUNT(DISTINCT e.agreement_id) as agreement_count
+            FROM kg_party p
+            LEFT JOIN kg_edge_party_to e ON p.id = e.party_id
+            WHERE p.dd_id = :dd_id
+            {run_filter('p')}
+            GROUP BY p.id, p.name, p.party_type, p.role, p.jurisdiction
+        """),
+        params
+    ).fetchall()
+
+    for party in parties:
+        graph.add_node(_node(
+            'party', f"party_{party.id}", party.name,
+            {
+                'party_type': party.party_type,
+                'role': party.role,
+                'jurisdiction': party.jurisdiction,
+                'document_count': party.doc_count,
+                'agreement_count': party.agreement_count
+            },
+            size=NODE_CONFIGS['party']['size_base'] + (party.doc_count * 2)
+        ))
+
+    agreements = session.execute(
+        text(f"""
+            SELECT
+                a.id,
+                a.name,
+                a.agreement_type,
+                a.document_id,
+                a.has_change_of_control,
+                a.has_consent_requirement,
+                a.has_assignment_restriction,
+                a.effective_date,
+                a.expiry_date,
+                d.original_file_name
+            FROM kg_agreement a
+            LEFT JOIN document d ON a.document_id = d.id
+            WHERE a.dd_id = :dd_id
+            {run_filter('a')}
+        """),
+        params
+    ).fetchall()
+
+    for agreement in agreements:
+        # Determine risk level based on flags
+        risk_level = 'low'
+        if agreement.has_change_of_control and agreement.has_consent_requirement:
+            risk_level = 'critical'
+        elif agreement.has_change_of_control or agreement.has_consent_requirement:
+            risk_level = 'high'
+        elif agreement.has_assignment_restriction:
+            risk_level = 'medium'
+
+        graph.add_node(_node(
+            'agreement', f"agreement_{agreement.id}", _truncate(agreement.name, 30),
+            {
+                'full_name': agreement.name,
+                'agreement_type': agreement.agreement_type,
+                'document_id': str(agreement.document_id) if agreement.document_id else None,
+                'document_name': agreement.original_file_name,
+                'has_coc': agreement.has_change_of_control,
+                'has_consent': agreement.has_consent_requirement,
+                'has_assignment_restriction': agreement.has_assignment_restriction,
+                'effective_date': agreement.effective_date.isoformat() if agreement.effective_date else None,
+                'expiry_date': agreement.expiry_date.isoformat() if agreement.expiry_date else None,
+                'risk_level': risk_level
+            }
+        ))
+
+    triggers = session.execute(
+        text(f"""
+            SELECT
+                t.id,
+                t.trigger_type,
+                t.description,
+                t.consequences,
+                t.clause_reference,
+                t.agreement_id,
+                a.name as agreement_name
+            FROM kg_trigger t
+            LEFT JOIN kg_agreement a ON t.agreement_id = a.id
+            WHERE t.dd_id = :dd_id
+            {run_filter('t')}
+        """),
+        params
+    ).fetchall()
+
+    for trigger in triggers:
+        node_id = f"trigger_{trigger.id}"
+        graph.add_node(_node(
+            'trigger', node_id, (trigger.trigger_type or 'Unknown').replace('_', ' ').title(),
+            {
+                'trigger_type': trigger.trigger_type,
+                'description': trigger.description,
+                'consequences': trigger.consequences,
+                'clause_reference': trigger.clause_reference,
+                'agreement_name': trigger.agreement_name
+            }
+        ))
+        if trigger.agreement_id:
+            graph.add_edge({
+                'id': f"edge_agr_trg_{trigger.id}",
+                'source': f"agreement_{trigger.agreement_id}",
+                'target': node_id,
+                'type': 'HAS_TRIGGER',
+                'label': 'triggers',
+                'color': '#DC2626',
+                'width': 2
+            })
+
+    obligations = session.execute(
+        text(f"""
+            SELECT
+                o.id,
+                o.description,
+                o.obligation_type,
+                o.agreement_id,
+                o.is_material,
+                o.amount,
+                o.currency
+            FROM kg_obligation o
+            WHERE o.dd_id = :dd_id
+            AND o.is_material = TRUE
+            {run_filter('o')}
+        """),
+        params
+    ).fetchall()
+
+    for obligation in obligations:
+        node_id = f"obligation_{obligation.id}"
+        graph.add_node(_node(
+            'obligation', node_id,
+            _truncate((obligation.obligation_type or 'Obligation').replace('_', ' ').title(), 20),
+            {
+                'description': obligation.description[:200] if obligation.description else None,
+                'obligation_type': obligation.obligation_type,
+                'is_material': obligation.is_material,
+                'amount': float(obligation.amount) if obligation.amount else None,
+                'currency': obligation.currency
+            }
+        ))
+        if obligation.agreement_id:
+            graph.add_edge({
+                'id': f"edge_agr_obl_{obligation.id}",
+                'source': f"agreement_{obligation.agreement_id}",
+                'target': node_id,
+                'type': 'HAS_OBLIGATION',
+                'color': '#D97706',
+                'width': 1
+            })
+
+    # Edge tables have no run_id; add_edge drops edges to vertices of other runs
+    party_edges = session.execute(
+        text("""
+            SELECT e.id, e.party_id, e.agreement_id, e.role
+            FROM kg_edge_party_to e
+            WHERE e.dd_id = :dd_id
+            AND e.agreement_id IS NOT NULL
+        """),
+        params
+    ).fetchall()
+
+    for edge in party_edges:
+        graph.add_edge({
+            'id': f"edge_pty_{edge.id}",
+            'source': f"party_{edge.party_id}",
+            'target': f"agreement_{edge.agreement_id}",
+            'type': 'PARTY_TO',
+            'label': edge.role or '',
+            'color': '#4F46E5',
+            'width': 1
+        })
+
+    consent_edges = session.execute(
+        text("""
+            SELECT rc.id, rc.agreement_id, rc.party_id, rc.consent_type, rc.clause_reference
+            FROM kg_edge_requires_consent rc
+            WHERE rc.dd_id = :dd_id
+        """),
+        params
+    ).fetchall()
+
+    for edge in consent_edges:
+        graph.add_edge({
+            'id': f"edge_consent_{edge.id}",
+            'source': f"agreement_{edge.agreement_id}",
+            'target': f"party_{edge.party_id}",
+            'type': 'REQUIRES_CONSENT',
+            'label': edge.consent_type or 'Consent Required',
+            'color': '#D97706',
+            'width': 2,
+            'dashed': True,
+            'metadata': {
+                'clause_reference': edge.clause_reference
+            }
+        })
+
+    documents = session.execute(
+        text(f"""
+            SELECT DISTINCT
+                d.id,
+                d.original_file_name,
+                d.type as doc_type,
+                f.folder_category
+            FROM document d
+            JOIN folder f ON d.folder_id = f.id
+            JOIN kg_agreement a ON a.document_id = d.id
+            WHERE f.dd_id = :dd_id
+            {run_filter('a')}
+        """),
+        params
+    ).fetchall()
+
+    for doc in documents:
+        graph.add_node(_node(
+            'document', f"document_{doc.id}", _truncate(doc.original_file_name, 25),
+            {
+                'full_name': doc.original_file_name,
+                'doc_type': doc.doc_type,
+                'folder_category': doc.folder_category
+            }
+        ))
+
+    return graph
+
+
+def read_build_stamp(session, dd_id: str) -> Tuple:
+    """
+    Identifies the current build of a DD's graph. Any clear, rebuild, progress
+    update or failure recorded by KnowledgeGraphBuilder changes it.
+    """
+    row = session.execute(
+        text("""
+            SELECT COUNT(*) AS builds,
+                   MAX(GREATEST(started_at, updated_at, completed_at)) AS last_change
+            FROM kg_build_status
+            WHERE dd_id = :dd_id
+        """),
+        {'dd_id': dd_id}
+    ).fetchone()
+    return (row.builds, row.last_change)
+
+
+class GraphCache:
+    """Least-recently-used KnowledgeGraphs per (dd_id, run_id), checked against the build stamp."""
+
+    def __init__(self, max_graphs: int = GRAPH_CACHE_SIZE):
+        self.max_graphs = max(1, max_graphs)
+        self._lock = threading.Lock()
+        self._graphs: "OrderedDict[Tuple[str, str], Tuple[Tuple, KnowledgeGraph]]" = OrderedDict()
+
+    def get(self, session, dd_id: str, run_id: Optional[str] = None) -> KnowledgeGraph:
+        key = (str(dd_id), str(run_id or ''))
+        # Read the stamp before the graph: a build committing in between
+        # leaves an older stamp cached, so the next request reloads
+        stamp = read_build_stamp(session, dd_id)
+
+        with self._lock:
+            cached = self._graphs.get(key)
+            if cached is not None and cached[0] == stamp:
+                self._graphs.move_to_end(key)
+                return cached[1]
+
+        graph = load_knowledge_graph(session, dd_id, run_id)
+        logger.info(f"[GraphCache] Loaded graph for DD {dd_id} run {run_id or 'all'}: "
+                    f"{len(graph.nodes)} nodes, {len(graph.edges)} edges")
+
+        with self._lock:
+            self._graphs[key] = (stamp, graph)
+            self._graphs.move_to_end(key)
+            while len(self._graphs) > self.max_graphs:
+                self._graphs.popitem(last=False)
+        return graph
+
+
+_graph_cache: Optional[GraphCache] = None
+_graph_cache_lock = threading.Lock()
+
+
+def get_graph_cache() -> GraphCache:
+    """Process-wide GraphCache, created on first use."""
+    global _graph_cache
+    if _graph_cache is None:
+        with _graph_cache_lock:
+            if _graph_cache is None:
+                _graph_cache = GraphCache()
+    return _graph_cache
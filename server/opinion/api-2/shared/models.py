@@ -9,6 +9,8 @@ from sqlalchemy.orm import relationship, declarative_base, backref
 import uuid
 import datetime
 
+from shared.serialization import json_value
+
 Base = declarative_base()
 
 FindingTypeEnum = ENUM(
@@ -102,13 +104,7 @@ class BaseModel(Base):
 
         # Include column attributes
         for column in inspect(self).mapper.column_attrs:
-            val = getattr(self, column.key)
-            if isinstance(val, datetime.datetime):
-                result[column.key] = val.isoformat()
-            elif isinstance(val, uuid.UUID):
-                result[column.key] = str(val)
-            else:
-                result[column.key] = val
+            result[column.key] = json_value(getattr(self, column.key))
 
         # Include relationships if requested
         if include_relationships and depth > 0:
@@ -224,6 +220,7 @@ class Document(BaseModel):
     # Page-aware content (for source referencing in findings)
     extracted_text_with_pages = Column(Text, nullable=True)  # Text with [PAGE X] markers
     total_pages = Column(Integer, nullable=True)  # Total number of pages in document
+    extracted_text_hash = Column(String(64), nullable=True)  # SHA-256 of the file extracted_text_with_pages came from
 
     folder = relationship("Folder", back_populates="documents", foreign_keys="[Document.folder_id]")
     original_folder = relationship("Folder", foreign_keys="[Document.original_folder_id]")
@@ -515,6 +512,10 @@ class DDProcessingCheckpoint(BaseModel):
     graph_vertices = Column(Integer, default=0)
     graph_edges = Column(Integer, default=0)
 
+    # Incremental runs: run diffed against, documents carried forward from it
+    previous_run_id = Column(UUID(as_uuid=True), nullable=True)
+    documents_from_cache = Column(Integer, default=0)
+
     # Cost tracking (accumulated across all passes)
     total_input_tokens = Column(Integer, default=0)
     total_output_tokens = Column(Integer, default=0)
@@ -0,0 +1,160 @@
+# File: server/opinion/api_2/shared/pubsub.py
+#
+# Cross-process notification transports for in-process state tables
+# (shared.run_control, shared.finding_events).
+#
+# A transport broadcasts string payloads on one channel and feeds received
+# payloads to a callback on a daemon listener thread:
+#   redis    - Redis pub/sub on REDIS_URL
+#   postgres - LISTEN/NOTIFY on the application database
+#   memory   - no broadcast (single worker process, development)
+# Messages can be lost while a listener reconnects, so on_reconnect is
+# called after every (re)subscribe and consumers resync from the database.
+
+import logging
+import os
+import select
+import threading
+import time
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Seconds between listener reconnect attempts
+RECONNECT_SECONDS = 5.0
+
+OnMessage = Callable[[str], None]
+OnReconnect = Callable[[], None]
+
+
+class LocalTransport:
+    """No broadcast: only the publishing process sees its messages."""
+    name = "memory"
+
+    def __init__(self, channel: str):
+        self.channel = channel
+
+    def start(self, on_message: OnMessage, on_reconnect: OnReconnect) -> None:
+        pass
+
+    def publish(self, payload: str) -> None:
+        pass
+
+
+class RedisTransport:
+    """Redis pub/sub."""
+    name = "redis"
+
+    def __init__(self, redis_url: str, channel: str):
+        import redis
+        self.channel = channel
+        self._client = redis.from_url(redis_url, decode_responses=True)
+
+    def publish(self, payload: str) -> None:
+        self._client.publish(self.channel, payload)
+
+    def start(self, on_message: OnMessage, on_reconnect: OnReconnect) -> None:
+        threading.Thread(
+            target=self._listen, args=(on_message, on_reconnect),
+            name=f"{self.channel}-redis", daemon=True
+        ).start()
+
+    def _listen(self, on_message: OnMessage, on_reconnect: OnReconnect) -> None:
+        while True:
+            try:
+                pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                on_reconnect()
+                for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        on_message(message["data"])
+            except Exception as e:
+                logger.warning(f"[pubsub] Redis listener on {self.channel} failed, reconnecting: {e}")
+                time.sleep(RECONNECT_SECONDS)
+
+
+class PostgresTransport:
+    """PostgreSQL LISTEN/NOTIFY, listening on a connection detached from the pool."""
+    name = "postgres"
+
+    # Seconds select() waits before checking the connection again
+    _POLL_SECONDS = 30.0
+
+    def __init__(self, engine, channel: str):
+        self.channel = channel
+        self._engine = engine
+
+    def publish(self, payload: str) -> None:
+        from sqlalchemy import text
+        with self._engine.begin() as conn:
+            conn.execute(
+                text("SELECT pg_notify(:channel, :payload)"),
+                {"channel": self.channel, "payload": payload}
+            )
+
+    def start(self, on_message: OnMessage, on_reconnect: OnReconnect) -> None:
+        threading.Thread(
+            target=self._listen, args=(on_message, on_reconnect),
+            name=f"{self.channel}-postgres", daemon=True
+        ).start()
+
+    def _listen(self, on_message: OnMessage, on_reconnect: OnReconnect) -> None:
+        while True:
+            connection = None
+            try:
+                connection = self._engine.raw_connection()
+                connection.detach()
+                dbapi_conn = getattr(connection, "dbapi_connection", None) or connection.connection
+                dbapi_conn.autocommit = True
+                with dbapi_conn.cursor() as cursor:
+                    cursor.execute(f"LISTEN {self.channel}")
+                on_reconnect()
+
+                while True:
+                    readable, _, _ = select.select([dbapi_conn], [], [], self._POLL_SECONDS)
+                    if not readable:
+                        continue
+                    dbapi_conn.poll()
+                    while dbapi_conn.notifies:
+                        on_message(dbapi_conn.notifies.pop(0).payload)
+            except Exception as e:
+                logger.warning(f"[pubsub] PostgreSQL listener on {self.channel} failed, reconnecting: {e}")
+                if connection is not None:
+                    try:
+                        connection.close()
+                    except Exception:
+                        pass
+                time.sleep(RECONNECT_SECONDS)
+
+
+def create_transport(channel: str, backend: Optional[str] = None):
+    """
+    Create a transport for a channel.
+
+    backend: 'auto', 'redis', 'postgres' or 'memory' (default 'auto': Redis if
+    reachable, else PostgreSQL, else memory). An unavailable transport falls
+    back along the same order.
+    """
+    backend = (backend or "auto").lower()
+
+    if backend in ("auto", "redis"):
+        redis_url = os.environ.get("REDIS_URL", "redis://localhost:6379")
+        try:
+            import redis
+            redis.from_url(redis_url, decode_responses=True).ping()
+            logger.info(f"[pubsub] {channel}: using Redis pub/sub")
+            return RedisTransport(redis_url, channel)
+        except Exception as e:
+            logger.info(f"[pubsub] {channel}: Redis not available ({e})")
+
+    if backend in ("auto", "redis", "postgres"):
+        try:
+            from shared.session import engine
+            if engine.dialect.name == "postgresql":
+                logger.info(f"[pubsub] {channel}: using PostgreSQL LISTEN/NOTIFY")
+                return PostgresTransport(engine, channel)
+        except Exception as e:
+            logger.info(f"[pubsub] {channel}: PostgreSQL notifications not available ({e})")
+
+    logger.info(f"[pubsub] {channel}: in-process only")
+    return LocalTransport(channel)
@@ -1,12 +1,15 @@
 # File: server/opinion/api_2/shared/rag.py
 
 import json, logging, os, requests, textwrap, time, re
-from langchain_text_splitters import RecursiveCharacterTextSplitter
 from shared.utils import sleep_random_time
+from shared.rate_limit import get_llm_rate_limiter, estimate_message_tokens, retry_after_seconds
 from shared.models import DueDiligence, Document, Folder
 import hashlib
 from bs4 import BeautifulSoup
-from typing import List, Dict
+from typing import Iterable, Iterator, List, Dict, Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from shared.embedding_cache import get_embedding_cache, embedding_cache_key
+from shared.chunking import CHUNK_MAX_TOKENS, CHUNK_OVERLAP_TOKENS, CHUNK_PROVENANCE_KEYS, iter_page_chunks, iter_text_chunks
 
 # Check for dev mode
 def _is_dev_mode():
@@ -539,16 +542,25 @@ def call_llm_with(*, messages, temperature=0, max_tokens=4000,
     max_retries = 5
     base_delay = 2
     max_delay = 60
+
+    # Shared Azure OpenAI budget across every concurrent caller in this process
+    limiter = get_llm_rate_limiter("azure_openai")
+    estimated_tokens = estimate_message_tokens(messages, max_output_tokens=max_tokens)
     
     for attempt in range(max_retries):
+        if limiter and not limiter.acquire(estimated_tokens):
+            raise TimeoutError("Timed out waiting for Azure OpenAI rate limiter")
+
+        actual_tokens = 0
         try:
             logging.info(f"LLM call attempt {attempt + 1}/{max_retries}")
             
+            call_start = time.time()
             response = requests.post(url, headers=headers, json=json_data, timeout=120)
             
             # Handle rate limiting (429)
             if response.status_code == 429:
-                retry_after = int(response.headers.get('Retry-After', base_delay * (2 ** attempt)))
+                retry_after = retry_after_seconds(response.headers, base_delay * (2 ** attempt))
                 retry_after = min(retry_after, max_delay)
                 
                 logging.warning(
@@ -557,7 +569,11 @@ def call_llm_with(*, messages, temperature=0, max_tokens=4000,
                 )
                 
                 if attempt < max_retries - 1:
-                    time.sleep(retry_after)
+                    if limiter:
+                        # Shared backoff: the next acquire waits it out, for every caller
+                        limiter.report_rate_limit_error(retry_after=retry_after)
+                    else:
+                        time.sleep(retry_after)
                     continue
                 else:
                     response.raise_for_status()
@@ -569,6 +585,8 @@ def call_llm_with(*, messages, temperature=0, max_tokens=4000,
                     f"Server error ({response.status_code}) on attempt {attempt + 1}. "
                     f"Waiting {wait_time}s before retry..."
                 )
+                if limiter:
+                    limiter.report_overloaded()
                 
                 if attempt < max_retries - 1:
                     time.sleep(wait_time)
@@ -582,6 +600,9 @@ def call_llm_with(*, messages, temperature=0, max_tokens=4000,
             
             # Log token usage
             usage = response_json.get("usage", {})
+            actual_tokens = usage.get('total_tokens', 0)
+            if limiter:
+                limiter.report_success(time.time() - call_start)
             logging.info(
                 f"LLM call successful. Tokens - "
                 f"Prompt: {usage.get('prompt_tokens', 0)}, "
@@ -626,6 +647,10 @@ def call_llm_with(*, messages, temperature=0, max_tokens=4000,
                 continue
             else:
                 raise
+
+        finally:
+            if limiter:
+                limiter.release(actual_tokens, estimated_tokens)
     
     # Should never reach here, but just in case
     raise Exception("Max retries exceeded without successful response")
@@ -999,40 +1024,22 @@ def clean_text(text: str) -> str: # TODO
     text = text.strip()
     return text
 
-def split_text(text, chunk_size=500, chunk_overlap=50): # TODO check consistency between APIs
-    logging.info("split_text 2")
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=chunk_size,
-        chunk_overlap=chunk_overlap,  # 50 tokens overlap
-        separators=["\n\n", "\n", ".", " ", ""]
-    )
-
-    chunks = text_splitter.split_text(text)
-    return chunks
-
-def split_text_by_page(pages, chunk_size=500, chunk_overlap=50): # TODO check consistency between APIs
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=chunk_size,
-        chunk_overlap=chunk_overlap,
-        separators=["\n\n", "\n", ".", " ", ""]
-    )
-
-    split_chunks = []
-
-    for page in pages:
-        page_number = page["page_number"]
-        text = page["text"]
-
-        chunks = text_splitter.split_text(text)
+def split_text(text, chunk_size=125, chunk_overlap=12): # TODO check consistency between APIs
+    """
+    Chunk texts of at most chunk_size tokens with chunk_overlap tokens of overlap.
 
-        for idx, chunk in enumerate(chunks):
-            split_chunks.append({
-                "page_number": page_number,
-                "chunk_index": idx,
-                "text": chunk
-            })
+    The defaults (~500/50 characters at 4 chars per token) keep the chunking
+    query prompts had when this split on characters.
+    """
+    return [chunk["text"] for chunk in iter_text_chunks(text, chunk_size, chunk_overlap)]
 
-    return split_chunks
+def split_text_by_page(pages, chunk_size=CHUNK_MAX_TOKENS, chunk_overlap=CHUNK_OVERLAP_TOKENS): # TODO check consistency between APIs
+    """
+    Token-bounded chunks of each page with page_number, per-page chunk_index,
+    char offsets and clause refs (see shared.chunking). Use iter_page_chunks
+    directly to stream instead of building the list.
+    """
+    return list(iter_page_chunks(pages, chunk_size, chunk_overlap))
 
 
 def create_chunks_and_embeddings_from_text(text: str) -> List[Dict]:
@@ -1059,30 +1066,144 @@ def create_chunks_and_embeddings_from_text(text: str) -> List[Dict]:
         for item in embeddings_with_metadata
     ]
 
+# Embeddings model and output size (compatible with the current search index)
+EMBEDDING_DEPLOYMENT = "text-embedding-3-large"
+EMBEDDING_DIMENSIONS = 1536
+
+# Concurrent embedding requests in flight; the shared azure_openai_embeddings
+# rate limiter (150k TPM / 900 RPM by default) still admits each one
+EMBEDDING_MAX_CONCURRENT = int(os.environ.get("EMBEDDING_MAX_CONCURRENT", "4"))
+
+# Estimated tokens per request - must stay below the limiter's per-minute
+# token budget or a request could never be admitted
+EMBEDDING_BATCH_MAX_TOKENS = int(os.environ.get("EMBEDDING_BATCH_MAX_TOKENS", "30000"))
+
+# Chunks embedded per window when streaming chunks into the embeddings API
+EMBEDDING_STREAM_WINDOW = int(os.environ.get("EMBEDDING_STREAM_WINDOW", "500"))
+
+
+def _post_embedding_batch(url: str, headers: Dict, texts: List[str], batch_label: str, limiter) -> Tuple[List[List[float]], int]:
+    """
+    Embed one batch of texts with retries. Returns (embeddings, tokens used).
+    """
+    data = {
+        "input": texts,
+        "encoding_format": "float",
+        "dimensions": EMBEDDING_DIMENSIONS #Compatible with current index
+    }
+    
+    # Retry logic with exponential backoff
+    max_retries = 4
+    retry_delay = 2
+    estimated_tokens = sum(len(t) for t in texts) // 4
+    
+    for attempt in range(max_retries):
+        if limiter and not limiter.acquire(estimated_tokens):
+            raise TimeoutError("Timed out waiting for Azure OpenAI embeddings rate limiter")
+
+        tokens_used = 0
+        try:
+            call_start = time.time()
+            response = requests.post(url, headers=headers, json=data, timeout=60)
+            
+            if response.status_code == 429:
+                retry_after = retry_after_seconds(response.headers, retry_delay)
+                logging.warning(
+                    f"Rate limited on batch {batch_label} "
+                    f"(attempt {attempt + 1}/{max_retries}). Waiting {retry_after}s..."
+                )
+                if attempt < max_retries - 1:
+                    if limiter:
+                        limiter.report_rate_limit_error(retry_after=retry_after)
+                    else:
+                        time.sleep(retry_after)
+                    retry_delay *= 2
+                    continue
+                else:
+                    response.raise_for_status()
+            
+            response.raise_for_status()
+
+            response_data = response.json()
+            batch_embeddings = sorted(response_data["data"], key=lambda emb: emb.get("index", 0))
+
+            usage = response_data.get("usage", {})
+            tokens_used = usage.get("total_tokens", 0)
+            if limiter:
+                limiter.report_success(time.time() - call_start)
+
+            return [emb["embedding"] for emb in batch_embeddings], tokens_used
+            
+        except requests.exceptions.Timeout:
+            logging.warning(
+                f"Timeout on batch {batch_label} (attempt {attempt + 1}/{max_retries})"
+            )
+            if attempt < max_retries - 1:
+                time.sleep(retry_delay)
+                retry_delay *= 2
+                continue
+            else:
+                logging.error(f"Failed after {max_retries} timeout attempts")
+                raise
+                
+        except requests.exceptions.HTTPError as e:
+            logging.error(
+                f"HTTP error on batch {batch_label}: {e.response.status_code} - {e.response.text}"
+            )
+            
+            if 500 <= e.response.status_code < 600 and limiter:
+                limiter.report_overloaded()
+            if 500 <= e.response.status_code < 600 and attempt < max_retries - 1:
+                logging.info(f"🔄 Retrying due to server error (attempt {attempt + 2}/{max_retries})...")
+                time.sleep(retry_delay)
+                retry_delay *= 2
+                continue
+            else:
+                raise
+                
+        except Exception as e:
+            logging.error(f"❌ Unexpected error on batch {batch_label}: {str(e)}")
+            if attempt < max_retries - 1:
+                time.sleep(retry_delay)
+                retry_delay *= 2
+                continue
+            else:
+                raise
+
+        finally:
+            if limiter:
+                limiter.release(tokens_used, estimated_tokens)
+
+    raise RuntimeError(f"Embedding batch {batch_label} failed after {max_retries} attempts")
+
+
 def create_chunks_and_embeddings_from_pages(pages: List[Dict], batch_size: int = 500) -> List[Dict]:
     """
     Optimized embedding generation. Rate Lims -> 150,000 TPM, 900 RPM
 
+    Texts already embedded with the same model and dimensions are served from
+    the embedding cache (shared.embedding_cache). Distinct uncached texts are
+    split into batches of at most batch_size texts / EMBEDDING_BATCH_MAX_TOKENS
+    estimated tokens and sent EMBEDDING_MAX_CONCURRENT at a time, each request
+    admitted by the shared rate limiter.
+
     Args:
         pages: List of page chunks with text, page_number, chunk_index
-        batch_size: Number of chunks to process per call
+        batch_size: Maximum number of chunks per call
 
     Returns:
         List of dicts with chunk, page_number, chunk_index, and embedding
+        (plus char offsets and clause refs when the chunks carry them)
     """
     # Use Claude adapter (mock embeddings) in dev mode
     if _is_dev_mode():
         return _dev_create_embeddings(pages, batch_size)
 
-    embeddings = []
-
     endpoint = os.environ.get("AZURE_OPENAI_ENDPOINT")
     api_key = os.environ.get("AZURE_OPENAI_KEY")
-    #TODO -> Def as ENV var, but easier to change on the fly
-    deployment_name = "text-embedding-3-large"
     api_version = "2024-02-01"
     
-    url = f"{endpoint}/openai/deployments/{deployment_name}/embeddings?api-version={api_version}"
+    url = f"{endpoint}/openai/deployments/{EMBEDDING_DEPLOYMENT}/embeddings?api-version={api_version}"
     
     headers = {
         "Content-Type": "application/json",
@@ -1093,103 +1214,85 @@ def create_chunks_and_embeddings_from_pages(pages: List[Dict], batch_size: int =
     logging.info(f"Starting embedding generation for {total_pages} chunks")
     
     start_time = time.time()
+    cache = get_embedding_cache()
+    keys = [embedding_cache_key(EMBEDDING_DEPLOYMENT, EMBEDDING_DIMENSIONS, item["text"]) for item in pages]
+    vectors = cache.get_many(keys) if cache else {}
+
+    # Each distinct uncached text is embedded once
+    pending_texts = {}
+    for key, item in zip(keys, pages):
+        if key not in vectors and key not in pending_texts:
+            pending_texts[key] = item["text"]
+
+    batches = []
+    current_keys, current_tokens = [], 0
+    for key, text in pending_texts.items():
+        text_tokens = len(text) // 4
+        if current_keys and (len(current_keys) >= batch_size or current_tokens + text_tokens > EMBEDDING_BATCH_MAX_TOKENS):
+            batches.append(current_keys)
+            current_keys, current_tokens = [], 0
+        current_keys.append(key)
+        current_tokens += text_tokens
+    if current_keys:
+        batches.append(current_keys)
+
+    logging.info(
+        f"Embeddings: {total_pages - sum(1 for k in keys if k not in vectors)} of {total_pages} chunks cached, "
+        f"{len(pending_texts)} unique texts in {len(batches)} batches"
+    )
+
     successful_batches = 0
     total_tokens_processed = 0
-    
-    for i in range(0, total_pages, batch_size):
-        batch = pages[i:i + batch_size]
-        texts = [item["text"] for item in batch]
-        
-        data = {
-            "input": texts,
-            "encoding_format": "float",
-            "dimensions": 1536 #Compatible with current index
-        }
-        
-        # Retry logic with exponential backoff
-        max_retries = 4
-        retry_delay = 2
-        
-        for attempt in range(max_retries):
+    if batches:
+        limiter = get_llm_rate_limiter("azure_openai_embeddings")
+        workers = max(1, min(EMBEDDING_MAX_CONCURRENT, len(batches)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(
+                    _post_embedding_batch, url, headers,
+                    [pending_texts[key] for key in batch_keys],
+                    f"{n + 1}/{len(batches)}", limiter
+                ): batch_keys
+                for n, batch_keys in enumerate(batches)
+            }
             try:
-                response = requests.post(url, headers=headers, json=data, timeout=60)
-                
-                if response.status_code == 429:
-                    retry_after = int(response.headers.get('Retry-After', retry_delay))
-                    logging.warning(
-                        f"Rate limited on batch {i//batch_size + 1}/{(total_pages + batch_size - 1)//batch_size} "
-                        f"(attempt {attempt + 1}/{max_retries}). Waiting {retry_after}s..."
-                    )
-                    if attempt < max_retries - 1:
-                        time.sleep(retry_after)
-                        retry_delay *= 2
-                        continue
-                    else:
-                        response.raise_for_status()
-                
-                response.raise_for_status()
-
-                response_data = response.json()
-                batch_embeddings = response_data["data"]
-
-                usage = response_data.get("usage", {})
-                tokens_used = usage.get("total_tokens", 0)
-                total_tokens_processed += tokens_used
-
-                for j, emb in enumerate(batch_embeddings):
-                    item = batch[j]
-                    embeddings.append({
-                        "chunk": item["text"],
-                        "page_number": item["page_number"],
-                        "chunk_index": item["chunk_index"],
-                        "embedding": emb["embedding"]
-                    })
-                
-                successful_batches += 1
-                
+                for future in as_completed(futures):
+                    batch_keys = futures[future]
+                    batch_embeddings, tokens_used = future.result()
+                    if len(batch_embeddings) != len(batch_keys):
+                        raise ValueError(
+                            f"Embeddings API returned {len(batch_embeddings)} vectors "
+                            f"for a batch of {len(batch_keys)} texts"
+                        )
+                    batch_vectors = dict(zip(batch_keys, batch_embeddings))
+                    vectors.update(batch_vectors)
+                    if cache:
+                        cache.set_many(batch_vectors)
+
+                    total_tokens_processed += tokens_used
+                    successful_batches += 1
+                    if successful_batches % 5 == 0:
+                        elapsed = time.time() - start_time
+                        rate = successful_batches / elapsed if elapsed > 0 else 0
+                        logging.info(
+                            f"Batch {successful_batches}/{len(batches)} complete | "
+                            f"Rate: {rate:.2f} batches/sec | Tokens: {total_tokens_processed:,}"
+                        )
+            except Exception:
+                for future in futures:
+                    future.cancel()
+                raise
 
-                if successful_batches % 5 == 0:
-                    elapsed = time.time() - start_time
-                    rate = successful_batches / elapsed if elapsed > 0 else 0
-                    logging.info(
-                        f"Batch {successful_batches}/{(total_pages + batch_size - 1)//batch_size} complete | "
-                        f"Rate: {rate:.2f} batches/sec | Tokens: {total_tokens_processed:,}"
-                    )
-                break
-                
-            except requests.exceptions.Timeout:
-                logging.warning(
-                    f"Timeout on batch {i//batch_size + 1} (attempt {attempt + 1}/{max_retries})"
-                )
-                if attempt < max_retries - 1:
-                    time.sleep(retry_delay)
-                    retry_delay *= 2
-                    continue
-                else:
-                    logging.error(f"Failed after {max_retries} timeout attempts")
-                    raise
-                    
-            except requests.exceptions.HTTPError as e:
-                logging.error(
-                    f"HTTP error on batch {i//batch_size + 1}: {e.response.status_code} - {e.response.text}"
-                )
-                
-                if 500 <= e.response.status_code < 600 and attempt < max_retries - 1:
-                    logging.info(f"🔄 Retrying due to server error (attempt {attempt + 2}/{max_retries})...")
-                    time.sleep(retry_delay)
-                    retry_delay *= 2
-                    continue
-                else:
-                    raise
-                    
-            except Exception as e:
-                logging.error(f"❌ Unexpected error on batch {i//batch_size + 1}: {str(e)}")
-                if attempt < max_retries - 1:
-                    time.sleep(retry_delay)
-                    retry_delay *= 2
-                    continue
-                else:
-                    raise
+    embeddings = [
+        {
+            "chunk": item["text"],
+            "page_number": item["page_number"],
+            "chunk_index": item["chunk_index"],
+            "embedding": vectors[key],
+            **{field: item[field] for field in CHUNK_PROVENANCE_KEYS if field in item}
+        }
+        for key, item in zip(keys, pages)
+    ]
     
     elapsed = time.time() - start_time
     chunks_per_sec = len(embeddings) / elapsed if elapsed > 0 else 0
@@ -1202,6 +1305,26 @@ def create_chunks_and_embeddings_from_pages(pages: List[Dict], batch_size: int =
     
     return embeddings
 
+def stream_chunks_and_embeddings(chunks: Iterable[Dict], window: int = EMBEDDING_STREAM_WINDOW) -> Iterator[List[Dict]]:
+    """
+    Embed a stream of chunks (e.g. iter_page_chunks) window by window.
+
+    Yields lists of at most `window` embedded chunks, so only one window of
+    chunk text and vectors is held at a time:
+
+        for embedded in stream_chunks_and_embeddings(iter_page_chunks(pages)):
+            save_to_dd_search_index(..., embedded, ...)
+    """
+    window_chunks = []
+    for chunk in chunks:
+        window_chunks.append(chunk)
+        if len(window_chunks) >= window:
+            yield create_chunks_and_embeddings_from_pages(window_chunks)
+            window_chunks = []
+    if window_chunks:
+        yield create_chunks_and_embeddings_from_pages(window_chunks)
+
+
 def assess_legal_risks(answer_text, document_results, dd_briefing):
     """
     Assess legal risks in the provided answer and documents with yellow/amber/red classification
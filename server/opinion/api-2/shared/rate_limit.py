@@ -0,0 +1,54 @@
+# File: server/opinion/api_2/shared/rate_limit.py
+#
+# Access to the process-wide LLM rate limiters for the shared/ call sites.
+# The limiter itself lives in dd_enhanced.core.queue.rate_limiter; it is
+# imported lazily so shared/ keeps working (unthrottled) where dd_enhanced
+# or its dependencies are unavailable.
+
+import logging
+from typing import Dict, List, Optional
+
+_import_failed = False
+
+
+def get_llm_rate_limiter(name: str = "claude"):
+    """
+    Return the shared rate limiter for an LLM quota, or None if unavailable.
+
+    name: "claude" (Anthropic), "azure_openai" (chat completions) or
+    "azure_openai_embeddings" - configured via CLAUDE_*, AZURE_OPENAI_* and
+    AZURE_OPENAI_EMBEDDINGS_* environment variables respectively.
+    """
+    global _import_failed
+    if _import_failed:
+        return None
+    try:
+        from dd_enhanced.core.queue.rate_limiter import get_rate_limiter
+    except Exception as e:
+        _import_failed = True
+        logging.warning(f"[rate_limit] LLM rate limiter unavailable, calls are not throttled: {e}")
+        return None
+    return get_rate_limiter(name=name)
+
+
+def estimate_message_tokens(messages: List[Dict], system: Optional[str] = None,
+                            max_output_tokens: int = 0) -> int:
+    """
+    Rough token estimate (4 chars per token) for chat messages, plus the
+    request's max_tokens so the output budget is reserved at admission
+    (release() settles against the actual input + output usage).
+    """
+    chars = len(system or "")
+    for message in messages:
+        content = message.get("content", "")
+        chars += len(content if isinstance(content, str) else str(content))
+    return chars // 4 + max_output_tokens
+
+
+def retry_after_seconds(headers, default: Optional[float]) -> Optional[float]:
+    """Seconds from a Retry-After header, or default if absent/unparseable."""
+    try:
+        value = (headers or {}).get("retry-after") or (headers or {}).get("Retry-After")
+        return float(value) if value else default
+    except (TypeError, ValueError):
+        return default
@@ -0,0 +1,235 @@
+# File: server/opinion/api_2/shared/run_control.py
+#
+# Push-based pause / resume / cancel for background DD runs.
+#
+# Processing threads call get_run_control().should_stop(checkpoint_id) before
+# each document. The answer comes from an in-process table. DDProcessPause
+# and DDProcessCancel update that table by publishing commands, so the
+# checks do not query the database. Commands reach other worker processes
+# through a shared.pubsub transport (Redis pub/sub, PostgreSQL LISTEN/NOTIFY
+# or in-process only). DD_RUN_CONTROL_BACKEND selects the transport. The
+# default, auto, uses Redis if it is reachable, else PostgreSQL, else memory.
+#
+# The checkpoint row is still the source of truth. A run's state is read from
+# it on first use, after a transport reconnect, and every
+# DD_RUN_CONTROL_RESYNC_SECONDS (default 60) in case a message was missed.
+
+import json
+import logging
+import os
+import threading
+import time
+import uuid as uuid_module
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Tuple
+
+from shared.pubsub import LocalTransport, create_transport
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "dd_run_control"
+
+# Run states (reasons returned by should_stop)
+RUNNING = "running"
+PAUSED = "paused"
+CANCELLED = "cancelled"
+FAILED = "failed"
+
+_COMMAND_STATES = {"pause": PAUSED, "resume": RUNNING, "cancel": CANCELLED}
+
+# Seconds a run's state is trusted before it is re-read from its checkpoint
+RESYNC_SECONDS = float(os.environ.get("DD_RUN_CONTROL_RESYNC_SECONDS", "60"))
+
+
+def load_checkpoint_state(checkpoint_id: str) -> Optional[str]:
+    """Run state from the processing checkpoint row (None if it cannot be read)."""
+    from shared.session import transactional_session
+    from shared.models import DDProcessingCheckpoint
+
+    try:
+        with transactional_session() as session:
+            checkpoint = session.query(DDProcessingCheckpoint).filter(
+                DDProcessingCheckpoint.id == uuid_module.UUID(str(checkpoint_id))
+            ).first()
+            if checkpoint:
+                if checkpoint.status == 'failed':
+                    if checkpoint.last_error and 'cancelled' in checkpoint.last_error.lower():
+                        return CANCELLED
+                    return FAILED
+                if checkpoint.status == 'paused':
+                    return PAUSED
+        return RUNNING
+    except Exception as e:
+        logger.warning(f"[RunControl] Error loading state for checkpoint {checkpoint_id}: {e}")
+        return None
+
+
+@dataclass
+class _RunEntry:
+    state: str
+    synced_at: float  # time.monotonic() of the last checkpoint read
+
+
+class RunControl:
+    """
+    In-process run states kept current by published commands.
+
+    transport: shared.pubsub transport for commands between processes (in-process only if None)
+    loader: reads a run's state from storage (load_checkpoint_state if None)
+    """
+
+    def __init__(
+        self,
+        transport=None,
+        loader: Optional[Callable[[str], Optional[str]]] = None,
+        resync_seconds: float = RESYNC_SECONDS,
+    ):
+        self._transport = transport or LocalTransport(CHANNEL)
+        self._loader = loader or load_checkpoint_state
+        self._resync_seconds = resync_seconds
+        self._runs: Dict[str, _RunEntry] = {}
+        self._commands_applied = 0
+        self._changed = threading.Condition()
+        self._transport.start(self._on_message, self._invalidate_all)
+
+    @property
+    def backend(self) -> str:
+        return self._transport.name
+
+    def publish(self, checkpoint_id: str, command: str) -> None:
+        """
+        Apply a command ('pause', 'resume' or 'cancel') here and broadcast it.
+
+        Call after the matching checkpoint status change is committed, so a
+        resync cannot undo the command.
+        """
+        if command not in _COMMAND_STATES:
+            raise ValueError(f"Unknown run control command: {command}")
+        key = str(checkpoint_id)
+        self._apply(key, command)
+        try:
+            self._transport.publish(_encode(key, command))
+        except Exception as e:
+            # Other processes still see the new state at their next resync
+            logger.warning(f"[RunControl] Could not broadcast {command} for {key} via {self.backend}: {e}")
+
+    def state(self, checkpoint_id: str) -> str:
+        """Current state of a run, read from its checkpoint only when stale."""
+        key = str(checkpoint_id)
+        with self._changed:
+            entry = self._runs.get(key)
+            if entry is not None and time.monotonic() - entry.synced_at < self._resync_seconds:
+                return entry.state
+            applied_before = self._commands_applied
+
+        loaded = self._loader(key)
+
+        with self._changed:
+            entry = self._runs.get(key)
+            if loaded is None:
+                return entry.state if entry is not None else RUNNING
+            if entry is None:
+                entry = self._runs[key] = _RunEntry(state=loaded, synced_at=time.monotonic())
+            elif self._commands_applied == applied_before:
+                entry.state = loaded
+                entry.synced_at = time.monotonic()
+            # else: a command arrived during the read and is newer than it
+            self._changed.notify_all()
+            return entry.state
+
+    def should_stop(self, checkpoint_id: str) -> Tuple[bool, str]:
+        """(should_stop, reason) with reason 'paused', 'cancelled' or 'failed'."""
+        state = self.state(checkpoint_id)
+        if state == RUNNING:
+            return False, ''
+        return True, state
+
+    def wait_while_paused(self, checkpoint_id: str, max_wait_seconds: float = 3600) -> str:
+        """
+        Block until the run is resumed or cancelled, or max_wait_seconds pass.
+
+        Returns 'resumed', 'cancelled' or 'timeout'.
+        """
+        key = str(checkpoint_id)
+        deadline = time.monotonic() + max_wait_seconds
+        while True:
+            state = self.state(key)
+            if state == RUNNING:
+                return 'resumed'
+            if state in (CANCELLED, FAILED):
+                return 'cancelled'
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return 'timeout'
+            with self._changed:
+                entry = self._runs.get(key)
+                if entry is not None and entry.state == PAUSED:
+                    self._changed.wait(timeout=min(remaining, self._resync_seconds))
+
+    def forget(self, checkpoint_id: str) -> None:
+        """Drop a finished run's state."""
+        with self._changed:
+            self._runs.pop(str(checkpoint_id), None)
+
+    def _on_message(self, payload: str) -> None:
+        try:
+            message = json.loads(payload)
+            self._apply(message["checkpoint_id"], message["command"])
+        except Exception as e:
+            logger.warning(f"[RunControl] Ignoring malformed message {payload!r}: {e}")
+
+    def _apply(self, key: str, command: str) -> None:
+        state = _COMMAND_STATES.get(command)
+        if state is None:
+            return
+        with self._changed:
+            self._commands_applied += 1
+            entry = self._runs.get(key)
+            if entry is None:
+                # Not running here; the state is loaded if the run starts later
+                return
+            entry.state = state
+            self._changed.notify_all()
+
+    def _invalidate_all(self) -> None:
+        # Messages may have been missed while the transport was disconnected
+        with self._changed:
+            for entry in self._runs.values():
+                entry.synced_at = 0.0
+
+
+def _encode(key: str, command: str) -> str:
+    return json.dumps({"checkpoint_id": key, "command": command})
+
+
+def create_run_control(backend: Optional[str] = None) -> RunControl:
+    """
+    Create a RunControl on the configured transport.
+
+    backend: 'auto', 'redis', 'postgres' or 'memory' (default DD_RUN_CONTROL_BACKEND,
+    see shared.pubsub.create_transport).
+    """
+    backend = backend or os.environ.get("DD_RUN_CONTROL_BACKEND", "auto")
+    return RunControl(create_transport(CHANNEL, backend))
+
+
+_run_control: Optional[RunControl] = None
+_run_control_lock = threading.Lock()
+
+
+def get_run_control() -> RunControl:
+    """Process-wide RunControl, created on first use."""
+    global _run_control
+    if _run_control is None:
+        with _run_control_lock:
+            if _run_control is None:
+                _run_control = create_run_control()
+    return _run_control
+
+
+def publish_run_command(checkpoint_id: str, command: str) -> None:
+    """Publish a pause/resume/cancel command; never raises (runs resync regardless)."""
+    try:
+        get_run_control().publish(checkpoint_id, command)
+    except Exception as e:
+        logger.warning(f"[RunControl] Could not publish {command} for {checkpoint_id}: {e}")
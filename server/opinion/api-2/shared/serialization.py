@@ -0,0 +1,61 @@
+# File: server/opinion/api_2/shared/serialization.py
+#
+# Column projections for list endpoints.
+#
+# BaseModel.to_dict serialises loaded model instances and, by default,
+# follows every relationship. That loads each related collection with its own
+# query. A list endpoint that needs a few fields per row should declare them
+# as a Projection instead:
+#
+#     RUN_LIST_FIELDS = Projection(
+#         DDAnalysisRun,
+#         run_id=DDAnalysisRun.id,
+#         name=DDAnalysisRun.name,
+#         created_at=DDAnalysisRun.created_at,
+#     )
+#     rows = RUN_LIST_FIELDS.query(session).filter(...).all()
+#     data = [RUN_LIST_FIELDS.to_dict(row) for row in rows]
+#
+# The query selects only those columns, as plain SQL with no ORM instances or
+# relationships. Fields can be any SQL expression: columns of joined tables,
+# correlated subqueries, or aggregates.
+
+import datetime
+import uuid
+from typing import Any, Dict, Iterable
+
+
+def json_value(val: Any) -> Any:
+    """Column value in the form list endpoints return it (ISO datetimes, string UUIDs)."""
+    if isinstance(val, datetime.datetime):
+        return val.isoformat()
+    if isinstance(val, uuid.UUID):
+        return str(val)
+    return val
+
+
+class Projection:
+    """
+    Named SQL expressions selected for one endpoint, in response key order.
+
+    model: entity the query selects from (its joins are added by the caller)
+    fields: response key -> column or SQL expression
+    """
+
+    def __init__(self, model, **fields):
+        self.model = model
+        self.fields = fields
+
+    @property
+    def keys(self) -> Iterable[str]:
+        return self.fields.keys()
+
+    def query(self, session):
+        """session.query over the projected columns, selecting from the model."""
+        return session.query(
+            *(expression.label(key) for key, expression in self.fields.items())
+        ).select_from(self.model)
+
+    def to_dict(self, row) -> Dict[str, Any]:
+        """Response dict for one row of query()."""
+        return {key: json_value(getattr(row, key)) for key in self.fields}
@@ -5,11 +5,54 @@ from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy import create_engine
 
-engine = create_engine(os.environ["DB_CONNECTION_STRING"], echo=True)
+from shared.db_instrumentation import instrument_engine
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.environ.get(name, str(default)))
+
+
+def create_db_engine(url: str = None, **overrides):
+    """
+    Create an instrumented engine configured from the environment.
+
+    DB_ECHO: log every statement (default false)
+    DB_POOL_SIZE / DB_MAX_OVERFLOW: pooled / extra connections (default 5 / 10)
+    DB_POOL_TIMEOUT: seconds to wait for a pooled connection (default 30)
+    DB_POOL_RECYCLE: seconds before a connection is replaced (default 1800)
+    DB_POOL_PRE_PING: test connections on checkout (default true)
+    DB_STATEMENT_TIMEOUT_MS: PostgreSQL statement_timeout (default 0 = none)
+
+    Query counts and slow-query logging: see shared.db_instrumentation.
+    """
+    url = url or os.environ["DB_CONNECTION_STRING"]
+    options = {
+        "echo": os.environ.get("DB_ECHO", "false").lower() == "true",
+        "pool_pre_ping": os.environ.get("DB_POOL_PRE_PING", "true").lower() == "true",
+        "pool_recycle": _env_int("DB_POOL_RECYCLE", 1800),
+    }
+    if not url.startswith("sqlite"):
+        options.update(
+            pool_size=_env_int("DB_POOL_SIZE", 5),
+            max_overflow=_env_int("DB_MAX_OVERFLOW", 10),
+            pool_timeout=_env_int("DB_POOL_TIMEOUT", 30),
+        )
+
+    statement_timeout_ms = _env_int("DB_STATEMENT_TIMEOUT_MS", 0)
+    if statement_timeout_ms and url.startswith("postgres"):
+        options["connect_args"] = {"options": f"-c statement_timeout={statement_timeout_ms}"}
+
+    options.update(overrides)
+    db_engine = create_engine(url, **options)
+    instrument_engine(db_engine)
+    return db_engine
+
+
+engine = create_db_engine()
 SessionLocal = sessionmaker(bind=engine)
 
 @contextmanager
-def transactional_session():    
+def transactional_session():
     session = SessionLocal()
     try:
         yield session
@@ -25,4 +68,4 @@ def transactional_session():
         logging.exception("Unexpected error during transaction")
         raise
     finally:
-        session.close()
\ No newline at end of file
+        session.close()
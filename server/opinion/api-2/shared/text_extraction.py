@@ -0,0 +1,227 @@
+"""
+Document Text Extraction Service
+
+Shared, cached text extraction for every stage that reads document content
+(classification, entity mapping, DD processing):
+
+- Page-tagged text ([PAGE N] markers) is persisted on the Document row
+  (extracted_text_with_pages) together with the SHA-256 of the file it was
+  extracted from (extracted_text_hash). Later stages and later runs reuse it
+  as long as the file is unchanged.
+- Cache misses are extracted in a process pool - PyMuPDF/python-docx parsing
+  is CPU-bound, so threads would serialise on the GIL.
+
+Configuration:
+    DD_TEXT_EXTRACTION_WORKERS: process pool size (default: CPU count)
+
+Usage:
+    with transactional_session() as session:
+        docs = session.query(Document).filter(...).all()
+        texts = get_document_texts(docs)   # {doc_id: text}, cache written back to docs
+"""
+
+import hashlib
+import logging
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+TEXT_EXTRACTION_WORKERS = int(os.environ.get("DD_TEXT_EXTRACTION_WORKERS", "0")) or (os.cpu_count() or 2)
+
+# Below this many cache misses a process pool costs more than it saves
+MIN_DOCS_FOR_POOL = 4
+
+_PAGE_MARKER = re.compile(r"^\[PAGE (\d+)\]$", re.MULTILINE)
+
+
+def extract_text_from_file_with_extension(file_path: str, extension: str) -> str:
+    """Extract text content from a file, using the provided extension to determine file type.
+    This is needed because in dev mode files are stored without extensions."""
+    if not os.path.exists(file_path):
+        logging.warning(f"File not found: {file_path}")
+        return ""
+
+    ext = extension.lower().lstrip('.')
+
+    try:
+        if ext == 'txt':
+            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+                return f.read()
+
+        elif ext == 'pdf':
+            try:
+                import fitz  # PyMuPDF
+                doc = fitz.open(file_path)
+                text_parts = []
+                for page_num, page in enumerate(doc, start=1):
+                    page_text = page.get_text()
+                    if page_text.strip():
+                        text_parts.append(f"\n[PAGE {page_num}]\n{page_text}")
+                doc.close()
+                return "".join(text_parts)
+            except ImportError:
+                logging.warning("PyMuPDF not installed, trying pdfplumber")
+                try:
+                    import pdfplumber
+                    with pdfplumber.open(file_path) as pdf:
+                        text_parts = []
+                        for page_num, page in enumerate(pdf.pages, start=1):
+                            page_text = page.extract_text() or ""
+                            if page_text.strip():
+                                text_parts.append(f"\n[PAGE {page_num}]\n{page_text}")
+                        return "".join(text_parts)
+                except ImportError:
+                    logging.error("No PDF library available")
+                    return f"[PDF file - {os.path.basename(file_path)}]"
+
+        elif ext in ['docx', 'doc']:
+            try:
+                from docx import Document as DocxDocument
+                doc = DocxDocument(file_path)
+                return "\n".join([para.text for para in doc.paragraphs])
+            except ImportError:
+                logging.error("python-docx not installed")
+                return f"[Word document - {os.path.basename(file_path)}]"
+            except Exception as e:
+                logging.error(f"Error reading docx: {e}")
+                # Try reading as binary and extracting text
+                return ""
+
+        else:
+            # Try to read as text
+            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+                return f.read()
+
+    except Exception as e:
+        logging.error(f"Error extracting text from {file_path}: {e}")
+        return ""
+
+
+def document_file_path(doc, local_storage_path: Optional[str] = None) -> str:
+    """Local path of a document's file ({storage}/docs/{doc_id}, stored without extension)."""
+    if local_storage_path is None:
+        from shared.dev_adapters.dev_config import get_dev_config
+        local_storage_path = get_dev_config().get("local_storage_path", "/tmp/dd_storage")
+    return os.path.join(local_storage_path, "docs", str(doc.id))
+
+
+def document_extension(doc) -> str:
+    """File extension for a document (its type, or the original filename's extension)."""
+    return doc.type if doc.type else os.path.splitext(doc.original_file_name)[1].lstrip('.')
+
+
+def bytes_hash(data: bytes) -> str:
+    """SHA-256 of in-memory file contents; equals content_hash() of the same file."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def content_hash(file_path: str) -> Optional[str]:
+    """SHA-256 of a file's bytes, or None if it cannot be read."""
+    try:
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+        return digest.hexdigest()
+    except OSError:
+        return None
+
+
+def _extract_job(job: Tuple[str, str, str]) -> Tuple[str, str]:
+    """Process pool entry point: (doc_id, file_path, extension) -> (doc_id, text)."""
+    doc_id, file_path, extension = job
+    try:
+        return doc_id, extract_text_from_file_with_extension(file_path, extension)
+    except Exception as e:
+        logging.warning(f"Text extraction failed for {doc_id}: {e}")
+        return doc_id, ""
+
+
+def _pool_context():
+    # The callers run in background threads; forking a threaded process can
+    # deadlock children, so start workers from a clean server process instead
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context()
+
+
+def _extract_many(jobs: List[Tuple[str, str, str]], max_workers: int) -> Dict[str, str]:
+    """Extract jobs in a process pool, falling back to in-process extraction."""
+    if len(jobs) < MIN_DOCS_FOR_POOL or max_workers <= 1:
+        return dict(_extract_job(job) for job in jobs)
+
+    workers = min(max_workers, len(jobs))
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=_pool_context()) as executor:
+            return dict(executor.map(_extract_job, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+    except Exception as e:
+        logging.warning(f"[text_extraction] Process pool unavailable, extracting in-process: {e}")
+        return dict(_extract_job(job) for job in jobs)
+
+
+def get_document_texts(
+    documents: List,
+    local_storage_path: Optional[str] = None,
+    max_workers: Optional[int] = None
+) -> Dict[str, str]:
+    """
+    Page-tagged text for each document, keyed by str(doc.id).
+
+    Text cached on the Document row is reused when its hash matches the
+    file's current content. Text stored without a hash (rows written before
+    hashing, e.g. by OCR) is kept and the hash backfilled, since re-extraction
+    would lose the OCR text of scanned files. Everything else is extracted in
+    a process pool and written back onto the rows. The caller's session
+    commits the cache. Documents whose file is missing map to "".
+    """
+    texts: Dict[str, str] = {}
+    jobs: List[Tuple[str, str, str]] = []
+    hashes: Dict[str, str] = {}
+    by_id = {}
+
+    for doc in documents:
+        doc_id = str(doc.id)
+        file_path = document_file_path(doc, local_storage_path)
+        file_hash = content_hash(file_path)
+        if file_hash is None:
+            logging.warning(f"File not found: {file_path}")
+            texts[doc_id] = ""
+            continue
+
+        if doc.extracted_text_hash == file_hash and doc.extracted_text_with_pages is not None:
+            texts[doc_id] = doc.extracted_text_with_pages
+            continue
+
+        if doc.extracted_text_hash is None and doc.extracted_text_with_pages:
+            doc.extracted_text_hash = file_hash
+            texts[doc_id] = doc.extracted_text_with_pages
+            continue
+
+        by_id[doc_id] = doc
+        hashes[doc_id] = file_hash
+        jobs.append((doc_id, file_path, document_extension(doc)))
+
+    if jobs:
+        logging.info(
+            f"[text_extraction] {len(texts)} cached, extracting {len(jobs)} documents "
+            f"with {min(max_workers or TEXT_EXTRACTION_WORKERS, len(jobs))} workers"
+        )
+        for doc_id, text in _extract_many(jobs, max_workers or TEXT_EXTRACTION_WORKERS).items():
+            text = text.replace("\x00", "")  # Postgres TEXT rejects NUL bytes
+            texts[doc_id] = text
+            doc = by_id[doc_id]
+            doc.extracted_text_with_pages = text
+            doc.extracted_text_hash = hashes[doc_id]
+            # Formats without page markers (docx, xlsx) keep their stored page count
+            total_pages = max((int(n) for n in _PAGE_MARKER.findall(text)), default=None)
+            if total_pages is not None:
+                doc.total_pages = total_pages
+
+    return texts
+
+
+def get_document_text(doc, local_storage_path: Optional[str] = None) -> str:
+    """Cached page-tagged text for a single document (see get_document_texts)."""
+    return get_document_texts([doc], local_storage_path).get(str(doc.id), "")
@@ -7,7 +7,8 @@ from azure.storage.blob import BlobServiceClient, generate_blob_sas, BlobSasPerm
 from datetime import datetime, timedelta
 from shared.ddsearch import save_to_dd_search_index
 from shared.search import save_to_search_index
-from shared.rag import create_chunks_and_embeddings_from_pages, create_chunks_and_embeddings_from_text, split_text_by_page
+from shared.rag import create_chunks_and_embeddings_from_pages, create_chunks_and_embeddings_from_text, split_text_by_page, stream_chunks_and_embeddings
+from shared.chunking import iter_page_chunks
 from azure.ai.documentintelligence import DocumentIntelligenceClient
 from azure.ai.documentintelligence.models import AnalyzeDocumentRequest
 from azure.core.credentials import AzureKeyCredential
@@ -64,7 +65,7 @@ def handle_file_with_next_chunk_to_process(
             logging.warning(f"No text extracted from {safe_filename}; marking as failed")
             return (0, 0, "failed")
         
-        pages_chunked = split_text_by_page(pages, chunk_size=800, chunk_overlap=80)
+        pages_chunked = split_text_by_page(pages)
         chunk_stop = next_chunk_to_process + PROCESSING_SIZE
         chunks_to_process = pages_chunked[next_chunk_to_process:chunk_stop]
         
@@ -99,9 +100,8 @@ def handle_file(file_bytes, safe_filename: str, extension: str, doc_id: str) ->
     
     try:
         pages = extract_text_with_new_client(file_bytes, extension, safe_filename)
-        pages_chunked = split_text_by_page(pages)
-        chunks_and_embeddings = create_chunks_and_embeddings_from_pages(pages_chunked)
-        save_to_search_index(doc_id, chunks_and_embeddings, safe_filename)
+        for chunks_and_embeddings in stream_chunks_and_embeddings(iter_page_chunks(pages)):
+            save_to_search_index(doc_id, chunks_and_embeddings, safe_filename)
         return True
     except Exception as e:
         logging.error(f"Failed to process {safe_filename}: {str(e)}")
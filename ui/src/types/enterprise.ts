@@ -114,6 +114,7 @@ export interface GraphCluster {
   nodes: string[];
   size: number;
   types: Record<GraphNodeType, number>;
+  hidden?: number; // nodes of this cluster left out by the max_nodes budget
 }
 
 export interface GraphStats {
@@ -129,8 +130,12 @@ export interface GraphStats {
 
 export interface GraphMetadata {
   dd_id: string;
+  run_id?: string | null;
   view_type: GraphViewType;
+  focus_node?: string | null;
+  depth?: number;
   include_documents: boolean;
+  hidden_nodes?: number;
   generated_at: string;
 }
 